@@ -1,6 +1,6 @@
 # deltica/backend/app/models.py
 
-from sqlalchemy import Column, Integer, Float, String, Date, DateTime, Enum, ForeignKey, Computed, Boolean
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, Enum, ForeignKey, Computed, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.core.database import Base
@@ -14,8 +14,8 @@ class Equipment(Base):
     equipment_model = Column(String, nullable=False)
     equipment_type = Column(Enum('SI', 'IO', name='equipment_type_enum'), nullable=False)
     equipment_specs = Column(String)
-    factory_number = Column(String, nullable=False)
-    inventory_number = Column(String, nullable=False)
+    factory_number = Column(String, nullable=False, index=True)
+    inventory_number = Column(String, nullable=False, index=True)
     equipment_year = Column(Integer, nullable=False)
 
     verifications = relationship("Verification", back_populates="equipment")
@@ -26,12 +26,12 @@ class Verification(Base):
     __tablename__ = "verification"
 
     id = Column(Integer, primary_key=True, index=True)
-    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False)
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False, index=True)
     verification_type = Column(Enum('calibration', 'verification', 'certification', name='verification_type_enum'), nullable=False)
     registry_number = Column(String)
     verification_interval = Column(Integer, nullable=False)
     verification_date = Column(Date, nullable=False)
-    verification_due = Column(Date, Computed("(verification_date + make_interval(months => verification_interval) - interval '1 day')::date"))
+    verification_due = Column(Date, Computed("(verification_date + make_interval(months => verification_interval) - interval '1 day')::date"), index=True)
     verification_plan = Column(Date, nullable=False)
     verification_state = Column(Enum(
         'state_work',
@@ -49,7 +49,7 @@ class Verification(Base):
         'status_verification',
         'status_repair',
         name='verification_status_enum'
-    ), nullable=False)  # Auto-calculated by trigger
+    ), nullable=False, index=True)  # Auto-calculated by trigger
 
     equipment = relationship("Equipment", back_populates="verifications")
 
@@ -58,7 +58,7 @@ class Responsibility(Base):
     __tablename__ = "responsibility"
 
     id = Column(Integer, primary_key=True, index=True)
-    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False)
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False, index=True)
     department = Column(String, nullable=False)
     responsible_person = Column(String, nullable=False)
     verifier_org = Column(String, nullable=False)
@@ -68,7 +68,7 @@ class Finance(Base):
     __tablename__ = "finance"
 
     id = Column(Integer, primary_key=True, index=True)
-    equipment_model_id = Column(Integer, ForeignKey("equipment.id"), nullable=False)
+    equipment_model_id = Column(Integer, ForeignKey("equipment.id"), nullable=False, index=True)
     budget_item = Column(String, nullable=False)  # Статья бюджета (обязательное поле)
     code_rate = Column(String)  # Тариф (опциональное поле)
     cost_rate = Column(Float)
@@ -82,13 +82,18 @@ class Finance(Base):
 
 class EquipmentFile(Base):
     __tablename__ = "equipment_files"
+    __table_args__ = (
+        # Список файлов оборудования в порядке sort_order
+        Index("ix_equipment_files_equipment_id_sort_order", "equipment_id", "sort_order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     equipment_id = Column(Integer, ForeignKey("equipment.id", ondelete="CASCADE"), nullable=False)
     file_name = Column(String, nullable=False)  # Оригинальное имя файла
-    file_path = Column(String, nullable=False)  # Относительный путь к файлу
+    file_path = Column(String, nullable=False, index=True)  # Относительный путь к файлу
     file_type = Column(Enum('verification_docs', 'general_docs', 'active_certificate', name='file_type_enum'), nullable=False, default='general_docs')
     file_size = Column(Integer, nullable=False)  # Размер в байтах
+    file_hash = Column(String(64))  # SHA-256 содержимого (hex)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active_certificate = Column(Boolean, default=False)  # Флаг действующего сертификата
     sort_order = Column(Integer, default=0)  # Порядок сортировки для drag & drop
@@ -96,6 +101,63 @@ class EquipmentFile(Base):
     equipment = relationship("Equipment", back_populates="files")
 
 
+# ==================== ПРОЕКЦИЯ ДЛЯ ЧТЕНИЯ ====================
+
+class EquipmentRegistry(Base):
+    """
+    Денормализованная проекция equipment + verification + responsibility + finance:
+    одна строка на единицу оборудования, списки и выгрузки читают её без JOIN.
+    Поддерживается EquipmentRegistryService (хуки сессии и сервисы), не редактируется напрямую.
+    """
+    __tablename__ = "equipment_registry"
+
+    equipment_id = Column(Integer, ForeignKey("equipment.id", ondelete="CASCADE"), primary_key=True)
+    equipment_name = Column(String, nullable=False)
+    equipment_model = Column(String, nullable=False)
+    equipment_type = Column(Enum('SI', 'IO', name='equipment_type_enum'), nullable=False)
+    equipment_specs = Column(String)
+    factory_number = Column(String, nullable=False)
+    inventory_number = Column(String, nullable=False)
+    equipment_year = Column(Integer, nullable=False)
+    # Поля связанных таблиц nullable: у оборудования может не быть записи
+    verification_type = Column(Enum('calibration', 'verification', 'certification', name='verification_type_enum'))
+    registry_number = Column(String)
+    verification_interval = Column(Integer)
+    verification_date = Column(Date)
+    verification_due = Column(Date, index=True)  # Копия computed значения
+    verification_plan = Column(Date)
+    verification_state = Column(Enum(
+        'state_work',
+        'state_storage',
+        'state_verification',
+        'state_repair',
+        'state_archived',
+        name='verification_state_enum'
+    ))
+    status = Column(Enum(
+        'status_fit',
+        'status_expired',
+        'status_expiring',
+        'status_storage',
+        'status_verification',
+        'status_repair',
+        name='verification_status_enum'
+    ), index=True)
+    department = Column(String)
+    responsible_person = Column(String)
+    verifier_org = Column(String)
+    budget_item = Column(String)
+    code_rate = Column(String)
+    cost_rate = Column(Float)
+    quantity = Column(Integer)
+    coefficient = Column(Float)
+    total_cost = Column(Float)
+    invoice_number = Column(String)
+    paid_amount = Column(Float)
+    payment_date = Column(Date)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 # ==================== АРХИВНЫЕ ТАБЛИЦЫ ====================
 
 class ArchivedEquipment(Base):
@@ -126,7 +188,7 @@ class ArchivedVerification(Base):
     __tablename__ = "archived_verification"
 
     id = Column(Integer, primary_key=True, index=True)
-    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False)
+    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False, index=True)
     original_equipment_id = Column(Integer, nullable=False)  # ID оригинального equipment
     verification_type = Column(Enum('calibration', 'verification', 'certification', name='verification_type_enum'), nullable=False)
     registry_number = Column(String)
@@ -160,7 +222,7 @@ class ArchivedResponsibility(Base):
     __tablename__ = "archived_responsibility"
 
     id = Column(Integer, primary_key=True, index=True)
-    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False)
+    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False, index=True)
     original_equipment_id = Column(Integer, nullable=False)
     department = Column(String, nullable=False)
     responsible_person = Column(String, nullable=False)
@@ -172,7 +234,7 @@ class ArchivedFinance(Base):
     __tablename__ = "archived_finance"
 
     id = Column(Integer, primary_key=True, index=True)
-    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False)
+    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False, index=True)
     original_equipment_id = Column(Integer, nullable=False)
     budget_item = Column(String, nullable=False)  # Статья бюджета (обязательное поле)
     code_rate = Column(String)  # Тариф (опциональное поле)
@@ -190,12 +252,13 @@ class ArchivedEquipmentFile(Base):
     __tablename__ = "archived_equipment_files"
 
     id = Column(Integer, primary_key=True, index=True)
-    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False)
+    archived_equipment_id = Column(Integer, ForeignKey("archived_equipment.id", ondelete="CASCADE"), nullable=False, index=True)
     original_equipment_id = Column(Integer, nullable=False)
     file_name = Column(String, nullable=False)
-    file_path = Column(String, nullable=False)
+    file_path = Column(String, nullable=False, index=True)
     file_type = Column(Enum('verification_docs', 'general_docs', 'active_certificate', name='file_type_enum'), nullable=False, default='general_docs')
     file_size = Column(Integer, nullable=False)
+    file_hash = Column(String(64))  # SHA-256 содержимого (hex)
     uploaded_at = Column(DateTime(timezone=True), nullable=False)  # Копируем дату оригинальной загрузки
     sort_order = Column(Integer, default=0)  # Порядок сортировки
 
@@ -228,8 +291,9 @@ class PinnedDocument(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     file_name = Column(String, nullable=False)  # Оригинальное имя файла
-    file_path = Column(String, nullable=False)  # Относительный путь к файлу
+    file_path = Column(String, nullable=False, index=True)  # Относительный путь к файлу
     file_size = Column(Integer, nullable=False)  # Размер в байтах
+    file_hash = Column(String(64))  # SHA-256 содержимого (hex)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     uploaded_by = Column(String, nullable=False)  # Username пользователя, загрузившего файл
 
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     DB_USER: str
@@ -8,6 +8,64 @@ class Settings(BaseSettings):
     DB_PORT: int = 5432
     DB_NAME: str = "deltica_db"
 
+    # Пул синхронного движка: размер пула плюс переполнение не должны
+    # превышать число потоков, одновременно обращающихся к БД
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Пересоздавать соединения старше N секунд (-1 - не пересоздавать)
+    DB_POOL_RECYCLE: int = 1800
+    # Проверять соединение перед выдачей из пула (переживает перезапуск БД)
+    DB_POOL_PRE_PING: bool = True
+    # statement_timeout PostgreSQL в миллисекундах (0 - без ограничения)
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+
+    # Пул асинхронного движка (psycopg 3): соединения заняты только на время
+    # запроса к БД, поэтому пул может быть меньше числа одновременных клиентов
+    DB_ASYNC_POOL_SIZE: int = 10
+    DB_ASYNC_MAX_OVERFLOW: int = 10
+    DB_ASYNC_POOL_TIMEOUT: float = 30.0
+
+    # Логирование: записи передаются в фоновый поток через ограниченную очередь
+    LOG_CONSOLE: bool = True  # Дублировать логи в stdout (в production можно отключить)
+    LOG_QUEUE_SIZE: int = 10000
+    # При переполнении очереди: "drop" - отбросить запись, "block" - ждать место
+    # не дольше LOG_QUEUE_BLOCK_TIMEOUT секунд, затем отбросить
+    LOG_QUEUE_FULL_POLICY: Literal["drop", "block"] = "drop"
+    LOG_QUEUE_BLOCK_TIMEOUT: float = 1.0
+
+    # Фоновый сбор показателей системы для /health/system и /health/history:
+    # интервал замеров в секундах и число хранимых замеров (720 x 5 с = 1 час)
+    SYSTEM_SAMPLE_INTERVAL: float = 5.0
+    SYSTEM_HISTORY_SIZE: int = 720
+
+    # Трассировка запросов: дерево участков (сервисы, SQL, рендеринг) пишется
+    # в лог для доли TRACE_SAMPLE_RATE запросов и для всех медленных запросов
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_SLOW_THRESHOLD_MS: float = 1000.0
+    TRACE_MAX_SPANS: int = 500  # Участков на запрос (остальные только считаются)
+
+    # Число процессов сервера (python -m backend.core.main --workers N).
+    # При N > 1 кэши процессов согласуются через LISTEN/NOTIFY на канале
+    # NOTIFY_CHANNEL, а логи всех процессов пишет главный процесс.
+    # У каждого процесса свои пулы БД: N x (DB_POOL_SIZE + DB_MAX_OVERFLOW +
+    # DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW + 1) не должно превышать
+    # max_connections PostgreSQL
+    SERVER_WORKERS: int = 1
+    NOTIFY_CHANNEL: str = "deltica_events"
+    NOTIFY_RECONNECT_DELAY: float = 5.0
+    # Сколько секунд при остановке сервера ждать завершения запросов; открытые
+    # потоки /events/stream после этого закрываются, клиенты переподключаются
+    SERVER_SHUTDOWN_TIMEOUT: float = 5.0
+
+    # Поток изменений для клиентов (/events/stream, Server-Sent Events):
+    # пинг неактивного соединения в секундах, число последних событий для
+    # досылки после переподключения (Last-Event-ID) и очередь одного клиента
+    CHANGE_STREAM_HEARTBEAT: float = 15.0
+    CHANGE_STREAM_HISTORY: int = 1000
+    CHANGE_STREAM_CLIENT_QUEUE: int = 500
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -19,4 +77,11 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return (
+            f"postgresql+psycopg://{self.DB_USER}:{self.DB_PASSWORD}"
+            f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        )
+
 settings = Settings()
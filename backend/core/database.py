@@ -1,9 +1,15 @@
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Depends
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from backend.core.config import settings
+from backend.core.db_metrics import instrument_engine, pool_metrics
+from backend.core.metrics import DB_POOL
+from backend.core.system_sampler import system_sampler
 
 # Подключение к базе данных через настройки
 DATABASE_URL = settings.DATABASE_URL
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL
 
 # Настройка именования ограничений для PostgreSQL
 metadata_obj = MetaData(
@@ -16,16 +22,100 @@ metadata_obj = MetaData(
     }
 )
 
-engine = create_engine(DATABASE_URL, echo=False)
+
+def _connect_args() -> dict:
+    """Параметры подключения, общие для psycopg2 и psycopg 3"""
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный движок (psycopg 3) для эндпоинтов, которые в основном ждут БД:
+# пока запрос выполняется, event loop обслуживает другие запросы, а поток
+# из пула не блокируется на всё время ожидания
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    pool_timeout=settings.DB_ASYNC_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+)
+
+# Счётчики запросов и времени БД для лога HTTP-запросов
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# Заполнение пулов - в /metrics и в фоновые замеры /health/system
+for _name, _engine in (("sync", engine), ("async", async_engine.sync_engine)):
+    DB_POOL.add_callback(pool_metrics(_engine, _name))
+    system_sampler.add_pool(_name, pool_metrics(_engine, _name))
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base(metadata=metadata_obj)
 
 
-# Dependency для получения сессии БД
+# Ключ в Session.info, помечающий сессию запроса как только для чтения
+READ_ONLY_KEY = "read_only"
+
+
+class ReadOnlySessionError(RuntimeError):
+    """Попытка записи через сессию, открытую только для чтения"""
+
+
+@event.listens_for(Session, "before_flush")
+def _forbid_flush_in_read_only(session, flush_context, instances):
+    if session.info.get(READ_ONLY_KEY):
+        raise ReadOnlySessionError("Сессия открыта только для чтения")
+
+
+# Dependency для получения сессии БД.
+# FastAPI кэширует зависимость в пределах запроса, поэтому эндпоинт,
+# get_current_user и другие зависимости получают одну и ту же сессию,
+# а соединение из пула берётся не более одного раза за запрос
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# Dependency для GET-эндпоинтов: та же сессия запроса в режиме только для
+# чтения - без autoflush, а flush с изменениями вызывает ReadOnlySessionError
+def get_read_db(db: Session = Depends(get_db)):
+    previous_autoflush = db.autoflush
+    previous_read_only = db.info.get(READ_ONLY_KEY, False)
+    db.autoflush = False
+    db.info[READ_ONLY_KEY] = True
+    try:
+        yield db
+    finally:
+        db.autoflush = previous_autoflush
+        db.info[READ_ONLY_KEY] = previous_read_only
+
+
+# Dependency для получения асинхронной сессии БД
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
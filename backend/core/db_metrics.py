@@ -0,0 +1,106 @@
+# deltica/backend/core/db_metrics.py
+
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.core.tracing import current_span, record_span
+
+
+@dataclass
+class RequestDbStats:
+    """Счётчики обращений к БД в рамках одного HTTP-запроса"""
+    queries: int = 0
+    time_ns: int = 0
+
+    @property
+    def time_ms(self) -> float:
+        return round(self.time_ns / 1_000_000, 2)
+
+
+# Статистика текущего запроса. Объект изменяемый: пул потоков anyio и greenlet
+# асинхронного движка получают копию контекста, но ссылаются на тот же объект
+_current_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+_START_STACK_KEY = "deltica_query_start"
+# Сколько символов SQL сохранять в участке трассировки
+SQL_STATEMENT_PREVIEW = 200
+
+
+def start_request_stats() -> Token:
+    """Начать сбор статистики БД для текущего запроса"""
+    return _current_stats.set(RequestDbStats())
+
+
+def current_request_stats() -> Optional[RequestDbStats]:
+    return _current_stats.get()
+
+
+def finish_request_stats(token: Token) -> RequestDbStats:
+    """Завершить сбор и вернуть накопленную статистику"""
+    stats = _current_stats.get() or RequestDbStats()
+    _current_stats.reset(token)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_STACK_KEY, []).append(time.perf_counter_ns())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(conn, statement)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute не вызывается при ошибке - время запроса учитываем здесь
+    conn = exception_context.connection
+    if conn is not None:
+        _record(conn, exception_context.statement, error=True)
+
+
+def _record(conn, statement: Optional[str], error: bool = False) -> None:
+    starts = conn.info.get(_START_STACK_KEY)
+    if not starts:
+        return
+    started = starts.pop()
+    finished = time.perf_counter_ns()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.time_ns += finished - started
+    if current_span() is not None:
+        # Участок трассировки: начало запроса без параметров (значения не пишем в лог)
+        attrs = {"statement": " ".join((statement or "").split())[:SQL_STATEMENT_PREVIEW]}
+        if error:
+            attrs["error"] = True
+        record_span("sql", started, finished, **attrs)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключить подсчёт запросов и времени БД к синхронному движку (или async_engine.sync_engine)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def pool_metrics(engine: Engine, name: str):
+    """
+    Callback для показателя db_pool_connections: состояние пула движка.
+
+    Пул читается при каждом вызове - engine.dispose() заменяет его новым.
+    """
+    def collect():
+        pool = engine.pool
+        return [
+            ((name, "size"), pool.size()),
+            ((name, "checked_out"), pool.checkedout()),
+            ((name, "idle"), pool.checkedin()),
+            ((name, "overflow"), max(pool.overflow(), 0)),
+        ]
+    return collect
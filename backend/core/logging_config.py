@@ -1,13 +1,28 @@
 # deltica/backend/core/logging_config.py
 
+import atexit
+import copy
 import logging
+import queue
+import socketserver
 import sys
 import os
+import threading
 from pathlib import Path
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, SocketHandler, TimedRotatingFileHandler
 import json
-from datetime import datetime
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from backend.core.config import settings
+from backend.core.tracing import RequestIdFilter
+from backend.core.metrics import LOG_RECORDS_DROPPED
+
+# orjson - необязательная зависимость: без неё используется стандартный json
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
 
 
 def get_logs_dir() -> Path:
@@ -45,55 +60,218 @@ def get_logs_dir() -> Path:
         return logs_dir
 
 
+# Атрибуты, которые есть у любой LogRecord; всё остальное в __dict__ - поля из extra
+_RESERVED_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime"}
+
+
+def _dumps_json(data: Dict[str, Any]) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+if orjson is not None:
+    def _dumps(data: Dict[str, Any]) -> str:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # orjson не поддерживает, например, целые больше 64 бит
+            return _dumps_json(data)
+else:
+    _dumps = _dumps_json
+
+
 class JSONFormatter(logging.Formatter):
     """
     Форматтер для вывода логов в JSON формате.
     Удобно для парсинга и анализа.
+
+    Все поля из extra попадают в JSON без перечисления; значения, которые
+    не сериализуются в JSON, записываются строкой.
     """
 
     def format(self, record: logging.LogRecord) -> str:
         """Форматирование записи лога в JSON"""
+        # Время создания записи, а не форматирования: запись форматируется
+        # в потоке QueueListener позже
+        timestamp = datetime.fromtimestamp(record.created, tz=timezone.utc).replace(tzinfo=None)
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": timestamp.isoformat() + "Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
 
         # Добавляем дополнительные поля из record
-        if hasattr(record, "event"):
-            log_data["event"] = record.event
-        if hasattr(record, "user"):
-            log_data["user"] = record.user
-        if hasattr(record, "method"):
-            log_data["method"] = record.method
-        if hasattr(record, "path"):
-            log_data["path"] = record.path
-        if hasattr(record, "status_code"):
-            log_data["status_code"] = record.status_code
-        if hasattr(record, "duration_ms"):
-            log_data["duration_ms"] = record.duration_ms
-        if hasattr(record, "ip"):
-            log_data["ip"] = record.ip
-        if hasattr(record, "equipment_id"):
-            log_data["equipment_id"] = record.equipment_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                log_data[key] = value
 
         # Добавляем информацию об ошибке если есть
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
+        if record.stack_info:
+            log_data["stack"] = self.formatStack(record.stack_info)
+
+        return _dumps(log_data)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler для ограниченной очереди.
+
+    В потоке запроса только подставляются аргументы сообщения и запись
+    кладётся в очередь; форматирование и запись в файл/консоль выполняет
+    QueueListener. При переполнении очереди запись отбрасывается (policy="drop")
+    или handler ждёт место не дольше block_timeout секунд (policy="block").
+    Число отброшенных записей - в dropped; о пропуске сообщается
+    отдельной записью, когда в очереди появится место.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Аргументы подставляем сразу: объекты могут измениться до форматирования.
+        # exc_info сохраняется - очередь внутри процесса, traceback форматирует JSONFormatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+                self._unreported += 1
+            return
+
+        if self._unreported:
+            self._report_dropped()
+
+    def _report_dropped(self) -> None:
+        with self.lock:
+            count, self._unreported = self._unreported, 0
+        if not count:
+            return
+        notice = logging.LogRecord(
+            "backend.core.logging_config", logging.WARNING, __file__, 0,
+            "Log queue overflow: %d records dropped", (count,), None,
+        )
+        notice.event = "log_records_dropped"
+        notice.dropped = count
+        try:
+            self.queue.put_nowait(self.prepare(notice))
+        except queue.Full:
+            with self.lock:
+                self._unreported += count
+
+
+class _QueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Очередь ограничена: ждём, пока поток слушателя освободит место
+        self.queue.put(self._sentinel)
+
 
-        return json.dumps(log_data, ensure_ascii=False)
+# Переменная окружения процессов-обработчиков (--workers N): порт главного
+# процесса, которому они передают записи лога. Файл лога пишет и ротирует
+# только главный процесс - ротация из нескольких процессов сразу ломается
+# (на Windows открытый другими процессами файл нельзя переименовать)
+LOG_FORWARD_PORT_ENV = "DELTICA_LOG_FORWARD_PORT"
 
 
-def setup_logging():
+class ForwardingHandler(SocketHandler):
+    """Передаёт записи главному процессу по TCP (127.0.0.1) строками JSON"""
+
+    def makePickle(self, record: logging.LogRecord) -> bytes:
+        data = dict(record.__dict__)
+        data["msg"] = record.getMessage()
+        data["args"] = None
+        if record.exc_info:
+            data["exc_text"] = logging.Formatter().formatException(record.exc_info)
+        data["exc_info"] = None
+        data["worker_pid"] = record.process
+        return (_dumps(data) + "\n").encode("utf-8")
+
+
+class _ForwardedRecordHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        root = logging.getLogger()
+        for line in self.rfile:
+            try:
+                record = logging.makeLogRecord(json.loads(line))
+            except ValueError:
+                continue
+            root.handle(record)
+
+
+class _LogReceiver(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+
+def start_log_receiver() -> int:
+    """
+    Принимать записи лога от процессов-обработчиков (главный процесс).
+
+    Returns:
+        Порт, который передаётся обработчикам через LOG_FORWARD_PORT_ENV
+    """
+    server = _LogReceiver(("127.0.0.1", 0), _ForwardedRecordHandler)
+    threading.Thread(target=server.serve_forever, name="log-receiver", daemon=True).start()
+    return server.server_address[1]
+
+
+# Активный слушатель очереди логов (один на процесс)
+_listener: Optional[QueueListener] = None
+_atexit_registered = False
+
+
+def _dropped_records():
+    handlers = logging.getLogger().handlers
+    return [((), sum(h.dropped for h in handlers if isinstance(h, BoundedQueueHandler)))]
+
+
+LOG_RECORDS_DROPPED.add_callback(_dropped_records)
+
+
+def stop_logging() -> None:
+    """Дописать записи из очереди и остановить поток записи логов"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def setup_logging(console: Optional[bool] = None):
     """
     Настройка системы логирования приложения.
 
     - JSON формат логов
     - Ротация: ежедневная, хранить 30 дней
     - Логи: рядом с exe (или AppData при отсутствии прав), для dev - backend/logs/
-    - Дублирование в console (для разработки)
+    - Дублирование в console (settings.LOG_CONSOLE, для разработки)
+    - Запись в файл и консоль - в фоновом потоке через ограниченную очередь
+    - В процессах-обработчиках (--workers N) записи передаются главному процессу
     """
+    global _listener, _atexit_registered
+    if console is None:
+        console = settings.LOG_CONSOLE
+
     # Получаем директорию для логов (с учётом прав доступа)
     logs_dir = get_logs_dir()
 
@@ -101,34 +279,60 @@ def setup_logging():
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
 
-    # Очищаем существующие handlers (если есть)
+    # Останавливаем предыдущий слушатель и очищаем существующие handlers (если есть)
+    stop_logging()
     logger.handlers.clear()
 
-    # === File Handler с ротацией ===
-    log_file = logs_dir / "deltica.log"
+    forward_port = os.environ.get(LOG_FORWARD_PORT_ENV)
+    if forward_port:
+        # === Процесс-обработчик: файл и консоль ведёт главный процесс ===
+        handlers = [ForwardingHandler("127.0.0.1", int(forward_port))]
+        console = False
+    else:
+        # === File Handler с ротацией ===
+        log_file = logs_dir / "deltica.log"
 
-    file_handler = TimedRotatingFileHandler(
-        filename=log_file,
-        when="midnight",  # Ротация в полночь
-        interval=1,       # Каждый день
-        backupCount=30,   # Хранить 30 дней
-        encoding="utf-8",
-    )
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(JSONFormatter())
-    logger.addHandler(file_handler)
+        file_handler = TimedRotatingFileHandler(
+            filename=log_file,
+            when="midnight",  # Ротация в полночь
+            interval=1,       # Каждый день
+            backupCount=30,   # Хранить 30 дней
+            encoding="utf-8",
+        )
+        file_handler.setLevel(logging.INFO)
+        file_handler.setFormatter(JSONFormatter())
+        handlers = [file_handler]
 
     # === Console Handler (для разработки) ===
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO)
+
+        # Для консоли используем простой формат (не JSON)
+        console_format = logging.Formatter(
+            "%(asctime)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+        console_handler.setFormatter(console_format)
+        handlers.append(console_handler)
 
-    # Для консоли используем простой формат (не JSON)
-    console_format = logging.Formatter(
-        "%(asctime)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
+    # === Очередь: потоки запросов только кладут записи, пишет QueueListener ===
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(
+        log_queue,
+        policy=settings.LOG_QUEUE_FULL_POLICY,
+        block_timeout=settings.LOG_QUEUE_BLOCK_TIMEOUT,
     )
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
+    # request_id текущего HTTP-запроса берётся из контекста потока запроса,
+    # поэтому фильтр стоит до очереди
+    queue_handler.addFilter(RequestIdFilter())
+    logger.addHandler(queue_handler)
+    _listener = _QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    if not _atexit_registered:
+        atexit.register(stop_logging)
+        _atexit_registered = True
 
     # Логируем старт приложения
     logger.info("Logging system initialized", extra={"event": "app_startup"})
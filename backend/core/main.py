@@ -1,5 +1,7 @@
 #deltica/backend/core/main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routes.main_table import router as main_table_router
@@ -11,13 +13,36 @@ from backend.routes.backup import router as backup_router
 from backend.routes.health import router as health_router
 from backend.routes.contracts import router as contracts_router
 from backend.routes.documents import router as documents_router
+from backend.routes.metrics import router as metrics_router
+from backend.routes.events import router as events_router
+from backend.core.config import settings
 from backend.core.logging_config import setup_logging
+from backend.core.notifications import notification_bus
+from backend.core.system_sampler import system_sampler
+from backend.core.tracing import REQUEST_ID_HEADER
 from backend.middleware.logging_middleware import LoggingMiddleware
+from backend.services.change_stream import change_stream
 
 # Инициализация системы логирования
 setup_logging()
 
-app = FastAPI(title="Deltica API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Фоновые замеры CPU, памяти и пулов БД для /health/system и /health/history
+    system_sampler.start()
+    # Несколько процессов: изменения из других процессов приходят по LISTEN
+    if settings.SERVER_WORKERS > 1:
+        notification_bus.start()
+    # Рассылка изменений клиентам /events/stream
+    change_stream.start()
+    yield
+    await change_stream.stop()
+    notification_bus.stop()
+    system_sampler.stop()
+
+
+app = FastAPI(title="Deltica API", version="1.0.0", lifespan=lifespan)
 
 # Настройка CORS
 app.add_middleware(
@@ -32,6 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[REQUEST_ID_HEADER],
 )
 
 # Middleware для логирования HTTP запросов
@@ -54,7 +80,40 @@ app.include_router(backup_router)
 app.include_router(health_router)
 app.include_router(contracts_router)
 app.include_router(documents_router)
+app.include_router(metrics_router)
+app.include_router(events_router)
 
 if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+    import os
+
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    from backend.core.logging_config import LOG_FORWARD_PORT_ENV, start_log_receiver
+
+    # Процессы-обработчики собранного exe (PyInstaller) запускают тот же exe
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Сервер Deltica")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="Число процессов-обработчиков (по умолчанию SERVER_WORKERS)")
+    args = parser.parse_args()
+
+    # Асинхронный psycopg 3 не работает с ProactorEventLoop, который uvicorn
+    # выбирает на Windows по умолчанию - явно используем SelectorEventLoop
+    loop = "asyncio:SelectorEventLoop"
+    # Без ограничения остановка ждала бы закрытия всех потоков /events/stream
+    shutdown_timeout = settings.SERVER_SHUTDOWN_TIMEOUT
+    if args.workers > 1:
+        # Процессы-обработчики импортируют приложение заново и читают настройки
+        # из окружения: включают слушатель LISTEN и отправляют логи в этот процесс,
+        # который единственный пишет и ротирует файл лога
+        os.environ["SERVER_WORKERS"] = str(args.workers)
+        os.environ[LOG_FORWARD_PORT_ENV] = str(start_log_receiver())
+        uvicorn.run("backend.core.main:app", host=args.host, port=args.port, workers=args.workers, loop=loop,
+                    timeout_graceful_shutdown=shutdown_timeout)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, loop=loop, timeout_graceful_shutdown=shutdown_timeout)
@@ -0,0 +1,268 @@
+# deltica/backend/core/metrics.py
+
+import functools
+import threading
+from abc import ABC, abstractmethod
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Границы корзин гистограмм длительности, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Для долгих операций (резервные копии, выгрузки)
+SLOW_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Метрика с набором меток; значения по комбинациям меток - в дочерних объектах"""
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Дочерняя метрика для значений меток (создаётся при первом обращении)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Объект значения для одной комбинации меток"""
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Строки значений в текстовом формате Prometheus"""
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type_name}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик"""
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Счётчик без меток"""
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Последняя корзина - +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Замерить длительность блока в секундах"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    """Гистограмма с фиксированными корзинами (значения в секундах)"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Гистограмма без меток"""
+        self.labels().observe(value)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class GaugeFunction(_Metric):
+    """Показатель, значение которого вычисляется при чтении метрик"""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: List[Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]] = []
+        if callback is not None:
+            self.add_callback(callback)
+
+    def add_callback(self, callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> None:
+        """callback возвращает пары (значения меток, значение)"""
+        self._callbacks.append(callback)
+
+    def _new_child(self):
+        raise TypeError(f"{self.name}: values are provided by callbacks, labels() is not supported")
+
+    def samples(self):
+        for callback in list(self._callbacks):
+            try:
+                items = list(callback())
+            except Exception:
+                continue  # Источник недоступен - показатель пропускается
+            for values, value in items:
+                yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+
+
+class CounterFunction(GaugeFunction):
+    """Счётчик, который ведётся вне реестра и читается при выводе метрик"""
+    type_name = "counter"
+
+
+class MetricsRegistry:
+    """Набор метрик процесса в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in list(self._metrics.values()))
+
+
+def timed(histogram: Histogram, *labelvalues):
+    """Декоратор: длительность вызова функции в гистограмму"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.labels(*labelvalues).time():
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+registry = MetricsRegistry()
+
+# ==================== МЕТРИКИ ПРИЛОЖЕНИЯ ====================
+
+PROCESS_START_TIME = registry.register(GaugeFunction(
+    "process_start_time_seconds", "Время запуска процесса (unix time)",
+))
+_started_at = time.time()
+PROCESS_START_TIME.add_callback(lambda: [((), _started_at)])
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP-запросы по маршруту и статусу", ("method", "route", "status"),
+))
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "Длительность HTTP-запросов", ("method", "route"),
+))
+HTTP_RESPONSE_BYTES = registry.register(Counter(
+    "http_response_bytes_total", "Отправлено байт тела ответа", ("method", "route"),
+))
+HTTP_DB_QUERIES = registry.register(Counter(
+    "http_request_db_queries_total", "Запросы к БД при обработке HTTP-запросов", ("method", "route"),
+))
+HTTP_DB_SECONDS = registry.register(Counter(
+    "http_request_db_seconds_total", "Время в БД при обработке HTTP-запросов", ("method", "route"),
+))
+
+DB_POOL = registry.register(GaugeFunction(
+    "db_pool_connections", "Соединения пула БД по состоянию", ("engine", "state"),
+))
+
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total", "Обращения к кэшам (hit/miss)", ("cache", "result"),
+))
+
+DOCUMENT_GENERATION = registry.register(Histogram(
+    "document_generation_seconds", "Формирование документов (включая ответы из кэша)", ("kind",),
+))
+BACKUP_DURATION = registry.register(Histogram(
+    "backup_duration_seconds", "Резервное копирование и выгрузка", ("kind",), buckets=SLOW_BUCKETS,
+))
+
+LOG_RECORDS_DROPPED = registry.register(CounterFunction(
+    "log_records_dropped_total", "Записи лога, отброшенные при переполнении очереди",
+))
+
+CHANGE_STREAM_CLIENTS = registry.register(GaugeFunction(
+    "change_stream_clients", "Клиенты, подключённые к потоку изменений /events/stream",
+))
+CHANGE_STREAM_EVENTS = registry.register(Counter(
+    "change_stream_events_total", "События, разосланные клиентам потока изменений", ("event",),
+))
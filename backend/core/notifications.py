@@ -0,0 +1,169 @@
+# deltica/backend/core/notifications.py
+
+import json
+import logging
+import select
+import threading
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2
+from sqlalchemy import event, func, select as sql_select
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Обработчик события: получает данные события (dict)
+Handler = Callable[[dict], None]
+
+# Ключ в Session.info: события, которые уйдут после фиксации транзакции
+PENDING_KEY = "pending_notifications"
+# Служебное событие: соединение слушателя восстановлено, часть событий могла быть
+# пропущена - подписчики сбрасывают свои кэши целиком
+RESYNC_TOPIC = "resync"
+# Ограничение PostgreSQL на размер payload NOTIFY - 8000 байт
+MAX_PAYLOAD_BYTES = 7900
+
+
+class NotificationBus:
+    """
+    События об изменениях данных между процессами сервера.
+
+    publish() добавляет событие к транзакции сессии: в PostgreSQL - через
+    pg_notify (доставляется только после COMMIT, при откате пропадает),
+    подписчики своего процесса вызываются из after_commit.
+
+    Фоновый поток (start()) слушает канал по LISTEN на отдельном соединении
+    и вызывает подписчиков для событий из других процессов. Нужен только
+    при нескольких процессах (SERVER_WORKERS > 1); в одном процессе события
+    доставляются без БД.
+
+    Подписчики должны быть идемпотентными: после переподключения слушателя
+    они получают RESYNC_TOPIC и сбрасывают состояние целиком.
+    """
+
+    def __init__(self, channel: str, reconnect_delay: float = 5.0):
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        # Свои события приходят и по LISTEN - отличаем их по origin
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._was_connected = False
+        self.received = 0
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Подписаться на событие (RESYNC_TOPIC - на переподключение слушателя)"""
+        self._handlers[topic].append(handler)
+
+    def publish(self, db: Session, topic: str, data: Dict[str, Any]) -> None:
+        """
+        Опубликовать событие в транзакции сессии.
+
+        Вызывается до db.commit(): подписчики получат событие после фиксации.
+        """
+        # connection() начинает транзакцию, даже если сессия ещё ничего не выполняла:
+        # событие связано с ней и отбрасывается при откате
+        connection = db.connection()
+        if connection.dialect.name == "postgresql":
+            connection.execute(sql_select(func.pg_notify(self.channel, self._encode(topic, data))))
+        db.info.setdefault(PENDING_KEY, []).append((topic, data))
+
+    def dispatch(self, topic: str, data: Dict[str, Any]) -> None:
+        """Вызвать подписчиков события; ошибка одного не мешает остальным"""
+        for handler in list(self._handlers.get(topic, ())):
+            try:
+                handler(data)
+            except Exception:
+                logger.exception(
+                    f"Notification handler failed: {topic}",
+                    extra={"event": "notification_handler_failed", "topic": topic}
+                )
+
+    def _encode(self, topic: str, data: Dict[str, Any]) -> str:
+        payload = json.dumps({"topic": topic, "origin": self.origin, "data": data}, ensure_ascii=False, default=str)
+        if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+            # Слишком большое событие (например, массовое обновление):
+            # получатели сбрасывают всё состояние этого типа
+            payload = json.dumps({"topic": topic, "origin": self.origin, "data": {"truncated": True}})
+        return payload
+
+    def _receive(self, payload: str) -> None:
+        """Обработать событие, полученное по LISTEN"""
+        try:
+            message = json.loads(payload)
+            topic, origin, data = message["topic"], message["origin"], message["data"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed notification ignored", extra={"event": "notification_malformed"})
+            return
+        if origin == self.origin:
+            return
+        self.received += 1
+        self.dispatch(topic, data)
+
+    # ==================== СЛУШАТЕЛЬ ====================
+
+    def _listen(self) -> None:
+        """Одно подключение: LISTEN и ожидание событий до остановки или ошибки"""
+        connection = psycopg2.connect(settings.DATABASE_URL)
+        try:
+            connection.set_session(autocommit=True)
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            if self._was_connected:
+                # Пока соединения не было, события других процессов могли потеряться
+                self.dispatch(RESYNC_TOPIC, {})
+            self._was_connected = True
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([connection], [], [], 1.0)
+                if not readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self._receive(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning(
+                    f"Notification listener disconnected: {e}",
+                    extra={"event": "notification_listener_error", "error": str(e)}
+                )
+                self._stop_event.wait(self.reconnect_delay)
+
+    def start(self) -> None:
+        """Запустить фоновый поток слушателя (повторный вызов ничего не делает)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="notification-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending(session):
+    for topic, data in session.info.pop(PENDING_KEY, ()):
+        notification_bus.dispatch(topic, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+notification_bus = NotificationBus(settings.NOTIFY_CHANNEL, settings.NOTIFY_RECONNECT_DELAY)
@@ -0,0 +1,158 @@
+# deltica/backend/core/system_sampler.py
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Источник показателей пула: callback из db_metrics.pool_metrics
+PoolSource = Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]
+
+
+def _directory_size(path) -> Tuple[int, int]:
+    """Количество и суммарный размер файлов логов (*.log*) в директории"""
+    count = 0
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if ".log" in entry.name and entry.is_file():
+                    count += 1
+                    total += entry.stat().st_size
+    except OSError:
+        pass
+    return count, total
+
+
+class SystemSampler:
+    """
+    Фоновый сбор показателей системы в кольцевой буфер.
+
+    Поток раз в interval секунд снимает загрузку CPU, память, диск, RSS и
+    открытые дескрипторы процесса, состояние пулов БД и размер логов.
+    CPU считается без ожидания - как доля с предыдущего замера, поэтому
+    /health/system отвечает сразу, а не через секунду psutil.cpu_percent(interval=1).
+    Буфер хранит последние history_size замеров (для /health/history).
+    """
+
+    def __init__(self, interval: float, history_size: int, logs_dir=None):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=history_size)
+        self._pool_sources: Dict[str, PoolSource] = {}
+        self._logs_dir = logs_dir
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_pool(self, name: str, source: PoolSource) -> None:
+        """Подключить пул соединений (callback из db_metrics.pool_metrics)"""
+        self._pool_sources[name] = source
+
+    def _get_logs_dir(self):
+        if self._logs_dir is None:
+            from backend.core.logging_config import get_logs_dir
+            self._logs_dir = get_logs_dir()
+        return self._logs_dir
+
+    def _open_files(self) -> int:
+        # open_files() перебирает все дескрипторы и на Windows бывает медленным -
+        # считаем дескрипторы (handles на Windows)
+        if sys.platform == "win32":
+            return self._process.num_handles()
+        return self._process.num_fds()
+
+    def sample(self) -> dict:
+        """Снять показатели и добавить их в буфер"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        log_count, log_size = _directory_size(self._get_logs_dir())
+
+        with self._process.oneshot():
+            rss = self._process.memory_info().rss
+            process_cpu = self._process.cpu_percent(interval=None)
+            threads = self._process.num_threads()
+            open_files = self._open_files()
+
+        pools = {}
+        for name, source in self._pool_sources.items():
+            try:
+                pools[name] = {values[-1]: value for values, value in source()}
+            except Exception:
+                continue  # Движок ещё не создал пул или уже закрыт
+
+        sample = {
+            "timestamp": time.time(),
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": memory.percent,
+            "memory_available_gb": round(memory.available / (1024**3), 2),
+            "disk_percent": disk.percent,
+            "disk_free_gb": round(disk.free / (1024**3), 2),
+            "process_rss_mb": round(rss / (1024**2), 1),
+            "process_cpu_percent": process_cpu,
+            "process_threads": threads,
+            "open_files": open_files,
+            "log_files": log_count,
+            "log_size_mb": round(log_size / (1024**2), 2),
+            "db_pools": pools,
+        }
+        with self._lock:
+            self._samples.append(sample)
+        return sample
+
+    def latest(self) -> Optional[dict]:
+        """Последний замер или None, если замеров ещё не было"""
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def history(self, since: Optional[float] = None) -> List[dict]:
+        """Замеры из буфера (начиная с unix-времени since), от старых к новым"""
+        with self._lock:
+            samples = list(self._samples)
+        if since is not None:
+            samples = [s for s in samples if s["timestamp"] >= since]
+        return samples
+
+    def _run(self):
+        # Первый вызов cpu_percent(None) задаёт точку отсчёта и возвращает 0.0 -
+        # первый замер делаем через секунду, дальше с заданным интервалом
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        wait = min(1.0, self.interval)
+        while not self._stop_event.wait(wait):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(
+                    f"System sample failed: {e}",
+                    extra={"event": "system_sample_failed", "error": str(e)}
+                )
+            wait = self.interval
+
+    def start(self) -> None:
+        """Запустить фоновый поток (повторный вызов ничего не делает)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Остановить фоновый поток; накопленные замеры сохраняются"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+
+system_sampler = SystemSampler(settings.SYSTEM_SAMPLE_INTERVAL, settings.SYSTEM_HISTORY_SIZE)
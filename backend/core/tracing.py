@@ -0,0 +1,232 @@
+# deltica/backend/core/tracing.py
+
+import functools
+import inspect
+import logging
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Входящий X-Request-ID принимаем только в безопасном виде - он попадает в лог
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class Span:
+    """Участок обработки запроса: имя, длительность, атрибуты и вложенные участки"""
+    __slots__ = ("name", "attrs", "start_ns", "duration_ns", "children")
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = time.perf_counter_ns() if start_ns is None else start_ns
+        self.duration_ns: Optional[int] = None
+        self.children: List["Span"] = []
+
+    def finish(self, end_ns: Optional[int] = None) -> None:
+        self.duration_ns = (time.perf_counter_ns() if end_ns is None else end_ns) - self.start_ns
+
+    def to_dict(self, origin_ns: int) -> dict:
+        """Дерево участков для лога: смещение от начала запроса и длительность в мс"""
+        duration_ns = self.duration_ns or 0
+        children_ns = sum(child.duration_ns or 0 for child in self.children)
+        data = {
+            "name": self.name,
+            "start_ms": round((self.start_ns - origin_ns) / 1_000_000, 3),
+            "duration_ms": round(duration_ns / 1_000_000, 3),
+            # Время самого участка без вложенных (валидация, сериализация, Python-код)
+            "self_ms": round(max(duration_ns - children_ns, 0) / 1_000_000, 3),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.children:
+            data["children"] = [child.to_dict(origin_ns) for child in self.children]
+        return data
+
+
+class Trace:
+    """Трассировка одного HTTP-запроса"""
+
+    def __init__(self, request_id: str, name: str, max_spans: int):
+        self.request_id = request_id
+        self.root = Span(name)
+        self.max_spans = max_spans
+        self.span_count = 1
+        self.dropped_spans = 0
+
+    def add_span(self) -> bool:
+        """Учесть новый участок; False - лимит исчерпан, участок не записывается"""
+        if self.span_count >= self.max_spans:
+            self.dropped_spans += 1
+            return False
+        self.span_count += 1
+        return True
+
+    def summary(self) -> Dict[str, dict]:
+        """Суммарное время и число участков по имени (например, все sql)"""
+        totals: Dict[str, dict] = {}
+        stack = list(self.root.children)
+        while stack:
+            node = stack.pop()
+            item = totals.setdefault(node.name, {"count": 0, "duration_ms": 0.0})
+            item["count"] += 1
+            item["duration_ms"] += (node.duration_ns or 0) / 1_000_000
+            stack.extend(node.children)
+        for item in totals.values():
+            item["duration_ms"] = round(item["duration_ms"], 3)
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "spans": self.root.to_dict(self.root.start_ns),
+            "summary": self.summary(),
+            "span_count": self.span_count,
+            "dropped_spans": self.dropped_spans,
+        }
+
+
+# Трассировка и текущий участок. Пул потоков anyio получает копию контекста,
+# участки из потоков добавляются в дерево того же объекта Trace
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("request_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("request_span", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def make_request_id(incoming: Optional[str] = None) -> str:
+    """ID запроса: входящий X-Request-ID, если он допустим, иначе новый"""
+    if incoming and _REQUEST_ID_PATTERN.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def current_span() -> Optional[Span]:
+    """Текущий участок (None - запрос не трассируется)"""
+    return _current_span.get()
+
+
+def start_trace(request_id: str, name: str) -> tuple:
+    """Начать трассировку запроса; возвращает токены для finish_trace()"""
+    id_token = _request_id.set(request_id)
+    if not settings.TRACING_ENABLED:
+        return (id_token, None, None)
+    trace = Trace(request_id, name, settings.TRACE_MAX_SPANS)
+    return (id_token, _current_trace.set(trace), _current_span.set(trace.root))
+
+
+def finish_trace(tokens: tuple, name: Optional[str] = None,
+                 attrs: Optional[Dict[str, Any]] = None, log: bool = True) -> Optional[Trace]:
+    """
+    Завершить трассировку и записать её в лог.
+
+    name заменяет имя корневого участка (шаблон маршрута известен только
+    после сопоставления запроса).
+
+    Медленные запросы (дольше TRACE_SLOW_THRESHOLD_MS) записываются всегда
+    с уровнем WARNING, остальные - с вероятностью TRACE_SAMPLE_RATE.
+    log=False - не записывать (долгоживущие потоки событий медленными не считаются).
+    """
+    id_token, trace_token, span_token = tokens
+    trace = _current_trace.get() if trace_token is not None else None
+    if trace_token is not None:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+    _request_id.reset(id_token)
+    if trace is None:
+        return None
+
+    trace.root.finish()
+    if name:
+        trace.root.name = name
+    if attrs:
+        trace.root.attrs = attrs
+    duration_ms = trace.root.duration_ns / 1_000_000
+    slow = duration_ms >= settings.TRACE_SLOW_THRESHOLD_MS
+    if log and (slow or random.random() < settings.TRACE_SAMPLE_RATE):
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            f"{'Slow request' if slow else 'Request trace'} {trace.root.name} - {duration_ms:.1f} ms",
+            extra={
+                "event": "slow_request" if slow else "request_trace",
+                "request_id": trace.request_id,
+                "duration_ms": round(duration_ms, 2),
+                "trace": trace.to_dict(),
+            }
+        )
+    return trace
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Участок внутри трассируемого запроса.
+
+    Вне запроса (скрипты, фоновые задачи) ничего не записывает.
+    """
+    parent = _current_span.get()
+    trace = _current_trace.get()
+    if parent is None or trace is None or not trace.add_span():
+        yield None
+        return
+    current = Span(name, attrs or None)
+    parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.finish()
+        _current_span.reset(token)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attrs) -> None:
+    """Добавить уже завершённый участок (замер сделан вне контекстного менеджера)"""
+    parent = _current_span.get()
+    trace = _current_trace.get()
+    if parent is None or trace is None or not trace.add_span():
+        return
+    completed = Span(name, attrs or None, start_ns=start_ns)
+    completed.finish(end_ns)
+    parent.children.append(completed)
+
+
+def traced(name: Optional[str] = None):
+    """Декоратор: вызов функции (или корутины) - участок трассировки"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет request_id текущего запроса ко всем записям лога"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            request_id = _request_id.get()
+            if request_id is not None:
+                record.request_id = request_id
+        return True
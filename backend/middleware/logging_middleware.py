@@ -2,58 +2,140 @@
 
 import time
 import logging
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.db_metrics import finish_request_stats, start_request_stats
+from backend.core.metrics import (
+    HTTP_DB_QUERIES, HTTP_DB_SECONDS, HTTP_REQUEST_DURATION, HTTP_REQUESTS, HTTP_RESPONSE_BYTES,
+)
+from backend.core.tracing import finish_trace, make_request_id, start_trace
 
 
 logger = logging.getLogger(__name__)
 
+# Метка маршрута для запросов, не сопоставленных ни одному маршруту (404)
+UNMATCHED_ROUTE = "<unmatched>"
+_REQUEST_ID_HEADER = b"x-request-id"
+# Потоки Server-Sent Events открыты часами: в трассировку медленных запросов
+# и гистограмму длительности не попадают
+_EVENT_STREAM_TYPE = b"text/event-stream"
+
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """
-    Middleware для автоматического логирования всех HTTP запросов.
+    ASGI middleware для автоматического логирования всех HTTP запросов.
 
     Логирует:
     - Метод и путь запроса
     - Статус код ответа
-    - Время выполнения
+    - Время выполнения (до отправки последнего фрагмента тела)
+    - Размер тела ответа в байтах
+    - Количество запросов к БД и суммарное время в БД
     - IP адрес клиента
     - Пользователь (если аутентифицирован)
+
+    Те же показатели накапливаются в метриках (/metrics) по шаблону маршрута,
+    а не по фактическому пути - число меток не растёт с числом ID.
+
+    Запросу назначается ID (входящий X-Request-ID или новый), он возвращается
+    в заголовке ответа и попадает во все записи лога запроса. На время запроса
+    открывается трассировка (backend.core.tracing).
+
+    В отличие от BaseHTTPMiddleware не создаёт отдельную задачу и поток
+    памяти на запрос: сообщения ответа передаются серверу как есть, поэтому
+    потоковые ответы (скачивание файлов, ZIP) не буферизуются.
     """
 
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         # Засекаем время начала
-        start_time = time.time()
-
-        # Получаем IP адрес
-        client_ip = request.client.host if request.client else "unknown"
-
-        # Обрабатываем запрос
-        response: Response = await call_next(request)
-
-        # Вычисляем длительность
-        duration_ms = round((time.time() - start_time) * 1000, 2)
-
-        # Определяем пользователя (если есть в state)
-        user = getattr(request.state, "user", None)
-        username = user.username if user else "anonymous"
-
-        # Логируем запрос
-        logger.info(
-            f"{request.method} {request.url.path} - {response.status_code}",
-            extra={
-                "event": "http_request",
-                "method": request.method,
-                "path": str(request.url.path),
-                "status_code": response.status_code,
-                "duration_ms": duration_ms,
-                "ip": client_ip,
-                "user": username,
-            }
-        )
-
-        return response
+        start_ns = time.perf_counter_ns()
+        status_code = 500  # Если приложение упало до начала ответа
+        response_bytes = 0
+        content_length = None
+        event_stream = False
+
+        incoming_id = None
+        for name, value in scope.get("headers", ()):
+            if name == _REQUEST_ID_HEADER:
+                incoming_id = value.decode("latin-1")
+                break
+        request_id = make_request_id(incoming_id)
+        method = scope["method"]
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_bytes, content_length, event_stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", ()))
+                for name, value in headers:
+                    if name == b"content-length":
+                        content_length = int(value)
+                    elif name == b"content-type" and value.startswith(_EVENT_STREAM_TYPE):
+                        event_stream = True
+                headers.append((_REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message["headers"] = headers
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        # Обрабатываем запрос, собирая статистику обращений к БД и участки трассировки
+        db_stats_token = start_request_stats()
+        trace_tokens = start_trace(request_id, f"{method} {scope['path']}")
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            db_stats = finish_request_stats(db_stats_token)
+
+            # Шаблон маршрута FastAPI добавляет в scope при сопоставлении
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            finish_trace(trace_tokens, f"{method} {route_path}", {"status_code": status_code},
+                         log=not event_stream)
+
+            # Вычисляем длительность
+            duration_ns = time.perf_counter_ns() - start_ns
+            duration_ms = round(duration_ns / 1_000_000, 2)
+
+            # Файл, отправленный через расширение http.response.pathsend, не проходит
+            # через тело сообщений - размер берём из Content-Length
+            if not response_bytes and content_length:
+                response_bytes = content_length
+
+            # Определяем пользователя (если есть в state)
+            user = scope.get("state", {}).get("user")
+            username = user.username if user else "anonymous"
+
+            client = scope.get("client")
+            path = scope["path"]
+
+            HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
+            if not event_stream:
+                HTTP_REQUEST_DURATION.labels(method, route_path).observe(duration_ns / 1e9)
+            HTTP_RESPONSE_BYTES.labels(method, route_path).inc(response_bytes)
+            HTTP_DB_QUERIES.labels(method, route_path).inc(db_stats.queries)
+            HTTP_DB_SECONDS.labels(method, route_path).inc(db_stats.time_ns / 1e9)
+
+            # Логируем запрос
+            logger.info(
+                f"{method} {path} - {status_code}",
+                extra={
+                    "event": "http_request",
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "status_code": status_code,
+                    "duration_ms": duration_ms,
+                    "response_bytes": response_bytes,
+                    "db_queries": db_stats.queries,
+                    "db_time_ms": db_stats.time_ms,
+                    "ip": client[0] if client else "unknown",
+                    "user": username,
+                }
+            )
@@ -2,8 +2,9 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from backend.core.database import SessionLocal
+from backend.core.database import get_async_db, get_db, get_read_db
 from backend.services.archive import ArchiveService
 from backend.app.schemas import ArchiveResponse, ArchiveRequest, ArchiveFullResponse, ArchiveReasonUpdate
 
@@ -11,15 +12,6 @@ from backend.app.schemas import ArchiveResponse, ArchiveRequest, ArchiveFullResp
 router = APIRouter(prefix="/archive", tags=["archive"])
 
 
-def get_db():
-    """Dependency для получения сессии базы данных"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/equipment/{equipment_id}", response_model=ArchiveResponse)
 def archive_equipment(
     equipment_id: int,
@@ -51,12 +43,12 @@ def archive_equipment(
 
 
 @router.get("/", response_model=List[ArchiveResponse])
-def get_archived_equipment(db: Session = Depends(get_db)):
+async def get_archived_equipment(db: AsyncSession = Depends(get_async_db)):
     """
     Получить список всего архивного оборудования
     """
     service = ArchiveService(db)
-    return service.get_all_archived()
+    return await service.get_all_archived_async()
 
 
 @router.patch("/{archived_equipment_id}/reason", response_model=ArchiveResponse)
@@ -82,7 +74,7 @@ def update_archive_reason(
 
 
 @router.get("/{archived_equipment_id}", response_model=ArchiveResponse)
-def get_archived_equipment_by_id(archived_equipment_id: int, db: Session = Depends(get_db)):
+def get_archived_equipment_by_id(archived_equipment_id: int, db: Session = Depends(get_read_db)):
     """
     Получить детали архивного оборудования по ID
     """
@@ -99,7 +91,7 @@ def get_archived_equipment_by_id(archived_equipment_id: int, db: Session = Depen
 
 
 @router.get("/{archived_equipment_id}/full", response_model=ArchiveFullResponse)
-def get_archived_equipment_full(archived_equipment_id: int, db: Session = Depends(get_db)):
+def get_archived_equipment_full(archived_equipment_id: int, db: Session = Depends(get_read_db)):
     """
     Получить полные данные архивного оборудования (включая верификацию, ответственность, финансы и файлы)
     """
@@ -10,7 +10,7 @@ from datetime import timedelta
 from backend.core.database import get_db
 from backend.app.schemas import LoginRequest, TokenResponse, UserResponse
 from backend.utils.auth import (
-    authenticate_user,
+    authenticate_user_in_threadpool,
     create_access_token,
     get_current_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
@@ -43,8 +43,8 @@ async def login(
     """
     client_ip = request.client.host if request.client else "unknown"
 
-    # Аутентификация пользователя
-    user = authenticate_user(db, login_data.username, login_data.password)
+    # Аутентификация пользователя (bcrypt - в отдельном пуле потоков)
+    user = await authenticate_user_in_threadpool(db, login_data.username, login_data.password)
 
     if not user:
         logger.warning(
@@ -140,13 +140,15 @@ async def get_me(current_user = Depends(get_current_user)):
 
 
 @router.post("/windows-login", response_model=TokenResponse)
-async def windows_login(
+def windows_login(
     request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Аутентификация через Windows username (SSO)
 
+    Синхронный endpoint: запрос к БД выполняется в пуле потоков FastAPI.
+
     Получает Windows username текущего пользователя из заголовка запроса
     и автоматически авторизует его, если пользователь найден в базе данных.
 
@@ -265,7 +267,7 @@ async def login_with_form(
     Использует стандартную OAuth2PasswordRequestForm вместо LoginRequest
     """
     client_ip = request.client.host if request.client else "unknown"
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_in_threadpool(db, form_data.username, form_data.password)
 
     if not user:
         logger.warning(
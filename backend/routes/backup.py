@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import List
-from backend.core.database import get_db
+from backend.core.database import get_db, get_read_db
 from backend.app.schemas import BackupHistoryResponse, BackupCreateResponse
 from backend.services.backup import BackupService
 from backend.utils.auth import get_current_active_admin
@@ -61,7 +61,7 @@ def create_backup(
 @router.get("/history", response_model=List[BackupHistoryResponse])
 def get_backup_history(
     limit: int = 20,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_active_admin)
 ):
     """
@@ -75,7 +75,7 @@ def get_backup_history(
 
 @router.get("/check", response_model=dict)
 def check_backup_availability(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_active_admin)
 ):
     """
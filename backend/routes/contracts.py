@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from backend.core.database import get_db
+from backend.core.database import get_db, get_read_db
 from backend.app.models import Contract
 from backend.app.schemas import ContractCreate, ContractUpdate, ContractResponse
 from backend.utils.auth import get_current_active_admin
@@ -21,14 +21,14 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[ContractResponse])
-def get_all_contracts(db: Session = Depends(get_db)):
+def get_all_contracts(db: Session = Depends(get_read_db)):
     """Получить список всех договоров"""
     contracts = db.query(Contract).order_by(Contract.valid_until.desc()).all()
     return contracts
 
 
 @router.get("/{contract_id}", response_model=ContractResponse)
-def get_contract(contract_id: int, db: Session = Depends(get_db)):
+def get_contract(contract_id: int, db: Session = Depends(get_read_db)):
     """Получить договор по ID"""
     contract = db.query(Contract).filter(Contract.id == contract_id).first()
     if not contract:
@@ -1,15 +1,20 @@
 # deltica/backend/routes/documents.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from pathlib import Path
 from pydantic import BaseModel
 from typing import List
+from urllib.parse import quote
 
 from backend.core.database import get_db
 from backend.services.documents import DocumentService
+from backend.services.bundle import BundleService, BUNDLE_KINDS
+from backend.routes import files as files_routes
 from backend.utils.auth import get_current_user, get_current_active_admin
+from backend.utils.http_range import parse_range_header, if_range_matches, slice_stream
 from backend.app.models import User
 
 
@@ -17,6 +22,12 @@ class GenerateLabelsRequest(BaseModel):
     """Схема запроса для пакетной генерации этикеток"""
     equipment_ids: List[int]
 
+
+class BundleRequest(BaseModel):
+    """Схема запроса для ZIP-архива документов по списку оборудования"""
+    equipment_ids: List[int]
+    kinds: List[str] = ["label", "active_certificate"]
+
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
@@ -51,6 +62,7 @@ def generate_label(
         # Вернуть файл для скачивания
         return FileResponse(
             path=file_path,
+            background=BackgroundTask(service.release, file_path),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             filename=f"Этикетка_{equipment_id}.docx",
             headers={
@@ -108,6 +120,7 @@ def generate_labels_batch(
         count = len(request.equipment_ids)
         return FileResponse(
             path=file_path,
+            background=BackgroundTask(service.release, file_path),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             filename=f"Этикетки_{count}_шт.docx",
             headers={
@@ -164,6 +177,7 @@ def generate_conservation_act(
         count = len(request.equipment_ids)
         return FileResponse(
             path=file_path,
+            background=BackgroundTask(service.release, file_path),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             filename=f"Акт_консервации_{count}_шт.docx",
             headers={
@@ -221,6 +235,7 @@ def generate_request(
         count = len(request.equipment_ids)
         return FileResponse(
             path=file_path,
+            background=BackgroundTask(service.release, file_path),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             filename=f"Предписание_{count}_шт.docx",
             headers={
@@ -278,6 +293,7 @@ def generate_bid_poverka(
         count = len(request.equipment_ids)
         return FileResponse(
             path=file_path,
+            background=BackgroundTask(service.release, file_path),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             filename=f"Заявка_на_поверку_{count}_шт.docx",
             headers={
@@ -335,6 +351,7 @@ def generate_bid_calibrovka(
         count = len(request.equipment_ids)
         return FileResponse(
             path=file_path,
+            background=BackgroundTask(service.release, file_path),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             filename=f"Заявка_на_калибровку_{count}_шт.docx",
             headers={
@@ -379,3 +396,97 @@ def download_commissioning_template(
             "Content-Disposition": "attachment; filename*=UTF-8''%D0%90%D0%BA%D1%82_%D0%B2%D0%B2%D0%BE%D0%B4%D0%B0_%D0%B2_%D1%8D%D0%BA%D1%81%D0%BF%D0%BB%D1%83%D0%B0%D1%82%D0%B0%D1%86%D0%B8%D1%8E.docx"
         }
     )
+
+
+def _bundle_response(request: Request, db: Session, equipment_ids: List[int], kinds: List[str]):
+    """Собрать потоковый ZIP-ответ с поддержкой докачки через Range"""
+    if not equipment_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Список ID оборудования не может быть пустым"
+        )
+
+    unknown_kinds = set(kinds) - BUNDLE_KINDS
+    if not kinds or unknown_kinds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Недопустимый вид документов. Разрешены: {', '.join(sorted(BUNDLE_KINDS))}"
+        )
+
+    service = BundleService(db, files_routes.UPLOAD_DIR)
+
+    try:
+        entries = service.build_entries(equipment_ids, kinds)
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Шаблон не найден: {str(e)}"
+        )
+
+    if not entries:
+        raise HTTPException(
+            status_code=404,
+            detail="Не найдено документов для выбранного оборудования"
+        )
+
+    etag = service.etag(entries)
+    encoded_filename = quote(f"Документы_{len(set(equipment_ids))}_шт.zip")
+    headers = {
+        "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+    }
+
+    range_header = request.headers.get("range")
+    if range_header and if_range_matches(request.headers.get("if-range"), etag):
+        total_size = service.archive_size(entries)
+        byte_range = parse_range_header(range_header, total_size)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{total_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                slice_stream(service.iter_zip(entries), start, end),
+                status_code=206,
+                media_type="application/zip",
+                headers=headers
+            )
+
+    return StreamingResponse(
+        service.iter_zip(entries),
+        media_type="application/zip",
+        headers=headers
+    )
+
+
+@router.get("/bundle")
+def download_bundle(
+    request: Request,
+    equipment_ids: List[int] = Query(...),
+    kinds: List[str] = Query(["label", "active_certificate"]),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Скачать ZIP-архив с документами и файлами для списка оборудования.
+    Архив формируется потоково, поддерживается докачка (Range / If-Range).
+    Доступно для всех аутентифицированных пользователей
+
+    - **equipment_ids**: ID оборудования (повторяемый параметр)
+    - **kinds**: Виды документов: label, active_certificate, verification_docs, general_docs
+    """
+    return _bundle_response(request, db, equipment_ids, kinds)
+
+
+@router.post("/bundle")
+def download_bundle_batch(
+    bundle_request: BundleRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    То же, что GET /documents/bundle, но список оборудования передаётся в теле запроса
+    Доступно для всех аутентифицированных пользователей
+    """
+    return _bundle_response(request, db, bundle_request.equipment_ids, bundle_request.kinds)
@@ -0,0 +1,37 @@
+# deltica/backend/routes/events.py
+
+from typing import Optional
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+
+from backend.services.change_stream import change_stream
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/stream")
+async def stream_changes(last_event_id: Optional[str] = Header(None)):
+    """
+    Поток изменений реестра (Server-Sent Events) - вместо перечитывания таблицы.
+
+    События:
+    - **ready**: подключение установлено, клиент загружает таблицу
+    - **upsert**: `{"rows": [...], "reason": "created|updated|restored|status_rollover"}` -
+      строки в формате GET /main-table/
+    - **remove**: `{"ids": [...], "reason": "deleted|archived"}`
+    - **files**: `{"equipment_id", "file_ids", "action": "added|deleted|updated"}`,
+      при изменении порядка - `{"equipment_id", "action": "reordered"}`
+    - **resync**: события пропущены, таблицу нужно перечитать целиком
+
+    При переподключении EventSource передаёт Last-Event-ID, и пропущенные
+    события досылаются. Доступен без аутентификации, как и GET /main-table/.
+    """
+    return StreamingResponse(
+        change_stream.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx не должен буферизовать поток
+            "X-Accel-Buffering": "no",
+        },
+    )
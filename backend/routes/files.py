@@ -5,13 +5,19 @@ import shutil
 from pathlib import Path
 from typing import List
 from urllib.parse import quote
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form, Request, Response
+from sqlalchemy import case, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_async_db, get_db, get_read_db
 from backend.app.models import EquipmentFile, Equipment, ArchivedEquipmentFile
 from backend.app.schemas import EquipmentFileResponse, FileOrderUpdate
+from backend.core.notifications import notification_bus
+from backend.services.storage import BlobStore
+from backend.services.thumbnails import THUMBNAIL_PENDING, THUMBNAIL_READY, thumbnail_service
+from backend.utils.http_range import cached_file_response
+from backend.utils.uploads import stream_upload_to_temp
 
 router = APIRouter(prefix="/files", tags=["files"])
 
@@ -58,7 +64,7 @@ def get_media_type(filename: str) -> str:
 
 
 @router.post("/upload/{equipment_id}", response_model=EquipmentFileResponse)
-async def upload_file(
+def upload_file(
     equipment_id: int,
     file: UploadFile = File(...),
     file_type: str = Form(...),
@@ -66,6 +72,7 @@ async def upload_file(
 ):
     """
     Загрузить файл для оборудования.
+    Синхронный endpoint: запись на диск и commit выполняются в пуле потоков.
 
     - **equipment_id**: ID оборудования
     - **file**: Загружаемый файл
@@ -83,75 +90,70 @@ async def upload_file(
             detail=f"Недопустимый тип файла. Разрешены: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    # Чтение файла и проверка размера
-    file_content = await file.read()
-    file_size = len(file_content)
+    store = BlobStore(UPLOAD_DIR)
 
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Файл слишком большой. Максимальный размер: {MAX_FILE_SIZE / (1024*1024):.0f} МБ"
-        )
-
-    # Создание директории для оборудования
-    equipment_dir = UPLOAD_DIR / f"equipment_{equipment_id}"
-    equipment_dir.mkdir(parents=True, exist_ok=True)
-
-    # Санитизация имени файла
-    safe_filename = sanitize_filename(file.filename)
-
-    # Проверка на уникальность имени файла
-    file_path = equipment_dir / safe_filename
-    counter = 1
-    original_stem = Path(safe_filename).stem
-    original_ext = Path(safe_filename).suffix
-
-    while file_path.exists():
-        safe_filename = f"{original_stem}_{counter}{original_ext}"
-        file_path = equipment_dir / safe_filename
-        counter += 1
+    # Потоковая запись во временный файл с проверкой размера и подсчётом SHA-256
+    streamed = stream_upload_to_temp(file, store.incoming_dir, MAX_FILE_SIZE)
 
-    # Сохранение файла на диск
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    # Одинаковое содержимое хранится на диске один раз
+    relative_path = store.blob_path(streamed.sha256)
+    store.lock(db, relative_path)
+    store.put(streamed)
 
     # Сохранение информации о файле в БД
-    relative_path = f"equipment_{equipment_id}/{safe_filename}"
-
     db_file = EquipmentFile(
         equipment_id=equipment_id,
         file_name=file.filename,  # Оригинальное имя
         file_path=relative_path,
         file_type=file_type,
-        file_size=file_size,
+        file_size=streamed.size,
+        file_hash=streamed.sha256,
         is_active_certificate=False
     )
 
     db.add(db_file)
-    db.commit()
+    try:
+        db.flush()
+        notification_bus.publish(
+            db, "files", {"action": "added", "equipment_id": equipment_id, "file_ids": [db_file.id]}
+        )
+        db.commit()
+    except Exception:
+        # Не оставляем на диске файл без записи в БД
+        db.rollback()
+        store.discard(db, relative_path)
+        raise
     db.refresh(db_file)
 
+    # Миниатюра строится в фоне, ответ не ждёт её готовности
+    thumbnail_service.schedule(
+        store.root / relative_path, store.thumbnail_path(relative_path), db_file.file_name
+    )
+
     return db_file
 
 
 @router.get("/equipment/{equipment_id}", response_model=List[EquipmentFileResponse])
-def get_equipment_files(equipment_id: int, db: Session = Depends(get_db)):
+async def get_equipment_files(equipment_id: int, db: AsyncSession = Depends(get_async_db)):
     """Получить список всех файлов для оборудования (отсортированный по sort_order)."""
-    equipment = db.query(Equipment).filter(Equipment.id == equipment_id).first()
-    if not equipment:
+    equipment_exists = await db.scalar(select(Equipment.id).where(Equipment.id == equipment_id))
+    if equipment_exists is None:
         raise HTTPException(status_code=404, detail="Оборудование не найдено")
 
-    files = db.query(EquipmentFile).filter(
-        EquipmentFile.equipment_id == equipment_id
-    ).order_by(EquipmentFile.sort_order, EquipmentFile.id).all()
-    return files
+    files = await db.scalars(
+        select(EquipmentFile)
+        .where(EquipmentFile.equipment_id == equipment_id)
+        .order_by(EquipmentFile.sort_order, EquipmentFile.id)
+    )
+    return files.all()
 
 
 @router.get("/view/{file_id}")
-def view_file(file_id: int, db: Session = Depends(get_db)):
+def view_file(file_id: int, request: Request, db: Session = Depends(get_read_db)):
     """
     Открыть файл для просмотра в браузере.
     Работает как с основными, так и с архивными файлами.
+    Поддерживает Range (постраничная загрузка PDF) и If-None-Match (304).
     """
     # Сначала ищем в основной таблице
     db_file = db.query(EquipmentFile).filter(EquipmentFile.id == file_id).first()
@@ -163,31 +165,28 @@ def view_file(file_id: int, db: Session = Depends(get_db)):
     if not db_file:
         raise HTTPException(status_code=404, detail="Файл не найден")
 
-    file_path = UPLOAD_DIR / db_file.file_path
-
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Файл не найден на диске")
-
     # Определяем MIME-тип для правильного отображения в браузере
     media_type = get_media_type(db_file.file_name)
 
     # Кодируем имя файла для корректной работы с кириллицей
     encoded_filename = quote(db_file.file_name)
 
-    return FileResponse(
-        path=str(file_path),
+    return cached_file_response(
+        request,
+        UPLOAD_DIR / db_file.file_path,
+        db_file.file_hash,
         media_type=media_type,
-        headers={
-            "Content-Disposition": f"inline; filename*=UTF-8''{encoded_filename}"
-        }
+        content_disposition=f"inline; filename*=UTF-8''{encoded_filename}"
     )
 
 
-@router.get("/download/{file_id}")
-def download_file(file_id: int, db: Session = Depends(get_db)):
+@router.get("/thumb/{file_id}")
+def get_thumbnail(file_id: int, request: Request, db: Session = Depends(get_read_db)):
     """
-    Скачать файл по ID (принудительное скачивание).
-    Работает как с основными, так и с архивными файлами.
+    Получить миниатюру файла (JPEG) для списка файлов.
+    Для изображений - уменьшенная копия, для PDF - первая страница.
+    Если миниатюра ещё не готова, генерация ставится в очередь и сразу
+    возвращается 202 с Retry-After: клиент повторяет запрос позже.
     """
     # Сначала ищем в основной таблице
     db_file = db.query(EquipmentFile).filter(EquipmentFile.id == file_id).first()
@@ -199,21 +198,54 @@ def download_file(file_id: int, db: Session = Depends(get_db)):
     if not db_file:
         raise HTTPException(status_code=404, detail="Файл не найден")
 
-    file_path = UPLOAD_DIR / db_file.file_path
+    store = BlobStore(UPLOAD_DIR)
+    source = store.root / db_file.file_path
+    thumbnail = store.thumbnail_path(db_file.file_path)
 
-    if not file_path.exists():
+    if not source.exists():
         raise HTTPException(status_code=404, detail="Файл не найден на диске")
 
+    state = thumbnail_service.request(source, thumbnail, db_file.file_name)
+    if state == THUMBNAIL_PENDING:
+        return Response(status_code=202, headers={"Retry-After": "1", "Cache-Control": "no-store"})
+    if state != THUMBNAIL_READY:
+        raise HTTPException(status_code=404, detail="Миниатюра недоступна для этого файла")
+
+    return cached_file_response(
+        request,
+        thumbnail,
+        f"{db_file.file_hash}-thumb" if db_file.file_hash else None,
+        media_type="image/jpeg",
+        content_disposition="inline"
+    )
+
+
+@router.get("/download/{file_id}")
+def download_file(file_id: int, request: Request, db: Session = Depends(get_read_db)):
+    """
+    Скачать файл по ID (принудительное скачивание).
+    Работает как с основными, так и с архивными файлами.
+    Поддерживает Range (докачка) и If-None-Match (304).
+    """
+    # Сначала ищем в основной таблице
+    db_file = db.query(EquipmentFile).filter(EquipmentFile.id == file_id).first()
+
+    # Если не найден, ищем в архивной таблице
+    if not db_file:
+        db_file = db.query(ArchivedEquipmentFile).filter(ArchivedEquipmentFile.id == file_id).first()
+
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Файл не найден")
+
     # Кодируем имя файла для корректной работы с кириллицей
     encoded_filename = quote(db_file.file_name)
 
-    return FileResponse(
-        path=str(file_path),
-        filename=db_file.file_name,
+    return cached_file_response(
+        request,
+        UPLOAD_DIR / db_file.file_path,
+        db_file.file_hash,
         media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-        }
+        content_disposition=f"attachment; filename*=UTF-8''{encoded_filename}"
     )
 
 
@@ -226,6 +258,9 @@ def set_file_as_active_certificate(file_id: int, db: Session = Depends(get_db)):
 
     # Переключить флаг (toggle)
     db_file.is_active_certificate = not db_file.is_active_certificate
+    notification_bus.publish(
+        db, "files", {"action": "updated", "equipment_id": db_file.equipment_id, "file_ids": [file_id]}
+    )
     db.commit()
     db.refresh(db_file)
 
@@ -254,21 +289,40 @@ def reorder_files(equipment_id: int, order_update: FileOrderUpdate, db: Session
     if not equipment:
         raise HTTPException(status_code=404, detail="Оборудование не найдено")
 
-    # Обновляем sort_order для каждого файла
-    for index, file_id in enumerate(order_update.file_ids):
-        db_file = db.query(EquipmentFile).filter(
-            EquipmentFile.id == file_id,
-            EquipmentFile.equipment_id == equipment_id
-        ).first()
-        if db_file:
-            db_file.sort_order = index
-
-    db.commit()
-
-    # Возвращаем обновленный список файлов
+    # Позиция файла - индекс в списке; для повторяющихся ID действует
+    # последнее вхождение (как при поочерёдном присваивании sort_order)
+    positions = {file_id: position for position, file_id in enumerate(order_update.file_ids)}
+    file_ids = list(positions)
+
+    if file_ids:
+        # Весь новый порядок - одним UPDATE; файлы другого оборудования не затрагиваются
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(
+                text("""
+                    UPDATE equipment_files AS f
+                    SET sort_order = v.position
+                    FROM unnest(CAST(:ids AS integer[]), CAST(:positions AS integer[])) AS v(id, position)
+                    WHERE f.id = v.id AND f.equipment_id = :equipment_id
+                """),
+                {"ids": file_ids, "positions": list(positions.values()), "equipment_id": equipment_id}
+            )
+        else:
+            db.execute(
+                update(EquipmentFile)
+                .where(EquipmentFile.id.in_(file_ids), EquipmentFile.equipment_id == equipment_id)
+                .values(sort_order=case(positions, value=EquipmentFile.id))
+                .execution_options(synchronize_session=False)
+            )
+
+    # Обновленный список читаем в той же транзакции и сериализуем до commit,
+    # чтобы после commit не перечитывать каждый объект отдельным запросом
     files = db.query(EquipmentFile).filter(
         EquipmentFile.equipment_id == equipment_id
-    ).order_by(EquipmentFile.sort_order, EquipmentFile.id).all()
+    ).order_by(EquipmentFile.sort_order, EquipmentFile.id).populate_existing().all()
+    files = [EquipmentFileResponse.model_validate(db_file) for db_file in files]
+
+    notification_bus.publish(db, "files", {"action": "reordered", "equipment_id": equipment_id})
+    db.commit()
 
     return {"message": "Порядок файлов обновлен", "files": files}
 
@@ -280,18 +334,12 @@ def delete_file(file_id: int, db: Session = Depends(get_db)):
     if not db_file:
         raise HTTPException(status_code=404, detail="Файл не найден")
 
-    # Удаление файла с диска
-    file_path = UPLOAD_DIR / db_file.file_path
-    if file_path.exists():
-        file_path.unlink()
-
-    # Проверка, если директория оборудования пуста - удаляем её
-    equipment_dir = file_path.parent
-    if equipment_dir.exists() and not any(equipment_dir.iterdir()):
-        equipment_dir.rmdir()
-
-    # Удаление записи из БД
+    # Удаление записи из БД и файла с диска, если на него больше никто не ссылается
     db.delete(db_file)
+    BlobStore(UPLOAD_DIR).release(db, db_file.file_path)
+    notification_bus.publish(
+        db, "files", {"action": "deleted", "equipment_id": db_file.equipment_id, "file_ids": [file_id]}
+    )
     db.commit()
 
     return {"message": "Файл успешно удален"}
@@ -1,15 +1,17 @@
 # deltica/backend/routes/health.py
 
 import logging
-import os
-import psutil
+import time
 from datetime import datetime
-from pathlib import Path
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from backend.core.database import get_db
+from backend.core.database import get_async_db
+from backend.core.system_sampler import system_sampler
+from backend.services.log_query import MAX_LIMIT, LogFilters, log_query, time_key
 from backend.utils.auth import get_current_active_admin
 
 logger = logging.getLogger(__name__)
@@ -29,9 +31,21 @@ def health_check():
     }
 
 
+def _isoformat(timestamp: float) -> str:
+    return datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
+
+
+# Показатели, доступные в /health/history (числовые поля замера)
+HISTORY_FIELDS = (
+    "cpu_percent", "memory_percent", "memory_available_gb", "disk_percent", "disk_free_gb",
+    "process_rss_mb", "process_cpu_percent", "process_threads", "open_files",
+    "log_files", "log_size_mb",
+)
+
+
 @router.get("/system")
-def get_system_info(
-    db: Session = Depends(get_db),
+async def get_system_info(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_active_admin)
 ):
     """
@@ -42,12 +56,16 @@ def get_system_info(
     - Информацию об использовании CPU и памяти
     - Информацию о дисковом пространстве
     - Количество файлов логов
+    - Память и дескрипторы процесса, состояние пулов БД
+
+    Показатели ресурсов берутся из последнего фонового замера (system_sampler),
+    запрос не ждёт замера CPU.
     """
     # Проверка подключения к БД
     db_status = "ok"
     db_error = None
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
     except Exception as e:
         db_status = "error"
         db_error = str(e)
@@ -56,37 +74,85 @@ def get_system_info(
             extra={"event": "health_check_failed", "component": "database"}
         )
 
-    # Информация о системе
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
-
-    # Информация о логах
-    logs_dir = Path("backend/logs")
-    log_files = list(logs_dir.glob("*.log*")) if logs_dir.exists() else []
-    total_log_size = sum(f.stat().st_size for f in log_files)
+    sample = system_sampler.latest()
+    if sample is None:
+        # Фоновый поток ещё не сделал ни одного замера
+        sample = await run_in_threadpool(system_sampler.sample)
 
     return {
         "status": "ok" if db_status == "ok" else "degraded",
         "timestamp": datetime.utcnow().isoformat() + "Z",
+        "sampled_at": _isoformat(sample["timestamp"]),
         "database": {
             "status": db_status,
-            "error": db_error
+            "error": db_error,
+            "pools": sample["db_pools"]
         },
         "system": {
-            "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "memory_available_gb": round(memory.available / (1024**3), 2),
-            "disk_percent": disk.percent,
-            "disk_free_gb": round(disk.free / (1024**3), 2)
+            "cpu_percent": sample["cpu_percent"],
+            "memory_percent": sample["memory_percent"],
+            "memory_available_gb": sample["memory_available_gb"],
+            "disk_percent": sample["disk_percent"],
+            "disk_free_gb": sample["disk_free_gb"]
+        },
+        "process": {
+            "rss_mb": sample["process_rss_mb"],
+            "cpu_percent": sample["process_cpu_percent"],
+            "threads": sample["process_threads"],
+            "open_files": sample["open_files"]
         },
         "logs": {
-            "count": len(log_files),
-            "total_size_mb": round(total_log_size / (1024**2), 2)
+            "count": sample["log_files"],
+            "total_size_mb": sample["log_size_mb"]
         }
     }
 
 
+@router.get("/history")
+async def get_system_history(
+    minutes: int = Query(60, ge=1, le=24 * 60),
+    fields: Optional[str] = None,
+    current_user = Depends(get_current_active_admin)
+):
+    """
+    История фоновых замеров для графиков (только для администратора).
+
+    Args:
+        minutes: За сколько последних минут вернуть замеры (не больше, чем хранит буфер)
+        fields: Показатели через запятую (по умолчанию все из HISTORY_FIELDS)
+
+    Returns:
+        Метки времени и ряды значений по показателям; для пулов БД - ряды
+        занятых соединений db_<пул>_checked_out
+    """
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in HISTORY_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Неизвестные показатели: {', '.join(unknown)}"
+            )
+    else:
+        selected = list(HISTORY_FIELDS)
+
+    samples = system_sampler.history(since=time.time() - minutes * 60)
+
+    series = {field: [s[field] for s in samples] for field in selected}
+    if not fields:
+        pool_names = sorted({name for s in samples for name in s["db_pools"]})
+        for name in pool_names:
+            series[f"db_{name}_checked_out"] = [
+                s["db_pools"].get(name, {}).get("checked_out") for s in samples
+            ]
+
+    return {
+        "interval_seconds": system_sampler.interval,
+        "timestamps": [_isoformat(s["timestamp"]) for s in samples],
+        "series": series
+    }
+
+
 @router.get("/logs")
 def get_logs(
     limit: int = 100,
@@ -95,36 +161,18 @@ def get_logs(
     """
     Получить последние записи из лога (только для администратора).
 
+    Файл читается с конца блоками; если в текущем файле строк меньше limit
+    (например, сразу после ротации), чтение продолжается в архивах.
+
     Args:
         limit: Количество последних строк (по умолчанию 100, макс 1000)
 
     Returns:
         Список последних записей лога
     """
-    # Ограничиваем лимит
-    limit = min(limit, 1000)
-
-    log_file = Path("backend/logs/deltica.log")
-
-    if not log_file.exists():
-        return {
-            "logs": [],
-            "message": "Файл логов не найден"
-        }
-
     try:
-        # Читаем последние N строк файла
-        with open(log_file, 'r', encoding='utf-8') as f:
-            # Читаем все строки и берём последние N
-            all_lines = f.readlines()
-            last_lines = all_lines[-limit:] if len(all_lines) > limit else all_lines
-
-        return {
-            "logs": [line.strip() for line in last_lines],
-            "count": len(last_lines),
-            "total_lines": len(all_lines)
-        }
-    except Exception as e:
+        lines = log_query.tail(limit)
+    except OSError as e:
         logger.error(
             f"Failed to read log file: {str(e)}",
             extra={"event": "log_read_failed", "error": str(e)}
@@ -133,3 +181,68 @@ def get_logs(
             "logs": [],
             "error": f"Ошибка чтения файла: {str(e)}"
         }
+
+    if not lines:
+        return {
+            "logs": [],
+            "message": "Файл логов не найден"
+        }
+
+    return {
+        "logs": lines,
+        "count": len(lines)
+    }
+
+
+@router.get("/logs/search")
+def search_logs(
+    event: Optional[str] = None,
+    user: Optional[str] = None,
+    level: Optional[str] = None,
+    path: Optional[str] = None,
+    q: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_user = Depends(get_current_active_admin)
+):
+    """
+    Поиск записей по всем файлам лога, включая архивы ротации (только для администратора).
+
+    Записи возвращаются от новых к старым, файлы читаются потоково.
+
+    Args:
+        event: Точное значение поля event (например, login_failed)
+        user: Имя пользователя
+        level: Уровень (INFO, WARNING, ERROR)
+        path: Префикс пути HTTP-запроса
+        q: Подстрока сообщения (без учёта регистра)
+        since, until: Интервал времени (ISO 8601, без часового пояса - UTC)
+        limit: Записей на странице (макс 1000)
+        cursor: next_cursor из предыдущего ответа
+
+    Returns:
+        Записи, курсор следующей страницы (null - записей больше нет)
+        и число просмотренных файлов
+    """
+    filters = LogFilters(
+        event=event,
+        user=user,
+        level=level.upper() if level else None,
+        path=path,
+        text=q,
+        since=time_key(since) if since else None,
+        until=time_key(until) if until else None,
+    )
+    try:
+        page = log_query.search(filters, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "records": page.records,
+        "count": len(page.records),
+        "next_cursor": page.next_cursor,
+        "scanned_files": page.scanned_files
+    }
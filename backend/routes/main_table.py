@@ -3,8 +3,9 @@
 import logging
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from backend.core.database import SessionLocal
+from backend.core.database import get_async_db, get_db, get_read_db
 from backend.services.main_table import MainTableService
 from backend.app.schemas import MainTableResponse, MainTableCreate, MainTableUpdate
 from backend.utils.auth import get_current_user
@@ -15,26 +16,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/main-table", tags=["main-table"])
 
 
-def get_db():
-    """Dependency для получения сессии базы данных"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get("/", response_model=List[MainTableResponse])
-def get_all_equipment_data(db: Session = Depends(get_db)):
+async def get_all_equipment_data(db: AsyncSession = Depends(get_async_db)):
     """
     Получить все данные оборудования с верификацией и ответственностью
     """
     service = MainTableService(db)
-    return service.get_all_data()
+    return await service.get_all_data_async()
 
 
 @router.get("/{equipment_id}", response_model=MainTableResponse)
-def get_equipment_by_id(equipment_id: int, db: Session = Depends(get_db)):
+def get_equipment_by_id(equipment_id: int, db: Session = Depends(get_read_db)):
     """
     Получить оборудование по ID со всеми связанными данными
     """
@@ -51,7 +43,7 @@ def get_equipment_by_id(equipment_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{equipment_id}/full")
-def get_equipment_full_by_id(equipment_id: int, db: Session = Depends(get_db)):
+def get_equipment_full_by_id(equipment_id: int, db: Session = Depends(get_read_db)):
     """
     Получить полные данные оборудования по ID для редактирования
     """
@@ -0,0 +1,26 @@
+# deltica/backend/routes/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.core.metrics import registry
+
+router = APIRouter(tags=["Мониторинг"])
+
+# Версия текстового формата Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Метрики процесса в текстовом формате Prometheus.
+    Доступна без аутентификации (для сборщика метрик).
+
+    Возвращает:
+    - Число и длительность HTTP-запросов по маршруту и статусу
+    - Запросы и время БД по маршруту, заполнение пулов соединений
+    - Попадания в кэши документов и миниатюр
+    - Длительность формирования документов и резервного копирования
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -4,19 +4,21 @@ import os
 from pathlib import Path
 from typing import List
 from urllib.parse import quote
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Request
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_db, get_read_db
 from backend.app.models import PinnedDocument, User
 from backend.app.schemas import PinnedDocumentResponse
 from backend.utils.auth import get_current_user, get_current_active_admin
+from backend.services.storage import BlobStore
+from backend.utils.http_range import cached_file_response
+from backend.utils.uploads import stream_upload_to_temp
 
 router = APIRouter(prefix="/pinned-documents", tags=["pinned-documents"])
 
 # Константы
-UPLOAD_DIR = Path("backend/uploads/pinned_documents")
+UPLOAD_DIR = Path("backend/uploads")  # Общее хранилище (старые файлы лежат в pinned_documents/)
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 МБ в байтах
 ALLOWED_EXTENSIONS = {".pdf"}  # Только PDF файлы
 
@@ -46,7 +48,7 @@ def sanitize_filename(filename: str) -> str:
 
 @router.get("/", response_model=List[PinnedDocumentResponse])
 def get_pinned_documents(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -58,7 +60,7 @@ def get_pinned_documents(
 
 
 @router.post("/upload", response_model=PinnedDocumentResponse)
-async def upload_pinned_document(
+def upload_pinned_document(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_admin)
@@ -66,6 +68,7 @@ async def upload_pinned_document(
     """
     Загрузить новый закрепленный документ (только PDF).
     Доступно только для администраторов.
+    Синхронный endpoint: запись на диск и commit выполняются в пуле потоков.
 
     - **file**: Загружаемый PDF файл
     """
@@ -76,49 +79,33 @@ async def upload_pinned_document(
             detail=f"Недопустимый тип файла. Разрешены только PDF файлы."
         )
 
-    # Чтение файла и проверка размера
-    file_content = await file.read()
-    file_size = len(file_content)
-
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Файл слишком большой. Максимальный размер: {MAX_FILE_SIZE / (1024*1024):.0f} МБ"
-        )
-
-    # Создание директории если не существует
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Санитизация имени файла
-    safe_filename = sanitize_filename(file.filename)
-
-    # Проверка на уникальность имени файла
-    file_path = UPLOAD_DIR / safe_filename
-    counter = 1
-    original_stem = Path(safe_filename).stem
-    original_ext = Path(safe_filename).suffix
+    store = BlobStore(UPLOAD_DIR)
 
-    while file_path.exists():
-        safe_filename = f"{original_stem}_{counter}{original_ext}"
-        file_path = UPLOAD_DIR / safe_filename
-        counter += 1
+    # Потоковая запись во временный файл с проверкой размера и подсчётом SHA-256
+    streamed = stream_upload_to_temp(file, store.incoming_dir, MAX_FILE_SIZE)
 
-    # Сохранение файла на диск
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    # Одинаковое содержимое хранится на диске один раз
+    relative_path = store.blob_path(streamed.sha256)
+    store.lock(db, relative_path)
+    store.put(streamed)
 
     # Сохранение информации о файле в БД
-    relative_path = f"pinned_documents/{safe_filename}"
-
     db_document = PinnedDocument(
         file_name=file.filename,  # Оригинальное имя
         file_path=relative_path,
-        file_size=file_size,
+        file_size=streamed.size,
+        file_hash=streamed.sha256,
         uploaded_by=current_user.username
     )
 
     db.add(db_document)
-    db.commit()
+    try:
+        db.commit()
+    except Exception:
+        # Не оставляем на диске файл без записи в БД
+        db.rollback()
+        store.discard(db, relative_path)
+        raise
     db.refresh(db_document)
 
     return db_document
@@ -127,6 +114,7 @@ async def upload_pinned_document(
 @router.get("/view/{document_id}")
 def view_pinned_document(
     document_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -138,26 +126,22 @@ def view_pinned_document(
     if not db_document:
         raise HTTPException(status_code=404, detail="Документ не найден")
 
-    file_path = Path("backend/uploads") / db_document.file_path
-
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Файл не найден на диске")
-
     # Кодируем имя файла для корректной работы с кириллицей
     encoded_filename = quote(db_document.file_name)
 
-    return FileResponse(
-        path=str(file_path),
+    return cached_file_response(
+        request,
+        UPLOAD_DIR / db_document.file_path,
+        db_document.file_hash,
         media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"inline; filename*=UTF-8''{encoded_filename}"
-        }
+        content_disposition=f"inline; filename*=UTF-8''{encoded_filename}"
     )
 
 
 @router.get("/download/{document_id}")
 def download_pinned_document(
     document_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -169,21 +153,15 @@ def download_pinned_document(
     if not db_document:
         raise HTTPException(status_code=404, detail="Документ не найден")
 
-    file_path = Path("backend/uploads") / db_document.file_path
-
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Файл не найден на диске")
-
     # Кодируем имя файла для корректной работы с кириллицей
     encoded_filename = quote(db_document.file_name)
 
-    return FileResponse(
-        path=str(file_path),
-        filename=db_document.file_name,
+    return cached_file_response(
+        request,
+        UPLOAD_DIR / db_document.file_path,
+        db_document.file_hash,
         media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-        }
+        content_disposition=f"attachment; filename*=UTF-8''{encoded_filename}"
     )
 
 
@@ -201,13 +179,9 @@ def delete_pinned_document(
     if not db_document:
         raise HTTPException(status_code=404, detail="Документ не найден")
 
-    # Удаление файла с диска
-    file_path = Path("backend/uploads") / db_document.file_path
-    if file_path.exists():
-        file_path.unlink()
-
-    # Удаление записи из БД
+    # Удаление записи из БД и файла с диска, если на него больше никто не ссылается
     db.delete(db_document)
+    BlobStore(UPLOAD_DIR).release(db, db_document.file_path)
     db.commit()
 
     return {"message": "Документ успешно удален"}
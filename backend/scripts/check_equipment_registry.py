@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# backend/scripts/check_equipment_registry.py
+# Проверка согласованности проекции equipment_registry с исходными таблицами
+
+"""
+Скрипт сравнивает каждую строку equipment_registry с данными equipment,
+verification, responsibility и finance и сообщает:
+- оборудование, отсутствующее в проекции
+- строки проекции без оборудования
+- строки, в которых отличаются колонки
+- оборудование с несколькими записями в таблицах 1:1 (проблема исходных данных)
+
+Использование:
+    uv run python backend/scripts/check_equipment_registry.py
+    uv run python backend/scripts/check_equipment_registry.py --repair
+    uv run python backend/scripts/check_equipment_registry.py --rebuild
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+# Устанавливаем UTF-8 кодировку для stdout (для Windows)
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.core.database import SessionLocal
+from backend.services.equipment_registry import EquipmentRegistryService
+
+# Сколько ID выводить в каждой категории без --verbose
+PREVIEW_LIMIT = 20
+
+
+def _preview(ids, verbose: bool) -> str:
+    shown = ids if verbose else ids[:PREVIEW_LIMIT]
+    suffix = "" if len(shown) == len(ids) else f" ... (ещё {len(ids) - len(shown)})"
+    return ", ".join(str(equipment_id) for equipment_id in shown) + suffix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка проекции equipment_registry")
+    parser.add_argument("--repair", action="store_true", help="Исправить найденные расхождения")
+    parser.add_argument("--rebuild", action="store_true", help="Пересобрать проекцию целиком")
+    parser.add_argument("--verbose", action="store_true", help="Показать все ID и колонки")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = EquipmentRegistryService(db)
+
+        if args.rebuild:
+            rows = service.rebuild()
+            db.commit()
+            print(f"Проекция пересобрана: {rows} строк")
+            return 0
+
+        report = service.check()
+        print(f"Проверено оборудования: {report.checked}")
+        if report.missing:
+            print(f"Нет в проекции ({len(report.missing)}): {_preview(report.missing, args.verbose)}")
+        if report.orphaned:
+            print(f"Лишние строки проекции ({len(report.orphaned)}): {_preview(report.orphaned, args.verbose)}")
+        if report.mismatched:
+            print(f"Устаревшие строки ({len(report.mismatched)}):")
+            items = list(report.mismatched.items())
+            for equipment_id, columns in (items if args.verbose else items[:PREVIEW_LIMIT]):
+                print(f"    {equipment_id}: {', '.join(columns)}")
+        for table, ids in report.duplicates.items():
+            print(f"Несколько записей в {table} ({len(ids)}): {_preview(ids, args.verbose)}")
+
+        if report.ok:
+            print("Проекция согласована")
+            return 0
+
+        if args.repair:
+            fixed = service.repair(report)
+            db.commit()
+            print(f"Исправлено строк: {fixed}")
+            return 0
+
+        print("Для исправления запустите с --repair")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ sys.path.insert(0, str(project_root))
 
 from sqlalchemy import text
 from backend.core.database import engine
+from backend.services.equipment_registry import EquipmentRegistryService
 
 
 def execute_sql_file(sql_file_path: str):
@@ -35,6 +36,10 @@ def execute_sql_file(sql_file_path: str):
             # Выполняем весь SQL скрипт за раз
             connection.execute(text(sql_content))
 
+            # Импорт пишет в таблицы напрямую - пересобираем проекцию в той же транзакции
+            rows = EquipmentRegistryService(connection).rebuild()
+            print(f"Проекция equipment_registry пересобрана: {rows} строк")
+
             trans.commit()
             print(f"\n✅ SQL скрипт успешно выполнен!")
             print("Транзакция зафиксирована.")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# backend/scripts/explain_queries.py
+# Советник по индексам: EXPLAIN (ANALYZE, BUFFERS) запросов сервисов
+
+"""
+Скрипт выполняет EXPLAIN (ANALYZE, BUFFERS) для запросов главной таблицы,
+архива, списка файлов, подсчёта ссылок на файлы и поиска по номерам и
+сообщает:
+- Seq Scan по таблицам, где прочитано не меньше --min-rows строк
+- запросы, выполнявшиеся дольше --slow-ms
+
+С --seed N перед замером в той же транзакции добавляется N синтетических
+единиц оборудования (с поверкой, ответственными, финансами и файлами);
+транзакция откатывается, база не изменяется.
+
+Использование:
+    uv run python backend/scripts/explain_queries.py
+    uv run python backend/scripts/explain_queries.py --seed 10000 --verbose
+    uv run python backend/scripts/explain_queries.py --seed 100000 --json report.json
+"""
+
+import argparse
+import io
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+# Устанавливаем UTF-8 кодировку для stdout (для Windows)
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.core.database import SessionLocal
+from backend.services.query_advisor import DEFAULT_MIN_SCAN_ROWS, DEFAULT_SLOW_MS, QueryAdvisor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN (ANALYZE, BUFFERS) запросов сервисов")
+    parser.add_argument("--seed", type=int, default=0, help="Добавить N синтетических записей (с откатом)")
+    parser.add_argument("--min-rows", type=int, default=DEFAULT_MIN_SCAN_ROWS,
+                        help="Сообщать о Seq Scan от N прочитанных строк")
+    parser.add_argument("--slow-ms", type=float, default=DEFAULT_SLOW_MS, help="Порог медленного запроса, мс")
+    parser.add_argument("--verbose", action="store_true", help="Показать SQL запросов")
+    parser.add_argument("--json", help="Сохранить отчёт в JSON-файл")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            print("Скрипт работает только с PostgreSQL")
+            return 2
+
+        advisor = QueryAdvisor(db, min_scan_rows=args.min_rows, slow_ms=args.slow_ms)
+        if args.seed:
+            print(f"Добавление {args.seed} синтетических записей (будут откачены)...")
+        reports = advisor.run(seed_count=args.seed)
+    finally:
+        db.close()
+
+    problems = 0
+    for report in reports:
+        status = "ПРОБЛЕМА" if report.issues else "ok"
+        print(
+            f"{report.name:<34} {report.execution_ms:>9.2f} мс  "
+            f"buffers hit={report.shared_hit_blocks} read={report.shared_read_blocks}  {status}"
+        )
+        for issue in report.issues:
+            print(f"    - {issue}")
+        if args.verbose:
+            print(f"    {report.sql}")
+        problems += bool(report.issues)
+
+    print(f"\nЗапросов: {len(reports)}, с проблемами: {problems}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                [{**asdict(report), "issues": report.issues} for report in reports],
+                f, ensure_ascii=False, indent=2
+            )
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
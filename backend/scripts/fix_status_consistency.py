@@ -12,6 +12,7 @@ sys.path.insert(0, str(project_root))
 
 from sqlalchemy import create_engine, text
 from backend.core.config import settings
+from backend.services.equipment_registry import EquipmentRegistryService
 
 # Fix encoding for Windows console
 if sys.platform == "win32":
@@ -57,6 +58,10 @@ def fix_status_consistency():
                     total_fixed += count
                     print(f'✓ Исправлено: {state} → {correct_status} (затронуто строк: {result.rowcount})')
 
+            if total_fixed:
+                # Статусы изменены в обход сервисов - пересобираем проекцию
+                EquipmentRegistryService(conn).rebuild()
+
             print(f'\n{"="*60}')
             print(f'Всего исправлено записей: {total_fixed}')
 
@@ -0,0 +1,105 @@
+"""
+Скрипт переноса загруженных файлов старого формата (equipment_{id}/имя.pdf,
+pinned_documents/имя.pdf) в хранилище с адресацией по содержимому (blobs/ab/<sha256>).
+Одинаковые файлы после переноса хранятся на диске один раз.
+
+Запуск: python backend/scripts/migrate_uploads_to_blobs.py [--dry-run]
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, text
+from backend.core.config import settings
+from backend.services.storage import BlobStore, UPLOAD_ROOT
+
+# Fix encoding for Windows console
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+FILE_TABLES = ("equipment_files", "archived_equipment_files", "pinned_documents")
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 файла (чтение блоками по 1 МБ)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def migrate_uploads(dry_run: bool = False):
+    """Перенести файлы в blob-хранилище и обновить file_path/file_hash во всех таблицах"""
+    engine = create_engine(settings.DATABASE_URL)
+    store = BlobStore(UPLOAD_ROOT)
+
+    moved = 0
+    deduplicated = 0
+    missing = 0
+    # Старый путь -> (новый путь, хеш): один файл может встречаться в нескольких строках
+    migrated = {}
+
+    with engine.begin() as conn:  # автоматический коммит при успехе
+        for table in FILE_TABLES:
+            rows = conn.execute(text(f'''
+                SELECT id, file_path FROM {table}
+                WHERE file_path NOT LIKE 'blobs/%'
+            ''')).fetchall()
+
+            for row_id, old_path in rows:
+                if old_path not in migrated:
+                    source = UPLOAD_ROOT / old_path
+                    if not source.exists():
+                        print(f'✗ {table}#{row_id}: файл не найден: {old_path}')
+                        missing += 1
+                        continue
+
+                    file_hash = file_sha256(source)
+                    new_path = store.blob_path(file_hash)
+                    target = UPLOAD_ROOT / new_path
+
+                    if target.exists():
+                        deduplicated += 1
+                    else:
+                        moved += 1
+
+                    if not dry_run:
+                        if target.exists():
+                            source.unlink()
+                        else:
+                            target.parent.mkdir(parents=True, exist_ok=True)
+                            os.replace(source, target)
+                        try:
+                            source.parent.rmdir()
+                        except OSError:
+                            pass
+
+                    migrated[old_path] = (new_path, file_hash)
+
+                new_path, file_hash = migrated[old_path]
+                if not dry_run:
+                    conn.execute(text(f'''
+                        UPDATE {table}
+                        SET file_path = :new_path, file_hash = :file_hash
+                        WHERE id = :id
+                    '''), {'new_path': new_path, 'file_hash': file_hash, 'id': row_id})
+
+                print(f'✓ {table}#{row_id}: {old_path} → {new_path}')
+
+    print(f'\n{"="*60}')
+    print(f'Перенесено файлов: {moved}')
+    print(f'Совпало с уже сохранёнными: {deduplicated}')
+    print(f'Не найдено на диске: {missing}')
+    if dry_run:
+        print('Режим --dry-run: изменения не применены')
+
+
+if __name__ == "__main__":
+    migrate_uploads(dry_run="--dry-run" in sys.argv)
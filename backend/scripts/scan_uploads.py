@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# backend/scripts/scan_uploads.py
+# Проверка целостности хранилища загруженных файлов
+
+"""
+Скрипт сверяет backend/uploads с таблицами equipment_files,
+archived_equipment_files и pinned_documents:
+- Находит файлы-сироты (нет ни одной записи в БД) и, с --quarantine,
+  перемещает их в backend/uploads/.quarantine/<дата>/
+- Находит записи, файл которых отсутствует на диске
+- С --verify проверяет SHA-256 файлов порциями (--max-gb / --max-minutes),
+  продолжая с места прошлой остановки
+
+Использование:
+    uv run python backend/scripts/scan_uploads.py
+    uv run python backend/scripts/scan_uploads.py --quarantine
+    uv run python backend/scripts/scan_uploads.py --verify --max-minutes 60
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+# Устанавливаем UTF-8 кодировку для stdout (для Windows)
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.core.database import SessionLocal
+from backend.services.storage_scanner import StorageScanner
+
+
+def format_size(size: int) -> str:
+    """Размер в человекочитаемом виде"""
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ТБ"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка целостности backend/uploads")
+    parser.add_argument("--quarantine", action="store_true", help="Переместить файлы-сироты в карантин")
+    parser.add_argument("--grace-hours", type=float, default=1.0, help="Не трогать файлы моложе N часов")
+    parser.add_argument("--verify", action="store_true", help="Проверить SHA-256 файлов")
+    parser.add_argument("--max-gb", type=float, help="Проверить не больше N ГБ за запуск")
+    parser.add_argument("--max-minutes", type=float, help="Проверять не дольше N минут")
+    parser.add_argument("--reset-checkpoint", action="store_true", help="Начать проверку хешей сначала")
+    parser.add_argument("--workers", type=int, default=8, help="Потоков для обхода диска")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        scanner = StorageScanner(db, workers=args.workers)
+
+        print("=" * 60)
+        print("Сверка хранилища с БД...")
+        report = scanner.scan(grace_seconds=args.grace_hours * 3600)
+        print(f"Файлов на диске: {report.files_scanned} ({format_size(report.bytes_scanned)})")
+        print(f"Время обхода: {report.duration_seconds:.1f} с")
+
+        print(f"\nФайлы без записей в БД: {len(report.orphan_files)} ({format_size(report.orphan_bytes)})")
+        for path in report.orphan_files:
+            print(f"  - {path}")
+
+        print(f"\nЗаписи без файлов на диске: {len(report.dangling_rows)}")
+        for ref in report.dangling_rows:
+            print(f"  - {ref.table}#{ref.id}: {ref.file_path}")
+
+        has_problems = bool(report.orphan_files or report.dangling_rows)
+
+        if args.quarantine and report.orphan_files:
+            moved = scanner.quarantine(report.orphan_files)
+            print(f"\n✓ Перемещено в карантин: {len(moved)}")
+
+        if args.verify:
+            if args.reset_checkpoint:
+                scanner.reset_checkpoint()
+
+            print("\n" + "=" * 60)
+            print("Проверка хешей...")
+            max_bytes = int(args.max_gb * 1024 ** 3) if args.max_gb else None
+            max_seconds = args.max_minutes * 60 if args.max_minutes else None
+            verify = scanner.verify_hashes(max_bytes=max_bytes, max_seconds=max_seconds)
+
+            print(f"Проверено файлов: {verify.files_verified} ({format_size(verify.bytes_verified)})")
+            for ref in verify.mismatches:
+                print(f"  ✗ Хеш не совпадает: {ref.table}#{ref.id}: {ref.file_path}")
+            for ref in verify.missing:
+                print(f"  ✗ Файл отсутствует: {ref.table}#{ref.id}: {ref.file_path}")
+            has_problems = has_problems or bool(verify.mismatches or verify.missing)
+            if verify.completed:
+                print("✓ Проверка всех файлов завершена")
+            else:
+                print("Лимит исчерпан, следующий запуск продолжит с места остановки")
+
+        sys.exit(1 if has_problems else 0)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
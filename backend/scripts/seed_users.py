@@ -27,6 +27,7 @@ from sqlalchemy.orm import Session
 from backend.core.database import SessionLocal
 from backend.app.models import User, Responsibility
 from backend.utils.auth import hash_password
+from backend.services.user_cache import notify_users_changed
 
 
 def seed_users(db: Session):
@@ -209,6 +210,8 @@ if __name__ == "__main__":
     db = SessionLocal()
     try:
         seed_users(db)
+        # Запущенный сервер сбросит кэш пользователей
+        notify_users_changed()
     except Exception as e:
         print(f"\n[ERROR] Ошибка при создании пользователей: {e}")
         import traceback
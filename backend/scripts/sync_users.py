@@ -30,6 +30,7 @@ from sqlalchemy.orm import Session
 from backend.core.database import SessionLocal
 from backend.app.models import User
 from backend.utils.auth import hash_password
+from backend.services.user_cache import notify_users_changed
 
 
 def load_users_config(config_path: Path) -> dict:
@@ -224,6 +225,8 @@ def main():
             sync_users(db, users_config)
         finally:
             db.close()
+            # Запущенный сервер сбросит кэш пользователей (деактивация вступит в силу сразу)
+            notify_users_changed()
 
     except FileNotFoundError as e:
         print(f"\n[ERROR] {e}")
@@ -1,9 +1,14 @@
 # deltica/backend/services/archive.py
 
 from typing import List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
 from backend.app import models
+from backend.core.notifications import notification_bus
+from backend.core.tracing import traced
+from backend.services.equipment_registry import EquipmentRegistryService
+from backend.services.storage import BlobStore
 
 
 class ArchiveService:
@@ -12,6 +17,7 @@ class ArchiveService:
     def __init__(self, db: Session):
         self.db = db
 
+    @traced()
     def archive_equipment(self, equipment_id: int, archive_reason: Optional[str] = None) -> Optional[models.ArchivedEquipment]:
         """
         Архивировать оборудование: скопировать в архивные таблицы и удалить из основных
@@ -107,11 +113,13 @@ class ArchiveService:
                 file_path=file.file_path,
                 file_type=file.file_type,
                 file_size=file.file_size,
+                file_hash=file.file_hash,
                 uploaded_at=file.uploaded_at
             )
             self.db.add(archived_file)
 
         # 6. Явно удалить связанные записи (ForeignKey не имеет CASCADE на уровне БД)
+        EquipmentRegistryService(self.db).remove([equipment_id])
         if verification:
             self.db.delete(verification)
         if responsibility:
@@ -124,23 +132,29 @@ class ArchiveService:
         # 7. Удалить оригинальное оборудование
         self.db.delete(equipment)
 
+        # Документы по списанному оборудованию больше не понадобятся
+        notification_bus.publish(self.db, "equipment", {"action": "archived", "ids": [equipment_id]})
+
         # Commit всех изменений
         self.db.commit()
         self.db.refresh(archived_equipment)
 
         return archived_equipment
 
-    def get_all_archived(self) -> List[dict]:
-        """Получить все архивные записи с department из ArchivedResponsibility"""
-        results = self.db.query(
+    @staticmethod
+    def _all_archived_query():
+        """Запрос архивных записей с department из ArchivedResponsibility (общий для sync и async)"""
+        return select(
             models.ArchivedEquipment,
             models.ArchivedResponsibility.department
         ).outerjoin(
             models.ArchivedResponsibility,
             models.ArchivedEquipment.id == models.ArchivedResponsibility.archived_equipment_id
-        ).all()
+        )
 
-        # Преобразуем результаты в словари с department
+    @staticmethod
+    def _to_archived_list(results) -> List[dict]:
+        """Преобразовать пары (ArchivedEquipment, department) в словари"""
         archived_list = []
         for archived_equipment, department in results:
             archived_dict = {
@@ -161,12 +175,25 @@ class ArchiveService:
 
         return archived_list
 
+    @traced()
+    def get_all_archived(self) -> List[dict]:
+        """Получить все архивные записи с department из ArchivedResponsibility"""
+        results = self.db.execute(self._all_archived_query()).all()
+        return self._to_archived_list(results)
+
+    @traced()
+    async def get_all_archived_async(self) -> List[dict]:
+        """То же, что get_all_archived, для AsyncSession"""
+        results = (await self.db.execute(self._all_archived_query())).all()
+        return self._to_archived_list(results)
+
     def get_archived_by_id(self, archived_equipment_id: int) -> Optional[models.ArchivedEquipment]:
         """Получить архивную запись по ID"""
         return self.db.query(models.ArchivedEquipment).filter(
             models.ArchivedEquipment.id == archived_equipment_id
         ).first()
 
+    @traced()
     def restore_equipment(self, archived_equipment_id: int) -> Optional[models.Equipment]:
         """
         Восстановить оборудование из архива: скопировать обратно в основные таблицы и удалить из архива
@@ -258,6 +285,7 @@ class ArchiveService:
                 file_path=archived_file.file_path,
                 file_type=archived_file.file_type,
                 file_size=archived_file.file_size,
+                file_hash=archived_file.file_hash,
                 uploaded_at=archived_file.uploaded_at
             )
             self.db.add(file)
@@ -275,12 +303,18 @@ class ArchiveService:
         # 7. Удалить архивное оборудование
         self.db.delete(archived_equipment)
 
+        # 8. Добавить восстановленное оборудование в проекцию
+        self.db.flush()
+        EquipmentRegistryService(self.db).refresh([equipment.id])
+        notification_bus.publish(self.db, "equipment", {"action": "restored", "ids": [equipment.id]})
+
         # Commit всех изменений
         self.db.commit()
         self.db.refresh(equipment)
 
         return equipment
 
+    @traced()
     def delete_archived(self, archived_equipment_id: int) -> bool:
         """Удалить архивную запись навсегда"""
         archived_equipment = self.db.query(models.ArchivedEquipment).filter(
@@ -290,10 +324,15 @@ class ArchiveService:
         if not archived_equipment:
             return False
 
+        file_paths = [archived_file.file_path for archived_file in archived_equipment.archived_files]
+
         self.db.delete(archived_equipment)
+        # Файлы удаляются с диска, только если на них не ссылаются другие записи
+        BlobStore().release_all(self.db, file_paths)
         self.db.commit()
         return True
 
+    @traced()
     def get_archived_full(self, archived_equipment_id: int) -> Optional[dict]:
         """
         Получить полные данные архивного оборудования
@@ -382,6 +421,7 @@ class ArchiveService:
 
         return result
 
+    @traced()
     def update_archive_reason(self, archived_equipment_id: int, new_reason: str) -> Optional[models.ArchivedEquipment]:
         """
         Обновить причину архивации для архивного оборудования.
@@ -3,14 +3,17 @@
 import os
 import subprocess
 import shutil
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 import pandas as pd
-from backend.app.models import BackupHistory, Equipment, Verification, Responsibility, Finance
+from backend.app.models import BackupHistory, EquipmentRegistry
 from backend.core.config import settings
+from backend.core.metrics import BACKUP_DURATION, timed
+from backend.core.tracing import traced
 
 
 class BackupService:
@@ -55,6 +58,7 @@ class BackupService:
 
         return None
 
+    @traced()
     def can_create_backup(self, db: Session) -> tuple[bool, Optional[str]]:
         """
         Проверка возможности создания backup (не чаще 1 раза в месяц).
@@ -75,6 +79,8 @@ class BackupService:
 
         return True, None
 
+    @timed(BACKUP_DURATION, "pg_dump")
+    @traced()
     def create_backup(self, db: Session, username: str) -> BackupHistory:
         """
         Создание резервной копии БД с помощью pg_dump.
@@ -194,6 +200,7 @@ class BackupService:
 
             raise Exception(error_msg)
 
+    @traced()
     def get_backup_history(self, db: Session, limit: int = 20) -> List[BackupHistory]:
         """
         Получить историю backup (последние N записей).
@@ -222,6 +229,7 @@ class BackupService:
         """
         return db.query(BackupHistory).filter(BackupHistory.id == backup_id).first()
 
+    @traced()
     def delete_backup(self, db: Session, backup_id: int) -> bool:
         """
         Удалить backup файл и запись из истории.
@@ -248,6 +256,8 @@ class BackupService:
 
         return True
 
+    @timed(BACKUP_DURATION, "excel_export")
+    @traced()
     def export_to_excel(self, db: Session) -> Path:
         """
         Экспортировать данные БД в Excel файл.
@@ -258,46 +268,42 @@ class BackupService:
         Returns:
             Path: Путь к созданному Excel файлу
         """
-        # Генерируем имя файла с датой и временем
+        # Генерируем имя файла с датой и временем (суффикс - для одновременных выгрузок)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_name = f"deltica_export_{timestamp}.xlsx"
+        file_name = f"deltica_export_{timestamp}_{uuid.uuid4().hex[:8]}.xlsx"
         file_path = self.BACKUP_DIR / file_name
 
-        # Получаем все данные с JOIN
+        # Получаем все данные из проекции (одна строка на оборудование, без JOIN)
         query = (
             select(
-                Equipment.id.label("ID"),
-                Equipment.equipment_name.label("Наименование"),
-                Equipment.equipment_model.label("Модель/Тип"),
-                Equipment.equipment_type.label("Тип оборудования"),
-                Equipment.factory_number.label("Заводской номер"),
-                Equipment.inventory_number.label("Инвентарный номер"),
-                Equipment.equipment_year.label("Год выпуска"),
-                Verification.verification_type.label("Тип верификации"),
-                Verification.registry_number.label("Номер в реестре"),
-                Verification.verification_interval.label("Межповерочный интервал"),
-                Verification.verification_date.label("Дата верификации"),
-                Verification.verification_due.label("Дата окончания"),
-                Verification.verification_plan.label("Плановая дата"),
-                Verification.verification_state.label("Состояние"),
-                Verification.status.label("Статус"),
-                Responsibility.department.label("Подразделение"),
-                Responsibility.responsible_person.label("Ответственный"),
-                Responsibility.verifier_org.label("Организация-поверитель"),
-                Finance.budget_item.label("Статья бюджета"),
-                Finance.code_rate.label("Тариф"),
-                Finance.cost_rate.label("Стоимость по тарифу"),
-                Finance.quantity.label("Количество"),
-                Finance.coefficient.label("Коэффициент"),
-                Finance.total_cost.label("Итоговая стоимость"),
-                Finance.invoice_number.label("Номер счета"),
-                Finance.paid_amount.label("Факт оплаты"),
-                Finance.payment_date.label("Дата оплаты")
+                EquipmentRegistry.equipment_id.label("ID"),
+                EquipmentRegistry.equipment_name.label("Наименование"),
+                EquipmentRegistry.equipment_model.label("Модель/Тип"),
+                EquipmentRegistry.equipment_type.label("Тип оборудования"),
+                EquipmentRegistry.factory_number.label("Заводской номер"),
+                EquipmentRegistry.inventory_number.label("Инвентарный номер"),
+                EquipmentRegistry.equipment_year.label("Год выпуска"),
+                EquipmentRegistry.verification_type.label("Тип верификации"),
+                EquipmentRegistry.registry_number.label("Номер в реестре"),
+                EquipmentRegistry.verification_interval.label("Межповерочный интервал"),
+                EquipmentRegistry.verification_date.label("Дата верификации"),
+                EquipmentRegistry.verification_due.label("Дата окончания"),
+                EquipmentRegistry.verification_plan.label("Плановая дата"),
+                EquipmentRegistry.verification_state.label("Состояние"),
+                EquipmentRegistry.status.label("Статус"),
+                EquipmentRegistry.department.label("Подразделение"),
+                EquipmentRegistry.responsible_person.label("Ответственный"),
+                EquipmentRegistry.verifier_org.label("Организация-поверитель"),
+                EquipmentRegistry.budget_item.label("Статья бюджета"),
+                EquipmentRegistry.code_rate.label("Тариф"),
+                EquipmentRegistry.cost_rate.label("Стоимость по тарифу"),
+                EquipmentRegistry.quantity.label("Количество"),
+                EquipmentRegistry.coefficient.label("Коэффициент"),
+                EquipmentRegistry.total_cost.label("Итоговая стоимость"),
+                EquipmentRegistry.invoice_number.label("Номер счета"),
+                EquipmentRegistry.paid_amount.label("Факт оплаты"),
+                EquipmentRegistry.payment_date.label("Дата оплаты")
             )
-            .select_from(Equipment)
-            .join(Verification, Equipment.id == Verification.equipment_id, isouter=True)
-            .join(Responsibility, Equipment.id == Responsibility.equipment_id, isouter=True)
-            .join(Finance, Equipment.id == Finance.equipment_model_id, isouter=True)
         )
 
         # Выполняем запрос и получаем результаты
@@ -326,7 +332,7 @@ class BackupService:
             for idx, col in enumerate(df.columns, start=1):
                 column_letter = get_column_letter(idx)
                 max_length = max(
-                    df[col].astype(str).apply(len).max(),
+                    df[col].map(str).map(len).max(),
                     len(str(col))
                 )
                 # Ограничиваем максимальную ширину 50 символами
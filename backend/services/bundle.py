@@ -0,0 +1,279 @@
+# deltica/backend/services/bundle.py
+
+import functools
+import hashlib
+import logging
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, ContextManager, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from backend.app import models
+from backend.services.documents import DocumentService
+
+logger = logging.getLogger(__name__)
+
+# Виды документов, которые можно запросить в архиве
+BUNDLE_KINDS = {"label", "active_certificate", "verification_docs", "general_docs"}
+
+CHUNK_SIZE = 64 * 1024
+
+# Дескриптор данных после каждой записи: сигнатура, CRC, размеры (4 x 4 байта)
+DATA_DESCRIPTOR_SIZE = 16
+
+# Минимальная дата в формате ZIP; дата записей, для которых в БД её нет (этикетки)
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+@dataclass(frozen=True)
+class BundleEntry:
+    """
+    Файл, попадающий в ZIP-архив.
+
+    identity и date_time берутся из БД, а не с диска: архив и его ETag
+    одинаковы, пока не изменилось содержимое файлов. Этикетки задаются
+    через source - файл формируется только при записи в архив.
+    """
+    arcname: str
+    path: Optional[Path] = None
+    # Идентичность содержимого для ETag: хеш файла или ключ кэша этикетки
+    identity: str = ""
+    date_time: Tuple[int, int, int, int, int, int] = ZIP_EPOCH
+    # Контекстный менеджер, выдающий файл на время записи (вместо path)
+    source: Optional[Callable[[], ContextManager[Path]]] = None
+
+    @contextmanager
+    def open(self) -> Iterator[Path]:
+        """Путь к файлу записи на время чтения"""
+        if self.source is None:
+            yield self.path
+        else:
+            with self.source() as path:
+                yield path
+
+
+class _ChunkSink:
+    """Несжимаемый поток для zipfile: копит записанные байты до выдачи клиенту"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _safe_name(name: str) -> str:
+    """Убрать из имени символы, недопустимые в пути внутри архива"""
+    for char in ['/', '\\', ':', '*', '?', '"', '<', '>', '|']:
+        name = name.replace(char, '_')
+    return name.strip() or "_"
+
+
+def _zip_date_time(value: Optional[datetime]) -> Tuple[int, int, int, int, int, int]:
+    """Дата из БД в формате ZIP (местное время, не раньше 1980 года)"""
+    if value is None:
+        return ZIP_EPOCH
+    if value.tzinfo is not None:
+        value = value.astimezone()
+    return max(tuple(value.timetuple()[:6]), ZIP_EPOCH)
+
+
+@contextmanager
+def _label_file(document_service: DocumentService, equipment_id: int, cache_key: str, data: dict) -> Iterator[Path]:
+    """Этикетка на время записи в архив; копия из кэша удаляется после записи"""
+    file_path = document_service.render_label(equipment_id, cache_key, data)
+    try:
+        yield Path(file_path)
+    finally:
+        document_service.release(file_path)
+
+
+def _encoded_name_size(arcname: str) -> int:
+    """Длина имени в заголовках zipfile: ASCII или UTF-8 (с флагом UTF-8)"""
+    try:
+        return len(arcname.encode("ascii"))
+    except UnicodeEncodeError:
+        return len(arcname.encode("utf-8"))
+
+
+class BundleService:
+    """Сервис для сборки ZIP-архива документов и файлов по списку оборудования"""
+
+    def __init__(self, db: Session, upload_dir: Path):
+        self.db = db
+        self.upload_dir = upload_dir
+
+    def build_entries(self, equipment_ids: List[int], kinds: Iterable[str]) -> List[BundleEntry]:
+        """
+        Подготовить список файлов архива.
+
+        Для этикеток вычисляется только ключ кэша: сами документы формируются
+        (или берутся из кэша) по мере записи архива. Файлы оборудования
+        выбираются одним запросом по всем ID.
+        Порядок записей детерминирован, что позволяет докачку через Range.
+        """
+        kinds = set(kinds)
+        equipment_list = self.db.query(models.Equipment).filter(
+            models.Equipment.id.in_(equipment_ids)
+        ).all()
+        equipment_by_id = {equipment.id: equipment for equipment in equipment_list}
+
+        files_by_equipment = {}
+        file_kinds = kinds - {"label"}
+        if file_kinds:
+            conditions = []
+            if "active_certificate" in file_kinds:
+                conditions.append(models.EquipmentFile.is_active_certificate == True)
+            conditions.append(models.EquipmentFile.file_type.in_(file_kinds))
+
+            files = self.db.query(models.EquipmentFile).filter(
+                models.EquipmentFile.equipment_id.in_(equipment_ids),
+                or_(*conditions)
+            ).order_by(
+                models.EquipmentFile.equipment_id,
+                models.EquipmentFile.sort_order,
+                models.EquipmentFile.id
+            ).all()
+            for db_file in files:
+                files_by_equipment.setdefault(db_file.equipment_id, []).append(db_file)
+
+        document_service = DocumentService(self.db)
+        entries: List[BundleEntry] = []
+
+        for equipment_id in dict.fromkeys(equipment_ids):
+            equipment = equipment_by_id.get(equipment_id)
+            if not equipment:
+                continue
+
+            folder = _safe_name(f"{equipment.id}_{equipment.inventory_number}")
+            used_names = set()
+
+            def add(name: str, **fields):
+                arcname = _safe_name(name)
+                stem, suffix = Path(arcname).stem, Path(arcname).suffix
+                counter = 1
+                while arcname in used_names:
+                    arcname = f"{stem}_{counter}{suffix}"
+                    counter += 1
+                used_names.add(arcname)
+                entries.append(BundleEntry(arcname=f"{folder}/{arcname}", **fields))
+
+            if "label" in kinds:
+                label_source = document_service.label_source(equipment_id)
+                if label_source:
+                    cache_key, data = label_source
+                    add(
+                        f"Этикетка_{equipment_id}.docx",
+                        identity=f"label:{cache_key}",
+                        source=functools.partial(_label_file, document_service, equipment_id, cache_key, data),
+                    )
+
+            for db_file in files_by_equipment.get(equipment_id, []):
+                file_path = self.upload_dir / db_file.file_path
+                if not file_path.exists():
+                    logger.warning(
+                        f"Bundle: file missing on disk: {db_file.file_path}",
+                        extra={"event": "bundle_file_missing", "equipment_id": equipment_id}
+                    )
+                    continue
+                add(
+                    db_file.file_name,
+                    path=file_path,
+                    # Файлы без хеша (загруженные до хранилища blob'ов) не перезаписываются по месту
+                    identity=f"file:{db_file.file_hash or db_file.file_path}:{db_file.file_size}",
+                    date_time=_zip_date_time(db_file.uploaded_at),
+                )
+
+        return entries
+
+    @staticmethod
+    def etag(entries: List[BundleEntry]) -> str:
+        """
+        ETag архива по составу и содержимому записей (без обращения к диску).
+
+        Время изменения файлов не учитывается: у копии этикетки из кэша оно
+        меняется при каждом обращении к кэшу, а содержимое - нет.
+        """
+        digest = hashlib.sha256()
+        for entry in entries:
+            digest.update(f"{entry.arcname}\0{entry.identity}\0{entry.date_time}\n".encode("utf-8"))
+        return f'"{digest.hexdigest()[:32]}"'
+
+    @staticmethod
+    def iter_zip(entries: List[BundleEntry], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Потоково сформировать ZIP-архив без записи на диск.
+
+        В памяти одновременно находится не больше одного блока chunk_size.
+        Даты записей берутся из BundleEntry, поэтому для одинакового состава
+        и содержимого результат байт-в-байт совпадает, и диапазоны можно
+        вырезать при повторе. Этикетки формируются по мере записи.
+
+        Записи не сжимаются (ZIP_STORED): размер архива для Content-Range
+        вычисляется по размерам файлов (archive_size) без пробного сжатия.
+        Основная часть архива - pdf, docx, xlsx и изображения - уже сжата.
+        """
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, mode="w") as archive:
+            for entry in entries:
+                zinfo = zipfile.ZipInfo(entry.arcname, date_time=entry.date_time)
+                zinfo.external_attr = 0o644 << 16
+                zinfo.compress_type = zipfile.ZIP_STORED
+
+                with entry.open() as path, open(path, "rb") as source, archive.open(zinfo, mode="w") as target:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+
+                data = sink.drain()
+                if data:
+                    yield data
+
+        data = sink.drain()
+        if data:
+            yield data
+
+    @staticmethod
+    def archive_size(entries: List[BundleEntry]) -> int:
+        """
+        Размер архива iter_zip() без его формирования - по размерам файлов.
+
+        Этикетки для этого формируются (обычно берутся из кэша).
+        Записи хранятся без сжатия, поэтому размер складывается из заголовков
+        zipfile: локальный заголовок, данные, дескриптор данных (поток без
+        seek), запись центрального каталога и конец каталога (ZIP64 - если
+        смещения превышают ZIP64_LIMIT).
+        """
+        offset = 0
+        central_size = 0
+        for entry in entries:
+            name_size = _encoded_name_size(entry.arcname)
+            # Смещение записи больше ZIP64_LIMIT хранится в дополнительном поле ZIP64
+            extra_size = 4 + 8 if offset > zipfile.ZIP64_LIMIT else 0
+            with entry.open() as path:
+                file_size = path.stat().st_size
+            offset += zipfile.sizeFileHeader + name_size + file_size + DATA_DESCRIPTOR_SIZE
+            central_size += zipfile.sizeCentralDir + name_size + extra_size
+
+        total = offset + central_size + zipfile.sizeEndCentDir
+        if (len(entries) > zipfile.ZIP_FILECOUNT_LIMIT or offset > zipfile.ZIP64_LIMIT
+                or central_size > zipfile.ZIP64_LIMIT):
+            total += zipfile.sizeEndCentDir64 + zipfile.sizeEndCentDir64Locator
+        return total
@@ -0,0 +1,267 @@
+# deltica/backend/services/change_stream.py
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_
+
+from backend.app.models import EquipmentRegistry
+from backend.core.config import settings
+from backend.core.database import AsyncSessionLocal
+from backend.core.metrics import CHANGE_STREAM_CLIENTS, CHANGE_STREAM_EVENTS
+from backend.core.notifications import RESYNC_TOPIC, notification_bus
+from backend.services.equipment_registry import registry_query
+from backend.services.main_table import MainTableService
+
+logger = logging.getLogger(__name__)
+
+# События потока (поле event: в SSE)
+UPSERT_EVENT = "upsert"    # Строки реестра добавлены или изменены: {"rows": [...], "reason": ...}
+REMOVE_EVENT = "remove"    # Строки убраны из реестра: {"ids": [...], "reason": "deleted" | "archived"}
+FILES_EVENT = "files"      # Изменились файлы оборудования: {"equipment_id", "file_ids", "action"}
+RESYNC_EVENT = "resync"    # Часть событий пропущена - клиент перечитывает таблицу целиком
+READY_EVENT = "ready"      # Новое подключение: клиент загружает таблицу и дальше применяет события
+
+# Действия события шины "equipment", после которых строка есть в реестре
+_UPSERT_ACTIONS = {"created", "updated", "restored"}
+# Порог статуса status_expiring (см. calculate_status)
+EXPIRING_DAYS = 14
+# Период проверки смены даты, с
+ROLLOVER_CHECK_INTERVAL = 60.0
+
+
+@dataclass(eq=False)
+class _Client:
+    queue: "asyncio.Queue[str]"
+    # Очередь переполнилась: клиент не успевает читать, вместо пропущенных событий получит resync
+    overflowed: bool = False
+
+
+class ChangeStream:
+    """
+    Рассылка изменений реестра подключённым клиентам (Server-Sent Events).
+
+    Источник событий - шина notification_bus: изменения своего процесса
+    приходят после commit, других процессов - по LISTEN. Каждое событие
+    превращается в одно сообщение SSE: для добавленных и изменённых строк
+    строки читаются из проекции один раз и рассылаются всем клиентам, поэтому
+    клиенту не нужно перечитывать таблицу после правок - ни своих, ни чужих.
+
+    Статус оборудования вычисляется по текущей дате, поэтому при смене даты
+    поток сам рассылает строки, у которых статус сменился (status_fit ->
+    status_expiring -> status_expired).
+
+    Сообщения нумеруются (id: <эпоха>-<номер>). После обрыва EventSource
+    переподключается с заголовком Last-Event-ID, и пропущенные события
+    досылаются из последних CHANGE_STREAM_HISTORY. Если досылка невозможна
+    (события вытеснены, другой процесс или перезапуск сервера) - клиент
+    получает resync и перечитывает таблицу.
+    """
+
+    def __init__(self, heartbeat: float = 15.0, history_size: int = 1000, client_queue_size: int = 500):
+        self.heartbeat = heartbeat
+        self.client_queue_size = client_queue_size
+        # Номера событий имеют смысл только в этом процессе и до его перезапуска
+        self.epoch = uuid.uuid4().hex[:8]
+        self.session_factory = AsyncSessionLocal
+        self._seq = 0
+        self._history: Deque[Tuple[int, str]] = deque(maxlen=history_size)
+        self._clients: Set[_Client] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._incoming: Optional["asyncio.Queue[Tuple[str, Dict[str, Any]]]"] = None
+        self._task: Optional[asyncio.Task] = None
+        self._today = date.today()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    # ==================== ЗАПУСК / ОСТАНОВКА ====================
+
+    def start(self) -> None:
+        """Запустить рассылку в текущем event loop (lifespan приложения)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._incoming = asyncio.Queue()
+        self._today = date.today()
+        self._task = self._loop.create_task(self._run(), name="change-stream")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        self._loop = None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # ==================== ПРИЁМ СОБЫТИЙ ====================
+
+    def _on_notification(self, topic: str, data: Dict[str, Any]) -> None:
+        """Подписчик шины: вызывается из любого потока, передаёт событие в event loop"""
+        loop, incoming = self._loop, self._incoming
+        if loop is None or incoming is None:
+            return
+        try:
+            loop.call_soon_threadsafe(incoming.put_nowait, (topic, data))
+        except RuntimeError:
+            pass  # Event loop уже закрыт (остановка сервера)
+
+    async def _run(self) -> None:
+        """Обработка событий по одному: порядок сообщений совпадает с порядком commit"""
+        while True:
+            try:
+                topic, data = await asyncio.wait_for(self._incoming.get(), timeout=ROLLOVER_CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                topic, data = None, None
+            try:
+                await self._check_rollover()
+                if topic is not None:
+                    await self._handle(topic, data)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change stream event failed", extra={"event": "change_stream_error", "topic": topic})
+                # Состояние клиентов неизвестно - пусть перечитают таблицу
+                self._publish(RESYNC_EVENT, {})
+
+    async def _handle(self, topic: str, data: Dict[str, Any]) -> None:
+        if not self._clients:
+            # Слушателей нет: события не храним, но номер сдвигаем - клиент,
+            # переподключившийся с прежним Last-Event-ID, получит resync
+            self._seq += 1
+            self._history.clear()
+            return
+
+        if topic == RESYNC_TOPIC or data.get("truncated"):
+            self._publish(RESYNC_EVENT, {})
+        elif topic == "equipment":
+            ids = data.get("ids", [])
+            action = data.get("action")
+            if action in _UPSERT_ACTIONS:
+                rows = await self._fetch_rows(registry_query().where(EquipmentRegistry.equipment_id.in_(ids)))
+                found = {row["equipment_id"] for row in rows}
+                if rows:
+                    self._publish(UPSERT_EVENT, {"rows": rows, "reason": action})
+                # Строку успели удалить следующей транзакцией
+                missing = [equipment_id for equipment_id in ids if equipment_id not in found]
+                if missing:
+                    self._publish(REMOVE_EVENT, {"ids": missing, "reason": "deleted"})
+            else:
+                self._publish(REMOVE_EVENT, {"ids": ids, "reason": action})
+        elif topic == "files":
+            self._publish(FILES_EVENT, data)
+
+    async def _fetch_rows(self, query) -> List[dict]:
+        async with self.session_factory() as db:
+            result = (await db.execute(query)).fetchall()
+        return [MainTableService._row_to_response(row).model_dump(mode="json") for row in result]
+
+    async def _check_rollover(self) -> None:
+        """Смена даты: разослать строки, у которых статус сменился без изменения данных"""
+        today = date.today()
+        previous, self._today = self._today, today
+        if today <= previous or not self._clients:
+            return
+        due = EquipmentRegistry.verification_due
+        query = registry_query().where(
+            EquipmentRegistry.verification_state == "state_work",
+            or_(
+                # Стали просроченными: previous <= verification_due < today
+                and_(due >= previous, due < today),
+                # Стали истекающими: срок вошёл в окно EXPIRING_DAYS
+                and_(due > previous + timedelta(days=EXPIRING_DAYS), due <= today + timedelta(days=EXPIRING_DAYS)),
+            ),
+        )
+        rows = await self._fetch_rows(query)
+        if rows:
+            self._publish(UPSERT_EVENT, {"rows": rows, "reason": "status_rollover"})
+
+    # ==================== РАССЫЛКА ====================
+
+    def _format(self, seq: int, event: str, data: Dict[str, Any]) -> str:
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return f"id: {self.epoch}-{seq}\nevent: {event}\ndata: {payload}\n\n"
+
+    def _publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Записать событие в историю и поставить в очереди клиентов (только из event loop)"""
+        self._seq += 1
+        message = self._format(self._seq, event, data)
+        self._history.append((self._seq, message))
+        CHANGE_STREAM_EVENTS.labels(event).inc()
+        for client in list(self._clients):
+            if client.overflowed:
+                continue
+            try:
+                client.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                client.overflowed = True
+
+    def _replay(self, last_event_id: Optional[str]) -> List[str]:
+        """
+        Сообщения для нового подключения: досылка пропущенных событий,
+        ready для первого подключения или resync, если досылка невозможна.
+        """
+        if not last_event_id:
+            return [self._format(self._seq, READY_EVENT, {})]
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch == self.epoch and seq.isdigit():
+            seq = int(seq)
+            if seq == self._seq:
+                return []
+            if seq < self._seq and self._history and self._history[0][0] <= seq + 1:
+                return [message for number, message in self._history if number > seq]
+        return [self._format(self._seq, RESYNC_EVENT, {})]
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Сообщения SSE для одного клиента до его отключения.
+
+        Без событий раз в heartbeat секунд отправляется комментарий: соединение
+        не закрывается прокси по простою, а обрыв обнаруживается при записи.
+        """
+        client = _Client(asyncio.Queue(maxsize=self.client_queue_size))
+        # Интервал переподключения EventSource, мс
+        yield "retry: 3000\n\n"
+        # Досылка и регистрация без await между ними: событие не может потеряться
+        backlog = self._replay(last_event_id)
+        self._clients.add(client)
+        try:
+            for message in backlog:
+                yield message
+            while True:
+                if client.overflowed:
+                    while not client.queue.empty():
+                        client.queue.get_nowait()
+                    client.overflowed = False
+                    yield self._format(self._seq, RESYNC_EVENT, {})
+                    continue
+                try:
+                    message = await asyncio.wait_for(client.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield message
+        finally:
+            self._clients.discard(client)
+
+
+change_stream = ChangeStream(
+    heartbeat=settings.CHANGE_STREAM_HEARTBEAT,
+    history_size=settings.CHANGE_STREAM_HISTORY,
+    client_queue_size=settings.CHANGE_STREAM_CLIENT_QUEUE,
+)
+
+for _topic in ("equipment", "files", RESYNC_TOPIC):
+    notification_bus.subscribe(_topic, lambda data, topic=_topic: change_stream._on_notification(topic, data))
+
+CHANGE_STREAM_CLIENTS.add_callback(lambda: [((), change_stream.client_count)])
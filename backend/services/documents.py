@@ -1,11 +1,15 @@
 # deltica/backend/services/documents.py
 
-from typing import Optional, List
+import uuid
+from typing import Optional, List, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 from docxtpl import DocxTemplate
 from sqlalchemy.orm import Session
 from backend.app import models
+from backend.core.metrics import DOCUMENT_GENERATION, timed
+from backend.core.tracing import span, traced
+from backend.services.render_cache import render_cache
 from copy import deepcopy
 
 
@@ -17,7 +21,9 @@ class DocumentService:
         self.templates_dir = Path("docs/docx-templates")
         self.output_dir = Path("backend/generated_documents")
         self.output_dir.mkdir(exist_ok=True)
+        self.cache = render_cache
 
+    @traced()
     def _get_equipment_full_data(self, equipment_id: int) -> Optional[dict]:
         """Получить полные данные оборудования для заполнения шаблонов"""
         equipment = self.db.query(models.Equipment).filter(
@@ -68,11 +74,54 @@ class DocumentService:
             'department': department
         }
 
+    @staticmethod
+    def _render_template(template_path: Path, context: dict) -> DocxTemplate:
+        """Загрузить шаблон и заполнить данными"""
+        with span("docx.render", template=template_path.name):
+            template = DocxTemplate(template_path)
+            template.render(context)
+        return template
+
+    def _output_path(self, name: str) -> Path:
+        """
+        Уникальный путь для нового документа.
+
+        Одинаковые запросы в одну секунду (в нескольких потоках или процессах
+        сервера) не должны записывать один и тот же файл.
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return self.output_dir / f"{name}_{timestamp}_{uuid.uuid4().hex[:8]}.docx"
+
+    def release(self, file_path: str) -> None:
+        """Освободить документ после отправки клиенту (копия из кэша удаляется)"""
+        self.cache.release(file_path)
+
+    @staticmethod
+    def _save(document, output_path: Path) -> None:
+        """Записать документ на диск"""
+        with span("docx.save"):
+            document.save(str(output_path))
+
+    @timed(DOCUMENT_GENERATION, "label")
+    @traced()
     def generate_label(self, equipment_id: int) -> Optional[str]:
         """
         Генерировать этикетку для оборудования
         Возвращает путь к сгенерированному файлу или None при ошибке
         """
+        source = self.label_source(equipment_id)
+        if not source:
+            return None
+        return self.render_label(equipment_id, *source)
+
+    def label_source(self, equipment_id: int) -> Optional[Tuple[str, dict]]:
+        """
+        Ключ кэша и данные этикетки без рендеринга.
+
+        Ключ однозначно определяет содержимое документа (версия шаблона и данные),
+        поэтому по нему можно сравнивать этикетки, не формируя их.
+        Возвращает None, если оборудование не найдено.
+        """
         # Получить данные оборудования
         data = self._get_equipment_full_data(equipment_id)
         if not data:
@@ -83,20 +132,28 @@ class DocumentService:
         if not template_path.exists():
             raise FileNotFoundError(f"Шаблон не найден: {template_path}")
 
-        template = DocxTemplate(template_path)
+        return self.cache.make_key(template_path, {"kind": "label", "item": data}), data
+
+    @traced()
+    def render_label(self, equipment_id: int, cache_key: str, data: dict) -> str:
+        """Этикетка по данным из label_source(): из кэша или новым рендерингом (без обращения к БД)"""
+        # Повторный запрос с теми же данными отдаём из кэша
+        cached_path = self.cache.get(cache_key)
+        if cached_path:
+            return str(cached_path)
 
         # Заполнить шаблон
-        template.render(data)
+        template = self._render_template(self.templates_dir / "template_label.docx", data)
 
         # Сохранить результат
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_filename = f"label_{equipment_id}_{timestamp}.docx"
-        output_path = self.output_dir / output_filename
+        output_path = self._output_path(f"label_{equipment_id}")
 
-        template.save(str(output_path))
+        self._save(template, output_path)
 
-        return str(output_path)
+        return str(self.cache.put(cache_key, output_path, [equipment_id]))
 
+    @timed(DOCUMENT_GENERATION, "labels_batch")
+    @traced()
     def generate_labels_batch(self, equipment_ids: List[int]) -> Optional[str]:
         """
         Генерировать пакет этикеток для нескольких единиц оборудования
@@ -121,20 +178,22 @@ class DocumentService:
         if not template_path.exists():
             raise FileNotFoundError(f"Шаблон не найден: {template_path}")
 
+        cache_key = self.cache.make_key(template_path, {"kind": "labels", "items": equipments_data})
+        cached_path = self.cache.get(cache_key)
+        if cached_path:
+            return str(cached_path)
+
         from docx import Document
         from docx.shared import Cm, Pt
         from docx.oxml import OxmlElement
         from docx.oxml.ns import qn
 
         # Генерируем первую этикетку - она станет основой документа
-        template = DocxTemplate(template_path)
-        template.render(equipments_data[0])
+        template = self._render_template(template_path, equipments_data[0])
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_filename = f"labels_{len(equipments_data)}_items_{timestamp}.docx"
-        output_path = self.output_dir / output_filename
+        output_path = self._output_path(f"labels_{len(equipments_data)}_items")
 
-        template.save(str(output_path))
+        self._save(template, output_path)
 
         # Если есть ещё этикетки, добавляем их
         if len(equipments_data) > 1:
@@ -154,12 +213,11 @@ class DocumentService:
                 equipment_data = equipments_data[idx]
 
                 # Загружаем шаблон и заполняем данными
-                template = DocxTemplate(template_path)
-                template.render(equipment_data)
+                template = self._render_template(template_path, equipment_data)
 
                 # Сохраняем во временный файл
-                temp_path = self.output_dir / f"temp_label_{idx}.docx"
-                template.save(str(temp_path))
+                temp_path = self._output_path(f"temp_label_{idx}")
+                self._save(template, temp_path)
 
                 # Читаем заполненный шаблон
                 temp_doc = Document(str(temp_path))
@@ -180,10 +238,12 @@ class DocumentService:
                 temp_path.unlink()
 
             # Сохраняем результат
-            result_doc.save(str(output_path))
+            self._save(result_doc, output_path)
 
-        return str(output_path)
+        return str(self.cache.put(cache_key, output_path, equipment_ids))
 
+    @timed(DOCUMENT_GENERATION, "conservation_act")
+    @traced()
     def generate_conservation_act(self, equipment_ids: List[int]) -> Optional[str]:
         """
         Генерировать акт консервации для нескольких единиц оборудования
@@ -207,17 +267,19 @@ class DocumentService:
         if not template_path.exists():
             raise FileNotFoundError(f"Шаблон не найден: {template_path}")
 
+        cache_key = self.cache.make_key(template_path, {"kind": "conservation_act", "items": equipments_data})
+        cached_path = self.cache.get(cache_key)
+        if cached_path:
+            return str(cached_path)
+
         from docx import Document
 
         # Генерируем первую запись
-        template = DocxTemplate(template_path)
-        template.render(equipments_data[0])
+        template = self._render_template(template_path, equipments_data[0])
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_filename = f"conservation_act_{len(equipments_data)}_items_{timestamp}.docx"
-        output_path = self.output_dir / output_filename
+        output_path = self._output_path(f"conservation_act_{len(equipments_data)}_items")
 
-        template.save(str(output_path))
+        self._save(template, output_path)
 
         # Если больше одной единицы оборудования, добавляем остальные строки
         if len(equipments_data) > 1:
@@ -250,10 +312,12 @@ class DocumentService:
                             run.font.size = Pt(12)
 
             # Сохраняем финальный документ
-            doc.save(str(output_path))
+            self._save(doc, output_path)
 
-        return str(output_path)
+        return str(self.cache.put(cache_key, output_path, equipment_ids))
 
+    @timed(DOCUMENT_GENERATION, "request")
+    @traced()
     def generate_request(self, equipment_ids: List[int]) -> Optional[str]:
         """
         Генерировать предписание для нескольких единиц оборудования
@@ -287,15 +351,22 @@ class DocumentService:
         first_equipment['current_date'] = current_date.strftime('%d/%m/%Y')
         first_equipment['current_date_plus_7'] = date_plus_7.strftime('%d/%m/%Y')
 
+        # Даты входят в ключ: предписание за другой день рендерится заново
+        cache_key = self.cache.make_key(template_path, {
+            "kind": "request",
+            "items": equipments_data,
+            "current_date": first_equipment['current_date'],
+        })
+        cached_path = self.cache.get(cache_key)
+        if cached_path:
+            return str(cached_path)
+
         # Генерируем первую запись
-        template = DocxTemplate(template_path)
-        template.render(first_equipment)
+        template = self._render_template(template_path, first_equipment)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_filename = f"request_{len(equipments_data)}_items_{timestamp}.docx"
-        output_path = self.output_dir / output_filename
+        output_path = self._output_path(f"request_{len(equipments_data)}_items")
 
-        template.save(str(output_path))
+        self._save(template, output_path)
 
         # Открываем документ для заполнения номеров
         doc = Document(str(output_path))
@@ -332,10 +403,12 @@ class DocumentService:
                             run.font.size = Pt(10)
 
         # Сохраняем финальный документ (ВСЕГДА, даже если одна единица оборудования)
-        doc.save(str(output_path))
+        self._save(doc, output_path)
 
-        return str(output_path)
+        return str(self.cache.put(cache_key, output_path, equipment_ids))
 
+    @timed(DOCUMENT_GENERATION, "bid_poverka")
+    @traced()
     def generate_bid_poverka(self, equipment_ids: List[int]) -> Optional[str]:
         """
         Генерировать заявку на поверку для нескольких единиц оборудования
@@ -359,17 +432,19 @@ class DocumentService:
         if not template_path.exists():
             raise FileNotFoundError(f"Шаблон не найден: {template_path}")
 
+        cache_key = self.cache.make_key(template_path, {"kind": "bid_poverka", "items": equipments_data})
+        cached_path = self.cache.get(cache_key)
+        if cached_path:
+            return str(cached_path)
+
         from docx import Document
 
         # Генерируем первую запись
-        template = DocxTemplate(template_path)
-        template.render(equipments_data[0])
+        template = self._render_template(template_path, equipments_data[0])
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_filename = f"bid_poverka_{len(equipments_data)}_items_{timestamp}.docx"
-        output_path = self.output_dir / output_filename
+        output_path = self._output_path(f"bid_poverka_{len(equipments_data)}_items")
 
-        template.save(str(output_path))
+        self._save(template, output_path)
 
         # Открываем документ для заполнения номеров
         doc = Document(str(output_path))
@@ -423,10 +498,12 @@ class DocumentService:
                             run.font.size = Pt(10)
 
         # Сохраняем финальный документ (ВСЕГДА, даже если одна единица оборудования)
-        doc.save(str(output_path))
+        self._save(doc, output_path)
 
-        return str(output_path)
+        return str(self.cache.put(cache_key, output_path, equipment_ids))
 
+    @timed(DOCUMENT_GENERATION, "bid_calibrovka")
+    @traced()
     def generate_bid_calibrovka(self, equipment_ids: List[int]) -> Optional[str]:
         """
         Генерировать заявку на калибровку для нескольких единиц оборудования
@@ -450,17 +527,19 @@ class DocumentService:
         if not template_path.exists():
             raise FileNotFoundError(f"Шаблон не найден: {template_path}")
 
+        cache_key = self.cache.make_key(template_path, {"kind": "bid_calibrovka", "items": equipments_data})
+        cached_path = self.cache.get(cache_key)
+        if cached_path:
+            return str(cached_path)
+
         from docx import Document
 
         # Генерируем первую запись
-        template = DocxTemplate(template_path)
-        template.render(equipments_data[0])
+        template = self._render_template(template_path, equipments_data[0])
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_filename = f"bid_calibrovka_{len(equipments_data)}_items_{timestamp}.docx"
-        output_path = self.output_dir / output_filename
+        output_path = self._output_path(f"bid_calibrovka_{len(equipments_data)}_items")
 
-        template.save(str(output_path))
+        self._save(template, output_path)
 
         # Открываем документ для заполнения номеров
         doc = Document(str(output_path))
@@ -506,6 +585,6 @@ class DocumentService:
                             run.font.size = Pt(10)
 
         # Сохраняем финальный документ (ВСЕГДА, даже если одна единица оборудования)
-        doc.save(str(output_path))
+        self._save(doc, output_path)
 
-        return str(output_path)
+        return str(self.cache.put(cache_key, output_path, equipment_ids))
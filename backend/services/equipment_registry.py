@@ -0,0 +1,251 @@
+# deltica/backend/services/equipment_registry.py
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Union
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from backend.app.models import Equipment, EquipmentRegistry, Finance, Responsibility, Verification
+
+# Колонки проекции (кроме служебной refreshed_at) в порядке source_query()
+REGISTRY_FIELDS = [
+    "equipment_id",
+    "equipment_name",
+    "equipment_model",
+    "equipment_type",
+    "equipment_specs",
+    "factory_number",
+    "inventory_number",
+    "equipment_year",
+    "verification_type",
+    "registry_number",
+    "verification_interval",
+    "verification_date",
+    "verification_due",
+    "verification_plan",
+    "verification_state",
+    "status",
+    "department",
+    "responsible_person",
+    "verifier_org",
+    "budget_item",
+    "code_rate",
+    "cost_rate",
+    "quantity",
+    "coefficient",
+    "total_cost",
+    "invoice_number",
+    "paid_amount",
+    "payment_date",
+]
+
+# Связанные таблицы 1:1 и их колонка-ссылка на equipment
+_LINKED = [
+    (Verification, Verification.equipment_id),
+    (Responsibility, Responsibility.equipment_id),
+    (Finance, Finance.equipment_model_id),
+]
+
+# Ключ session.info: оборудование, чьи исходные строки изменены через ORM и ещё не обновлены в проекции
+STALE_KEY = "registry_stale"
+
+# Исходная модель -> атрибут со ссылкой на equipment
+_SOURCE_LINKS = {Equipment: "id", **{model: link_column.key for model, link_column in _LINKED}}
+
+
+def _join_first_row(query, model, link_column):
+    """
+    Внешний JOIN одной записи связанной таблицы.
+
+    Сервисы считают связи 1:1 и берут .first(); при дублях в проекцию
+    попадает запись с наименьшим id, а проверка сообщает о дублях.
+    Агрегат по таблице дешевле коррелированного подзапроса на каждую строку.
+    """
+    first = (
+        select(link_column.label("equipment_id"), func.min(model.id).label("id"))
+        .group_by(link_column)
+        .subquery()
+    )
+    return (
+        query
+        .join(first, first.c.equipment_id == Equipment.id, isouter=True)
+        .join(model, model.id == first.c.id, isouter=True)
+    )
+
+
+def source_query():
+    """Строки проекции, собранные из исходных таблиц (четыре таблицы, три внешних JOIN)"""
+    query = select(
+        Equipment.id.label("equipment_id"),
+        Equipment.equipment_name,
+        Equipment.equipment_model,
+        Equipment.equipment_type,
+        Equipment.equipment_specs,
+        Equipment.factory_number,
+        Equipment.inventory_number,
+        Equipment.equipment_year,
+        Verification.verification_type,
+        Verification.registry_number,
+        Verification.verification_interval,
+        Verification.verification_date,
+        Verification.verification_due,
+        Verification.verification_plan,
+        Verification.verification_state,
+        Verification.status,
+        Responsibility.department,
+        Responsibility.responsible_person,
+        Responsibility.verifier_org,
+        Finance.budget_item,
+        Finance.code_rate,
+        Finance.cost_rate,
+        Finance.quantity,
+        Finance.coefficient,
+        Finance.total_cost,
+        Finance.invoice_number,
+        Finance.paid_amount,
+        Finance.payment_date
+    ).select_from(Equipment)
+    for model, link_column in _LINKED:
+        query = _join_first_row(query, model, link_column)
+    return query
+
+
+def registry_query():
+    """Чтение проекции: одна строка на оборудование, без JOIN"""
+    return select(*(getattr(EquipmentRegistry, name) for name in REGISTRY_FIELDS))
+
+
+@dataclass
+class RegistryCheckReport:
+    """Расхождения проекции equipment_registry с исходными таблицами"""
+    checked: int = 0
+    missing: List[int] = field(default_factory=list)  # Есть в equipment, нет в проекции
+    orphaned: List[int] = field(default_factory=list)  # Есть в проекции, нет в equipment
+    mismatched: Dict[int, List[str]] = field(default_factory=dict)  # equipment_id -> отличающиеся колонки
+    duplicates: Dict[str, List[int]] = field(default_factory=dict)  # таблица -> оборудование с дублями
+
+    @property
+    def ok(self) -> bool:
+        """Проекция согласована (дубли - проблема исходных данных, проекцию не портят)"""
+        return not (self.missing or self.orphaned or self.mismatched)
+
+
+class EquipmentRegistryService:
+    """
+    Поддержка проекции equipment_registry.
+
+    Изменения equipment/verification/responsibility/finance через ORM-объекты
+    сессии попадают в проекцию автоматически при commit (хуки ниже).
+    Сервисы вызывают refresh()/remove() сами, когда проекция нужна до commit
+    или строки удаляются массово (query.delete()/update(), сырой SQL) -
+    такие изменения хуки не видят. После прямых SQL-изменений (импорт,
+    скрипты исправления) вызывается rebuild(); check() находит расхождения.
+    Работает и с Session, и с Connection.
+    """
+
+    def __init__(self, db: Union[Session, Connection]):
+        self.db = db
+
+    def refresh(self, equipment_ids: Iterable[int]) -> None:
+        """Пересобрать строки проекции для указанного оборудования"""
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return
+        self.remove(ids)
+        self._forget_stale(ids)
+        self.db.execute(
+            insert(EquipmentRegistry).from_select(
+                REGISTRY_FIELDS, source_query().where(Equipment.id.in_(ids))
+            )
+        )
+
+    def remove(self, equipment_ids: Iterable[int]) -> None:
+        """Удалить строки проекции (вызывается до удаления самого оборудования)"""
+        ids = sorted(set(equipment_ids))
+        if ids:
+            self.db.execute(delete(EquipmentRegistry).where(EquipmentRegistry.equipment_id.in_(ids)))
+            self._forget_stale(ids)
+
+    def _forget_stale(self, ids: List[int]) -> None:
+        """Снять отметку хуков: строки уже пересобраны (execute выше выполнил autoflush)"""
+        if isinstance(self.db, Session):
+            self.db.info.get(STALE_KEY, set()).difference_update(ids)
+
+    def rebuild(self) -> int:
+        """Пересобрать проекцию целиком; возвращает число строк"""
+        self.db.execute(delete(EquipmentRegistry))
+        if isinstance(self.db, Session):
+            self.db.info.pop(STALE_KEY, None)
+        self.db.execute(insert(EquipmentRegistry).from_select(REGISTRY_FIELDS, source_query()))
+        return self.db.execute(select(func.count()).select_from(EquipmentRegistry)).scalar()
+
+    def find_duplicates(self) -> Dict[str, List[int]]:
+        """Оборудование, у которого больше одной записи в таблице 1:1"""
+        duplicates = {}
+        for model, link_column in _LINKED:
+            ids = self.db.execute(
+                select(link_column).group_by(link_column).having(func.count() > 1).order_by(link_column)
+            ).scalars().all()
+            if ids:
+                duplicates[model.__tablename__] = list(ids)
+        return duplicates
+
+    def check(self) -> RegistryCheckReport:
+        """Сравнить проекцию с исходными таблицами по всем колонкам"""
+        expected = {row.equipment_id: row for row in self.db.execute(source_query())}
+        actual = {row.equipment_id: row for row in self.db.execute(registry_query())}
+
+        report = RegistryCheckReport(checked=len(expected))
+        report.missing = sorted(expected.keys() - actual.keys())
+        report.orphaned = sorted(actual.keys() - expected.keys())
+        for equipment_id in sorted(expected.keys() & actual.keys()):
+            source, projected = expected[equipment_id], actual[equipment_id]
+            columns = [name for name in REGISTRY_FIELDS if getattr(source, name) != getattr(projected, name)]
+            if columns:
+                report.mismatched[equipment_id] = columns
+        report.duplicates = self.find_duplicates()
+        return report
+
+    def repair(self, report: RegistryCheckReport) -> int:
+        """Исправить найденные расхождения; возвращает число затронутых строк"""
+        self.remove(report.orphaned)
+        stale = report.missing + list(report.mismatched)
+        self.refresh(stale)
+        return len(report.orphaned) + len(stale)
+
+
+def _linked_ids(obj, key: str) -> List[int]:
+    """Текущее и прежнее значение ссылки на equipment (без загрузки из БД)"""
+    return [value for value in inspect(obj).attrs[key].history.sum() if value is not None]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale(session, flush_context):
+    # После flush id новых строк уже известны, а new/dirty/deleted ещё описывают сброшенные изменения
+    stale = set()
+    for obj in session.new | session.deleted:
+        key = _SOURCE_LINKS.get(type(obj))
+        if key:
+            stale.update(_linked_ids(obj, key))
+    for obj in session.dirty:
+        key = _SOURCE_LINKS.get(type(obj))
+        if key and session.is_modified(obj, include_collections=False):
+            stale.update(_linked_ids(obj, key))
+    if stale:
+        session.info.setdefault(STALE_KEY, set()).update(stale)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_stale(session):
+    # before_commit вызывается до финального flush - сбрасываем сами, чтобы собрать все изменения
+    session.flush()
+    stale = session.info.pop(STALE_KEY, None)
+    if stale:
+        EquipmentRegistryService(session).refresh(stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_stale(session):
+    session.info.pop(STALE_KEY, None)
@@ -0,0 +1,378 @@
+# deltica/backend/services/log_query.py
+
+import json
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+LOG_FILE_NAME = "deltica.log"
+
+# Суффиксы архивов TimedRotatingFileHandler (when="midnight"): deltica.log.2025-01-31
+_ROTATED_SUFFIX = re.compile(r"^\d{4}-\d{2}-\d{2}(_\d{2}-\d{2}-\d{2})?$")
+_TIMESTAMP = re.compile(rb'"timestamp":\s*"([^"]+)"')
+
+# Размер блока при чтении файла с конца
+READ_BLOCK = 64 * 1024
+# Шаг контрольных точек индекса (смещение + время записи)
+CHECKPOINT_BYTES = 256 * 1024
+# Сколько записей можно запросить за один раз
+MAX_LIMIT = 1000
+
+
+def _loads(line: bytes) -> Optional[dict]:
+    try:
+        record = orjson.loads(line) if orjson is not None else json.loads(line)
+    except ValueError:
+        return None  # Не JSON (обрыв строки при записи, ручная правка)
+    return record if isinstance(record, dict) else None
+
+
+def _time_key(value: str) -> str:
+    """
+    Ключ сравнения времени записи: "2025-01-31T10:00:00.123456Z" без "Z".
+
+    Время в логе - UTC в ISO-формате, поэтому строки сравниваются без разбора дат;
+    isoformat() опускает микросекунды, если они равны нулю - дополняем.
+    """
+    value = value.rstrip("Z")
+    return value + ".000000" if len(value) == 19 else value
+
+
+def time_key(moment: datetime) -> str:
+    """Ключ сравнения для границы интервала (наивное время считается UTC)"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _line_time(line: bytes) -> Optional[str]:
+    match = _TIMESTAMP.search(line, 0, 80)
+    return _time_key(match.group(1).decode()) if match else None
+
+
+def read_blocks_backward(f, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Блоки целых строк файла от end к start: пары (смещение блока, байты).
+
+    start и end должны указывать на начало строки; в памяти держится один блок
+    (строка длиннее блока переносится в следующий целиком).
+    """
+    pos = end
+    carry = b""
+    while pos > start:
+        size = min(READ_BLOCK, pos - start)
+        pos -= size
+        f.seek(pos)
+        chunk = f.read(size) + carry
+        if pos > start:
+            # Начало блока - хвост строки, начавшейся раньше: дочитаем её со следующим блоком
+            cut = chunk.find(b"\n") + 1
+            if cut == 0:
+                carry = chunk
+                continue
+            carry, chunk = chunk[:cut], chunk[cut:]
+            if chunk:
+                yield pos + cut, chunk
+        else:
+            yield pos, chunk
+
+
+def _block_lines(offset: int, block: bytes) -> Iterator[Tuple[int, bytes]]:
+    """Непустые строки блока от последней к первой со смещениями в файле"""
+    lines = block.split(b"\n")
+    cursor = offset + len(block)
+    for line in reversed(lines):
+        line_start = cursor - len(line)
+        if line.strip():
+            yield line_start, line
+        cursor = line_start - 1
+
+
+def _block_lines_containing(offset: int, block: bytes, needle: bytes,
+                            haystack: Optional[bytes] = None) -> Iterator[Tuple[int, bytes]]:
+    """
+    Строки блока, содержащие needle, от последней к первой (без разбиения всего блока).
+
+    haystack - копия блока той же длины, в которой ищется needle
+    (block.lower() для поиска без учёта регистра).
+    """
+    if haystack is None:
+        haystack = block
+    pos = len(block)
+    while True:
+        hit = haystack.rfind(needle, 0, pos)
+        if hit < 0:
+            return
+        line_start = block.rfind(b"\n", 0, hit) + 1
+        line_end = block.find(b"\n", hit)
+        yield offset + line_start, block[line_start:line_end if line_end >= 0 else len(block)]
+        pos = line_start
+
+
+def read_lines_backward(f, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    """Строки файла от end к start: пары (смещение начала строки, строка без \\n)"""
+    for offset, block in read_blocks_backward(f, start, end):
+        yield from _block_lines(offset, block)
+
+
+@dataclass
+class FileIndex:
+    """
+    Индекс файла лога: границы по времени и редкие контрольные точки.
+
+    Границы читаются по первой и последней строке; контрольные точки
+    (время записи, смещение) - через каждые CHECKPOINT_BYTES, строятся
+    при первом поиске по интервалу времени и дополняются по мере роста файла.
+    """
+    identity: Tuple[int, int]
+    size: int
+    first_time: Optional[str]
+    last_time: Optional[str]
+    indexed_to: int = 0
+    checkpoints: List[Tuple[str, int]] = field(default_factory=list)
+
+
+@dataclass
+class LogFilters:
+    """Условия отбора записей; пустые поля не проверяются"""
+    event: Optional[str] = None
+    user: Optional[str] = None
+    level: Optional[str] = None
+    path: Optional[str] = None  # Префикс пути HTTP-запроса
+    text: Optional[str] = None  # Подстрока сообщения
+    since: Optional[str] = None  # Ключи time_key()
+    until: Optional[str] = None
+
+    def needles(self) -> List[bytes]:
+        """
+        Подстроки, без которых строка заведомо не подходит (до разбора JSON).
+
+        Блоки файла без первой подстроки пропускаются целиком.
+        """
+        needles = []
+        for value in (self.event, self.user, self.path, self.level):
+            if value:
+                escaped = json.dumps(value, ensure_ascii=False)[1:-1]
+                if escaped == value:
+                    needles.append(value.encode())
+        return needles
+
+    def text_needle(self) -> Optional[bytes]:
+        """Подстрока сообщения в нижнем регистре для поиска по block.lower() (только ASCII)"""
+        if self.text and self.text.isascii():
+            escaped = json.dumps(self.text.lower())[1:-1]
+            if escaped == self.text.lower():
+                return escaped.encode()
+        return None
+
+    def match(self, record: dict) -> bool:
+        if self.event and record.get("event") != self.event:
+            return False
+        if self.user and record.get("user") != self.user:
+            return False
+        if self.level and record.get("level") != self.level:
+            return False
+        if self.path and not str(record.get("path", "")).startswith(self.path):
+            return False
+        if self.text and self.text.lower() not in str(record.get("message", "")).lower():
+            return False
+        if self.since or self.until:
+            moment = _time_key(str(record.get("timestamp", "")))
+            if self.since and moment < self.since:
+                return False
+            if self.until and moment > self.until:
+                return False
+        return True
+
+
+@dataclass
+class LogPage:
+    records: List[dict]
+    next_cursor: Optional[str]
+    scanned_files: int
+
+
+class LogQueryService:
+    """
+    Чтение JSON-логов без загрузки файлов в память.
+
+    - tail: последние строки, файл читается с конца блоками
+    - search: записи по фильтрам от новых к старым во всех файлах
+      (текущий и архивы ротации); файлы вне интервала времени пропускаются
+      по индексу, внутри файла чтение ограничивается контрольными точками
+    - курсор страницы: "<имя файла>:<смещение>", следующая страница
+      продолжает чтение с этого места
+    """
+
+    def __init__(self, logs_dir: Optional[Path] = None):
+        self._logs_dir = logs_dir
+        self._indexes: Dict[str, FileIndex] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def logs_dir(self) -> Path:
+        if self._logs_dir is None:
+            from backend.core.logging_config import get_logs_dir
+            self._logs_dir = get_logs_dir()
+        return self._logs_dir
+
+    def files(self) -> List[Path]:
+        """Файлы лога от старых к новым: архивы по дате, затем текущий"""
+        rotated = sorted(
+            p for p in self.logs_dir.glob(f"{LOG_FILE_NAME}.*")
+            if _ROTATED_SUFFIX.match(p.name[len(LOG_FILE_NAME) + 1:])
+        )
+        current = self.logs_dir / LOG_FILE_NAME
+        return rotated + ([current] if current.exists() else [])
+
+    # ==================== ИНДЕКС ====================
+
+    def _index(self, path: Path, f, size: int) -> FileIndex:
+        stat = path.stat()
+        identity = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            index = self._indexes.get(path.name)
+            if index is not None and index.identity == identity and index.size <= size:
+                if index.size < size:
+                    # Файл дописан: обновляем последнюю запись
+                    index.last_time = self._last_time(f, size) or index.last_time
+                    index.size = size
+                return index
+
+            f.seek(0)
+            index = FileIndex(
+                identity=identity, size=size,
+                first_time=_line_time(f.readline()),
+                last_time=self._last_time(f, size),
+            )
+            self._indexes[path.name] = index
+            return index
+
+    @staticmethod
+    def _last_time(f, size: int) -> Optional[str]:
+        for _, line in read_lines_backward(f, 0, size):
+            moment = _line_time(line)
+            if moment:
+                return moment
+        return None
+
+    def _extend_checkpoints(self, index: FileIndex, f) -> None:
+        """Дописать контрольные точки до конца проиндексированной части файла"""
+        with self._lock:
+            if index.indexed_to >= index.size:
+                return
+            offset = index.indexed_to
+            next_checkpoint = offset
+            f.seek(offset)
+            while offset < index.size:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # Строка ещё дописывается
+                if offset >= next_checkpoint:
+                    moment = _line_time(line)
+                    if moment:
+                        index.checkpoints.append((moment, offset))
+                        next_checkpoint = offset + CHECKPOINT_BYTES
+                offset += len(line)
+            index.indexed_to = offset
+
+    def _bounds(self, index: FileIndex, f, filters: LogFilters) -> Tuple[int, int]:
+        """Диапазон смещений файла, в котором могут быть записи из интервала"""
+        start, end = 0, index.size
+        if not (filters.since or filters.until):
+            return start, end
+        self._extend_checkpoints(index, f)
+        times = [moment for moment, _ in index.checkpoints]
+        # Записи пишутся почти по порядку времени: берём контрольную точку
+        # с запасом в одну, чтобы не потерять записи на границе
+        if filters.since:
+            position = bisect_left(times, filters.since) - 2
+            if position >= 0:
+                start = index.checkpoints[position][1]
+        if filters.until:
+            position = bisect_right(times, filters.until) + 1
+            if position < len(index.checkpoints):
+                end = index.checkpoints[position][1]
+        return start, end
+
+    # ==================== ЗАПРОСЫ ====================
+
+    def tail(self, limit: int = 100) -> List[str]:
+        """Последние limit строк лога (с продолжением в архивах), от старых к новым"""
+        limit = min(limit, MAX_LIMIT)
+        lines: List[str] = []
+        for path in reversed(self.files()):
+            with open(path, "rb") as f:
+                size = f.seek(0, 2)
+                for _, line in read_lines_backward(f, 0, size):
+                    lines.append(line.decode("utf-8", errors="replace").strip())
+                    if len(lines) >= limit:
+                        return lines[::-1]
+        return lines[::-1]
+
+    def _parse_cursor(self, cursor: Optional[str], files: List[Path]) -> Tuple[int, Optional[int]]:
+        """Позиция в списке файлов и смещение, с которых продолжить чтение"""
+        if not cursor:
+            return len(files) - 1, None
+        name, _, offset = cursor.rpartition(":")
+        names = [p.name for p in files]
+        if name not in names or not offset.isdigit():
+            raise ValueError(f"Некорректный курсор: {cursor}")
+        return names.index(name), int(offset)
+
+    def search(self, filters: LogFilters, limit: int = 100, cursor: Optional[str] = None) -> LogPage:
+        """Записи, подходящие под фильтры, от новых к старым, не больше limit"""
+        limit = max(1, min(limit, MAX_LIMIT))
+        files = self.files()
+        position, resume_offset = self._parse_cursor(cursor, files)
+        needles = filters.needles()
+        text_needle = filters.text_needle()
+        records: List[dict] = []
+        scanned = 0
+
+        for path in reversed(files[:position + 1]):
+            with open(path, "rb") as f:
+                size = f.seek(0, 2)
+                index = self._index(path, f, size)
+                if filters.since and index.last_time and index.last_time < filters.since:
+                    break  # Этот и более старые файлы целиком раньше интервала
+                if filters.until and index.first_time and index.first_time > filters.until:
+                    resume_offset = None
+                    continue
+                scanned += 1
+
+                start, end = self._bounds(index, f, filters)
+                if resume_offset is not None:
+                    end = min(end, resume_offset)
+                    resume_offset = None
+
+                for block_offset, block in read_blocks_backward(f, start, end):
+                    if needles:
+                        lines = _block_lines_containing(block_offset, block, needles[0])
+                    elif text_needle:
+                        lines = _block_lines_containing(block_offset, block, text_needle, block.lower())
+                    else:
+                        lines = _block_lines(block_offset, block)
+                    for offset, line in lines:
+                        if any(needle not in line for needle in needles[1:]):
+                            continue
+                        record = _loads(line)
+                        if record is None or not filters.match(record):
+                            continue
+                        records.append(record)
+                        if len(records) >= limit:
+                            return LogPage(records, f"{path.name}:{offset}", scanned)
+
+        return LogPage(records, None, scanned)
+
+
+log_query = LogQueryService()
@@ -7,6 +7,10 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import select
 from backend.app.models import Equipment, Verification, Responsibility, Finance
 from backend.app.schemas import MainTableResponse, MainTableCreate, MainTableUpdate
+from backend.core.notifications import notification_bus
+from backend.core.tracing import span, traced
+from backend.services.equipment_registry import EquipmentRegistryService, registry_query
+from backend.services.storage import BlobStore
 
 
 def calculate_status(verification_due: date, verification_state: str) -> str:
@@ -58,93 +62,72 @@ class MainTableService:
     def __init__(self, db: Session):
         self.db = db
 
+    @staticmethod
+    def _all_data_query():
+        """Запрос всех данных оборудования из проекции equipment_registry (общий для sync и async)"""
+        return registry_query()
+
+    @staticmethod
+    def _row_to_response(row) -> MainTableResponse:
+        """Преобразовать строку результата в схему с пересчетом статуса"""
+        # Пересчитываем статус на основе текущей даты
+        calculated_status = row.status or ""
+        if row.verification_due and row.verification_state:
+            calculated_status = calculate_status(
+                verification_due=row.verification_due,
+                verification_state=row.verification_state
+            )
+
+        return MainTableResponse(
+            equipment_id=row.equipment_id,
+            equipment_name=row.equipment_name,
+            equipment_model=row.equipment_model,
+            equipment_type=row.equipment_type,
+            equipment_specs=row.equipment_specs,
+            factory_number=row.factory_number,
+            inventory_number=row.inventory_number,
+            equipment_year=row.equipment_year,
+            verification_type=row.verification_type or "",
+            registry_number=row.registry_number,
+            verification_interval=row.verification_interval or 0,
+            verification_date=row.verification_date,
+            verification_due=row.verification_due,
+            verification_plan=row.verification_plan,
+            verification_state=row.verification_state or "",
+            status=calculated_status,  # Используем пересчитанный статус
+            department=row.department,
+            responsible_person=row.responsible_person,
+            verifier_org=row.verifier_org,
+            budget_item=row.budget_item,
+            code_rate=row.code_rate,
+            cost_rate=row.cost_rate,
+            quantity=row.quantity,
+            coefficient=row.coefficient,
+            total_cost=row.total_cost,
+            invoice_number=row.invoice_number,
+            paid_amount=row.paid_amount,
+            payment_date=row.payment_date
+        )
+
+    @traced()
     def get_all_data(self) -> List[MainTableResponse]:
         """
-        Получить все данные из всех таблиц с JOIN
+        Получить все данные оборудования (из проекции, без JOIN)
         """
-        query = (
-            select(
-                Equipment.id.label("equipment_id"),
-                Equipment.equipment_name,
-                Equipment.equipment_model,
-                Equipment.equipment_type,
-                Equipment.equipment_specs,
-                Equipment.factory_number,
-                Equipment.inventory_number,
-                Equipment.equipment_year,
-                Verification.verification_type,
-                Verification.registry_number,
-                Verification.verification_interval,
-                Verification.verification_date,
-                Verification.verification_due,
-                Verification.verification_plan,
-                Verification.verification_state,
-                Verification.status,
-                Responsibility.department,
-                Responsibility.responsible_person,
-                Responsibility.verifier_org,
-                Finance.budget_item,
-                Finance.code_rate,
-                Finance.cost_rate,
-                Finance.quantity,
-                Finance.coefficient,
-                Finance.total_cost,
-                Finance.invoice_number,
-                Finance.paid_amount,
-                Finance.payment_date
-            )
-            .select_from(Equipment)
-            .join(Verification, Equipment.id == Verification.equipment_id, isouter=True)
-            .join(Responsibility, Equipment.id == Responsibility.equipment_id, isouter=True)
-            .join(Finance, Equipment.id == Finance.equipment_model_id, isouter=True)
-        )
+        result = self.db.execute(self._all_data_query()).fetchall()
+        with span("pydantic.main_table", rows=len(result)):
+            return [self._row_to_response(row) for row in result]
 
-        result = self.db.execute(query).fetchall()
-
-        # Преобразование результата в список схем с пересчетом статуса
-        responses = []
-        for row in result:
-            # Пересчитываем статус на основе текущей даты
-            calculated_status = row.status or ""
-            if row.verification_due and row.verification_state:
-                calculated_status = calculate_status(
-                    verification_due=row.verification_due,
-                    verification_state=row.verification_state
-                )
-
-            responses.append(MainTableResponse(
-                equipment_id=row.equipment_id,
-                equipment_name=row.equipment_name,
-                equipment_model=row.equipment_model,
-                equipment_type=row.equipment_type,
-                equipment_specs=row.equipment_specs,
-                factory_number=row.factory_number,
-                inventory_number=row.inventory_number,
-                equipment_year=row.equipment_year,
-                verification_type=row.verification_type or "",
-                registry_number=row.registry_number,
-                verification_interval=row.verification_interval or 0,
-                verification_date=row.verification_date,
-                verification_due=row.verification_due,
-                verification_plan=row.verification_plan,
-                verification_state=row.verification_state or "",
-                status=calculated_status,  # Используем пересчитанный статус
-                department=row.department,
-                responsible_person=row.responsible_person,
-                verifier_org=row.verifier_org,
-                budget_item=row.budget_item,
-                code_rate=row.code_rate,
-                cost_rate=row.cost_rate,
-                quantity=row.quantity,
-                coefficient=row.coefficient,
-                total_cost=row.total_cost,
-                invoice_number=row.invoice_number,
-                paid_amount=row.paid_amount,
-                payment_date=row.payment_date
-            ))
-
-        return responses
+    @traced()
+    async def get_all_data_async(self) -> List[MainTableResponse]:
+        """
+        Получить все данные оборудования из проекции (self.db - AsyncSession)
+        """
+        result = (await self.db.execute(self._all_data_query())).fetchall()
+        with span("pydantic.main_table", rows=len(result)):
+            return [self._row_to_response(row) for row in result]
 
+    @traced()
     def create_equipment_full(self, data: MainTableCreate) -> MainTableResponse:
         """
         Создать новое оборудование со всеми связанными данными
@@ -211,6 +194,10 @@ class MainTableService:
         )
 
         self.db.add(finance)
+        self.db.flush()
+        EquipmentRegistryService(self.db).refresh([equipment.id])
+        # Клиенты добавят строку без перечитывания таблицы
+        notification_bus.publish(self.db, "equipment", {"action": "created", "ids": [equipment.id]})
         self.db.commit()
 
         # Возвращаем созданные данные
@@ -245,6 +232,7 @@ class MainTableService:
             payment_date=finance.payment_date
         )
 
+    @traced()
     def update_equipment_full(self, equipment_id: int, data: MainTableUpdate) -> Optional[MainTableResponse]:
         """
         Обновить оборудование со всеми связанными данными
@@ -303,6 +291,10 @@ class MainTableService:
             finance.paid_amount = data.paid_amount
             finance.payment_date = data.payment_date
 
+        self.db.flush()
+        EquipmentRegistryService(self.db).refresh([equipment_id])
+        # Этикетки и акты с прежними данными больше не актуальны (во всех процессах)
+        notification_bus.publish(self.db, "equipment", {"action": "updated", "ids": [equipment_id]})
         self.db.commit()
 
         # Возвращаем обновленные данные
@@ -337,6 +329,7 @@ class MainTableService:
             payment_date=finance.payment_date if finance else None
         )
 
+    @traced()
     def delete_equipment_full(self, equipment_id: int) -> bool:
         """
         Удалить оборудование со всеми связанными данными
@@ -345,17 +338,24 @@ class MainTableService:
         if not equipment:
             return False
 
-        # Удаляем связанные данные
+        # Удаляем связанные данные (строку проекции - до оборудования)
+        EquipmentRegistryService(self.db).remove([equipment_id])
         self.db.query(Finance).filter(Finance.equipment_model_id == equipment_id).delete()
         self.db.query(Responsibility).filter(Responsibility.equipment_id == equipment_id).delete()
         self.db.query(Verification).filter(Verification.equipment_id == equipment_id).delete()
 
-        # Удаляем оборудование
+        file_paths = [equipment_file.file_path for equipment_file in equipment.files]
+
+        # Удаляем оборудование (файлы удаляются каскадно)
         self.db.delete(equipment)
+        # Файлы удаляются с диска, только если на них не ссылаются другие записи
+        BlobStore().release_all(self.db, file_paths)
+        notification_bus.publish(self.db, "equipment", {"action": "deleted", "ids": [equipment_id]})
         self.db.commit()
 
         return True
 
+    @traced()
     def get_equipment_by_id(self, equipment_id: int) -> Optional[MainTableResponse]:
         """
         Получить оборудование по ID со всеми связанными данными
@@ -419,6 +419,7 @@ class MainTableService:
             verifier_org=result.verifier_org
         )
 
+    @traced()
     def get_equipment_full_by_id(self, equipment_id: int) -> Optional[dict]:
         """
         Получить полные данные оборудования по ID для редактирования
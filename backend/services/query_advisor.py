@@ -0,0 +1,263 @@
+# deltica/backend/services/query_advisor.py
+
+import json
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from backend.app.models import Equipment, EquipmentFile, Verification
+from backend.services.archive import ArchiveService
+from backend.services.equipment_registry import EquipmentRegistryService, source_query
+from backend.services.main_table import MainTableService
+from backend.services.storage import BlobStore
+
+# Seq Scan по таблице меньше этого числа строк дешевле индекса - не считаем проблемой
+DEFAULT_MIN_SCAN_ROWS = 1000
+DEFAULT_SLOW_MS = 50.0
+
+# Синтетические записи (seed) помечены заводскими номерами SEED-F-* / SEED-AF-*
+SEED_STATEMENTS = [
+    """
+    INSERT INTO equipment (equipment_name, equipment_model, equipment_type,
+                           factory_number, inventory_number, equipment_year)
+    SELECT 'Синтетическое оборудование ' || g,
+           'Модель-' || (g % 50),
+           (CASE WHEN g % 3 = 0 THEN 'IO' ELSE 'SI' END)::equipment_type_enum,
+           'SEED-F-' || g,
+           'SEED-INV-' || g,
+           2000 + g % 25
+    FROM generate_series(1, :count) AS g
+    """,
+    """
+    INSERT INTO verification (equipment_id, verification_type, verification_interval,
+                              verification_date, verification_plan, verification_state, status)
+    SELECT e.id, 'verification'::verification_type_enum, 12,
+           CURRENT_DATE - (e.id % 400),
+           CURRENT_DATE + (e.id % 60),
+           (CASE e.id % 5 WHEN 0 THEN 'state_storage' WHEN 1 THEN 'state_repair'
+                 ELSE 'state_work' END)::verification_state_enum,
+           'status_fit'::verification_status_enum
+    FROM equipment e WHERE e.factory_number LIKE 'SEED-F-%'
+    """,
+    """
+    INSERT INTO responsibility (equipment_id, department, responsible_person, verifier_org)
+    SELECT e.id, 'Отдел ' || (e.id % 10), 'Сотрудник ' || (e.id % 100), 'ЦСМ'
+    FROM equipment e WHERE e.factory_number LIKE 'SEED-F-%'
+    """,
+    """
+    INSERT INTO finance (equipment_model_id, budget_item, quantity, coefficient)
+    SELECT e.id, 'Статья ' || (e.id % 7), 1, 1.0
+    FROM equipment e WHERE e.factory_number LIKE 'SEED-F-%'
+    """,
+    """
+    INSERT INTO equipment_files (equipment_id, file_name, file_path, file_type, file_size, sort_order)
+    SELECT e.id, 'doc' || n || '.pdf',
+           'blobs/' || substr(md5(e.id || '-' || n), 1, 2) || '/' || md5(e.id || '-' || n),
+           'general_docs'::file_type_enum, 1000, n
+    FROM equipment e CROSS JOIN generate_series(0, 2) AS n
+    WHERE e.factory_number LIKE 'SEED-F-%'
+    """,
+    """
+    INSERT INTO archived_equipment (original_id, equipment_name, equipment_model, equipment_type,
+                                    factory_number, inventory_number, equipment_year)
+    SELECT 1000000 + g, 'Списанное оборудование ' || g, 'Модель-' || (g % 50), 'SI'::equipment_type_enum,
+           'SEED-AF-' || g, 'SEED-AINV-' || g, 1990 + g % 30
+    FROM generate_series(1, GREATEST(:count / 10, 1)) AS g
+    """,
+    """
+    INSERT INTO archived_responsibility (archived_equipment_id, original_equipment_id,
+                                         department, responsible_person, verifier_org)
+    SELECT a.id, a.original_id, 'Отдел ' || (a.id % 10), 'Сотрудник ' || (a.id % 100), 'ЦСМ'
+    FROM archived_equipment a WHERE a.factory_number LIKE 'SEED-AF-%'
+    """,
+    """
+    INSERT INTO archived_equipment_files (archived_equipment_id, original_equipment_id, file_name,
+                                          file_path, file_type, file_size, uploaded_at)
+    SELECT a.id, a.original_id, 'archived.pdf',
+           'blobs/' || substr(md5('a' || a.id), 1, 2) || '/' || md5('a' || a.id),
+           'general_docs'::file_type_enum, 1000, now()
+    FROM archived_equipment a WHERE a.factory_number LIKE 'SEED-AF-%'
+    """,
+]
+
+SEEDED_TABLES = [
+    "equipment", "verification", "responsibility", "finance", "equipment_files",
+    "archived_equipment", "archived_responsibility", "archived_equipment_files", "equipment_registry",
+]
+
+
+@dataclass
+class ScanNode:
+    """Последовательное чтение таблицы в плане запроса"""
+    relation: str
+    rows_scanned: int  # Прочитано строк (с учётом отброшенных фильтром и повторов)
+    filter: Optional[str] = None
+
+
+@dataclass
+class QueryPlanReport:
+    """Результат EXPLAIN (ANALYZE, BUFFERS) одного запроса"""
+    name: str
+    sql: str
+    execution_ms: float
+    planning_ms: float
+    shared_hit_blocks: int
+    shared_read_blocks: int
+    seq_scans: List[ScanNode] = field(default_factory=list)
+    slow: bool = False
+
+    @property
+    def issues(self) -> List[str]:
+        issues = [
+            f"Seq Scan по {scan.relation}: {scan.rows_scanned} строк"
+            + (f" (фильтр {scan.filter})" if scan.filter else "")
+            for scan in self.seq_scans
+        ]
+        if self.slow:
+            issues.append(f"медленный запрос: {self.execution_ms:.1f} мс")
+        return issues
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def analyze_plan(
+    name: str,
+    sql: str,
+    explain_json,
+    min_scan_rows: int = DEFAULT_MIN_SCAN_ROWS,
+    slow_ms: float = DEFAULT_SLOW_MS,
+    full_scan_expected: bool = False,
+) -> QueryPlanReport:
+    """
+    Разобрать результат EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON).
+
+    Seq Scan считается проблемой, если прочитано не меньше min_scan_rows строк
+    и запрос не читает таблицы целиком по замыслу (full_scan_expected);
+    запрос медленный, если Execution Time не меньше slow_ms.
+    """
+    if isinstance(explain_json, str):
+        explain_json = json.loads(explain_json)
+    result = explain_json[0] if isinstance(explain_json, list) else explain_json
+    root = result["Plan"]
+
+    seq_scans = []
+    for node in _walk(root):
+        if full_scan_expected or node.get("Node Type") != "Seq Scan":
+            continue
+        loops = node.get("Actual Loops", 1) or 1
+        rows = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+        if rows >= min_scan_rows:
+            seq_scans.append(ScanNode(node.get("Relation Name", "?"), rows, node.get("Filter")))
+
+    execution_ms = result.get("Execution Time", 0.0)
+    return QueryPlanReport(
+        name=name,
+        sql=sql,
+        execution_ms=execution_ms,
+        planning_ms=result.get("Planning Time", 0.0),
+        shared_hit_blocks=root.get("Shared Hit Blocks", 0),
+        shared_read_blocks=root.get("Shared Read Blocks", 0),
+        seq_scans=seq_scans,
+        slow=execution_ms >= slow_ms,
+    )
+
+
+def compile_query(statement) -> str:
+    """SQL запроса с подставленными параметрами (диалект PostgreSQL)"""
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class QueryAdvisor:
+    """
+    Прогон запросов сервисов через EXPLAIN (ANALYZE, BUFFERS).
+
+    Запросы строятся теми же функциями, что и в сервисах, параметры берутся
+    из существующих записей. Все изменения (seed) выполняются в транзакции,
+    которая откатывается в конце.
+    """
+
+    # Запросы, которые возвращают все строки: Seq Scan для них - нормальный план
+    FULL_SCAN_QUERIES = {"main_table.get_all_data", "archive.get_all_archived", "equipment_registry.rebuild"}
+
+    def __init__(self, db: Session, min_scan_rows: int = DEFAULT_MIN_SCAN_ROWS, slow_ms: float = DEFAULT_SLOW_MS):
+        self.db = db
+        self.min_scan_rows = min_scan_rows
+        self.slow_ms = slow_ms
+
+    def seed(self, count: int) -> None:
+        """Добавить count синтетических единиц оборудования со связанными записями и обновить статистику"""
+        for statement in SEED_STATEMENTS:
+            self.db.execute(text(statement), {"count": count})
+        EquipmentRegistryService(self.db).rebuild()
+        for table in SEEDED_TABLES:
+            self.db.execute(text(f"ANALYZE {table}"))
+
+    def _sample(self) -> dict:
+        """Параметры запросов из существующих данных (последняя запись - обычно синтетическая)"""
+        equipment = self.db.execute(
+            select(Equipment.id, Equipment.factory_number, Equipment.inventory_number)
+            .order_by(Equipment.id.desc()).limit(1)
+        ).first()
+        file_path = self.db.execute(
+            select(EquipmentFile.file_path).order_by(EquipmentFile.id.desc()).limit(1)
+        ).scalar()
+        return {
+            "equipment_id": equipment.id if equipment else 0,
+            "factory_number": equipment.factory_number if equipment else "",
+            "inventory_number": equipment.inventory_number if equipment else "",
+            "file_path": file_path or "",
+        }
+
+    def service_queries(self) -> Dict[str, object]:
+        """Запросы сервисов и эндпоинтов, которые проверяет советник"""
+        sample = self._sample()
+        return {
+            "main_table.get_all_data": MainTableService._all_data_query(),
+            "equipment_registry.refresh": source_query().where(Equipment.id == sample["equipment_id"]),
+            "equipment_registry.rebuild": source_query(),
+            "archive.get_all_archived": ArchiveService._all_archived_query(),
+            "files.get_equipment_files": (
+                select(EquipmentFile)
+                .where(EquipmentFile.equipment_id == sample["equipment_id"])
+                .order_by(EquipmentFile.sort_order, EquipmentFile.id)
+            ),
+            "storage.reference_count": BlobStore.reference_count_query(sample["file_path"]),
+            "equipment.by_factory_number": select(Equipment).where(
+                Equipment.factory_number == sample["factory_number"]
+            ),
+            "equipment.by_inventory_number": select(Equipment).where(
+                Equipment.inventory_number == sample["inventory_number"]
+            ),
+            "verification.expiring": select(Verification).where(
+                Verification.verification_due.between(date.today(), date.today() + timedelta(days=14))
+            ),
+            "verification.by_status": select(Verification).where(Verification.status == "status_expired"),
+        }
+
+    def explain(self, name: str, statement) -> QueryPlanReport:
+        # Параметры передаются драйверу как есть - без подстановки в текст EXPLAIN
+        compiled = statement.compile(dialect=self.db.get_bind().dialect)
+        plan = self.db.connection().exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        return analyze_plan(
+            name, compile_query(statement), plan, self.min_scan_rows, self.slow_ms,
+            full_scan_expected=name in self.FULL_SCAN_QUERIES,
+        )
+
+    def run(self, seed_count: int = 0) -> List[QueryPlanReport]:
+        """Выполнить EXPLAIN для всех запросов; транзакция откатывается в любом случае"""
+        try:
+            if seed_count:
+                self.seed(seed_count)
+            return [self.explain(name, statement) for name, statement in self.service_queries().items()]
+        finally:
+            self.db.rollback()
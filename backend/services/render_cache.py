@@ -0,0 +1,301 @@
+# deltica/backend/services/render_cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+from backend.core.metrics import CACHE_REQUESTS
+from backend.core.notifications import RESYNC_TOPIC, notification_bus
+
+# Префикс копий, выданных из кэша (get), в каталоге output_dir
+CHECKOUT_PREFIX = "cached_"
+# Копии, оставшиеся после оборванных ответов, удаляются через столько секунд
+# после выдачи (release() не был вызван); уборка - не чаще раза за этот период
+CHECKOUT_TTL = 3600.0
+
+
+class RenderCache:
+    """
+    Кэш сгенерированных документов с адресацией по содержимому.
+
+    Ключ - SHA-256 от версии шаблона (имя, размер, время изменения файла) и данных,
+    которыми шаблон заполняется. Повторный запрос с теми же данными возвращает
+    готовый файл без повторного рендеринга docxtpl.
+
+    - Изменение файла шаблона меняет ключ, старые записи вытесняются по LRU
+    - Изменение данных оборудования удаляет записи через invalidate_equipment()
+
+    Файлы кэша вызывающему коду не выдаются: запись может быть вытеснена или
+    инвалидирована (в том числе другим процессом), пока документ отправляется
+    клиенту. get() возвращает жёсткую ссылку (или копию) в output_dir, put() -
+    сам отрендеренный файл. После отправки копия удаляется через release().
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 2000, output_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.output_dir = output_dir or cache_dir.parent
+        self._lock = threading.Lock()
+        # equipment_id -> ключи документов, в которых участвует оборудование
+        self._index: Optional[Dict[int, Set[str]]] = None
+        # Примерное число документов в кэше: каталог просматривается,
+        # только когда счётчик превышает max_entries
+        self._entry_count: Optional[int] = None
+        # Время следующей уборки забытых копий (первая - при первой выдаче)
+        self._next_sweep = 0.0
+
+    # ==================== КЛЮЧИ ====================
+
+    @staticmethod
+    def template_version(template_path: Path) -> str:
+        """Версия шаблона: меняется при любой замене файла"""
+        stat = template_path.stat()
+        return f"{template_path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def make_key(self, template_path: Path, context: Any) -> str:
+        """Вычислить ключ кэша по версии шаблона и данным для рендеринга"""
+        payload = json.dumps(
+            {"template": self.template_version(template_path), "context": context},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ==================== ЧТЕНИЕ / ЗАПИСЬ ====================
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Вернуть документ из кэша или None.
+
+        Возвращается отдельный путь в output_dir, который не пропадёт при
+        вытеснении или инвалидации записи. После отправки клиенту его нужно
+        освободить через release().
+        """
+        path = self._entry_path(key)
+        try:
+            os.utime(path)  # Отмечаем использование для LRU-вытеснения
+            checkout = self._checkout(path, key)
+        except FileNotFoundError:
+            CACHE_REQUESTS.labels("render", "miss").inc()
+            return None
+        CACHE_REQUESTS.labels("render", "hit").inc()
+        return checkout
+
+    def put(self, key: str, rendered_path: Path, equipment_ids: Iterable[int]) -> Path:
+        """
+        Сохранить сгенерированный файл в кэше.
+
+        Returns:
+            rendered_path: файл остаётся на месте, в кэш попадает его копия.
+            Если сохранить в кэш не удалось (на Windows файл записи может быть
+            открыт другим запросом), документ просто не кэшируется.
+        """
+        ids = sorted(set(equipment_ids))
+        target = self._entry_path(key)
+        temp = self.cache_dir / f"{key}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._meta_path(key).write_text(json.dumps({"equipment_ids": ids}), encoding="utf-8")
+            self._link_or_copy(rendered_path, temp)
+            existed = target.exists()
+            os.replace(temp, target)
+        except OSError:
+            self._unlink(temp)
+            return rendered_path
+
+        with self._lock:
+            index = self._load_index()
+            for equipment_id in ids:
+                index.setdefault(equipment_id, set()).add(key)
+            if self._entry_count is not None and not existed:
+                self._entry_count += 1
+
+        self._evict()
+        return rendered_path
+
+    def release(self, path) -> None:
+        """
+        Удалить копию, выданную get(), когда документ отправлен клиенту.
+
+        Остальные файлы (например, результат put()) не трогаются.
+        """
+        path = Path(path)
+        if path.name.startswith(CHECKOUT_PREFIX) and path.parent.resolve() == self.output_dir.resolve():
+            self._unlink(path)
+
+    # ==================== ИНВАЛИДАЦИЯ ====================
+
+    def invalidate_equipment(self, equipment_id: int) -> int:
+        """
+        Удалить все документы, в которых участвует оборудование.
+
+        Returns:
+            Количество удалённых записей
+        """
+        with self._lock:
+            index = self._load_index()
+            keys = index.pop(equipment_id, set())
+            for other_keys in index.values():
+                other_keys.difference_update(keys)
+
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Полностью очистить кэш"""
+        with self._lock:
+            self._index = {}
+            self._entry_count = None  # Занятые файлы могут остаться - пересчитать при уборке
+        if not self.cache_dir.exists():
+            return
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    self._unlink(Path(entry.path))
+
+    # ==================== ВНУТРЕННИЕ МЕТОДЫ ====================
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.docx"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    @staticmethod
+    def _unlink(path: Path) -> bool:
+        """
+        Удалить файл; False, если его нет или он занят.
+
+        На Windows файл, который в этот момент отдаётся клиенту, удалить
+        нельзя (PermissionError) - он останется до следующей уборки.
+        """
+        try:
+            path.unlink()
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path) -> None:
+        """Жёсткая ссылка (без копирования данных) или копия, если ссылки не поддерживаются"""
+        try:
+            os.link(source, target)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copyfile(source, target)
+
+    def _checkout(self, path: Path, key: str) -> Path:
+        """Выдать документ кэша отдельным файлом в output_dir"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Время выдачи - в имени: mtime жёсткой ссылки меняется вместе с записью кэша
+        now = time.time()
+        checkout = self.output_dir / f"{CHECKOUT_PREFIX}{key[:16]}_{int(now)}_{uuid.uuid4().hex[:8]}.docx"
+        self._link_or_copy(path, checkout)
+        with self._lock:
+            sweep = now >= self._next_sweep
+            if sweep:
+                self._next_sweep = now + CHECKOUT_TTL
+        if sweep:
+            self._sweep_checkouts(now - CHECKOUT_TTL)
+        return checkout
+
+    def _sweep_checkouts(self, deadline: float) -> None:
+        """Удалить копии, выданные раньше deadline и не освобождённые release()"""
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if not entry.name.startswith(CHECKOUT_PREFIX):
+                    continue
+                issued = entry.name[len(CHECKOUT_PREFIX):].split("_")
+                if len(issued) == 3 and issued[1].isdigit() and int(issued[1]) < deadline:
+                    self._unlink(Path(entry.path))
+
+    def _remove(self, key: str) -> None:
+        removed = self._unlink(self._entry_path(key))
+        self._unlink(self._meta_path(key))
+        if removed:
+            with self._lock:
+                if self._entry_count is not None:
+                    self._entry_count -= 1
+
+    def _load_index(self) -> Dict[int, Set[str]]:
+        """Построить индекс equipment_id -> ключи из метаданных на диске (один раз)"""
+        if self._index is not None:
+            return self._index
+
+        index: Dict[int, Set[str]] = {}
+        if self.cache_dir.exists():
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith(".json"):
+                    continue
+                key = entry.name[:-len(".json")]
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                for equipment_id in meta.get("equipment_ids", []):
+                    index.setdefault(equipment_id, set()).add(key)
+
+        self._index = index
+        return index
+
+    def _evict(self) -> None:
+        """
+        Удалить самые давно использованные документы сверх max_entries.
+
+        Каталог просматривается только при превышении счётчика записей; после
+        просмотра счётчик берётся с диска (там же записи других процессов).
+        """
+        with self._lock:
+            if self._entry_count is not None and self._entry_count <= self.max_entries:
+                return
+
+        with os.scandir(self.cache_dir) as scan:
+            entries = [entry for entry in scan if entry.name.endswith(".docx")]
+        with self._lock:
+            self._entry_count = len(entries)
+        overflow = len(entries) - self.max_entries
+        if overflow <= 0:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        evicted = {entry.name[:-len(".docx")] for entry in entries[:overflow]}
+
+        with self._lock:
+            index = self._load_index()
+            for keys in index.values():
+                keys.difference_update(evicted)
+
+        for key in evicted:
+            self._remove(key)
+
+
+# Общий кэш для всех экземпляров DocumentService
+render_cache = RenderCache(Path("backend/generated_documents/cache"))
+
+
+def _on_equipment_changed(data: dict) -> None:
+    """
+    Изменение оборудования в любом процессе сервера.
+
+    Каталог кэша общий, но индекс equipment_id -> ключи у каждого процесса свой:
+    документ, отрендеренный другим процессом, удаляет только его владелец.
+    """
+    if data.get("truncated"):
+        render_cache.clear()
+        return
+    for equipment_id in data.get("ids", ()):
+        render_cache.invalidate_equipment(equipment_id)
+
+
+notification_bus.subscribe("equipment", _on_equipment_changed)
+notification_bus.subscribe(RESYNC_TOPIC, lambda data: render_cache.clear())
@@ -0,0 +1,192 @@
+# deltica/backend/services/storage.py
+
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Union
+from sqlalchemy import event, func, select, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from backend.app.models import EquipmentFile, ArchivedEquipmentFile, PinnedDocument
+from backend.utils.uploads import StreamedUpload
+
+logger = logging.getLogger(__name__)
+
+# Корень хранилища загруженных файлов
+UPLOAD_ROOT = Path("backend/uploads")
+
+# Ключ в Session.info: файлы без ссылок, которые удаляются с диска после
+# фиксации транзакции (при откате запись о файле остаётся - и файл тоже)
+RELEASED_KEY = "released_blobs"
+
+
+class BlobStore:
+    """
+    Хранилище файлов с адресацией по содержимому.
+
+    Файл лежит по пути blobs/<первые 2 символа хеша>/<sha256> относительно корня
+    загрузок, поэтому одинаковый сертификат, прикреплённый к десяти приборам,
+    хранится на диске один раз. Отдельного счётчика ссылок нет: число ссылок -
+    это количество строк в equipment_files, archived_equipment_files и
+    pinned_documents с тем же file_path.
+
+    Файлы старого формата (equipment_{id}/имя.pdf) обрабатываются так же:
+    на них ссылается одна запись, и при её удалении файл удаляется.
+    """
+
+    BLOBS_DIR = "blobs"
+    THUMBNAIL_SUFFIX = ".thumb.jpg"
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = root or UPLOAD_ROOT
+
+    @property
+    def incoming_dir(self) -> Path:
+        """Директория для временных файлов (на том же диске, что и blob'ы)"""
+        return self.root / self.BLOBS_DIR / ".incoming"
+
+    def blob_path(self, file_hash: str) -> str:
+        """Относительный путь blob'а по SHA-256"""
+        return f"{self.BLOBS_DIR}/{file_hash[:2]}/{file_hash}"
+
+    def thumbnail_path(self, relative_path: str) -> Path:
+        """Путь миниатюры: хранится рядом с файлом и удаляется вместе с ним"""
+        return self.root / f"{relative_path}{self.THUMBNAIL_SUFFIX}"
+
+    def lock(self, db: Union[Session, Connection], relative_path: str) -> None:
+        """
+        Заблокировать blob до конца транзакции.
+
+        Загрузка и удаление одного и того же содержимого из разных запросов
+        (и процессов) выполняются последовательно, поэтому удаление не может
+        стереть blob, на который только что сослалась новая запись.
+        """
+        dialect = db.dialect if isinstance(db, Connection) else db.get_bind().dialect
+        if dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": relative_path})
+
+    def put(self, streamed: StreamedUpload) -> str:
+        """
+        Поместить загруженный файл в хранилище.
+
+        Если такое содержимое уже есть, временный файл удаляется (дедупликация).
+
+        Returns:
+            Относительный путь blob'а для сохранения в file_path
+        """
+        relative_path = self.blob_path(streamed.sha256)
+        target = self.root / relative_path
+
+        if target.exists():
+            streamed.temp_path.unlink(missing_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(streamed.temp_path, target)
+
+        return relative_path
+
+    @staticmethod
+    def reference_count_query(relative_path: str):
+        """Запрос количества записей, ссылающихся на файл (один запрос по трём таблицам)"""
+        references = union_all(
+            select(EquipmentFile.id).where(EquipmentFile.file_path == relative_path),
+            select(ArchivedEquipmentFile.id).where(ArchivedEquipmentFile.file_path == relative_path),
+            select(PinnedDocument.id).where(PinnedDocument.file_path == relative_path),
+        ).subquery()
+        return select(func.count()).select_from(references)
+
+    def reference_count(self, db: Union[Session, Connection], relative_path: str) -> int:
+        """Количество записей, ссылающихся на файл"""
+        return db.execute(self.reference_count_query(relative_path)).scalar()
+
+    def release(self, db: Session, relative_path: str) -> bool:
+        """
+        Удалить файл с диска после commit, если на него больше никто не ссылается.
+
+        Вызывается после удаления записи (до commit, в той же транзакции).
+        Сам файл удаляется только после фиксации транзакции: если commit не
+        удался, запись остаётся и файл на диске тоже.
+
+        Returns:
+            True, если файл будет удалён после commit
+        """
+        self.lock(db, relative_path)
+        db.flush()
+        if self.reference_count(db, relative_path) > 0:
+            return False
+        db.info.setdefault(RELEASED_KEY, []).append((self.root, relative_path))
+        return True
+
+    def discard(self, db: Session, relative_path: str) -> None:
+        """
+        Удалить файл неудавшейся загрузки (транзакция уже откачена).
+
+        Ошибка при очистке только логируется: исключение загрузки не должно
+        подменяться вторым. Оставшийся без ссылок файл найдёт проверка хранилища.
+        """
+        try:
+            self.release(db, relative_path)
+            db.commit()
+        except Exception as e:
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            logger.warning(
+                f"Failed to discard uploaded file {relative_path}: {e}",
+                extra={"event": "blob_discard_failed", "file_path": relative_path, "error": str(e)}
+            )
+
+    def delete_unreferenced(self, connection: Connection, relative_path: str) -> bool:
+        """
+        Удалить файл и миниатюру, если на файл нет ссылок (в транзакции connection).
+
+        Ссылки пересчитываются под той же блокировкой, что и при загрузке:
+        между commit удаления и этим вызовом на blob могла сослаться новая запись.
+        """
+        self.lock(connection, relative_path)
+        if self.reference_count(connection, relative_path) > 0:
+            return False
+
+        file_path = self.root / relative_path
+        self.thumbnail_path(relative_path).unlink(missing_ok=True)
+        try:
+            file_path.unlink()
+        except FileNotFoundError:
+            return False
+
+        # Убираем опустевшую директорию (equipment_{id} или blobs/ab)
+        try:
+            file_path.parent.rmdir()
+        except OSError:
+            pass
+
+        return True
+
+    def release_all(self, db: Session, relative_paths: Iterable[str]) -> int:
+        """Освободить несколько файлов; возвращает количество удаляемых"""
+        return sum(1 for path in set(relative_paths) if self.release(db, path))
+
+
+@event.listens_for(Session, "after_commit")
+def _delete_released(session):
+    released = session.info.pop(RELEASED_KEY, None)
+    if not released:
+        return
+    # Сессия после commit не выполняет запросов - пересчёт ссылок на отдельном соединении
+    try:
+        with session.get_bind().connect() as connection:
+            for root, relative_path in released:
+                with connection.begin():
+                    BlobStore(root).delete_unreferenced(connection, relative_path)
+    except Exception as e:
+        # Файл без ссылок останется на диске - его найдёт проверка хранилища
+        logger.warning(
+            f"Failed to delete released files: {e}",
+            extra={"event": "blob_release_failed", "error": str(e)}
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_released(session):
+    session.info.pop(RELEASED_KEY, None)
@@ -0,0 +1,392 @@
+# deltica/backend/services/storage_scanner.py
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.app.models import EquipmentFile, ArchivedEquipmentFile, PinnedDocument
+from backend.services.storage import BlobStore
+
+logger = logging.getLogger(__name__)
+
+# Таблицы, строки которых ссылаются на файлы в хранилище
+FILE_MODELS = {
+    "equipment_files": EquipmentFile,
+    "archived_equipment_files": ArchivedEquipmentFile,
+    "pinned_documents": PinnedDocument,
+}
+
+QUARANTINE_DIR = ".quarantine"
+CHECKPOINT_FILE = ".scan_checkpoint.json"
+
+# Служебные директории, которые не сканируются
+SKIPPED_DIRS = {QUARANTINE_DIR}
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 МБ
+
+
+@dataclass
+class DiskEntry:
+    """Файл, найденный на диске"""
+    path: str  # Относительно корня хранилища, с разделителем "/"
+    size: int
+    mtime: float
+
+
+@dataclass
+class FileReference:
+    """Строка БД, ссылающаяся на файл"""
+    table: str
+    id: int
+    file_path: str
+    file_hash: Optional[str]
+
+
+@dataclass
+class ScanReport:
+    """Результат сверки диска и БД"""
+    files_scanned: int = 0
+    bytes_scanned: int = 0
+    orphan_files: List[str] = field(default_factory=list)
+    orphan_bytes: int = 0
+    dangling_rows: List[FileReference] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+
+@dataclass
+class VerifyReport:
+    """Результат проверки хешей (одного запуска)"""
+    files_verified: int = 0
+    bytes_verified: int = 0
+    mismatches: List[FileReference] = field(default_factory=list)
+    missing: List[FileReference] = field(default_factory=list)
+    completed: bool = False  # True - проход по всем строкам завершён, checkpoint сброшен
+
+
+class StorageScanner:
+    """
+    Сверка файлов в хранилище загрузок с записями в БД.
+
+    - Сироты: файлы на диске без строк в equipment_files,
+      archived_equipment_files и pinned_documents
+    - Висячие строки: записи, файл которых отсутствует на диске
+    - Проверка хешей: SHA-256 файлов сверяется с file_hash порциями,
+      прогресс сохраняется в checkpoint и продолжается при следующем запуске
+    """
+
+    def __init__(self, db: Session, root: Optional[Path] = None, workers: int = 8):
+        self.db = db
+        self.store = BlobStore(root)
+        self.root = self.store.root
+        self.workers = workers
+
+    # ==================== ОБХОД ДИСКА ====================
+
+    def walk(self) -> List[DiskEntry]:
+        """
+        Обойти хранилище через os.scandir.
+
+        Поддиректории верхнего уровня (blobs/00..ff после распределения по
+        префиксу, equipment_{id} для старых файлов) обходятся параллельно:
+        на больших деревьях время уходит на ожидание файловой системы,
+        а не на Python-код.
+        """
+        if not self.root.exists():
+            return []
+
+        entries: List[DiskEntry] = []
+        subtrees: List[Path] = []
+
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIPPED_DIRS:
+                        subtrees.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False) and entry.name != CHECKPOINT_FILE:
+                    stat = entry.stat(follow_symlinks=False)
+                    entries.append(DiskEntry(entry.name, stat.st_size, stat.st_mtime))
+
+        # blobs/ разбиваем на 256 поддиректорий, иначе он обходился бы одним потоком
+        expanded: List[Path] = []
+        for subtree in subtrees:
+            if subtree.name == BlobStore.BLOBS_DIR:
+                with os.scandir(subtree) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            expanded.append(Path(entry.path))
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            entries.append(DiskEntry(self._relative(entry.path), stat.st_size, stat.st_mtime))
+            else:
+                expanded.append(subtree)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="storage-scan") as executor:
+            for chunk in executor.map(self._walk_subtree, expanded):
+                entries.extend(chunk)
+
+        return entries
+
+    def _walk_subtree(self, directory: Path) -> List[DiskEntry]:
+        entries = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            entries.append(DiskEntry(self._relative(entry.path), stat.st_size, stat.st_mtime))
+            except FileNotFoundError:
+                continue  # Директорию удалили во время обхода
+        return entries
+
+    def _relative(self, path: str) -> str:
+        return Path(path).relative_to(self.root).as_posix()
+
+    # ==================== ССЫЛКИ ИЗ БД ====================
+
+    def load_references(self) -> Dict[str, List[FileReference]]:
+        """Все ссылки на файлы: по одному запросу на таблицу, только нужные столбцы"""
+        references: Dict[str, List[FileReference]] = {}
+        for table, model in FILE_MODELS.items():
+            rows = self.db.execute(
+                select(model.id, model.file_path, model.file_hash)
+            )
+            for row_id, file_path, file_hash in rows:
+                references.setdefault(file_path, []).append(
+                    FileReference(table=table, id=row_id, file_path=file_path, file_hash=file_hash)
+                )
+        return references
+
+    # ==================== СВЕРКА ====================
+
+    def scan(self, grace_seconds: float = 3600) -> ScanReport:
+        """
+        Сверить диск с БД.
+
+        Файлы моложе grace_seconds не считаются сиротами: они могут
+        принадлежать загрузке, транзакция которой ещё не завершена.
+        """
+        started = time.perf_counter()
+        report = ScanReport()
+
+        # Сначала ссылки, потом диск: файл, загруженный между запросом и обходом,
+        # отсеивается по grace_seconds и не попадает в сироты
+        references = self.load_references()
+        entries = self.walk()
+        on_disk = {entry.path for entry in entries}
+        cutoff = time.time() - grace_seconds
+
+        for entry in entries:
+            report.files_scanned += 1
+            report.bytes_scanned += entry.size
+
+            if entry.path in references:
+                continue
+            # Миниатюра - сирота, только если исчез сам файл
+            if entry.path.endswith(BlobStore.THUMBNAIL_SUFFIX):
+                if entry.path[:-len(BlobStore.THUMBNAIL_SUFFIX)] in references:
+                    continue
+            if entry.mtime > cutoff:
+                continue
+
+            report.orphan_files.append(entry.path)
+            report.orphan_bytes += entry.size
+
+        for file_path, refs in references.items():
+            if file_path not in on_disk:
+                report.dangling_rows.extend(refs)
+
+        report.orphan_files.sort()
+        report.duration_seconds = time.perf_counter() - started
+
+        logger.info(
+            f"Storage scan: {report.files_scanned} files, {len(report.orphan_files)} orphans, "
+            f"{len(report.dangling_rows)} dangling rows",
+            extra={
+                "event": "storage_scan",
+                "files_scanned": report.files_scanned,
+                "orphan_files": len(report.orphan_files),
+                "orphan_bytes": report.orphan_bytes,
+                "dangling_rows": len(report.dangling_rows),
+                "duration_ms": round(report.duration_seconds * 1000, 2),
+            }
+        )
+        return report
+
+    def quarantine(self, relative_paths: List[str]) -> List[str]:
+        """
+        Переместить файлы-сироты в .quarantine/<дата>/ с сохранением структуры.
+
+        Перед перемещением ссылка в БД проверяется ещё раз под блокировкой
+        blob'а, поэтому файл, на который успела сослаться новая загрузка,
+        не трогается. Транзакция завершается после каждого файла: блокировка
+        держится только на время его проверки и перемещения, а не всего обхода.
+        Файлы из карантина можно вернуть вручную.
+
+        Returns:
+            Список перемещённых путей
+        """
+        target_root = self.root / QUARANTINE_DIR / datetime.now().strftime("%Y%m%d_%H%M%S")
+        moved = []
+
+        for relative_path in relative_paths:
+            if self._quarantine_file(relative_path, target_root):
+                moved.append(relative_path)
+            # Снимаем advisory-блокировку blob'а
+            self.db.commit()
+
+        if moved:
+            logger.warning(
+                f"Storage scan: {len(moved)} orphan files moved to quarantine",
+                extra={"event": "storage_quarantine", "files": len(moved), "target": str(target_root)}
+            )
+        return moved
+
+    def _quarantine_file(self, relative_path: str, target_root: Path) -> bool:
+        """Переместить один файл в карантин, если на него (или его оригинал) нет ссылок"""
+        referenced_path = relative_path
+        if relative_path.endswith(BlobStore.THUMBNAIL_SUFFIX):
+            referenced_path = relative_path[:-len(BlobStore.THUMBNAIL_SUFFIX)]
+
+        self.store.lock(self.db, referenced_path)
+        if self.store.reference_count(self.db, referenced_path) > 0:
+            return False
+
+        source = self.root / relative_path
+        target = target_root / relative_path
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, target)
+        except FileNotFoundError:
+            return False
+
+        try:
+            source.parent.rmdir()
+        except OSError:
+            pass
+        return True
+
+    # ==================== ПРОВЕРКА ХЕШЕЙ ====================
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.root / CHECKPOINT_FILE
+
+    def load_checkpoint(self) -> Dict[str, int]:
+        """Последний проверенный id по каждой таблице"""
+        try:
+            return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_checkpoint(self, checkpoint: Dict[str, int]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = self.checkpoint_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(checkpoint), encoding="utf-8")
+        os.replace(temp_path, self.checkpoint_path)
+
+    def reset_checkpoint(self) -> None:
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def verify_hashes(
+        self,
+        max_bytes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        batch_size: int = 500
+    ) -> VerifyReport:
+        """
+        Проверить SHA-256 файлов, у которых записан file_hash.
+
+        Строки обходятся по возрастанию id начиная с checkpoint. Проверка
+        останавливается по исчерпании max_bytes или max_seconds, прогресс
+        сохраняется после каждой порции, так что следующий запуск (например,
+        следующей ночью) продолжит с того же места. Blob, на который ссылаются
+        несколько строк, читается один раз за запуск.
+        """
+        report = VerifyReport()
+        checkpoint = self.load_checkpoint()
+        verified_paths: Dict[str, bool] = {}
+        started = time.monotonic()
+
+        def budget_left() -> bool:
+            if max_bytes is not None and report.bytes_verified >= max_bytes:
+                return False
+            if max_seconds is not None and time.monotonic() - started >= max_seconds:
+                return False
+            return True
+
+        stopped = False
+        for table, model in FILE_MODELS.items():
+            while not stopped:
+                # Лишняя строка показывает, остались ли строки после порции
+                rows = self.db.execute(
+                    select(model.id, model.file_path, model.file_hash)
+                    .where(model.id > checkpoint.get(table, 0), model.file_hash.isnot(None))
+                    .order_by(model.id)
+                    .limit(batch_size + 1)
+                ).all()
+
+                for row_id, file_path, file_hash in rows[:batch_size]:
+                    # Бюджет проверяется перед каждым файлом: если он кончился
+                    # ровно на последнем файле, проход всё равно завершён
+                    if not budget_left():
+                        stopped = True
+                        break
+                    reference = FileReference(table=table, id=row_id, file_path=file_path, file_hash=file_hash)
+
+                    if file_path not in verified_paths:
+                        result = self._check_file(self.root / file_path, file_hash)
+                        verified_paths[file_path] = result
+                        if result is not None:
+                            report.files_verified += 1
+                            report.bytes_verified += (self.root / file_path).stat().st_size
+
+                    result = verified_paths[file_path]
+                    if result is None:
+                        report.missing.append(reference)
+                    elif result is False:
+                        report.mismatches.append(reference)
+
+                    checkpoint[table] = row_id
+
+                if len(rows) <= batch_size and not stopped:
+                    break  # Таблица пройдена до конца
+                self.save_checkpoint(checkpoint)
+
+            if stopped:
+                break
+        else:
+            # Все таблицы пройдены до конца: следующий запуск начнёт сначала
+            report.completed = True
+            self.reset_checkpoint()
+
+        if report.mismatches:
+            logger.error(
+                f"Storage verify: {len(report.mismatches)} files with hash mismatch",
+                extra={"event": "storage_hash_mismatch", "files": [ref.file_path for ref in report.mismatches]}
+            )
+        return report
+
+    @staticmethod
+    def _check_file(path: Path, expected_hash: str) -> Optional[bool]:
+        """True - хеш совпал, False - не совпал, None - файла нет"""
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as source:
+                for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            return None
+        return digest.hexdigest() == expected_hash
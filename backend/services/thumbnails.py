@@ -0,0 +1,178 @@
+# deltica/backend/services/thumbnails.py
+
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from backend.core.metrics import CACHE_REQUESTS
+
+# Pillow и pypdfium2 входят в зависимости проекта (pyproject.toml, сборка
+# PyInstaller); если их нет в окружении, миниатюры просто не создаются,
+# загрузка и просмотр файлов работают как раньше
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - зависит от окружения
+    Image = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - зависит от окружения
+    pdfium = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+PDF_EXTENSIONS = {".pdf"}
+
+# Миниатюра вписывается в квадрат THUMBNAIL_SIZE x THUMBNAIL_SIZE
+THUMBNAIL_SIZE = 320
+THUMBNAIL_QUALITY = 80
+
+# Состояние миниатюры для запроса (ThumbnailService.request)
+THUMBNAIL_READY = "ready"              # Файл миниатюры готов
+THUMBNAIL_PENDING = "pending"          # Генерация поставлена в очередь или идёт
+THUMBNAIL_UNAVAILABLE = "unavailable"  # Тип не поддерживается или генерация не удалась
+
+# Сколько неудачных миниатюр помнить, чтобы не генерировать их повторно
+MAX_FAILED = 10000
+
+
+class ThumbnailService:
+    """
+    Фоновая генерация миниатюр для изображений и первой страницы PDF.
+
+    Генерация выполняется в пуле потоков, поэтому загрузка файла не ждёт
+    её окончания. Pillow и pdfium освобождают GIL на время декодирования
+    и масштабирования, так что потоки работают параллельно. Запрос
+    миниатюры не ждёт генерации: пока она идёт, возвращается THUMBNAIL_PENDING.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Путь миниатюры -> задача, которая её сейчас создаёт
+        self._pending: Dict[Path, Future] = {}
+        # Миниатюры, генерация которых завершилась ошибкой (повреждённые файлы)
+        self._failed: Set[Path] = set()
+
+    @staticmethod
+    def supports(file_name: str) -> bool:
+        """Можно ли построить миниатюру для файла в текущем окружении"""
+        suffix = Path(file_name).suffix.lower()
+        if suffix in IMAGE_EXTENSIONS:
+            return Image is not None
+        if suffix in PDF_EXTENSIONS:
+            return Image is not None and pdfium is not None
+        return False
+
+    def schedule(self, source: Path, target: Path, file_name: str) -> Optional[Future]:
+        """
+        Поставить генерацию миниатюры в очередь.
+
+        Returns:
+            Future задачи или None, если миниатюра не поддерживается или уже готова
+        """
+        if not self.supports(file_name) or target.exists():
+            return None
+
+        with self._lock:
+            future = self._pending.get(target)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="thumbnails"
+                )
+            future = self._executor.submit(self._generate, source, target, file_name)
+            self._pending[target] = future
+
+        # Вне блокировки: для уже завершённой задачи callback вызывается сразу
+        future.add_done_callback(lambda done: self._forget(target, done))
+        return future
+
+    def request(self, source: Path, target: Path, file_name: str) -> str:
+        """
+        Состояние миниатюры для ответа клиенту, без ожидания генерации.
+
+        Если миниатюры ещё нет, генерация ставится в очередь (или
+        продолжается уже начатая) и возвращается THUMBNAIL_PENDING.
+        """
+        if target.exists():
+            CACHE_REQUESTS.labels("thumbnail", "hit").inc()
+            return THUMBNAIL_READY
+        CACHE_REQUESTS.labels("thumbnail", "miss").inc()
+        with self._lock:
+            failed = target in self._failed
+        if failed:
+            return THUMBNAIL_UNAVAILABLE
+
+        future = self.schedule(source, target, file_name)
+        if future is not None and not future.done():
+            return THUMBNAIL_PENDING
+        return THUMBNAIL_READY if target.exists() else THUMBNAIL_UNAVAILABLE
+
+    def shutdown(self) -> None:
+        """Остановить пул потоков (дождавшись текущих задач)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _forget(self, target: Path, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(target, None)
+            if not future.cancelled() and future.exception() is not None:
+                if len(self._failed) >= MAX_FAILED:
+                    self._failed.clear()
+                self._failed.add(target)
+
+    def _generate(self, source: Path, target: Path, file_name: str) -> None:
+        suffix = Path(file_name).suffix.lower()
+        try:
+            if suffix in PDF_EXTENSIONS:
+                image = self._render_pdf_page(source)
+            else:
+                image = Image.open(source)
+                image.draft("RGB", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))  # быстрое уменьшение JPEG при декодировании
+
+            image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+
+            # Запись через временный файл: частично записанная миниатюра не отдаётся клиенту
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=target.parent, prefix=".thumb_", suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    image.save(out, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+                os.replace(temp_name, target)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+        except Exception as e:
+            logger.warning(
+                f"Thumbnail generation failed for {source.name}: {e}",
+                extra={"event": "thumbnail_failed", "file_name": file_name}
+            )
+            raise
+
+    @staticmethod
+    def _render_pdf_page(source: Path):
+        """Растеризовать первую страницу PDF в масштабе, близком к размеру миниатюры"""
+        document = pdfium.PdfDocument(str(source))
+        try:
+            page = document[0]
+            width, height = page.get_size()
+            scale = THUMBNAIL_SIZE / max(width, height, 1) * 2  # запас для сглаживания
+            return page.render(scale=scale).to_pil()
+        finally:
+            document.close()
+
+
+# Общий пул для всего приложения
+thumbnail_service = ThumbnailService()
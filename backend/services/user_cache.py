@@ -0,0 +1,119 @@
+# deltica/backend/services/user_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Файл-метка: скрипты sync_users/seed_users обновляют его mtime после изменения
+# пользователей, процессы сервера по mtime сбрасывают кэш
+USERS_CHANGED_MARKER = Path("backend/.users_changed")
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Неизменяемый снимок пользователя (без пароля), не привязанный к сессии БД"""
+    id: int
+    username: str
+    full_name: str
+    department: str
+    role: str
+    is_active: bool
+    windows_username: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            full_name=user.full_name,
+            department=user.department,
+            role=user.role,
+            is_active=user.is_active,
+            windows_username=user.windows_username,
+            created_at=user.created_at,
+        )
+
+
+class UserCache:
+    """
+    TTL-кэш активных пользователей для get_current_user.
+
+    Ключ - (username, iat токена). Кэшируются только активные пользователи,
+    поэтому деактивация вступает в силу:
+    - сразу после sync_users/seed_users (через файл-метку USERS_CHANGED_MARKER)
+    - не позже чем через ttl секунд при изменении пользователя в обход скриптов
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024, marker_path: Path = USERS_CHANGED_MARKER):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.marker_path = marker_path
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Optional[int]], Tuple[float, UserSnapshot]]" = OrderedDict()
+        self._marker_mtime = self._read_marker()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str, iat: Optional[int]) -> Optional[UserSnapshot]:
+        """Вернуть снимок пользователя или None (нет в кэше / истёк / кэш сброшен)"""
+        self._check_marker()
+        key = (username, iat)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, username: str, iat: Optional[int], snapshot: UserSnapshot) -> None:
+        """Сохранить снимок активного пользователя"""
+        if not snapshot.is_active:
+            return
+        with self._lock:
+            self._entries[(username, iat)] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end((username, iat))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        """Сбросить кэш целиком или для одного пользователя"""
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == username]:
+                    del self._entries[key]
+
+    def _read_marker(self) -> Optional[int]:
+        try:
+            return os.stat(self.marker_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _check_marker(self) -> None:
+        mtime = self._read_marker()
+        if mtime != self._marker_mtime:
+            self._marker_mtime = mtime
+            self.invalidate()
+
+
+def notify_users_changed(marker_path: Path = USERS_CHANGED_MARKER) -> None:
+    """Сообщить работающим процессам сервера, что пользователи изменились"""
+    marker_path.parent.mkdir(parents=True, exist_ok=True)
+    marker_path.touch()
+
+
+# Общий кэш для всего приложения
+user_cache = UserCache()
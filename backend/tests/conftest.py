@@ -11,17 +11,21 @@ import pytest
 import tempfile
 import shutil
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 from fastapi.testclient import TestClient
 
 from backend.core.main import app
-from backend.core.database import Base, get_db
+from backend.core.database import Base, get_async_db, get_db
+from backend.core.db_metrics import instrument_engine
 from backend.app.models import Equipment, Verification, Responsibility, Finance, EquipmentFile
 
 
-# Используем in-memory SQLite для тестов
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Используем in-memory SQLite для тестов. База с общим кэшем доступна и
+# синхронному движку, и асинхронному (aiosqlite), пока открыто соединение StaticPool
+SQLALCHEMY_DATABASE_URL = "sqlite:///file:deltica_test?mode=memory&cache=shared&uri=true"
+SQLALCHEMY_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///file:deltica_test?mode=memory&cache=shared&uri=true"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -30,6 +34,13 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: TestClient создаёт свой event loop, соединения aiosqlite не переиспользуем
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -106,7 +117,10 @@ def db_session():
                 file_path VARCHAR NOT NULL,
                 file_type VARCHAR NOT NULL DEFAULT 'other',
                 file_size INTEGER NOT NULL,
+                file_hash VARCHAR(64),
                 uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                is_active_certificate BOOLEAN DEFAULT 0,
+                sort_order INTEGER DEFAULT 0,
                 FOREIGN KEY (equipment_id) REFERENCES equipment(id) ON DELETE CASCADE
             )
         """))
@@ -115,6 +129,7 @@ def db_session():
         conn.execute(text("""
             CREATE TABLE IF NOT EXISTS archived_equipment (
                 id INTEGER PRIMARY KEY,
+                original_id INTEGER,
                 equipment_name VARCHAR NOT NULL,
                 equipment_model VARCHAR NOT NULL,
                 equipment_type VARCHAR NOT NULL,
@@ -131,6 +146,7 @@ def db_session():
             CREATE TABLE IF NOT EXISTS archived_verification (
                 id INTEGER PRIMARY KEY,
                 archived_equipment_id INTEGER NOT NULL,
+                original_equipment_id INTEGER NOT NULL,
                 verification_type VARCHAR NOT NULL,
                 registry_number VARCHAR,
                 verification_interval INTEGER NOT NULL,
@@ -147,6 +163,7 @@ def db_session():
             CREATE TABLE IF NOT EXISTS archived_responsibility (
                 id INTEGER PRIMARY KEY,
                 archived_equipment_id INTEGER NOT NULL,
+                original_equipment_id INTEGER NOT NULL,
                 department VARCHAR NOT NULL,
                 responsible_person VARCHAR NOT NULL,
                 verifier_org VARCHAR NOT NULL,
@@ -157,7 +174,8 @@ def db_session():
         conn.execute(text("""
             CREATE TABLE IF NOT EXISTS archived_finance (
                 id INTEGER PRIMARY KEY,
-                archived_equipment_model_id INTEGER NOT NULL,
+                archived_equipment_id INTEGER NOT NULL,
+                original_equipment_id INTEGER NOT NULL,
                 budget_item VARCHAR NOT NULL,
                 code_rate VARCHAR,
                 cost_rate FLOAT,
@@ -167,7 +185,7 @@ def db_session():
                 invoice_number VARCHAR,
                 paid_amount FLOAT,
                 payment_date DATE,
-                FOREIGN KEY (archived_equipment_model_id) REFERENCES archived_equipment(id)
+                FOREIGN KEY (archived_equipment_id) REFERENCES archived_equipment(id)
             )
         """))
 
@@ -175,15 +193,65 @@ def db_session():
             CREATE TABLE IF NOT EXISTS archived_equipment_files (
                 id INTEGER PRIMARY KEY,
                 archived_equipment_id INTEGER NOT NULL,
+                original_equipment_id INTEGER NOT NULL,
                 file_name VARCHAR NOT NULL,
                 file_path VARCHAR NOT NULL,
                 file_type VARCHAR NOT NULL DEFAULT 'other',
                 file_size INTEGER NOT NULL,
+                file_hash VARCHAR(64),
                 uploaded_at TIMESTAMP,
+                sort_order INTEGER DEFAULT 0,
                 FOREIGN KEY (archived_equipment_id) REFERENCES archived_equipment(id)
             )
         """))
 
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS pinned_documents (
+                id INTEGER PRIMARY KEY,
+                file_name VARCHAR NOT NULL,
+                file_path VARCHAR NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_hash VARCHAR(64),
+                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                uploaded_by VARCHAR NOT NULL
+            )
+        """))
+
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS equipment_registry (
+                equipment_id INTEGER PRIMARY KEY,
+                equipment_name VARCHAR NOT NULL,
+                equipment_model VARCHAR NOT NULL,
+                equipment_type VARCHAR NOT NULL,
+                equipment_specs VARCHAR,
+                factory_number VARCHAR NOT NULL,
+                inventory_number VARCHAR NOT NULL,
+                equipment_year INTEGER NOT NULL,
+                verification_type VARCHAR,
+                registry_number VARCHAR,
+                verification_interval INTEGER,
+                verification_date DATE,
+                verification_due DATE,
+                verification_plan DATE,
+                verification_state VARCHAR,
+                status VARCHAR,
+                department VARCHAR,
+                responsible_person VARCHAR,
+                verifier_org VARCHAR,
+                budget_item VARCHAR,
+                code_rate VARCHAR,
+                cost_rate FLOAT,
+                quantity INTEGER,
+                coefficient FLOAT,
+                total_cost FLOAT,
+                invoice_number VARCHAR,
+                paid_amount FLOAT,
+                payment_date DATE,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                FOREIGN KEY (equipment_id) REFERENCES equipment(id) ON DELETE CASCADE
+            )
+        """))
+
         conn.commit()
 
     db = TestingSessionLocal()
@@ -194,6 +262,7 @@ def db_session():
         # Очищаем таблицы (порядок важен из-за FK)
         with engine.connect() as conn:
             # Сначала удаляем таблицы с FK
+            conn.execute(text("DROP TABLE IF EXISTS equipment_registry"))
             conn.execute(text("DROP TABLE IF EXISTS equipment_files"))
             conn.execute(text("DROP TABLE IF EXISTS verification"))
             conn.execute(text("DROP TABLE IF EXISTS responsibility"))
@@ -202,6 +271,7 @@ def db_session():
             conn.execute(text("DROP TABLE IF EXISTS archived_verification"))
             conn.execute(text("DROP TABLE IF EXISTS archived_responsibility"))
             conn.execute(text("DROP TABLE IF EXISTS archived_finance"))
+            conn.execute(text("DROP TABLE IF EXISTS pinned_documents"))
             # Затем основные таблицы
             conn.execute(text("DROP TABLE IF EXISTS equipment"))
             conn.execute(text("DROP TABLE IF EXISTS archived_equipment"))
@@ -217,21 +287,38 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def isolated_render_cache(tmp_path, monkeypatch):
+    """Кэш документов и выданные из него копии - во временной директории, а не в backend/generated_documents."""
+    from backend.services import documents, render_cache
+    cache = render_cache.RenderCache(tmp_path / "render_cache" / "cache")
+    monkeypatch.setattr(render_cache, "render_cache", cache)
+    monkeypatch.setattr(documents, "render_cache", cache)
+    return cache
+
+
 @pytest.fixture(scope="function")
 def temp_upload_dir(monkeypatch):
     """Создать временную директорию для загрузки файлов."""
     temp_dir = tempfile.mkdtemp()
     temp_path = Path(temp_dir)
 
-    # Переопределяем UPLOAD_DIR в модуле files
+    # Переопределяем UPLOAD_DIR в модуле files и корень хранилища для сервисов
     from backend.routes import files
+    from backend.services import storage
     monkeypatch.setattr(files, "UPLOAD_DIR", temp_path)
+    monkeypatch.setattr(storage, "UPLOAD_ROOT", temp_path)
 
     yield temp_path
 
@@ -103,7 +103,10 @@ def db_session():
                 file_path VARCHAR NOT NULL,
                 file_type VARCHAR NOT NULL DEFAULT 'other',
                 file_size INTEGER NOT NULL,
+                file_hash VARCHAR(64),
                 uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                is_active_certificate BOOLEAN DEFAULT 0,
+                sort_order INTEGER DEFAULT 0,
                 FOREIGN KEY (equipment_id) REFERENCES equipment(id) ON DELETE CASCADE
             )
         """))
@@ -181,11 +184,60 @@ def db_session():
                 file_path VARCHAR NOT NULL,
                 file_type VARCHAR NOT NULL DEFAULT 'other',
                 file_size INTEGER NOT NULL,
+                file_hash VARCHAR(64),
                 uploaded_at TIMESTAMP NOT NULL,
+                sort_order INTEGER DEFAULT 0,
                 FOREIGN KEY (archived_equipment_id) REFERENCES archived_equipment(id) ON DELETE CASCADE
             )
         """))
 
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS pinned_documents (
+                id INTEGER PRIMARY KEY,
+                file_name VARCHAR NOT NULL,
+                file_path VARCHAR NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_hash VARCHAR(64),
+                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                uploaded_by VARCHAR NOT NULL
+            )
+        """))
+
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS equipment_registry (
+                equipment_id INTEGER PRIMARY KEY,
+                equipment_name VARCHAR NOT NULL,
+                equipment_model VARCHAR NOT NULL,
+                equipment_type VARCHAR NOT NULL,
+                equipment_specs VARCHAR,
+                factory_number VARCHAR NOT NULL,
+                inventory_number VARCHAR NOT NULL,
+                equipment_year INTEGER NOT NULL,
+                verification_type VARCHAR,
+                registry_number VARCHAR,
+                verification_interval INTEGER,
+                verification_date DATE,
+                verification_due DATE,
+                verification_plan DATE,
+                verification_state VARCHAR,
+                status VARCHAR,
+                department VARCHAR,
+                responsible_person VARCHAR,
+                verifier_org VARCHAR,
+                budget_item VARCHAR,
+                code_rate VARCHAR,
+                cost_rate FLOAT,
+                quantity INTEGER,
+                coefficient FLOAT,
+                total_cost FLOAT,
+                invoice_number VARCHAR,
+                paid_amount FLOAT,
+                payment_date DATE,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                FOREIGN KEY (equipment_id) REFERENCES equipment(id) ON DELETE CASCADE
+            )
+        """))
+
         conn.commit()
 
     db = TestingSessionLocal()
@@ -195,11 +247,13 @@ def db_session():
         db.close()
         # Очищаем таблицы
         with engine.connect() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS pinned_documents"))
             conn.execute(text("DROP TABLE IF EXISTS archived_equipment_files"))
             conn.execute(text("DROP TABLE IF EXISTS archived_finance"))
             conn.execute(text("DROP TABLE IF EXISTS archived_responsibility"))
             conn.execute(text("DROP TABLE IF EXISTS archived_verification"))
             conn.execute(text("DROP TABLE IF EXISTS archived_equipment"))
+            conn.execute(text("DROP TABLE IF EXISTS equipment_registry"))
             conn.execute(text("DROP TABLE IF EXISTS equipment_files"))
             conn.execute(text("DROP TABLE IF EXISTS finance"))
             conn.execute(text("DROP TABLE IF EXISTS responsibility"))
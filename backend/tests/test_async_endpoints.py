@@ -0,0 +1,85 @@
+# deltica/backend/tests/test_async_endpoints.py
+
+from datetime import date
+from sqlalchemy import text
+
+from backend.app.models import ArchivedEquipment, EquipmentFile, Verification
+from backend.core.main import app
+from backend.core import system_sampler as sampler_module
+from backend.services.equipment_registry import EquipmentRegistryService
+from backend.utils.auth import get_current_active_admin
+
+
+class TestAsyncReadEndpoints:
+    """Эндпоинты чтения на AsyncSession видят данные, записанные синхронной сессией."""
+
+    def test_main_table_list(self, client, db_session, test_equipment):
+        db_session.add(Verification(
+            equipment_id=test_equipment.id, verification_type="verification",
+            verification_interval=12, verification_date=date(2025, 1, 15),
+            verification_plan=date(2025, 12, 1), verification_state="state_storage",
+            status="status_storage"
+        ))
+        db_session.commit()
+        # verification_due - вычисляемая колонка PostgreSQL, в SQLite задаём вручную
+        db_session.execute(text("UPDATE verification SET verification_due = '2026-01-14'"))
+        # Записи добавлены в обход сервисов - проекцию обновляем явно
+        EquipmentRegistryService(db_session).refresh([test_equipment.id])
+        db_session.commit()
+
+        response = client.get("/main-table/")
+
+        assert response.status_code == 200
+        rows = response.json()
+        assert [row["equipment_id"] for row in rows] == [test_equipment.id]
+        assert rows[0]["equipment_name"] == "Тестовый манометр"
+        assert rows[0]["status"] == "status_storage"
+
+    def test_archive_list(self, client, db_session):
+        db_session.add(ArchivedEquipment(
+            original_id=42, equipment_name="Старый манометр", equipment_model="МТ-1",
+            equipment_type="SI", factory_number="1", inventory_number="INV-42",
+            equipment_year=2001, archive_reason="Списан"
+        ))
+        db_session.commit()
+
+        response = client.get("/archive/")
+
+        assert response.status_code == 200
+        archived = response.json()
+        assert len(archived) == 1
+        assert archived[0]["original_id"] == 42
+        assert archived[0]["department"] is None
+
+    def test_files_list_sorted(self, client, db_session, test_equipment):
+        db_session.add_all([
+            EquipmentFile(
+                equipment_id=test_equipment.id, file_name=f"doc{i}.pdf",
+                file_path=f"blobs/0{i}/doc{i}", file_type="general_docs",
+                file_size=10, sort_order=order
+            )
+            for i, order in enumerate([2, 0, 1])
+        ])
+        db_session.commit()
+
+        response = client.get(f"/files/equipment/{test_equipment.id}")
+
+        assert response.status_code == 200
+        assert [f["file_name"] for f in response.json()] == ["doc1.pdf", "doc2.pdf", "doc0.pdf"]
+
+    def test_files_list_unknown_equipment(self, client):
+        response = client.get("/files/equipment/99999")
+
+        assert response.status_code == 404
+
+    def test_health_system(self, client, monkeypatch):
+        monkeypatch.setattr(sampler_module.psutil, "cpu_percent", lambda interval=None: 12.5)
+        app.dependency_overrides[get_current_active_admin] = lambda: None
+        sampler_module.system_sampler.sample()
+
+        response = client.get("/health/system")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["database"]["status"] == "ok"
+        assert data["system"]["cpu_percent"] == 12.5
@@ -0,0 +1,101 @@
+# deltica/backend/tests/test_auth_login.py
+
+import asyncio
+import time
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.main import app
+from backend.core.database import get_db
+from backend.app.models import User
+from backend.utils.auth import hash_password
+
+PASSWORD = "secret123"
+
+
+@pytest.fixture
+def auth_db():
+    """Изолированная БД с одним пользователем."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    User.__table__.create(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.add(User(
+        username="petrov",
+        password_hash=hash_password(PASSWORD),
+        full_name="Петров П.П.",
+        department="Лаборатория",
+        role="admin",
+        is_active=True
+    ))
+    session.commit()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield session
+    app.dependency_overrides.clear()
+    session.close()
+
+
+async def post_login(password):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/auth/login", json={"username": "petrov", "password": password})
+
+
+class TestLogin:
+    """Тесты логина с проверкой пароля вне event loop."""
+
+    def test_login_success(self, auth_db):
+        response = asyncio.run(post_login(PASSWORD))
+
+        assert response.status_code == 200
+        assert response.json()["user"]["username"] == "petrov"
+
+    def test_login_wrong_password(self, auth_db):
+        response = asyncio.run(post_login("wrong"))
+
+        assert response.status_code == 401
+
+    def test_event_loop_not_blocked(self, auth_db):
+        """Во время проверки bcrypt event loop продолжает обслуживать другие задачи."""
+
+        async def scenario():
+            gaps = []
+            done = asyncio.Event()
+
+            async def ticker():
+                last = time.perf_counter()
+                while not done.is_set():
+                    await asyncio.sleep(0.005)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            tick_task = asyncio.create_task(ticker())
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(post_login(PASSWORD) for _ in range(4)))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await tick_task
+            return responses, gaps, elapsed
+
+        responses, gaps, elapsed = asyncio.run(scenario())
+
+        assert all(r.status_code == 200 for r in responses)
+        # Если бы bcrypt выполнялся в event loop, самая длинная пауза была бы
+        # сопоставима с общим временем четырёх проверок
+        assert max(gaps) < elapsed / 2
@@ -0,0 +1,28 @@
+# deltica/backend/tests/test_backup_export.py
+
+import openpyxl
+
+from backend.services.backup import BackupService
+from backend.services.equipment_registry import EquipmentRegistryService
+
+
+def test_export_with_null_text_columns(db_session, test_equipment, tmp_path, monkeypatch):
+    """
+    Оборудование без верификации и ответственных: текстовые колонки пустые (NULL).
+
+    В pandas 3 astype(str) оставляет пропуски как NaN, и len() падал с
+    TypeError. Длина значений считается через map(str).
+    """
+    monkeypatch.setattr(BackupService, "BACKUP_DIR", tmp_path)
+    EquipmentRegistryService(db_session).refresh([test_equipment.id])
+    db_session.commit()
+
+    file_path = BackupService().export_to_excel(db_session)
+
+    worksheet = openpyxl.load_workbook(file_path)["Оборудование"]
+    headers = [cell.value for cell in worksheet[1]]
+    row = dict(zip(headers, (cell.value for cell in worksheet[2])))
+    assert row["Наименование"] == "Тестовый манометр"
+    assert row["Ответственный"] is None
+    for column in worksheet.column_dimensions.values():
+        assert 0 < column.width <= 50
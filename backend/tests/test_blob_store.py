@@ -0,0 +1,135 @@
+# deltica/backend/tests/test_blob_store.py
+
+import pytest
+from io import BytesIO
+
+from backend.app.models import Equipment, EquipmentFile
+from backend.routes import files as files_routes
+from backend.services.main_table import MainTableService
+from backend.services.storage import BlobStore
+
+
+@pytest.fixture
+def second_equipment(db_session):
+    """Второе оборудование, к которому прикрепляют тот же сертификат."""
+    equipment = Equipment(
+        equipment_name="Тестовый термометр",
+        equipment_model="ТТ-10",
+        equipment_type="SI",
+        factory_number="67890",
+        inventory_number="INV-002",
+        equipment_year=2021
+    )
+    db_session.add(equipment)
+    db_session.commit()
+    db_session.refresh(equipment)
+    return equipment
+
+
+def upload(client, equipment_id, content=b"%PDF-1.4 shared certificate"):
+    response = client.post(
+        f"/files/upload/{equipment_id}",
+        files={"file": ("cert.pdf", BytesIO(content), "application/pdf")},
+        data={"file_type": "verification_docs"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestBlobStore:
+    """Тесты дедуплицирующего хранилища файлов."""
+
+    def test_shared_file_stored_once(self, client, test_equipment, second_equipment, temp_upload_dir):
+        """Один сертификат у двух приборов хранится на диске один раз."""
+        first = upload(client, test_equipment.id)
+        second = upload(client, second_equipment.id)
+
+        assert first["file_path"] == second["file_path"]
+        blobs = [path for path in (temp_upload_dir / "blobs").rglob("*") if path.is_file()]
+        assert len(blobs) == 1
+
+    def test_blob_kept_while_referenced(self, client, test_equipment, second_equipment, temp_upload_dir):
+        """Удаление одной ссылки не удаляет файл, удаление последней - удаляет."""
+        first = upload(client, test_equipment.id)
+        second = upload(client, second_equipment.id)
+        blob = temp_upload_dir / first["file_path"]
+
+        assert client.delete(f"/files/{first['id']}").status_code == 200
+        assert blob.exists()
+
+        assert client.delete(f"/files/{second['id']}").status_code == 200
+        assert not blob.exists()
+        assert not blob.parent.exists()
+
+    def test_view_after_partial_delete(self, client, test_equipment, second_equipment, temp_upload_dir):
+        """Оставшаяся запись по-прежнему отдаёт содержимое файла."""
+        content = b"%PDF-1.4 shared certificate"
+        first = upload(client, test_equipment.id, content)
+        second = upload(client, second_equipment.id, content)
+
+        client.delete(f"/files/{first['id']}")
+        response = client.get(f"/files/download/{second['id']}")
+
+        assert response.status_code == 200
+        assert response.content == content
+
+    def test_delete_equipment_releases_blobs(self, client, db_session, test_equipment, temp_upload_dir):
+        """Полное удаление оборудования удаляет файлы, на которые больше нет ссылок."""
+        uploaded = upload(client, test_equipment.id)
+        blob = temp_upload_dir / uploaded["file_path"]
+
+        assert MainTableService(db_session).delete_equipment_full(test_equipment.id)
+
+        assert db_session.query(EquipmentFile).count() == 0
+        assert not blob.exists()
+
+    def test_reference_count(self, client, db_session, test_equipment, second_equipment, temp_upload_dir):
+        uploaded = upload(client, test_equipment.id)
+        upload(client, second_equipment.id)
+
+        store = BlobStore(temp_upload_dir)
+        assert store.reference_count(db_session, uploaded["file_path"]) == 2
+        assert store.reference_count(db_session, "blobs/00/missing") == 0
+
+    def test_blob_kept_when_delete_rolled_back(self, client, db_session, test_equipment, temp_upload_dir):
+        """Файл удаляется только после commit: при откате запись и файл остаются."""
+        uploaded = upload(client, test_equipment.id)
+        blob = temp_upload_dir / uploaded["file_path"]
+        db_file = db_session.get(EquipmentFile, uploaded["id"])
+
+        db_session.delete(db_file)
+        assert BlobStore(temp_upload_dir).release(db_session, uploaded["file_path"])
+        assert blob.exists()
+        db_session.rollback()
+
+        assert db_session.get(EquipmentFile, uploaded["id"]) is not None
+        assert blob.exists()
+
+    def test_released_blob_rechecked_after_commit(self, client, db_session, test_equipment, second_equipment,
+                                                  temp_upload_dir):
+        """Если после commit удаления на blob сослалась новая запись, файл не удаляется."""
+        uploaded = upload(client, test_equipment.id)
+        blob = temp_upload_dir / uploaded["file_path"]
+        store = BlobStore(temp_upload_dir)
+
+        db_session.delete(db_session.get(EquipmentFile, uploaded["id"]))
+        assert store.release(db_session, uploaded["file_path"])
+        db_session.flush()
+        upload(client, second_equipment.id)
+        db_session.commit()
+
+        assert blob.exists()
+
+    def test_failed_upload_keeps_original_error(self, client, test_equipment, temp_upload_dir, monkeypatch):
+        """Ошибка очистки после неудачной загрузки не заслоняет исходную ошибку."""
+        def failing_publish(*args, **kwargs):
+            raise RuntimeError("commit failed")
+
+        def failing_release(*args, **kwargs):
+            raise RuntimeError("cleanup failed")
+
+        monkeypatch.setattr(files_routes.notification_bus, "publish", failing_publish)
+        monkeypatch.setattr(BlobStore, "release", failing_release)
+
+        with pytest.raises(RuntimeError, match="commit failed"):
+            upload(client, test_equipment.id)
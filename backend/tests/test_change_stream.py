@@ -0,0 +1,149 @@
+# deltica/backend/tests/test_change_stream.py
+
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from backend.app.models import Verification
+from backend.core.notifications import notification_bus
+from backend.services.change_stream import ChangeStream
+from backend.services.equipment_registry import EquipmentRegistryService
+from backend.tests.conftest import TestingAsyncSessionLocal
+
+
+def parse(message: str) -> dict:
+    """Поля сообщения SSE: id, event, data (JSON)"""
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+@pytest.fixture
+def registry_row(db_session, test_equipment):
+    """Оборудование в работе со сроком верификации verification_due (задаётся тестом)"""
+    def create(verification_due: date):
+        db_session.add(Verification(
+            equipment_id=test_equipment.id,
+            verification_type="verification",
+            verification_interval=12,
+            verification_date=verification_due - timedelta(days=365),
+            verification_due=verification_due,
+            verification_plan=verification_due,
+            verification_state="state_work",
+            status="status_fit",
+        ))
+        db_session.flush()
+        EquipmentRegistryService(db_session).refresh([test_equipment.id])
+        db_session.commit()
+        return test_equipment.id
+    return create
+
+
+async def open_stream(stream: ChangeStream, last_event_id=None):
+    messages = stream.stream(last_event_id)
+    assert await anext(messages) == "retry: 3000\n\n"
+    return messages
+
+
+def run(scenario):
+    """Выполнить сценарий с запущенной рассылкой на тестовой БД"""
+    async def main():
+        stream = ChangeStream(heartbeat=0.05)
+        stream.session_factory = TestingAsyncSessionLocal
+        stream.start()
+        try:
+            return await asyncio.wait_for(scenario(stream), timeout=10)
+        finally:
+            await stream.stop()
+    return asyncio.run(main())
+
+
+def test_changes_are_pushed_to_clients(registry_row):
+    equipment_id = registry_row(date.today() + timedelta(days=100))
+
+    async def scenario(stream):
+        messages = await open_stream(stream)
+        ready = parse(await anext(messages))
+        assert ready["event"] == "ready"
+
+        stream._on_notification("equipment", {"action": "updated", "ids": [equipment_id]})
+        upsert = parse(await anext(messages))
+        assert upsert["event"] == "upsert"
+        assert upsert["data"]["reason"] == "updated"
+        [row] = upsert["data"]["rows"]
+        assert row["equipment_id"] == equipment_id
+        assert row["status"] == "status_fit"
+
+        stream._on_notification("equipment", {"action": "archived", "ids": [equipment_id]})
+        stream._on_notification("files", {"action": "added", "equipment_id": equipment_id, "file_ids": [7]})
+        remove, files = parse(await anext(messages)), parse(await anext(messages))
+        assert (remove["event"], remove["data"]) == ("remove", {"ids": [equipment_id], "reason": "archived"})
+        assert files["event"] == "files"
+
+        # Без событий - пинг, соединение не простаивает
+        assert await anext(messages) == ": ping\n\n"
+        await messages.aclose()
+        return stream.client_count
+
+    assert run(scenario) == 0
+
+
+def test_reconnect_replays_missed_events():
+    async def scenario(stream):
+        messages = await open_stream(stream)
+        last_id = parse(await anext(messages))["id"]
+        for equipment_id in (1, 2):
+            stream._on_notification("equipment", {"action": "deleted", "ids": [equipment_id]})
+        missed = [parse(await anext(messages)) for _ in range(2)]
+        await messages.aclose()
+
+        replayed = await open_stream(stream, last_id)
+        assert [parse(await anext(replayed)) for _ in range(2)] == missed
+        await replayed.aclose()
+
+        # Событие другого процесса или вытесненное из истории - перечитать таблицу
+        for unknown_id in ("other-1", f"{stream.epoch}-x"):
+            fresh = await open_stream(stream, unknown_id)
+            assert parse(await anext(fresh))["event"] == "resync"
+            await fresh.aclose()
+
+    run(scenario)
+
+
+def test_status_rollover_pushes_changed_rows(registry_row):
+    equipment_id = registry_row(date.today() - timedelta(days=1))
+
+    async def scenario(stream):
+        messages = await open_stream(stream)
+        await anext(messages)
+        # Вчера срок ещё не истёк
+        stream._today = date.today() - timedelta(days=1)
+        stream._on_notification("files", {"action": "reordered", "equipment_id": equipment_id})
+        rollover, files = parse(await anext(messages)), parse(await anext(messages))
+        assert rollover["data"]["reason"] == "status_rollover"
+        assert [(row["equipment_id"], row["status"]) for row in rollover["data"]["rows"]] == [
+            (equipment_id, "status_expired")
+        ]
+        assert files["event"] == "files"
+        await messages.aclose()
+
+    run(scenario)
+
+
+def test_file_upload_publishes_event(client, test_equipment, temp_upload_dir, sample_pdf_file, monkeypatch):
+    received = []
+    monkeypatch.setitem(notification_bus._handlers, "files", [received.append])
+    filename, content, mime = sample_pdf_file
+
+    response = client.post(
+        f"/files/upload/{test_equipment.id}",
+        files={"file": (filename, content, mime)},
+        data={"file_type": "general_docs"},
+    )
+
+    assert response.status_code == 200
+    assert received == [
+        {"action": "added", "equipment_id": test_equipment.id, "file_ids": [response.json()["id"]]}
+    ]
@@ -0,0 +1,113 @@
+# deltica/backend/tests/test_db_metrics.py
+
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from backend.app.models import EquipmentFile
+from backend.core import database
+from backend.core.db_metrics import (
+    current_request_stats,
+    finish_request_stats,
+    instrument_engine,
+    start_request_stats,
+)
+
+
+def http_request_records(caplog):
+    return [r for r in caplog.records if getattr(r, "event", None) == "http_request"]
+
+
+class TestDbMetrics:
+    """Тесты подсчёта запросов и времени БД на запрос."""
+
+    def test_counts_queries_and_time(self):
+        engine = create_engine("sqlite:///:memory:")
+        instrument_engine(engine)
+        instrument_engine(engine)  # повторное подключение не удваивает счётчики
+
+        token = start_request_stats()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        stats = finish_request_stats(token)
+
+        assert stats.queries == 2
+        assert stats.time_ns > 0
+        assert current_request_stats() is None
+
+    def test_failed_query_counted(self):
+        engine = create_engine("sqlite:///:memory:")
+        instrument_engine(engine)
+
+        token = start_request_stats()
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+        stats = finish_request_stats(token)
+
+        assert stats.queries == 2
+
+    def test_no_request_no_stats(self):
+        engine = create_engine("sqlite:///:memory:")
+        instrument_engine(engine)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert current_request_stats() is None
+
+    def test_statement_timeout_connect_args(self, monkeypatch):
+        monkeypatch.setattr(database.settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+        assert database._connect_args() == {"options": "-c statement_timeout=5000"}
+
+        monkeypatch.setattr(database.settings, "DB_STATEMENT_TIMEOUT_MS", 0)
+        assert database._connect_args() == {}
+
+    def test_engine_pool_settings(self):
+        assert database.engine.pool._pre_ping == database.settings.DB_POOL_PRE_PING
+        assert database.engine.pool._recycle == database.settings.DB_POOL_RECYCLE
+        assert database.engine.pool.size() == database.settings.DB_POOL_SIZE
+
+
+class TestRequestLog:
+    """Статистика БД попадает в запись лога LoggingMiddleware."""
+
+    def test_async_endpoint(self, client, test_equipment, caplog):
+        caplog.set_level(logging.INFO)
+
+        response = client.get(f"/files/equipment/{test_equipment.id}")
+
+        assert response.status_code == 200
+        record = http_request_records(caplog)[-1]
+        assert record.db_queries == 2  # проверка оборудования + список файлов
+        assert record.db_time_ms >= 0
+
+    def test_sync_endpoint(self, client, db_session, test_equipment, caplog):
+        db_file = EquipmentFile(
+            equipment_id=test_equipment.id, file_name="a.pdf", file_path="blobs/aa/a",
+            file_type="general_docs", file_size=1, sort_order=0
+        )
+        db_session.add(db_file)
+        db_session.commit()
+        caplog.set_level(logging.INFO)
+
+        response = client.put(
+            f"/files/equipment/{test_equipment.id}/reorder",
+            json={"file_ids": [db_file.id]}
+        )
+
+        assert response.status_code == 200
+        record = http_request_records(caplog)[-1]
+        assert record.db_queries == 3  # проверка оборудования + UPDATE + итоговый список
+
+    def test_request_without_db(self, client, caplog):
+        caplog.set_level(logging.INFO)
+
+        client.get("/health/")
+
+        record = http_request_records(caplog)[-1]
+        assert record.db_queries == 0
+        assert record.db_time_ms == 0
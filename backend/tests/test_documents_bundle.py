@@ -0,0 +1,199 @@
+# deltica/backend/tests/test_documents_bundle.py
+
+import io
+import zipfile
+import pytest
+from types import SimpleNamespace
+
+from backend.core.main import app
+from backend.app.models import EquipmentFile
+from backend.services.bundle import BundleEntry, BundleService
+from backend.utils.auth import get_current_user
+from backend.utils.http_range import parse_range_header, slice_stream
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def auth_client(client):
+    """TestClient с подменой текущего пользователя."""
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+        username="tester", role="laborant", is_active=True
+    )
+    yield client
+
+
+@pytest.fixture
+def equipment_with_files(db_session, test_equipment, temp_upload_dir):
+    """Оборудование с действующим сертификатом и общим документом на диске."""
+    equipment_dir = temp_upload_dir / f"equipment_{test_equipment.id}"
+    equipment_dir.mkdir(parents=True)
+
+    certificate = equipment_dir / "cert.pdf"
+    certificate.write_bytes(b"%PDF-1.4 certificate" * 1000)
+    manual = equipment_dir / "manual.doc"
+    manual.write_bytes(b"manual text " * 5000)
+
+    db_session.add_all([
+        EquipmentFile(
+            equipment_id=test_equipment.id,
+            file_name="Свидетельство.pdf",
+            file_path=f"equipment_{test_equipment.id}/cert.pdf",
+            file_type="verification_docs",
+            file_size=certificate.stat().st_size,
+            is_active_certificate=True
+        ),
+        EquipmentFile(
+            equipment_id=test_equipment.id,
+            file_name="Руководство.doc",
+            file_path=f"equipment_{test_equipment.id}/manual.doc",
+            file_type="general_docs",
+            file_size=manual.stat().st_size,
+            is_active_certificate=False
+        ),
+    ])
+    db_session.commit()
+    return test_equipment
+
+
+class TestRangeHelpers:
+    """Тесты разбора заголовка Range."""
+
+    def test_no_header(self):
+        assert parse_range_header(None, 100) is None
+
+    def test_open_range(self):
+        assert parse_range_header("bytes=10-", 100) == (10, 99)
+
+    def test_closed_range_clamped(self):
+        assert parse_range_header("bytes=10-500", 100) == (10, 99)
+
+    def test_suffix_range(self):
+        assert parse_range_header("bytes=-20", 100) == (80, 99)
+
+    def test_multiple_ranges_ignored(self):
+        assert parse_range_header("bytes=0-1,5-6", 100) is None
+
+    def test_unsatisfiable(self):
+        with pytest.raises(HTTPException) as exc:
+            parse_range_header("bytes=200-", 100)
+        assert exc.value.status_code == 416
+
+    def test_slice_stream(self):
+        chunks = [b"abc", b"defg", b"hij"]
+        assert b"".join(slice_stream(chunks, 2, 7)) == b"cdefgh"
+
+
+class TestBundleDownload:
+    """Интеграционные тесты ZIP-архива документов."""
+
+    def test_bundle_contains_active_certificate(self, auth_client, equipment_with_files):
+        response = auth_client.get(
+            "/documents/bundle",
+            params={"equipment_ids": [equipment_with_files.id], "kinds": ["active_certificate"]}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert response.headers["accept-ranges"] == "bytes"
+
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        names = archive.namelist()
+        assert len(names) == 1
+        assert names[0].endswith("Свидетельство.pdf")
+        assert archive.read(names[0]).startswith(b"%PDF-1.4")
+
+    def test_bundle_post_with_several_kinds(self, auth_client, equipment_with_files):
+        response = auth_client.post(
+            "/documents/bundle",
+            json={
+                "equipment_ids": [equipment_with_files.id],
+                "kinds": ["active_certificate", "general_docs"]
+            }
+        )
+
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert len(archive.namelist()) == 2
+        assert archive.testzip() is None
+
+    def test_bundle_resume_with_range(self, auth_client, equipment_with_files):
+        params = {"equipment_ids": [equipment_with_files.id], "kinds": ["active_certificate", "general_docs"]}
+        full = auth_client.get("/documents/bundle", params=params)
+        etag = full.headers["etag"]
+
+        partial = auth_client.get(
+            "/documents/bundle",
+            params=params,
+            headers={"Range": "bytes=1000-", "If-Range": etag}
+        )
+
+        assert partial.status_code == 206
+        assert partial.headers["content-range"] == f"bytes 1000-{len(full.content) - 1}/{len(full.content)}"
+        assert partial.content == full.content[1000:]
+
+    def test_bundle_range_generates_archive_once(self, auth_client, equipment_with_files, monkeypatch):
+        """Размер для Content-Range вычисляется без холостого формирования архива."""
+        params = {"equipment_ids": [equipment_with_files.id], "kinds": ["active_certificate", "general_docs"]}
+        etag = auth_client.get("/documents/bundle", params=params).headers["etag"]
+        calls = []
+        iter_zip = BundleService.iter_zip
+        monkeypatch.setattr(BundleService, "iter_zip", staticmethod(lambda *args: calls.append(1) or iter_zip(*args)))
+
+        partial = auth_client.get("/documents/bundle", params=params, headers={"Range": "bytes=10-", "If-Range": etag})
+
+        assert partial.status_code == 206
+        assert len(calls) == 1
+
+    def test_bundle_with_labels_is_reproducible(self, auth_client, equipment_with_files, isolated_render_cache):
+        """Этикетки из кэша не меняют ETag и байты архива; их копии удаляются после записи."""
+        params = {"equipment_ids": [equipment_with_files.id], "kinds": ["label", "active_certificate"]}
+        first = auth_client.get("/documents/bundle", params=params)
+        second = auth_client.get("/documents/bundle", params=params)
+
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.content == second.content
+
+        partial = auth_client.get(
+            "/documents/bundle", params=params,
+            headers={"Range": "bytes=100-", "If-Range": first.headers["etag"]}
+        )
+        assert partial.status_code == 206
+        assert partial.content == first.content[100:]
+        assert list(isolated_render_cache.output_dir.glob("cached_*")) == []
+
+    def test_archive_size_matches_generated_archive(self, tmp_path):
+        """archive_size() совпадает с длиной архива, в том числе для имён не в ASCII."""
+        entries = []
+        for index, (name, size) in enumerate([("label.docx", 0), ("Свидетельство.pdf", 70000), ("a.doc", 5)]):
+            path = tmp_path / f"file{index}"
+            path.write_bytes(b"x" * size)
+            entries.append(BundleEntry(arcname=f"1_INV/{name}", path=path))
+
+        for count in range(len(entries) + 1):
+            archive = b"".join(BundleService.iter_zip(entries[:count]))
+            assert BundleService.archive_size(entries[:count]) == len(archive)
+
+    def test_bundle_range_ignored_for_stale_etag(self, auth_client, equipment_with_files):
+        response = auth_client.get(
+            "/documents/bundle",
+            params={"equipment_ids": [equipment_with_files.id], "kinds": ["active_certificate"]},
+            headers={"Range": "bytes=10-", "If-Range": '"stale"'}
+        )
+
+        assert response.status_code == 200
+
+    def test_bundle_unknown_kind(self, auth_client, equipment_with_files):
+        response = auth_client.get(
+            "/documents/bundle",
+            params={"equipment_ids": [equipment_with_files.id], "kinds": ["passport"]}
+        )
+
+        assert response.status_code == 400
+
+    def test_bundle_nothing_found(self, auth_client, temp_upload_dir):
+        response = auth_client.get(
+            "/documents/bundle",
+            params={"equipment_ids": [99999], "kinds": ["active_certificate"]}
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,165 @@
+# deltica/backend/tests/test_equipment_registry.py
+
+from datetime import date
+
+import pytest
+from sqlalchemy import select, text
+
+from backend.app.models import Equipment, EquipmentRegistry, Finance, Responsibility, Verification
+from backend.app.schemas import MainTableUpdate
+from backend.services.archive import ArchiveService
+from backend.services.equipment_registry import EquipmentRegistryService
+from backend.services.main_table import MainTableService
+
+
+@pytest.fixture
+def registry(db_session):
+    return EquipmentRegistryService(db_session)
+
+
+@pytest.fixture
+def full_equipment(db_session):
+    """Оборудование со всеми связанными записями (verification_due в SQLite задаётся явно)"""
+    equipment = Equipment(
+        equipment_name="Манометр образцовый", equipment_model="МО-250", equipment_type="SI",
+        factory_number="12345", inventory_number="INV-001", equipment_year=2020
+    )
+    db_session.add(equipment)
+    db_session.flush()
+    db_session.add_all([
+        Verification(
+            equipment_id=equipment.id, verification_type="verification", verification_interval=12,
+            verification_date=date(2024, 1, 15), verification_due=date(2025, 1, 14),
+            verification_plan=date(2025, 1, 1), verification_state="state_storage", status="status_storage"
+        ),
+        Responsibility(
+            equipment_id=equipment.id, department="Лаборатория", responsible_person="Иванов И.И.",
+            verifier_org="ЦСМ"
+        ),
+        Finance(equipment_model_id=equipment.id, budget_item="01.02.03.4", quantity=1, total_cost=1500.0),
+    ])
+    db_session.commit()
+    return equipment
+
+
+def _registry_row(db_session, equipment_id):
+    return db_session.execute(
+        select(EquipmentRegistry).where(EquipmentRegistry.equipment_id == equipment_id)
+    ).scalar_one_or_none()
+
+
+def test_rebuild_projects_one_row_per_equipment(db_session, registry, full_equipment):
+    bare = Equipment(
+        equipment_name="Термометр", equipment_model="ТЛ-4", equipment_type="IO",
+        factory_number="777", inventory_number="INV-002", equipment_year=2019
+    )
+    db_session.add(bare)
+    db_session.commit()
+
+    assert registry.rebuild() == 2
+
+    row = _registry_row(db_session, full_equipment.id)
+    assert row.equipment_name == "Манометр образцовый"
+    assert row.verification_due == date(2025, 1, 14)
+    assert row.department == "Лаборатория"
+    assert row.total_cost == 1500.0
+    # Оборудование без связанных записей попадает в проекцию с пустыми полями
+    bare_row = _registry_row(db_session, bare.id)
+    assert bare_row.verification_type is None and bare_row.budget_item is None
+
+
+def test_check_detects_and_repairs_drift(db_session, registry, full_equipment):
+    registry.rebuild()
+    db_session.commit()
+    assert registry.check().ok
+
+    # Изменения в обход сервисов: правка связанной таблицы, новая запись, строка без оборудования
+    db_session.execute(text("UPDATE responsibility SET department = 'Склад'"))
+    db_session.execute(text(
+        "INSERT INTO equipment (equipment_name, equipment_model, equipment_type, factory_number, "
+        "inventory_number, equipment_year) VALUES ('Весы', 'ВЛ-1', 'SI', '1', 'INV-003', 2021)"
+    ))
+    db_session.execute(text(
+        "INSERT INTO equipment_registry (equipment_id, equipment_name, equipment_model, equipment_type, "
+        "factory_number, inventory_number, equipment_year) VALUES (999, 'x', 'x', 'SI', 'x', 'x', 2000)"
+    ))
+    new_id = db_session.execute(text("SELECT id FROM equipment WHERE inventory_number = 'INV-003'")).scalar()
+
+    report = registry.check()
+
+    assert not report.ok
+    assert report.missing == [new_id]
+    assert report.orphaned == [999]
+    assert report.mismatched == {full_equipment.id: ["department"]}
+
+    assert registry.repair(report) == 3
+    assert registry.check().ok
+    assert _registry_row(db_session, full_equipment.id).department == "Склад"
+
+
+def test_duplicate_relations_use_first_row_and_are_reported(db_session, registry, full_equipment):
+    db_session.add(Responsibility(
+        equipment_id=full_equipment.id, department="Дубль", responsible_person="Петров П.П.", verifier_org="ЦСМ"
+    ))
+    db_session.commit()
+
+    registry.rebuild()
+    report = registry.check()
+
+    assert report.ok
+    assert report.duplicates == {"responsibility": [full_equipment.id]}
+    assert _registry_row(db_session, full_equipment.id).department == "Лаборатория"
+
+
+def test_service_write_paths_keep_projection_in_sync(db_session, registry, full_equipment):
+    registry.rebuild()
+    db_session.commit()
+    service = MainTableService(db_session)
+
+    current = service.get_equipment_full_by_id(full_equipment.id)
+    current.update(department="Отдел главного метролога", total_cost=2000.0)
+    service.update_equipment_full(full_equipment.id, MainTableUpdate(**current))
+    row = _registry_row(db_session, full_equipment.id)
+    db_session.refresh(row)
+    assert (row.department, row.total_cost) == ("Отдел главного метролога", 2000.0)
+    assert [item.department for item in service.get_all_data()] == ["Отдел главного метролога"]
+
+    archived = ArchiveService(db_session).archive_equipment(full_equipment.id)
+    assert _registry_row(db_session, full_equipment.id) is None
+
+    restored = ArchiveService(db_session).restore_equipment(archived.id)
+    assert _registry_row(db_session, restored.id).department == "Отдел главного метролога"
+
+    assert service.delete_equipment_full(restored.id)
+    assert service.get_all_data() == []
+    assert registry.check().ok
+
+
+def test_orm_writes_outside_services_refresh_projection(db_session, registry, full_equipment):
+    """Правки исходных таблиц через ORM в обход сервисов попадают в проекцию при commit"""
+    assert _registry_row(db_session, full_equipment.id).department == "Лаборатория"
+
+    verification = db_session.query(Verification).filter_by(equipment_id=full_equipment.id).one()
+    verification.status = "status_expired"
+    db_session.delete(db_session.query(Responsibility).filter_by(equipment_id=full_equipment.id).one())
+    db_session.query(Finance).filter_by(equipment_model_id=full_equipment.id).one().total_cost = 3000.0
+    bare = Equipment(
+        equipment_name="Весы", equipment_model="ВЛ-1", equipment_type="SI",
+        factory_number="1", inventory_number="INV-003", equipment_year=2021
+    )
+    db_session.add(bare)
+    db_session.commit()
+
+    row = _registry_row(db_session, full_equipment.id)
+    db_session.refresh(row)
+    assert (row.status, row.department, row.total_cost) == ("status_expired", None, 3000.0)
+    assert _registry_row(db_session, bare.id).equipment_name == "Весы"
+    assert registry.check().ok
+
+    # Откат не оставляет отметок: следующий commit не пересобирает чужие строки
+    verification.status = "status_storage"
+    db_session.flush()
+    db_session.rollback()
+    db_session.commit()
+    assert db_session.get(Verification, verification.id).status == "status_expired"
+    assert registry.check().ok
@@ -0,0 +1,125 @@
+# deltica/backend/tests/test_files_range.py
+
+import hashlib
+import pytest
+from io import BytesIO
+
+from backend.app.models import EquipmentFile
+
+
+@pytest.fixture
+def uploaded_pdf(client, test_equipment, temp_upload_dir):
+    """Загруженный PDF размером ~100 КБ."""
+    content = b"%PDF-1.4\n" + bytes(range(256)) * 400
+    response = client.post(
+        f"/files/upload/{test_equipment.id}",
+        files={"file": ("scan.pdf", BytesIO(content), "application/pdf")},
+        data={"file_type": "verification_docs"}
+    )
+    assert response.status_code == 200
+    return response.json(), content
+
+
+class TestConditionalAndRangeRequests:
+    """Тесты ETag, 304 и частичной загрузки файлов."""
+
+    @pytest.mark.parametrize("endpoint", ["view", "download"])
+    def test_strong_etag_from_hash(self, client, uploaded_pdf, endpoint):
+        data, content = uploaded_pdf
+
+        response = client.get(f"/files/{endpoint}/{data['id']}")
+
+        assert response.status_code == 200
+        assert response.content == content
+        assert response.headers["etag"] == f'"{hashlib.sha256(content).hexdigest()}"'
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "max-age" in response.headers["cache-control"]
+
+    def test_not_modified(self, client, uploaded_pdf):
+        data, _ = uploaded_pdf
+        etag = client.get(f"/files/view/{data['id']}").headers["etag"]
+
+        response = client.get(f"/files/view/{data['id']}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_not_modified_weak_and_list(self, client, uploaded_pdf):
+        data, _ = uploaded_pdf
+        etag = client.get(f"/files/view/{data['id']}").headers["etag"]
+
+        response = client.get(
+            f"/files/view/{data['id']}",
+            headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+
+        assert response.status_code == 304
+
+    def test_stale_etag_returns_full_file(self, client, uploaded_pdf):
+        data, content = uploaded_pdf
+
+        response = client.get(f"/files/view/{data['id']}", headers={"If-None-Match": '"stale"'})
+
+        assert response.status_code == 200
+        assert response.content == content
+
+    def test_range_request(self, client, uploaded_pdf):
+        data, content = uploaded_pdf
+
+        response = client.get(f"/files/view/{data['id']}", headers={"Range": "bytes=1000-1999"})
+
+        assert response.status_code == 206
+        assert response.content == content[1000:2000]
+        assert response.headers["content-range"] == f"bytes 1000-1999/{len(content)}"
+
+    def test_if_range_with_current_etag(self, client, uploaded_pdf):
+        data, content = uploaded_pdf
+        etag = client.get(f"/files/view/{data['id']}").headers["etag"]
+
+        response = client.get(
+            f"/files/view/{data['id']}",
+            headers={"Range": "bytes=-100", "If-Range": etag}
+        )
+
+        assert response.status_code == 206
+        assert response.content == content[-100:]
+
+    def test_if_range_with_stale_etag(self, client, uploaded_pdf):
+        data, content = uploaded_pdf
+
+        response = client.get(
+            f"/files/view/{data['id']}",
+            headers={"Range": "bytes=0-9", "If-Range": '"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.content == content
+
+    def test_unsatisfiable_range(self, client, uploaded_pdf):
+        data, content = uploaded_pdf
+
+        response = client.get(f"/files/view/{data['id']}", headers={"Range": f"bytes={len(content)}-"})
+
+        assert response.status_code == 416
+
+    def test_legacy_file_without_hash(self, client, db_session, test_equipment, temp_upload_dir):
+        """Для файлов без хеша ETag строится по размеру и времени изменения."""
+        legacy_dir = temp_upload_dir / f"equipment_{test_equipment.id}"
+        legacy_dir.mkdir(parents=True)
+        (legacy_dir / "old.pdf").write_bytes(b"%PDF-1.4 legacy")
+        db_file = EquipmentFile(
+            equipment_id=test_equipment.id,
+            file_name="old.pdf",
+            file_path=f"equipment_{test_equipment.id}/old.pdf",
+            file_type="general_docs",
+            file_size=15
+        )
+        db_session.add(db_file)
+        db_session.commit()
+
+        first = client.get(f"/files/view/{db_file.id}")
+        second = client.get(f"/files/view/{db_file.id}", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
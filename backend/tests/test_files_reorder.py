@@ -0,0 +1,110 @@
+# deltica/backend/tests/test_files_reorder.py
+
+import pytest
+from sqlalchemy import event
+
+from backend.app.models import Equipment, EquipmentFile
+
+
+@pytest.fixture
+def equipment_files(db_session, test_equipment):
+    """Пять файлов оборудования в исходном порядке."""
+    files = [
+        EquipmentFile(
+            equipment_id=test_equipment.id,
+            file_name=f"doc{i}.pdf",
+            file_path=f"blobs/0{i}/doc{i}",
+            file_type="general_docs",
+            file_size=100,
+            sort_order=i
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(files)
+    db_session.commit()
+    return [db_file.id for db_file in files]
+
+
+class TestReorderFiles:
+    """Тесты изменения порядка файлов."""
+
+    def test_reorder(self, client, test_equipment, equipment_files):
+        new_order = list(reversed(equipment_files))
+
+        response = client.put(
+            f"/files/equipment/{test_equipment.id}/reorder",
+            json={"file_ids": new_order}
+        )
+
+        assert response.status_code == 200
+        files = response.json()["files"]
+        assert [f["id"] for f in files] == new_order
+        assert [f["sort_order"] for f in files] == list(range(5))
+
+    def test_foreign_files_untouched(self, client, db_session, test_equipment, equipment_files):
+        other = Equipment(
+            equipment_name="Другое", equipment_model="X", equipment_type="SI",
+            factory_number="999", inventory_number="INV-999", equipment_year=2020
+        )
+        db_session.add(other)
+        db_session.commit()
+        foreign = EquipmentFile(
+            equipment_id=other.id, file_name="foreign.pdf", file_path="blobs/ff/foreign",
+            file_type="general_docs", file_size=1, sort_order=7
+        )
+        db_session.add(foreign)
+        db_session.commit()
+
+        response = client.put(
+            f"/files/equipment/{test_equipment.id}/reorder",
+            json={"file_ids": [foreign.id] + equipment_files}
+        )
+
+        assert response.status_code == 200
+        assert foreign.id not in [f["id"] for f in response.json()["files"]]
+        db_session.expire_all()
+        assert db_session.get(EquipmentFile, foreign.id).sort_order == 7
+
+    def test_single_update_statement(self, client, db_session, test_equipment, equipment_files):
+        equipment_id = test_equipment.id
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.strip().split()[0].upper())
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.put(
+                f"/files/equipment/{equipment_id}/reorder",
+                json={"file_ids": list(reversed(equipment_files))}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        assert statements.count("UPDATE") == 1
+        assert statements.count("SELECT") == 2  # проверка оборудования + итоговый список
+
+    def test_duplicate_ids_last_wins(self, client, test_equipment, equipment_files):
+        first, second, third = equipment_files[:3]
+
+        response = client.put(
+            f"/files/equipment/{test_equipment.id}/reorder",
+            json={"file_ids": [first, second, first, third]}
+        )
+
+        assert response.status_code == 200
+        sort_orders = {f["id"]: f["sort_order"] for f in response.json()["files"]}
+        assert (sort_orders[first], sort_orders[second], sort_orders[third]) == (2, 1, 3)
+
+    def test_unknown_equipment(self, client):
+        response = client.put("/files/equipment/99999/reorder", json={"file_ids": [1]})
+
+        assert response.status_code == 404
+
+    def test_empty_list(self, client, test_equipment, equipment_files):
+        response = client.put(f"/files/equipment/{test_equipment.id}/reorder", json={"file_ids": []})
+
+        assert response.status_code == 200
+        assert [f["id"] for f in response.json()["files"]] == equipment_files
@@ -0,0 +1,85 @@
+# deltica/backend/tests/test_files_streaming.py
+
+import hashlib
+import pytest
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from backend.app.models import EquipmentFile
+from backend.routes import files
+from backend.utils import uploads
+
+
+class TestStreamingUpload:
+    """Тесты потоковой загрузки файлов с ограниченным расходом памяти."""
+
+    def test_upload_stores_sha256(self, client, db_session, test_equipment, temp_upload_dir, sample_pdf_file):
+        """SHA-256 вычисляется на лету и сохраняется в БД."""
+        filename, content, mime_type = sample_pdf_file
+
+        response = client.post(
+            f"/files/upload/{test_equipment.id}",
+            files={"file": (filename, BytesIO(content), mime_type)},
+            data={"file_type": "general_docs"}
+        )
+
+        assert response.status_code == 200
+        db_file = db_session.query(EquipmentFile).filter(EquipmentFile.id == response.json()["id"]).first()
+        assert db_file.file_hash == hashlib.sha256(content).hexdigest()
+        assert db_file.file_size == len(content)
+
+    def test_upload_reads_in_chunks(self, client, test_equipment, temp_upload_dir, monkeypatch):
+        """Файл читается блоками фиксированного размера, а не целиком."""
+        monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 1024)
+        read_sizes = []
+        original_read = SpooledTemporaryFile.read
+
+        def tracking_read(self, size=-1):
+            read_sizes.append(size)
+            return original_read(self, size)
+
+        monkeypatch.setattr(SpooledTemporaryFile, "read", tracking_read)
+
+        content = b"%PDF-1.4\n" + b"x" * 10_000
+        response = client.post(
+            f"/files/upload/{test_equipment.id}",
+            files={"file": ("big.pdf", BytesIO(content), "application/pdf")},
+            data={"file_type": "general_docs"}
+        )
+
+        assert response.status_code == 200
+        assert read_sizes and all(size == 1024 for size in read_sizes)
+        stored = temp_upload_dir / response.json()["file_path"]
+        assert stored.read_bytes() == content
+
+    def test_oversized_upload_leaves_no_temp_files(self, client, test_equipment, temp_upload_dir, monkeypatch):
+        """Превышение лимита прерывает загрузку и удаляет временный файл."""
+        monkeypatch.setattr(files, "MAX_FILE_SIZE", 4096)
+
+        response = client.post(
+            f"/files/upload/{test_equipment.id}",
+            files={"file": ("big.pdf", BytesIO(b"x" * 10_000), "application/pdf")},
+            data={"file_type": "general_docs"}
+        )
+
+        assert response.status_code == 400
+        assert "слишком большой" in response.json()["detail"].lower()
+        assert [path for path in temp_upload_dir.rglob("*") if path.is_file()] == []
+
+    def test_same_content_is_stored_once(self, client, test_equipment, temp_upload_dir, sample_pdf_file):
+        """Повторная загрузка того же содержимого ссылается на один blob."""
+        filename, content, mime_type = sample_pdf_file
+        digest = hashlib.sha256(content).hexdigest()
+
+        paths = []
+        for _ in range(2):
+            response = client.post(
+                f"/files/upload/{test_equipment.id}",
+                files={"file": (filename, BytesIO(content), mime_type)},
+                data={"file_type": "general_docs"}
+            )
+            assert response.status_code == 200
+            paths.append(response.json()["file_path"])
+
+        assert paths[0] == paths[1] == f"blobs/{digest[:2]}/{digest}"
+        assert not list(temp_upload_dir.rglob("*.part"))
@@ -0,0 +1,117 @@
+# deltica/backend/tests/test_log_query.py
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.core.main import app
+from backend.services import log_query as log_query_module
+from backend.services.log_query import LogFilters, LogQueryService, read_lines_backward, time_key
+from backend.utils.auth import get_current_active_admin
+
+START = datetime(2025, 3, 1, 0, 0, 0)
+
+
+def write_log(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def make_record(minute, **extra):
+    moment = START + timedelta(minutes=minute)
+    record = {"timestamp": moment.isoformat() + "Z", "level": "INFO", "message": f"m{minute}"}
+    record.update(extra)
+    return record
+
+
+@pytest.fixture
+def logs_dir(tmp_path, monkeypatch):
+    # Маленькие блоки и контрольные точки, чтобы проверить границы на коротких файлах
+    monkeypatch.setattr(log_query_module, "READ_BLOCK", 64)
+    monkeypatch.setattr(log_query_module, "CHECKPOINT_BYTES", 256)
+    day1 = [make_record(m, event="http_request", user="ivan", path=f"/files/{m}") for m in range(0, 100)]
+    day2 = [make_record(m, event="login_failed" if m % 10 == 0 else "http_request", user="пётр")
+            for m in range(100, 200)]
+    write_log(tmp_path / "deltica.log.2025-03-01", day1)
+    write_log(tmp_path / "deltica.log", day2)
+    (tmp_path / "deltica.log.bak").write_text("not a log\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_read_lines_backward_offsets(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_query_module, "READ_BLOCK", 7)
+    path = tmp_path / "lines.log"
+    path.write_bytes(b"first\n\nsecond line\nthird\n")
+
+    with open(path, "rb") as f:
+        lines = list(read_lines_backward(f, 0, path.stat().st_size))
+        for offset, line in lines:
+            f.seek(offset)
+            assert f.read(len(line)) == line
+
+    assert [line for _, line in lines] == [b"third", b"second line", b"first"]
+
+
+def test_tail_continues_into_rotated_files(logs_dir):
+    service = LogQueryService(logs_dir)
+
+    lines = service.tail(105)
+
+    assert len(lines) == 105
+    assert json.loads(lines[0])["message"] == "m95"
+    assert json.loads(lines[-1])["message"] == "m199"
+
+
+def test_search_filters_and_paginates(logs_dir):
+    service = LogQueryService(logs_dir)
+    filters = LogFilters(event="login_failed", user="пётр")
+
+    first = service.search(filters, limit=6)
+    second = service.search(filters, limit=6, cursor=first.next_cursor)
+
+    messages = [r["message"] for r in first.records + second.records]
+    assert messages == [f"m{m}" for m in range(190, 99, -10)]
+    assert second.next_cursor is None
+
+    by_path = service.search(LogFilters(path="/files/4"), limit=100)
+    assert sorted(r["message"] for r in by_path.records) == ["m4"] + [f"m{m}" for m in range(40, 50)]
+
+    by_text = service.search(LogFilters(text="M15"), limit=100)
+    assert [r["message"] for r in by_text.records] == [f"m{m}" for m in range(159, 149, -1)] + ["m15"]
+
+
+def test_search_time_range_skips_files(logs_dir):
+    service = LogQueryService(logs_dir)
+    filters = LogFilters(
+        since=time_key(START + timedelta(minutes=150)),
+        until=time_key(START + timedelta(minutes=159)),
+    )
+
+    page = service.search(filters, limit=100)
+
+    assert [r["message"] for r in page.records] == [f"m{m}" for m in range(159, 149, -1)]
+    assert page.scanned_files == 1
+
+    with pytest.raises(ValueError):
+        service.search(filters, cursor="../../etc/passwd:0")
+
+
+def test_search_endpoint(client, logs_dir, monkeypatch):
+    monkeypatch.setattr(log_query_module.log_query, "_logs_dir", logs_dir)
+    monkeypatch.setattr(log_query_module.log_query, "_indexes", {})
+    app.dependency_overrides[get_current_active_admin] = lambda: None
+
+    response = client.get("/health/logs/search", params={
+        "event": "http_request", "user": "ivan", "since": "2025-03-01T01:00:00", "limit": 5,
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["message"] for r in data["records"]] == ["m99", "m98", "m97", "m96", "m95"]
+    assert data["next_cursor"].startswith("deltica.log.2025-03-01:")
+
+    tail = client.get("/health/logs", params={"limit": 3}).json()
+    assert tail["count"] == 3
+    assert client.get("/health/logs/search", params={"cursor": "bad"}).status_code == 400
@@ -0,0 +1,109 @@
+# deltica/backend/tests/test_logging_config.py
+
+import json
+import logging
+import queue
+import sys
+from datetime import date
+from logging.handlers import TimedRotatingFileHandler
+
+import pytest
+
+from backend.core import logging_config
+from backend.core.logging_config import BoundedQueueHandler, JSONFormatter
+
+
+def _record(msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def restore_logging():
+    """Вернуть штатную настройку логирования после теста"""
+    yield
+    logging_config.setup_logging()
+
+
+def test_json_formatter_serializes_any_extra_fields():
+    payload = json.loads(JSONFormatter().format(_record(
+        event="http_request", duration_ms=1.5, request_id="abc", day=date(2026, 1, 2), nested={"k": [1, 2]}
+    )))
+
+    assert payload["message"] == "hello world"
+    assert payload["event"] == "http_request"
+    assert payload["request_id"] == "abc"
+    assert payload["day"] == "2026-01-02"  # Не сериализуемые в JSON значения - строкой
+    assert payload["nested"] == {"k": [1, 2]}
+    assert payload["timestamp"].endswith("Z")
+    assert "args" not in payload and "msg" not in payload
+
+
+def test_json_formatter_includes_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+    payload = json.loads(JSONFormatter().format(record))
+
+    assert "ValueError: boom" in payload["exception"]
+
+
+def test_queue_handler_prepares_message_and_keeps_exc_info():
+    log_queue = queue.Queue()
+    handler = BoundedQueueHandler(log_queue)
+    try:
+        raise KeyError("x")
+    except KeyError:
+        record = _record()
+        record.exc_info = sys.exc_info()
+
+    handler.handle(record)
+    queued = log_queue.get_nowait()
+
+    assert (queued.msg, queued.args) == ("hello world", None)
+    assert queued.exc_info is not None
+    assert record.args == ("world",)  # Исходная запись не изменяется
+
+
+def test_queue_handler_drop_policy_counts_and_reports_dropped():
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, policy="drop")
+
+    for _ in range(4):
+        handler.handle(_record())
+    assert handler.dropped == 2
+
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.handle(_record())
+
+    assert log_queue.get_nowait().getMessage() == "hello world"
+    notice = log_queue.get_nowait()
+    assert notice.event == "log_records_dropped" and notice.dropped == 2
+
+
+def test_queue_handler_block_policy_waits_then_drops():
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, policy="block", block_timeout=0.01)
+
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.dropped == 1
+
+
+def test_setup_logging_routes_through_queue(tmp_path, monkeypatch, restore_logging):
+    monkeypatch.setattr(logging_config, "get_logs_dir", lambda: tmp_path)
+
+    root = logging_config.setup_logging(console=False)
+    logging.getLogger("test").info("queued", extra={"event": "check"})
+    listener = logging_config._listener
+    logging_config.stop_logging()
+
+    assert [type(handler) for handler in root.handlers] == [BoundedQueueHandler]
+    assert [type(handler) for handler in listener.handlers] == [TimedRotatingFileHandler]
+    lines = [json.loads(line) for line in (tmp_path / "deltica.log").read_text(encoding="utf-8").splitlines()]
+    assert {"message": "queued", "event": "check"}.items() <= lines[-1].items()
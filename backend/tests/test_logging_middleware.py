@@ -0,0 +1,69 @@
+# deltica/backend/tests/test_logging_middleware.py
+
+import logging
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.middleware.logging_middleware import LoggingMiddleware
+
+
+def http_request_records(caplog):
+    return [r for r in caplog.records if getattr(r, "event", None) == "http_request"]
+
+
+async def ping(request):
+    return JSONResponse({"ok": True})
+
+
+async def stream(request):
+    async def body():
+        for index in range(5):
+            yield f"chunk-{index};".encode()
+    return StreamingResponse(body(), media_type="text/plain")
+
+
+async def fail(request):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def mini_client():
+    app = Starlette(routes=[Route("/ping", ping), Route("/stream", stream), Route("/fail", fail)])
+    app.add_middleware(LoggingMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_logs_status_size_and_timing(mini_client, caplog):
+    caplog.set_level(logging.INFO)
+
+    response = mini_client.get("/ping")
+
+    record = http_request_records(caplog)[-1]
+    assert (record.method, record.path, record.status_code) == ("GET", "/ping", 200)
+    assert record.response_bytes == len(response.content)
+    assert record.duration_ms >= 0
+    assert (record.db_queries, record.user) == (0, "anonymous")
+
+
+def test_streaming_response_passes_through(mini_client, caplog):
+    caplog.set_level(logging.INFO)
+
+    with mini_client.stream("GET", "/stream") as response:
+        chunks = list(response.iter_bytes())
+
+    assert b"".join(chunks) == b"".join(f"chunk-{i};".encode() for i in range(5))
+    assert http_request_records(caplog)[-1].response_bytes == sum(len(chunk) for chunk in chunks)
+
+
+def test_unhandled_error_logged_as_500(mini_client, caplog):
+    caplog.set_level(logging.INFO)
+
+    response = mini_client.get("/fail")
+
+    assert response.status_code == 500
+    record = http_request_records(caplog)[-1]
+    assert (record.path, record.status_code) == ("/fail", 500)
@@ -0,0 +1,96 @@
+# deltica/backend/tests/test_metrics.py
+
+import pytest
+
+from backend.core.metrics import Counter, CounterFunction, GaugeFunction, Histogram, MetricsRegistry, _Metric, timed
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Запросы", ("route", "status")))
+    registry.register(GaugeFunction("pool", "Пул", ("state",), callback=lambda: [(("idle",), 3)]))
+    registry.register(CounterFunction("dropped_total", "Отброшено", callback=lambda: [((), 2)]))
+
+    requests.labels("/items/{id}", "200").inc()
+    requests.labels("/items/{id}", "200").inc(2)
+    requests.labels('a"b', "500").inc()
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/items/{id}",status="200"} 3' in text
+    assert 'requests_total{route="a\\"b",status="500"} 1' in text
+    assert 'pool{state="idle"} 3' in text
+    assert "# TYPE dropped_total counter\ndropped_total 2" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("latency_seconds", "Задержка", ("route",), buckets=(0.1, 1.0)))
+    child = histogram.labels("/x")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/x"} 3.65' in lines
+    assert 'latency_seconds_count{route="/x"} 4' in lines
+
+
+def test_labels_validation_and_duplicate_registration():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("c_total", "c", ("a",)))
+
+    with pytest.raises(ValueError):
+        counter.labels("x", "y")
+    with pytest.raises(ValueError):
+        registry.register(Counter("c_total", "c"))
+
+
+def test_metric_subclass_must_implement_abstract_methods():
+    class Incomplete(_Metric):
+        type_name = "gauge"
+
+        def samples(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Без _new_child")
+    with pytest.raises(TypeError):
+        GaugeFunction("pool", "Пул", ("state",)).labels("idle")
+
+
+def test_timed_decorator_and_failing_gauge():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("work_seconds", "Работа", ("kind",)))
+
+    def broken():
+        raise RuntimeError("source unavailable")
+    registry.register(GaugeFunction("broken", "Недоступный источник", callback=broken))
+
+    @timed(histogram, "label")
+    def work():
+        return 42
+
+    assert work() == 42
+    text = registry.render()
+    assert 'work_seconds_count{kind="label"} 1' in text
+    assert "# TYPE broken gauge" in text
+
+
+def test_metrics_endpoint_uses_route_templates(client, test_equipment):
+    client.get(f"/files/equipment/{test_equipment.id}")
+    client.get("/no-such-path")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/files/equipment/{equipment_id}",status="200"}' in text
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/files/equipment/{equipment_id}",le="+Inf"}' in text
+    assert "# TYPE db_pool_connections gauge" in text
+    assert f"/files/equipment/{test_equipment.id}\"" not in text
@@ -0,0 +1,89 @@
+# deltica/backend/tests/test_notifications.py
+
+import json
+import logging
+import time
+
+import pytest
+
+from backend.core import notifications
+from backend.core.logging_config import ForwardingHandler, start_log_receiver
+from backend.core.notifications import NotificationBus, notification_bus
+from backend.services import render_cache as render_cache_module
+from backend.services.main_table import MainTableService
+from backend.services.render_cache import RenderCache
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Подписка на тестовое событие глобальной шины (после теста удаляется)"""
+    received = []
+    monkeypatch.setitem(notification_bus._handlers, "test", [received.append])
+    return received
+
+
+def test_publish_dispatches_after_commit(db_session, events):
+    notification_bus.publish(db_session, "test", {"ids": [1]})
+    assert events == []
+
+    db_session.commit()
+    assert events == [{"ids": [1]}]
+
+    notification_bus.publish(db_session, "test", {"ids": [2]})
+    db_session.rollback()
+    db_session.commit()
+    assert events == [{"ids": [1]}]
+
+
+def test_receive_skips_own_events():
+    bus = NotificationBus("test_channel")
+    received = []
+    bus.subscribe("equipment", received.append)
+
+    bus._receive(bus._encode("equipment", {"ids": [1]}))
+    other = NotificationBus("test_channel")
+    bus._receive(other._encode("equipment", {"ids": [2]}))
+    bus._receive("not json")
+    bus._receive(json.dumps({"topic": "equipment"}))
+
+    assert received == [{"ids": [2]}]
+    assert bus.received == 1
+
+
+def test_large_event_is_truncated():
+    bus = NotificationBus("test_channel")
+
+    payload = json.loads(bus._encode("equipment", {"ids": list(range(5000))}))
+
+    assert payload["data"] == {"truncated": True}
+
+
+def test_delete_invalidates_render_cache(db_session, test_equipment, tmp_path, monkeypatch):
+    cache = RenderCache(tmp_path / "cache")
+    monkeypatch.setattr(render_cache_module, "render_cache", cache)
+    rendered = tmp_path / "label.docx"
+    rendered.write_bytes(b"docx")
+    key = "a" * 64
+    cache.put(key, rendered, [test_equipment.id])
+
+    assert MainTableService(db_session).delete_equipment_full(test_equipment.id)
+
+    assert cache.get(key) is None
+
+
+def test_forwarded_log_records_reach_main_process(caplog):
+    caplog.set_level(logging.INFO)
+    handler = ForwardingHandler("127.0.0.1", start_log_receiver())
+    record = logging.LogRecord("worker", logging.WARNING, __file__, 1, "Slow %s", ("request",), None)
+    record.event = "slow_request"
+
+    handler.handle(record)
+    handler.close()
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not any(r.name == "worker" for r in caplog.records):
+        time.sleep(0.01)
+    forwarded = [r for r in caplog.records if r.name == "worker"][-1]
+    assert forwarded.getMessage() == "Slow request"
+    assert forwarded.event == "slow_request"
+    assert forwarded.worker_pid == record.process
@@ -48,10 +48,24 @@ def pinned_db_session():
                 file_name VARCHAR NOT NULL,
                 file_path VARCHAR NOT NULL,
                 file_size INTEGER NOT NULL,
+                file_hash VARCHAR(64),
                 uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 uploaded_by VARCHAR NOT NULL
             )
         """))
+        # Таблицы файлов оборудования (нужны для подсчёта ссылок на blob'ы)
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS equipment_files (
+                id INTEGER PRIMARY KEY,
+                file_path VARCHAR NOT NULL
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS archived_equipment_files (
+                id INTEGER PRIMARY KEY,
+                file_path VARCHAR NOT NULL
+            )
+        """))
         conn.commit()
 
     db = TestingSessionLocal()
@@ -61,6 +75,8 @@ def pinned_db_session():
         db.close()
         with engine.connect() as conn:
             conn.execute(text("DROP TABLE IF EXISTS pinned_documents"))
+            conn.execute(text("DROP TABLE IF EXISTS equipment_files"))
+            conn.execute(text("DROP TABLE IF EXISTS archived_equipment_files"))
             conn.commit()
 
 
@@ -233,10 +249,10 @@ class TestPinnedDocumentsUpload:
         assert data["uploaded_by"] == "test_admin"
         assert "id" in data
         assert "uploaded_at" in data
-        assert "pinned_documents/" in data["file_path"]
+        assert data["file_path"].startswith("blobs/")
 
         # Проверяем, что файл создан на диске
-        file_path = temp_pinned_upload_dir / filename
+        file_path = temp_pinned_upload_dir / data["file_path"]
         assert file_path.exists()
         assert file_path.read_bytes() == sample_pdf_content
 
@@ -253,12 +269,12 @@ class TestPinnedDocumentsUpload:
         data = response.json()
         assert data["file_name"] == filename
 
-        # Файл должен быть создан с правильным именем
-        file_path = temp_pinned_upload_dir / filename
+        # Файл хранится по хешу содержимого, имя сохраняется только в БД
+        file_path = temp_pinned_upload_dir / data["file_path"]
         assert file_path.exists()
 
     def test_upload_duplicate_filename(self, client_as_admin, temp_pinned_upload_dir, sample_pdf_content):
-        """Загрузка файла с дублирующимся именем (должен добавиться суффикс)."""
+        """Повторная загрузка того же файла не создаёт копию на диске."""
         filename = "график.pdf"
 
         # Первая загрузка
@@ -277,9 +293,10 @@ class TestPinnedDocumentsUpload:
         assert response2.status_code == 200
         file_path_2 = response2.json()["file_path"]
 
-        # Пути должны быть разные (второй файл должен получить суффикс)
-        assert file_path_1 != file_path_2
-        assert "_1" in file_path_2
+        # Обе записи ссылаются на один blob
+        assert response1.json()["id"] != response2.json()["id"]
+        assert file_path_1 == file_path_2
+        assert len([path for path in temp_pinned_upload_dir.rglob("*") if path.is_file()]) == 1
 
     def test_upload_non_pdf_file(self, client_as_admin):
         """Загрузка не-PDF файла должна быть отклонена."""
@@ -532,7 +549,7 @@ class TestPinnedDocumentsDelete:
             files={"file": ("missing.pdf", BytesIO(sample_pdf_content), "application/pdf")}
         )
         doc_id = upload_response.json()["id"]
-        file_path = temp_pinned_upload_dir / "missing.pdf"
+        file_path = temp_pinned_upload_dir / upload_response.json()["file_path"]
 
         # Вручную удаляем файл с диска
         if file_path.exists():
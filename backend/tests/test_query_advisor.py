@@ -0,0 +1,84 @@
+# deltica/backend/tests/test_query_advisor.py
+
+import json
+
+from backend.services.query_advisor import QueryAdvisor, analyze_plan, compile_query
+from backend.services.storage import BlobStore
+
+
+def explain_result(plan, execution_ms=1.0):
+    return [{"Plan": plan, "Planning Time": 0.1, "Execution Time": execution_ms}]
+
+
+INDEX_PLAN = {
+    "Node Type": "Index Scan",
+    "Relation Name": "equipment_files",
+    "Actual Rows": 3,
+    "Actual Loops": 1,
+    "Shared Hit Blocks": 4,
+    "Shared Read Blocks": 1,
+}
+
+SEQ_PLAN = {
+    "Node Type": "Hash Join",
+    "Actual Rows": 10,
+    "Actual Loops": 1,
+    "Shared Hit Blocks": 900,
+    "Plans": [
+        {
+            "Node Type": "Seq Scan",
+            "Relation Name": "verification",
+            "Actual Rows": 10,
+            "Rows Removed by Filter": 19990,
+            "Actual Loops": 1,
+            "Filter": "(equipment_id = 5)",
+        },
+        {"Node Type": "Seq Scan", "Relation Name": "equipment", "Actual Rows": 1, "Actual Loops": 1},
+    ],
+}
+
+
+class TestAnalyzePlan:
+    """Тесты разбора EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)."""
+
+    def test_index_scan_is_ok(self):
+        report = analyze_plan("files", "SELECT 1", explain_result(INDEX_PLAN))
+
+        assert report.issues == []
+        assert report.shared_hit_blocks == 4
+        assert report.shared_read_blocks == 1
+
+    def test_large_seq_scan_reported(self):
+        report = analyze_plan("by_id", "SELECT 1", explain_result(SEQ_PLAN))
+
+        assert [scan.relation for scan in report.seq_scans] == ["verification"]
+        assert report.seq_scans[0].rows_scanned == 20000
+        assert "verification" in report.issues[0]
+
+    def test_full_scan_expected(self):
+        report = analyze_plan("all", "SELECT 1", explain_result(SEQ_PLAN), full_scan_expected=True)
+
+        assert report.seq_scans == []
+
+    def test_slow_query_and_json_text(self):
+        report = analyze_plan("slow", "SELECT 1", json.dumps(explain_result(INDEX_PLAN, 120.0)), slow_ms=50)
+
+        assert report.slow
+        assert report.issues == ["медленный запрос: 120.0 мс"]
+
+
+class TestServiceQueries:
+    """Запросы сервисов компилируются в SQL PostgreSQL."""
+
+    def test_reference_count_query(self):
+        sql = compile_query(BlobStore.reference_count_query("blobs/ab/abc"))
+
+        assert "UNION ALL" in sql
+        assert sql.count("'blobs/ab/abc'") == 3
+
+    def test_full_scan_queries_are_known(self, db_session):
+        queries = QueryAdvisor(db_session).service_queries()
+
+        assert QueryAdvisor.FULL_SCAN_QUERIES <= set(queries)
+        for statement in queries.values():
+            assert compile_query(statement).startswith("SELECT")
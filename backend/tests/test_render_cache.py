@@ -0,0 +1,255 @@
+# deltica/backend/tests/test_render_cache.py
+
+import zipfile
+import pytest
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+from backend.app.models import Equipment, Verification, Responsibility
+from backend.services import render_cache as render_cache_module
+from backend.services.render_cache import CHECKOUT_PREFIX, RenderCache
+from backend.core.main import app
+from backend.utils.auth import get_current_user
+from backend.services import documents as documents_module
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Кэш во временной директории."""
+    return RenderCache(tmp_path / "cache", max_entries=3)
+
+
+@pytest.fixture
+def template(tmp_path):
+    """Файл, играющий роль шаблона."""
+    path = tmp_path / "template_label.docx"
+    path.write_bytes(b"template v1")
+    return path
+
+
+def document_xml(path) -> bytes:
+    """Текст документа docx без метаданных архива."""
+    with zipfile.ZipFile(path) as document:
+        return document.read("word/document.xml")
+
+
+def _rendered(tmp_path, name, content=b"rendered"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+class TestRenderCacheKeys:
+    """Тесты вычисления ключей кэша."""
+
+    def test_same_context_same_key(self, cache, template):
+        context = {"equipment_name": "Манометр", "verification_due": "01.01.2026"}
+        assert cache.make_key(template, context) == cache.make_key(template, dict(context))
+
+    def test_different_context_different_key(self, cache, template):
+        key1 = cache.make_key(template, {"verification_due": "01.01.2026"})
+        key2 = cache.make_key(template, {"verification_due": "01.01.2027"})
+        assert key1 != key2
+
+    def test_template_change_changes_key(self, cache, template):
+        key1 = cache.make_key(template, {"a": 1})
+        template.write_bytes(b"template v2 with more bytes")
+        key2 = cache.make_key(template, {"a": 1})
+        assert key1 != key2
+
+
+class TestRenderCacheStorage:
+    """Тесты хранения и инвалидации документов."""
+
+    def test_miss_returns_none(self, cache):
+        assert cache.get("0" * 64) is None
+
+    def test_put_then_get(self, cache, template, tmp_path):
+        key = cache.make_key(template, {"a": 1})
+        rendered = _rendered(tmp_path, "out.docx", b"doc")
+
+        assert cache.put(key, rendered, [1]) == rendered
+        served = cache.get(key)
+        assert served.read_bytes() == b"doc"
+        assert served.parent == tmp_path
+        assert served != cache._entry_path(key)
+
+    def test_served_file_survives_invalidation(self, cache, template, tmp_path):
+        key = cache.make_key(template, {"a": 1})
+        cache.put(key, _rendered(tmp_path, "out.docx", b"doc"), [1])
+        served = cache.get(key)
+
+        cache.invalidate_equipment(1)
+        cache.clear()
+
+        assert served.read_bytes() == b"doc"
+
+    def test_release_removes_only_checkouts(self, cache, template, tmp_path):
+        key = cache.make_key(template, {"a": 1})
+        rendered = _rendered(tmp_path, "out.docx", b"doc")
+        cache.put(key, rendered, [1])
+        served = cache.get(key)
+
+        cache.release(served)
+        cache.release(rendered)
+
+        assert not served.exists()
+        assert rendered.exists()
+        assert cache.get(key).read_bytes() == b"doc"
+
+    def test_forgotten_checkouts_are_swept(self, cache, template, tmp_path, monkeypatch):
+        key = cache.make_key(template, {"a": 1})
+        cache.put(key, _rendered(tmp_path, "out.docx", b"doc"), [1])
+        forgotten = cache.get(key)
+
+        # Через CHECKOUT_TTL после выдачи (release() не вызывался)
+        issued = render_cache_module.time.time()
+        monkeypatch.setattr(render_cache_module.time, "time", lambda: issued + render_cache_module.CHECKOUT_TTL + 1)
+        served = cache.get(key)
+
+        assert not forgotten.exists()
+        assert served.exists()
+
+    def test_put_failure_returns_rendered_file(self, cache, template, tmp_path, monkeypatch):
+        def locked(*args):
+            raise PermissionError("file is in use")
+
+        monkeypatch.setattr(render_cache_module.os, "replace", locked)
+        key = cache.make_key(template, {"a": 1})
+        rendered = _rendered(tmp_path, "out.docx", b"doc")
+
+        assert cache.put(key, rendered, [1]) == rendered
+        assert rendered.read_bytes() == b"doc"
+        assert cache.get(key) is None
+        assert not list(cache.cache_dir.glob("*.tmp"))
+
+    def test_remove_tolerates_locked_file(self, cache, template, tmp_path, monkeypatch):
+        key = cache.make_key(template, {"a": 1})
+        cache.put(key, _rendered(tmp_path, "out.docx"), [1])
+
+        def locked(self, *args, **kwargs):
+            raise PermissionError("file is in use")
+
+        monkeypatch.setattr(render_cache_module.Path, "unlink", locked)
+        assert cache.invalidate_equipment(1) == 1
+        cache.clear()
+
+    def test_invalidate_equipment(self, cache, template, tmp_path):
+        key1 = cache.make_key(template, {"a": 1})
+        key2 = cache.make_key(template, {"a": 2})
+        cache.put(key1, _rendered(tmp_path, "one.docx"), [1])
+        cache.put(key2, _rendered(tmp_path, "two.docx"), [1, 2])
+
+        assert cache.invalidate_equipment(1) == 2
+        assert cache.get(key1) is None
+        assert cache.get(key2) is None
+        assert cache.invalidate_equipment(2) == 0
+
+    def test_index_rebuilt_from_disk(self, cache, template, tmp_path):
+        key = cache.make_key(template, {"a": 1})
+        cache.put(key, _rendered(tmp_path, "out.docx"), [7])
+
+        # Новый экземпляр (например, после перезапуска сервера)
+        restarted = RenderCache(cache.cache_dir)
+        assert restarted.invalidate_equipment(7) == 1
+        assert restarted.get(key) is None
+
+    def test_eviction_over_limit(self, cache, template, tmp_path):
+        keys = []
+        for i in range(5):
+            key = cache.make_key(template, {"i": i})
+            cache.put(key, _rendered(tmp_path, f"out_{i}.docx"), [i])
+            keys.append(key)
+
+        remaining = [key for key in keys if cache.get(key)]
+        assert len(remaining) == 3
+
+    def test_eviction_scans_only_over_limit(self, cache, template, tmp_path, monkeypatch):
+        scans = []
+        original_scandir = render_cache_module.os.scandir
+
+        def counting_scandir(path):
+            scans.append(path)
+            return original_scandir(path)
+
+        monkeypatch.setattr(render_cache_module.os, "scandir", counting_scandir)
+        for i in range(5):
+            cache.put(cache.make_key(template, {"i": i}), _rendered(tmp_path, f"out_{i}.docx"), [i])
+
+        # Загрузка индекса, первый подсчёт записей и две уборки при превышении лимита
+        assert len(scans) == 4
+        assert len(list(cache.cache_dir.glob("*.docx"))) == 3
+
+
+class TestDocumentServiceCache:
+    """Интеграция кэша с DocumentService."""
+
+    @pytest.fixture
+    def equipment(self, db_session):
+        equipment = Equipment(
+            equipment_name="Тестовый манометр",
+            equipment_model="МТ-100",
+            equipment_type="SI",
+            factory_number="12345",
+            inventory_number="INV-001",
+            equipment_year=2020
+        )
+        db_session.add(equipment)
+        db_session.flush()
+        db_session.add(Verification(
+            equipment_id=equipment.id,
+            verification_type="verification",
+            verification_interval=12,
+            verification_date=date(2025, 1, 10),
+            verification_plan=date(2026, 1, 1),
+            verification_state="state_work",
+            status="status_fit"
+        ))
+        db_session.add(Responsibility(
+            equipment_id=equipment.id,
+            department="gtl",
+            responsible_person="Иванов И.И.",
+            verifier_org="ЦСМ"
+        ))
+        db_session.commit()
+        return equipment
+
+    def test_repeat_label_is_served_from_cache(self, db_session, equipment, tmp_path, monkeypatch):
+        cache = RenderCache(tmp_path / "cache")
+        monkeypatch.setattr(documents_module, "render_cache", cache)
+
+        renders = []
+        original_render = documents_module.DocxTemplate.render
+
+        def counting_render(self, context, *args, **kwargs):
+            renders.append(context)
+            return original_render(self, context, *args, **kwargs)
+
+        monkeypatch.setattr(documents_module.DocxTemplate, "render", counting_render)
+
+        service = documents_module.DocumentService(db_session)
+        first = service.generate_label(equipment.id)
+        second = service.generate_label(equipment.id)
+
+        assert first != second  # Каждый запрос получает свой файл
+        assert Path(first).read_bytes() == Path(second).read_bytes()
+        assert len(renders) == 1
+
+        cache.invalidate_equipment(equipment.id)
+        third = service.generate_label(equipment.id)
+        assert len(renders) == 2
+        # Новый рендеринг: время записей внутри docx может отличаться, текст - нет
+        assert document_xml(third) == document_xml(first)
+
+    def test_label_checkout_removed_after_response(self, client, equipment, isolated_render_cache):
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+            username="tester", role="laborant", is_active=True
+        )
+        for _ in range(2):
+            response = client.get(f"/documents/label/{equipment.id}")
+            assert response.status_code == 200
+
+        # Второй ответ отдан из кэша, его копия удалена после отправки
+        assert list(isolated_render_cache.output_dir.glob(f"{CHECKOUT_PREFIX}*")) == []
+        assert list(isolated_render_cache.cache_dir.glob("*.docx"))
@@ -0,0 +1,77 @@
+# deltica/backend/tests/test_session_lifecycle.py
+
+import pytest
+
+from backend.app.models import Equipment, User
+from backend.core.database import READ_ONLY_KEY, ReadOnlySessionError, get_db, get_read_db
+from backend.core.main import app
+from backend.services.user_cache import UserCache
+from backend.utils import auth
+from backend.utils.auth import create_access_token
+
+
+@pytest.fixture
+def auth_headers(db_session, monkeypatch, tmp_path):
+    """Пользователь в тестовой БД и токен для него."""
+    engine = db_session.get_bind()
+    User.__table__.create(engine, checkfirst=True)
+    db_session.add(User(
+        username="sidorov",
+        password_hash="x",
+        full_name="Сидоров С.С.",
+        department="Лаборатория",
+        role="admin",
+        is_active=True
+    ))
+    db_session.commit()
+    monkeypatch.setattr(auth, "user_cache", UserCache(marker_path=tmp_path / ".users_changed"))
+
+    yield {"Authorization": f"Bearer {create_access_token({'sub': 'sidorov'})}"}
+
+    User.__table__.drop(engine)
+
+
+class TestSessionPerRequest:
+    """Одна сессия на запрос для эндпоинта и get_current_user."""
+
+    def test_single_session_per_request(self, client, db_session, auth_headers):
+        opened = []
+
+        def counting_get_db():
+            opened.append(db_session)
+            yield db_session
+
+        app.dependency_overrides[get_db] = counting_get_db
+
+        response = client.delete("/main-table/99999", headers=auth_headers)
+
+        assert response.status_code == 404
+        assert len(opened) == 1
+
+    def test_read_only_rejects_writes(self, db_session):
+        db_session.autoflush = True
+        dependency = get_read_db(db_session)
+        db = next(dependency)
+        assert db.info[READ_ONLY_KEY] is True
+        assert db.autoflush is False
+
+        db.add(Equipment(
+            equipment_name="X", equipment_model="X", equipment_type="SI",
+            factory_number="1", inventory_number="1", equipment_year=2020
+        ))
+        with pytest.raises(ReadOnlySessionError):
+            db.flush()
+        db.rollback()
+        dependency.close()
+
+        assert db_session.info[READ_ONLY_KEY] is False
+        assert db_session.autoflush is True
+
+    def test_read_only_endpoint_restores_session(self, client, db_session, test_equipment):
+        db_session.autoflush = True
+
+        response = client.get(f"/main-table/{test_equipment.id}/full")
+
+        assert response.status_code == 200
+        assert db_session.info[READ_ONLY_KEY] is False
+        assert db_session.autoflush is True
@@ -0,0 +1,169 @@
+# deltica/backend/tests/test_storage_scanner.py
+
+import hashlib
+import os
+import time
+import pytest
+from io import BytesIO
+
+from backend.app.models import EquipmentFile
+from backend.services.storage_scanner import StorageScanner, QUARANTINE_DIR
+
+
+def make_old(path, hours=2):
+    """Сдвинуть mtime файла в прошлое (за пределы grace-периода)."""
+    old = time.time() - hours * 3600
+    os.utime(path, (old, old))
+
+
+def upload(client, equipment_id, content):
+    response = client.post(
+        f"/files/upload/{equipment_id}",
+        files={"file": ("doc.pdf", BytesIO(content), "application/pdf")},
+        data={"file_type": "general_docs"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def scanner(db_session, temp_upload_dir):
+    return StorageScanner(db_session, root=temp_upload_dir, workers=4)
+
+
+class TestStorageScan:
+    """Тесты сверки хранилища с БД."""
+
+    def test_clean_storage(self, client, scanner, test_equipment):
+        upload(client, test_equipment.id, b"%PDF-1.4 one")
+        upload(client, test_equipment.id, b"%PDF-1.4 two")
+
+        report = scanner.scan()
+
+        assert report.files_scanned == 2
+        assert report.orphan_files == []
+        assert report.dangling_rows == []
+
+    def test_orphan_and_dangling(self, client, db_session, scanner, test_equipment, temp_upload_dir):
+        data = upload(client, test_equipment.id, b"%PDF-1.4 kept")
+        orphan = temp_upload_dir / "equipment_999" / "lost.pdf"
+        orphan.parent.mkdir(parents=True)
+        orphan.write_bytes(b"lost")
+        make_old(orphan)
+        db_session.add(EquipmentFile(
+            equipment_id=test_equipment.id,
+            file_name="gone.pdf",
+            file_path="blobs/00/gone",
+            file_type="general_docs",
+            file_size=1
+        ))
+        db_session.commit()
+
+        report = scanner.scan()
+
+        assert report.orphan_files == ["equipment_999/lost.pdf"]
+        assert [ref.file_path for ref in report.dangling_rows] == ["blobs/00/gone"]
+        assert data["file_path"] not in report.orphan_files
+
+    def test_recent_files_are_not_orphans(self, scanner, temp_upload_dir):
+        fresh = temp_upload_dir / "blobs" / "ab" / ("ab" + "0" * 62)
+        fresh.parent.mkdir(parents=True)
+        fresh.write_bytes(b"upload in progress")
+
+        assert scanner.scan().orphan_files == []
+        assert scanner.scan(grace_seconds=0).orphan_files == [fresh.relative_to(temp_upload_dir).as_posix()]
+
+    def test_quarantine_moves_orphans(self, scanner, temp_upload_dir):
+        orphan = temp_upload_dir / "equipment_5" / "old.pdf"
+        orphan.parent.mkdir(parents=True)
+        orphan.write_bytes(b"old")
+        make_old(orphan)
+
+        report = scanner.scan()
+        moved = scanner.quarantine(report.orphan_files)
+
+        assert moved == ["equipment_5/old.pdf"]
+        assert not orphan.exists()
+        assert list((temp_upload_dir / QUARANTINE_DIR).rglob("old.pdf"))
+        # Карантин не сканируется повторно
+        assert scanner.scan().orphan_files == []
+
+    def test_quarantine_skips_referenced(self, client, scanner, test_equipment, temp_upload_dir):
+        data = upload(client, test_equipment.id, b"%PDF-1.4 referenced")
+
+        assert scanner.quarantine([data["file_path"]]) == []
+        assert (temp_upload_dir / data["file_path"]).exists()
+
+    def test_quarantine_releases_lock_per_file(self, db_session, scanner, temp_upload_dir, monkeypatch):
+        paths = []
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            orphan = temp_upload_dir / "equipment_6" / name
+            orphan.parent.mkdir(parents=True, exist_ok=True)
+            orphan.write_bytes(b"old")
+            paths.append(f"equipment_6/{name}")
+
+        commits = []
+        locked_at = []
+        original_commit = db_session.commit
+        original_lock = scanner.store.lock
+        monkeypatch.setattr(db_session, "commit", lambda: (commits.append(1), original_commit()))
+        monkeypatch.setattr(
+            scanner.store, "lock",
+            lambda db, path: (locked_at.append(len(commits)), original_lock(db, path))
+        )
+
+        assert scanner.quarantine(paths) == paths
+        # Каждая блокировка берётся в новой транзакции
+        assert locked_at == [0, 1, 2]
+        assert len(commits) == 3
+
+
+class TestHashVerification:
+    """Тесты инкрементальной проверки хешей."""
+
+    def test_detects_corruption(self, client, scanner, test_equipment, temp_upload_dir):
+        good = upload(client, test_equipment.id, b"%PDF-1.4 good")
+        bad = upload(client, test_equipment.id, b"%PDF-1.4 bad")
+        (temp_upload_dir / bad["file_path"]).write_bytes(b"bit rot")
+
+        report = scanner.verify_hashes()
+
+        assert report.completed
+        assert report.files_verified == 2
+        assert [ref.id for ref in report.mismatches] == [bad["id"]]
+        assert good["id"] not in [ref.id for ref in report.mismatches]
+
+    def test_resumes_from_checkpoint(self, client, scanner, test_equipment):
+        ids = [upload(client, test_equipment.id, f"%PDF-1.4 {i}".encode())["id"] for i in range(5)]
+
+        first = scanner.verify_hashes(max_bytes=1)
+        assert not first.completed
+        assert first.files_verified == 1
+        assert scanner.load_checkpoint()["equipment_files"] == ids[0]
+
+        second = scanner.verify_hashes()
+        assert second.completed
+        assert second.files_verified == 4
+        assert not scanner.checkpoint_path.exists()
+
+    def test_budget_exhausted_on_last_file_completes(self, client, scanner, test_equipment):
+        contents = [f"%PDF-1.4 {i}".encode() for i in range(2)]
+        for content in contents:
+            upload(client, test_equipment.id, content)
+
+        report = scanner.verify_hashes(max_bytes=sum(map(len, contents)), batch_size=2)
+
+        assert report.completed
+        assert report.files_verified == 2
+        assert not scanner.checkpoint_path.exists()
+
+    def test_shared_blob_read_once(self, client, db_session, scanner, test_equipment):
+        content = b"%PDF-1.4 shared"
+        upload(client, test_equipment.id, content)
+        upload(client, test_equipment.id, content)
+
+        report = scanner.verify_hashes()
+
+        assert report.files_verified == 1
+        assert report.bytes_verified == len(content)
+        assert db_session.query(EquipmentFile).first().file_hash == hashlib.sha256(content).hexdigest()
@@ -0,0 +1,77 @@
+# deltica/backend/tests/test_system_sampler.py
+
+import time
+
+import pytest
+
+from backend.core.main import app
+from backend.core.system_sampler import SystemSampler, system_sampler
+from backend.utils.auth import get_current_active_admin
+
+
+@pytest.fixture
+def admin(client):
+    app.dependency_overrides[get_current_active_admin] = lambda: None
+    return client
+
+
+def test_ring_buffer_keeps_last_samples(tmp_path):
+    (tmp_path / "deltica.log").write_bytes(b"x" * 2048)
+    (tmp_path / "other.txt").write_bytes(b"x")
+    sampler = SystemSampler(interval=60, history_size=3, logs_dir=tmp_path)
+    sampler.add_pool("test", lambda: [(("test", "size"), 5), (("test", "checked_out"), 1)])
+
+    samples = [sampler.sample() for _ in range(5)]
+
+    assert sampler.history() == samples[-3:]
+    assert sampler.latest() is samples[-1]
+    assert samples[-1]["log_files"] == 1
+    assert samples[-1]["db_pools"] == {"test": {"size": 5, "checked_out": 1}}
+    assert samples[-1]["process_rss_mb"] > 0
+    assert sampler.history(since=time.time() + 60) == []
+
+
+def test_background_thread_samples_and_stops(tmp_path):
+    sampler = SystemSampler(interval=0.05, history_size=10, logs_dir=tmp_path)
+
+    sampler.start()
+    deadline = time.time() + 5
+    while sampler.latest() is None and time.time() < deadline:
+        time.sleep(0.01)
+    sampler.stop()
+
+    assert sampler.latest() is not None
+    count = len(sampler.history())
+    time.sleep(0.15)
+    assert len(sampler.history()) == count
+
+
+def test_system_endpoint_answers_from_last_sample(admin):
+    system_sampler.sample()
+
+    started = time.perf_counter()
+    response = admin.get("/health/system")
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    data = response.json()
+    assert elapsed < 0.5
+    assert data["sampled_at"].endswith("Z") and data["system"]["memory_percent"] > 0
+    assert data["process"]["rss_mb"] > 0 and data["process"]["open_files"] > 0
+    assert set(data["database"]["pools"]) == {"sync", "async"}
+
+
+def test_history_endpoint_returns_series(admin):
+    system_sampler.sample()
+    system_sampler.sample()
+
+    response = admin.get("/health/history", params={"minutes": 5, "fields": "cpu_percent,open_files"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["series"]) == {"cpu_percent", "open_files"}
+    assert len(data["timestamps"]) == len(data["series"]["cpu_percent"]) >= 2
+
+    assert admin.get("/health/history", params={"fields": "nope"}).status_code == 400
+    full = admin.get("/health/history").json()
+    assert "db_sync_checked_out" in full["series"]
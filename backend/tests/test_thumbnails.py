@@ -0,0 +1,124 @@
+# deltica/backend/tests/test_thumbnails.py
+
+import threading
+import time
+import pytest
+from io import BytesIO
+
+from backend.services import thumbnails
+from backend.services.thumbnails import thumbnail_service
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def make_png(width=1200, height=800) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def upload(client, equipment_id, filename, content, mime_type):
+    response = client.post(
+        f"/files/upload/{equipment_id}",
+        files={"file": (filename, BytesIO(content), mime_type)},
+        data={"file_type": "general_docs"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def get_thumb(client, file_id, **kwargs):
+    """Запросить миниатюру, повторяя запрос, пока она генерируется (202)."""
+    deadline = time.monotonic() + 10
+    while True:
+        response = client.get(f"/files/thumb/{file_id}", **kwargs)
+        if response.status_code != 202 or time.monotonic() > deadline:
+            return response
+        time.sleep(0.05)
+
+
+class TestThumbnails:
+    """Тесты генерации и выдачи миниатюр."""
+
+    def test_image_thumbnail(self, client, test_equipment, temp_upload_dir):
+        data = upload(client, test_equipment.id, "photo.png", make_png(), "image/png")
+
+        response = get_thumb(client, data["id"])
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        thumb = Image.open(BytesIO(response.content))
+        assert max(thumb.size) == thumbnails.THUMBNAIL_SIZE
+        assert (temp_upload_dir / f"{data['file_path']}.thumb.jpg").exists()
+
+    def test_thumbnail_etag(self, client, test_equipment, temp_upload_dir):
+        data = upload(client, test_equipment.id, "photo.png", make_png(), "image/png")
+        etag = get_thumb(client, data["id"]).headers["etag"]
+
+        response = get_thumb(client, data["id"], headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_pdf_thumbnail(self, client, test_equipment, temp_upload_dir):
+        pytest.importorskip("pypdfium2")
+        buffer = BytesIO()
+        Image.new("RGB", (600, 800), color=(255, 255, 255)).save(buffer, format="PDF")
+        data = upload(client, test_equipment.id, "scan.pdf", buffer.getvalue(), "application/pdf")
+
+        response = get_thumb(client, data["id"])
+
+        assert response.status_code == 200
+        assert Image.open(BytesIO(response.content)).size[1] == thumbnails.THUMBNAIL_SIZE
+
+    def test_unsupported_type(self, client, test_equipment, temp_upload_dir):
+        data = upload(client, test_equipment.id, "table.xlsx", b"PK\x03\x04 fake", "application/vnd.ms-excel")
+
+        response = get_thumb(client, data["id"])
+
+        assert response.status_code == 404
+
+    def test_without_pillow(self, client, test_equipment, temp_upload_dir, monkeypatch):
+        monkeypatch.setattr(thumbnails, "Image", None)
+        data = upload(client, test_equipment.id, "photo.png", make_png(), "image/png")
+
+        response = get_thumb(client, data["id"])
+
+        assert response.status_code == 404
+
+    def test_pending_thumbnail_does_not_block(self, client, test_equipment, temp_upload_dir, monkeypatch):
+        started, release = threading.Event(), threading.Event()
+        generate = thumbnail_service._generate
+
+        def slow_generate(*args):
+            started.set()
+            release.wait(10)
+            generate(*args)
+
+        monkeypatch.setattr(thumbnail_service, "_generate", slow_generate)
+        data = upload(client, test_equipment.id, "photo.png", make_png(), "image/png")
+        assert started.wait(10)
+
+        response = client.get(f"/files/thumb/{data['id']}")
+        assert response.status_code == 202
+        assert response.headers["retry-after"] == "1"
+
+        release.set()
+        assert get_thumb(client, data["id"]).status_code == 200
+
+    def test_thumbnail_removed_with_file(self, client, test_equipment, temp_upload_dir):
+        data = upload(client, test_equipment.id, "photo.png", make_png(), "image/png")
+        get_thumb(client, data["id"])
+        thumb = temp_upload_dir / f"{data['file_path']}.thumb.jpg"
+        assert thumb.exists()
+
+        client.delete(f"/files/{data['id']}")
+
+        assert not thumb.exists()
+
+    def test_broken_image(self, client, test_equipment, temp_upload_dir):
+        data = upload(client, test_equipment.id, "broken.jpg", b"not an image", "image/jpeg")
+
+        response = get_thumb(client, data["id"])
+
+        assert response.status_code == 404
+        assert not list(temp_upload_dir.rglob("*.part"))
@@ -0,0 +1,108 @@
+# deltica/backend/tests/test_tracing.py
+
+import logging
+from datetime import date
+
+from backend.app.models import Verification
+from backend.core import tracing
+from backend.core.config import settings
+from backend.core.tracing import finish_trace, record_span, span, start_trace, traced
+
+
+def trace_records(caplog, event):
+    return [r for r in caplog.records if getattr(r, "event", None) == event]
+
+
+@traced()
+def traced_work():
+    with span("inner", step=1):
+        pass
+    return "done"
+
+
+def test_span_tree_and_self_time(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+    tokens = start_trace("req-1", "GET /x")
+
+    assert traced_work() == "done"
+    record_span("sql", 0, 0)
+    trace = finish_trace(tokens, "GET /items/{id}")
+
+    data = trace.to_dict()
+    root = data["spans"]
+    assert root["name"] == "GET /items/{id}"
+    assert [child["name"] for child in root["children"]] == ["traced_work", "sql"]
+    work = root["children"][0]
+    assert work["children"][0] == {**work["children"][0], "name": "inner", "attrs": {"step": 1}}
+    assert work["self_ms"] <= work["duration_ms"]
+    assert data["summary"]["inner"]["count"] == 1
+    assert tracing.current_span() is None
+
+
+def test_spans_outside_request_are_noop():
+    with span("orphan") as current:
+        assert current is None
+    assert traced_work() == "done"
+
+
+def test_span_limit(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_MAX_SPANS", 3)
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+    tokens = start_trace("req-2", "GET /x")
+
+    for _ in range(5):
+        with span("step"):
+            pass
+    trace = finish_trace(tokens)
+
+    assert (trace.span_count, trace.dropped_spans) == (3, 3)
+
+
+def test_request_id_header(client):
+    generated = client.get("/health/")
+    echoed = client.get("/health/", headers={"X-Request-ID": "abc-123"})
+    replaced = client.get("/health/", headers={"X-Request-ID": "bad id with spaces"})
+
+    assert len(generated.headers["X-Request-ID"]) == 32
+    assert echoed.headers["X-Request-ID"] == "abc-123"
+    assert replaced.headers["X-Request-ID"] != "bad id with spaces"
+
+
+def test_slow_request_dumps_span_tree(client, db_session, test_equipment, caplog, monkeypatch):
+    # Строка таблицы требует поверку с датами (как создаёт MainTableService)
+    db_session.add(Verification(
+        equipment_id=test_equipment.id, verification_type="verification", verification_interval=12,
+        verification_date=date(2024, 1, 15), verification_due=date(2025, 1, 14),
+        verification_plan=date(2025, 1, 1), verification_state="state_work", status="status_fit"
+    ))
+    db_session.commit()
+    monkeypatch.setattr(settings, "TRACE_SLOW_THRESHOLD_MS", 0.0)
+    caplog.set_level(logging.INFO)
+
+    response = client.get("/main-table/", headers={"X-Request-ID": "slow-1"})
+
+    assert response.status_code == 200
+    record = trace_records(caplog, "slow_request")[-1]
+    assert record.levelno == logging.WARNING
+    assert record.request_id == "slow-1"
+    spans = record.trace["spans"]
+    assert spans["name"] == "GET /main-table/"
+    assert spans["attrs"] == {"status_code": 200}
+    service = spans["children"][0]
+    assert service["name"] == "MainTableService.get_all_data_async"
+    assert [child["name"] for child in service["children"]] == ["sql", "pydantic.main_table"]
+    assert "equipment_registry" in service["children"][0]["attrs"]["statement"]
+
+    http_record = trace_records(caplog, "http_request")[-1]
+    assert http_record.request_id == "slow-1"
+
+
+def test_sampling_rate(client, caplog, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+    caplog.set_level(logging.INFO)
+    client.get("/health/")
+    assert not trace_records(caplog, "request_trace")
+
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    client.get("/health/")
+    assert trace_records(caplog, "request_trace")
@@ -0,0 +1,138 @@
+# deltica/backend/tests/test_user_cache.py
+
+import asyncio
+import os
+import time
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi import HTTPException
+
+from backend.app.models import User
+from backend.services import user_cache as user_cache_module
+from backend.services.user_cache import UserCache, UserSnapshot, notify_users_changed
+from backend.utils import auth
+from backend.utils.auth import create_access_token, decode_access_token_payload, get_current_user
+
+
+@pytest.fixture
+def users_db():
+    """Изолированная БД только с таблицей users."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    User.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(
+        username="ivanov",
+        password_hash="x",
+        full_name="Иванов И.И.",
+        department="Лаборатория",
+        role="laborant",
+        is_active=True
+    ))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch, tmp_path):
+    """Отдельный кэш с меткой во временной директории."""
+    cache = UserCache(ttl=60, marker_path=tmp_path / ".users_changed")
+    monkeypatch.setattr(auth, "user_cache", cache)
+    return cache
+
+
+def count_queries(session):
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def resolve(token, db):
+    return asyncio.run(get_current_user(token=token, db=db))
+
+
+class TestUserCache:
+    """Тесты кэша аутентифицированных пользователей."""
+
+    def test_token_contains_iat(self):
+        payload = decode_access_token_payload(create_access_token({"sub": "ivanov"}))
+
+        assert payload["sub"] == "ivanov"
+        assert isinstance(payload["iat"], int)
+
+    def test_second_request_skips_db(self, users_db, fresh_cache):
+        token = create_access_token({"sub": "ivanov"})
+        statements = count_queries(users_db)
+
+        first = resolve(token, users_db)
+        second = resolve(token, users_db)
+
+        assert isinstance(first, UserSnapshot)
+        assert second == first
+        assert len(statements) == 1
+        assert fresh_cache.hits == 1
+
+    def test_snapshot_is_immutable(self, users_db, fresh_cache):
+        user = resolve(create_access_token({"sub": "ivanov"}), users_db)
+
+        with pytest.raises(Exception):
+            user.role = "admin"
+
+    def test_marker_invalidates_deactivated_user(self, users_db, fresh_cache):
+        token = create_access_token({"sub": "ivanov"})
+        resolve(token, users_db)
+
+        users_db.query(User).filter(User.username == "ivanov").update({"is_active": False})
+        users_db.commit()
+        notify_users_changed(fresh_cache.marker_path)
+
+        with pytest.raises(HTTPException) as exc:
+            resolve(token, users_db)
+        assert exc.value.status_code == 403
+
+    def test_marker_change_detected_by_mtime(self, fresh_cache):
+        snapshot = UserSnapshot(1, "a", "A", "D", "admin", True, None, None)
+        notify_users_changed(fresh_cache.marker_path)
+        fresh_cache.get("a", 1)
+        fresh_cache.put("a", 1, snapshot)
+        assert fresh_cache.get("a", 1) == snapshot
+
+        later = time.time() + 5
+        os.utime(fresh_cache.marker_path, (later, later))
+
+        assert fresh_cache.get("a", 1) is None
+
+    def test_ttl_expiry(self, monkeypatch, tmp_path):
+        cache = UserCache(ttl=10, marker_path=tmp_path / "marker")
+        snapshot = UserSnapshot(1, "a", "A", "D", "admin", True, None, None)
+        now = [1000.0]
+        monkeypatch.setattr(user_cache_module.time, "monotonic", lambda: now[0])
+
+        cache.put("a", 1, snapshot)
+        assert cache.get("a", 1) == snapshot
+        now[0] += 11
+        assert cache.get("a", 1) is None
+
+    def test_inactive_not_cached(self, fresh_cache):
+        fresh_cache.put("a", 1, UserSnapshot(1, "a", "A", "D", "admin", False, None, None))
+
+        assert fresh_cache.get("a", 1) is None
+
+    def test_unknown_user(self, users_db, fresh_cache):
+        with pytest.raises(HTTPException) as exc:
+            resolve(create_access_token({"sub": "nobody"}), users_db)
+        assert exc.value.status_code == 401
+
+    def test_max_entries(self, tmp_path):
+        cache = UserCache(max_entries=2, marker_path=tmp_path / "marker")
+        for i in range(3):
+            cache.put(f"u{i}", 1, UserSnapshot(i, f"u{i}", "", "", "laborant", True, None, None))
+
+        assert cache.get("u0", 1) is None
+        assert cache.get("u2", 1) is not None
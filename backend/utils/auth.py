@@ -1,16 +1,20 @@
 # backend/utils/auth.py
 # Утилиты для аутентификации: хеширование паролей, создание и проверка JWT токенов
 
+import os
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
+import anyio
 import bcrypt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from backend.core.database import get_db
 from backend.app.models import User
+from backend.services.user_cache import UserSnapshot, user_cache
 
 # Настройки безопасности
 SECRET_KEY = "deltica_secret_key_change_in_production_2024"  # TODO: Вынести в .env
@@ -20,6 +24,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 часа (для удобства п
 # OAuth2 схема для получения токена из заголовка Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Максимум одновременных проверок пароля. bcrypt занимает 100-250 мс CPU, поэтому
+# проверки выполняются в отдельном ограниченном пуле: всплеск логинов не блокирует
+# event loop и не занимает общий пул потоков, в котором работают остальные endpoints
+AUTH_THREAD_LIMIT = max(2, os.cpu_count() or 2)
+_auth_limiter: Optional[anyio.CapacityLimiter] = None
+
 
 # ==================== ХЕШИРОВАНИЕ ПАРОЛЕЙ ====================
 
@@ -57,18 +67,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         JWT токен в виде строки
     """
     to_encode = data.copy()
+    issued_at = datetime.utcnow()
 
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = issued_at + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = issued_at + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    # iat входит в ключ кэша пользователей
+    to_encode.update({"exp": expire, "iat": issued_at})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
     return encoded_jwt
 
 
+def decode_access_token_payload(token: str) -> Optional[dict]:
+    """
+    Декодирование JWT токена
+
+    Args:
+        token: JWT токен
+
+    Returns:
+        Содержимое токена (sub, exp, iat) или None если токен невалидный
+    """
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
 def decode_access_token(token: str) -> Optional[str]:
     """
     Декодирование JWT токена и получение username
@@ -79,24 +107,32 @@ def decode_access_token(token: str) -> Optional[str]:
     Returns:
         Username из токена или None если токен невалидный
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        return username
-    except JWTError:
+    payload = decode_access_token_payload(token)
+    if payload is None:
         return None
+    return payload.get("sub")
 
 
 # ==================== DEPENDENCY: ПОЛУЧЕНИЕ ТЕКУЩЕГО ПОЛЬЗОВАТЕЛЯ ====================
 
+def _load_user(db: Session, username: str) -> Optional[UserSnapshot]:
+    """Загрузить пользователя из БД (блокирующий вызов)"""
+    db_user = db.query(User).filter(User.username == username).first()
+    return UserSnapshot.from_model(db_user) if db_user else None
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> User:
+) -> UserSnapshot:
     """
     Dependency для получения текущего аутентифицированного пользователя
 
     Используется в защищенных endpoints: @router.get("/protected", dependencies=[Depends(get_current_user)])
+
+    Возвращает неизменяемый снимок пользователя. Снимки активных пользователей
+    кэшируются по (username, iat), поэтому повторные запросы с тем же токеном
+    не обращаются к БД.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -105,14 +141,19 @@ async def get_current_user(
     )
 
     # Декодируем токен
-    username = decode_access_token(token)
+    payload = decode_access_token_payload(token)
+    username = payload.get("sub") if payload else None
     if username is None:
         raise credentials_exception
+    issued_at = payload.get("iat")
 
-    # Ищем пользователя в БД
-    user = db.query(User).filter(User.username == username).first()
+    # Ищем пользователя в кэше, затем в БД (запрос - в пуле потоков, не в event loop)
+    user = user_cache.get(username, issued_at)
     if user is None:
-        raise credentials_exception
+        user = await run_in_threadpool(_load_user, db, username)
+        if user is None:
+            raise credentials_exception
+        user_cache.put(username, issued_at, user)
 
     # Проверяем активность пользователя
     if not user.is_active:
@@ -125,8 +166,8 @@ async def get_current_user(
 
 
 async def get_current_active_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_user)
+) -> UserSnapshot:
     """
     Dependency для проверки что текущий пользователь - администратор
 
@@ -163,3 +204,16 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         return None
 
     return user
+
+
+async def authenticate_user_in_threadpool(db: Session, username: str, password: str) -> Optional[User]:
+    """
+    authenticate_user() для async endpoints.
+
+    Запрос к БД и bcrypt выполняются в отдельном пуле из AUTH_THREAD_LIMIT потоков
+    (bcrypt освобождает GIL, поэтому проверки идут параллельно на разных ядрах).
+    """
+    global _auth_limiter
+    if _auth_limiter is None:
+        _auth_limiter = anyio.CapacityLimiter(AUTH_THREAD_LIMIT)
+    return await anyio.to_thread.run_sync(authenticate_user, db, username, password, limiter=_auth_limiter)
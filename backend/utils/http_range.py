@@ -0,0 +1,150 @@
+# backend/utils/http_range.py
+# Утилиты для HTTP Range запросов (докачка и частичная загрузка файлов)
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+
+# Файлы не меняются после загрузки (новое содержимое - новая запись),
+# поэтому клиент может держать их в кэше и перепроверять по ETag
+FILE_CACHE_CONTROL = "private, max-age=86400"
+
+
+def parse_range_header(range_header: Optional[str], total_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Разобрать заголовок Range для одного диапазона байт.
+
+    Поддерживаются формы "bytes=START-", "bytes=START-END" и "bytes=-SUFFIX".
+    Запросы с несколькими диапазонами игнорируются (отдаётся весь файл).
+
+    Args:
+        range_header: Значение заголовка Range
+        total_size: Полный размер ресурса в байтах
+
+    Returns:
+        (start, end) включительно или None, если заголовок отсутствует или не поддерживается
+
+    Raises:
+        416: Диапазон за пределами ресурса
+    """
+    if not range_header:
+        return None
+
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_str, sep, end_str = spec.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if start_str == "":
+            # Суффикс: последние N байт
+            suffix = int(end_str)
+            if suffix <= 0:
+                raise ValueError
+            start = max(total_size - suffix, 0)
+            end = total_size - 1
+        else:
+            start = int(start_str)
+            end = int(end_str) if end_str else total_size - 1
+            end = min(end, total_size - 1)
+    except ValueError:
+        return None
+
+    if start < 0 or start > end or start >= total_size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Запрошенный диапазон недоступен",
+            headers={"Content-Range": f"bytes */{total_size}"},
+        )
+
+    return start, end
+
+
+def if_range_matches(if_range: Optional[str], etag: str) -> bool:
+    """Проверить If-Range: диапазон отдаётся только для неизменившегося ресурса"""
+    return not if_range or if_range.strip() == etag
+
+
+def slice_stream(chunks: Iterable[bytes], start: int, end: int) -> Iterator[bytes]:
+    """Вырезать из потока байт диапазон [start, end] включительно"""
+    position = 0
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        if chunk_end > start:
+            yield chunk[max(start - position, 0):end + 1 - position]
+        position = chunk_end
+        if position > end:
+            break
+
+
+def file_etag(file_hash: Optional[str], stat_result: os.stat_result) -> str:
+    """
+    Сильный ETag файла.
+
+    Для файлов с известным SHA-256 ETag - это хеш содержимого, он одинаков
+    для всех копий и не зависит от mtime. Для старых файлов без хеша
+    используется размер и время изменения.
+    """
+    if file_hash:
+        return f'"{file_hash}"'
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверить If-None-Match (слабое сравнение, список значений или *)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (value.strip() for value in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cached_file_response(
+    request: Request,
+    file_path: Path,
+    file_hash: Optional[str],
+    media_type: str,
+    content_disposition: str
+) -> Response:
+    """
+    Отдать файл с поддержкой условных и частичных запросов.
+
+    - If-None-Match с совпадающим ETag -> 304 без тела
+    - Range / If-Range -> 206 Partial Content (обрабатывает FileResponse)
+    - Тело читается FileResponse блоками в потоке: uvicorn не поддерживает
+      расширение http.response.pathsend, поэтому zero-copy sendfile нет
+
+    Файл проверяется через stat один раз: результат нужен для 404 и ETag
+    старых файлов и передаётся в FileResponse, чтобы не повторять stat.
+
+    Raises:
+        404: Файла нет на диске
+    """
+    try:
+        stat_result = file_path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Файл не найден на диске")
+
+    etag = file_etag(file_hash, stat_result)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": FILE_CACHE_CONTROL,
+        "Content-Disposition": content_disposition,
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Disposition")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(
+        path=str(file_path),
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat_result
+    )
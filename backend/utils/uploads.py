@@ -0,0 +1,81 @@
+# backend/utils/uploads.py
+# Потоковое сохранение загружаемых файлов с ограниченным расходом памяти
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+
+# Размер блока чтения: в памяти одновременно находится не больше одного блока
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 МБ
+
+
+@dataclass
+class StreamedUpload:
+    """Результат потоковой записи загружаемого файла во временный файл"""
+    temp_path: Path
+    size: int
+    sha256: str
+
+
+def stream_upload_to_temp(
+    upload: UploadFile,
+    target_dir: Path,
+    max_size: int,
+    chunk_size: Optional[int] = None
+) -> StreamedUpload:
+    """
+    Записать загружаемый файл блоками во временный файл в target_dir.
+
+    Функция блокирующая: вызывается из синхронных endpoints, которые FastAPI
+    выполняет в пуле потоков. К моменту вызова тело запроса уже разобрано
+    Starlette во временный файл upload.file, поэтому чтение идёт с диска.
+
+    - Размер проверяется по ходу чтения, превышение max_size прерывает загрузку
+    - SHA-256 вычисляется на лету, без повторного чтения файла
+    - Временный файл лежит на том же диске, что и итоговый, поэтому
+      его можно атомарно переименовать через os.replace()
+
+    Raises:
+        400: Файл больше max_size (временный файл удаляется)
+    """
+    chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+    target_dir.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=target_dir, prefix=".upload_", suffix=".part")
+    temp_path = Path(temp_name)
+
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = upload.file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Файл слишком большой. Максимальный размер: {max_size / (1024*1024):.0f} МБ"
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        _remove_if_empty(target_dir)
+        raise
+
+    return StreamedUpload(temp_path=temp_path, size=size, sha256=digest.hexdigest())
+
+
+def _remove_if_empty(directory: Path) -> None:
+    """Удалить директорию, созданную под отклонённую загрузку"""
+    try:
+        directory.rmdir()
+    except OSError:
+        pass
+
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# benchmarks/async_db_throughput.py
+# Нагрузочный тест: пропускная способность эндпоинтов чтения при 50/200 клиентах
+
+"""
+Скрипт держит N одновременных клиентов (по умолчанию 50 и 200), каждый из
+которых по кругу запрашивает эндпоинты чтения, и выводит для каждого уровня
+нагрузки запросы в секунду, p50/p95/p99 задержки и число ошибок.
+
+Эндпоинты чтения (главная таблица, архив, список файлов, /health/system)
+работают на AsyncSession; /main-table/{id} оставлен на синхронной сессии
+и служит точкой сравнения. Для сравнения до/после миграции сохраните
+результаты обоих прогонов в JSON и выполните --compare.
+
+Использование (сервер должен быть запущен):
+    uv run python benchmarks/async_db_throughput.py --equipment-id 1 --json after.json
+    uv run python benchmarks/async_db_throughput.py --clients 50 200 --duration 20
+    uv run python benchmarks/async_db_throughput.py --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from common import summarize
+
+
+def build_paths(equipment_id: int, with_health: bool) -> List[str]:
+    paths = [
+        "/main-table/",
+        "/archive/",
+        f"/files/equipment/{equipment_id}",
+        f"/main-table/{equipment_id}",
+    ]
+    if with_health:
+        paths.append("/health/system")
+    return paths
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    paths: List[str],
+    offset: int,
+    deadline: float,
+    headers: dict,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int],
+):
+    """Запрашивает эндпоинты по кругу до истечения времени замера"""
+    index = offset
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok:
+            samples[path].append(elapsed)
+        else:
+            errors[path] += 1
+
+
+async def run_level(args, clients: int, paths: List[str], headers: dict) -> dict:
+    samples: Dict[str, List[float]] = {path: [] for path in paths}
+    errors: Dict[str, int] = {path: 0 for path in paths}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        # Прогрев: установить соединения и заполнить пулы на сервере
+        await asyncio.gather(*(client.get(paths[i % len(paths)], headers=headers) for i in range(clients)))
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            client_loop(client, paths, i, deadline, headers, samples, errors)
+            for i in range(clients)
+        ))
+        wall = time.perf_counter() - started
+
+    completed = sum(len(values) for values in samples.values())
+    return {
+        "clients": clients,
+        "duration_s": round(wall, 3),
+        "requests": completed,
+        "errors": sum(errors.values()),
+        "rps": round(completed / wall, 1),
+        "latency": summarize([value for values in samples.values() for value in values]),
+        "endpoints": {
+            path: {**summarize(samples[path]), "errors": errors[path], "rps": round(len(samples[path]) / wall, 1)}
+            for path in paths
+        },
+    }
+
+
+async def login(args) -> dict:
+    if not args.username:
+        return {}
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        response = await client.post("/auth/login", json={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run(args) -> dict:
+    headers = await login(args)
+    paths = build_paths(args.equipment_id, with_health=bool(headers))
+    levels = []
+    for clients in args.clients:
+        levels.append(await run_level(args, clients, paths, headers))
+        print_level(levels[-1])
+    return {"url": args.url, "label": args.label, "paths": paths, "levels": levels}
+
+
+def print_level(level: dict):
+    stats = level["latency"]
+    print(
+        f"clients={level['clients']:<4} rps={level['rps']:>8.1f}  "
+        f"p50={stats['p50_ms']:>8.1f} мс  p95={stats['p95_ms']:>8.1f} мс  "
+        f"p99={stats['p99_ms']:>8.1f} мс  errors={level['errors']}"
+    )
+    for path, endpoint in level["endpoints"].items():
+        print(
+            f"    {path:<28} rps={endpoint['rps']:>8.1f}  p50={endpoint['p50_ms']:>8.1f} мс  "
+            f"p99={endpoint['p99_ms']:>8.1f} мс  errors={endpoint['errors']}"
+        )
+
+
+def compare(before_path: str, after_path: str) -> int:
+    """Сравнить два сохранённых прогона по уровням нагрузки"""
+    with open(before_path, encoding="utf-8") as f:
+        before = {level["clients"]: level for level in json.load(f)["levels"]}
+    with open(after_path, encoding="utf-8") as f:
+        after = {level["clients"]: level for level in json.load(f)["levels"]}
+
+    for clients in sorted(before.keys() & after.keys()):
+        old, new = before[clients], after[clients]
+        ratio = new["rps"] / old["rps"] if old["rps"] else float("inf")
+        print(
+            f"clients={clients:<4} rps {old['rps']:>8.1f} -> {new['rps']:>8.1f} (x{ratio:.2f})  "
+            f"p99 {old['latency']['p99_ms']:>8.1f} -> {new['latency']['p99_ms']:>8.1f} мс  "
+            f"errors {old['errors']} -> {new['errors']}"
+        )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Пропускная способность эндпоинтов чтения")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Адрес сервера")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200], help="Уровни одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность замера на уровень, с")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Таймаут запроса, с")
+    parser.add_argument("--equipment-id", type=int, default=1, help="ID оборудования для списка файлов")
+    parser.add_argument("--username", help="Логин администратора (добавляет /health/system)")
+    parser.add_argument("--password")
+    parser.add_argument("--label", default="", help="Метка прогона, например before/after")
+    parser.add_argument("--json", help="Сохранить результат в JSON-файл")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Сравнить два JSON-результата")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare)
+
+    result = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
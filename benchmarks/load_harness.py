@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# benchmarks/load_harness.py
+# Нагрузочный тест: смесь запросов клиентов по сценарию из benchmarks/scenarios
+
+"""
+Скрипт моделирует N одновременных клиентов (приложение Electron): каждый
+входит в систему, затем по кругу выполняет шаги сценария, выбирая их
+случайно по весам, с паузой "на размышление" между шагами. Для каждого
+уровня нагрузки выводятся запросы в секунду, p50/p95/p99 задержки
+и ошибки - в целом и по каждому шагу сценария.
+
+Сценарии - JSON-файлы в benchmarks/scenarios:
+
+    think_time_ms   [мин, макс] пауза между шагами клиента
+    on_start        шаги, которые клиент выполняет при подключении
+    steps           шаги: name, weight и одно из
+                    - method + path (+ json) - обычный запрос
+                    - "action": "login"      - POST /auth/login, новый токен клиента
+                    - "action": "edit"       - GET source и PUT path с изменёнными changes
+                                               (как сохранение ячейки в таблице)
+
+В path, source и json подставляются значения из данных сервера:
+{equipment_id}, {bench_equipment_id} (только синтетические записи BENCH-*),
+{file_id} (файлы, которые реально открываются) и списки вида {equipment_id:10}.
+Одна и та же подстановка внутри шага получает одно значение.
+Шаги edit изменяют только записи BENCH-* (benchmarks/registry_generator.py);
+если их нет, такие шаги отключаются. Шаги, для которых нет данных, тоже
+отключаются с предупреждением.
+
+--think-scale 0 убирает паузы: клиенты отправляют запросы подряд,
+это предельная пропускная способность, а не поведение пользователей.
+
+Использование (сервер и PostgreSQL должны быть запущены):
+    uv run python benchmarks/load_harness.py --username admin --password admin123
+    uv run python benchmarks/load_harness.py --scenario morning_open --clients 20 50 100 --duration 30
+    uv run python benchmarks/load_harness.py --clients 50 --think-scale 0 --json after.json
+    uv run python benchmarks/load_harness.py --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from common import summarize
+
+SCENARIOS_DIR = Path(__file__).parent / "scenarios"
+# Префикс заводских номеров синтетических записей (registry_generator.py)
+BENCH_PREFIX = "BENCH-"
+ACTIONS = {"request", "login", "edit"}
+POOLS = {"equipment_id", "bench_equipment_id", "file_id"}
+PLACEHOLDER = re.compile(r"\{(\w+)(?::(\d+))?\}")
+# Сколько единиц оборудования просмотреть при поиске открываемых файлов
+FILE_PROBE_EQUIPMENT = 30
+
+
+@dataclass
+class Step:
+    name: str
+    weight: float
+    action: str = "request"
+    method: str = "GET"
+    path: str = ""
+    json: Any = None
+    source: str = ""
+    changes: Dict[str, Any] = field(default_factory=dict)
+
+    def pools(self) -> set:
+        """Данные сервера, которые нужны шагу"""
+        text = self.path + self.source + json.dumps(self.json, ensure_ascii=False)
+        return {match.group(1) for match in PLACEHOLDER.finditer(text)}
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    think_time_ms: List[float]
+    on_start: List[str]
+    steps: Dict[str, Step]
+
+
+def load_scenario(name_or_path: str) -> Scenario:
+    """Загрузить сценарий по имени (benchmarks/scenarios/<name>.json) или пути"""
+    path = Path(name_or_path)
+    if not path.suffix:
+        path = SCENARIOS_DIR / f"{name_or_path}.json"
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    steps = {}
+    for item in data["steps"]:
+        step = Step(**item)
+        if step.action not in ACTIONS:
+            raise ValueError(f"{path.name}: неизвестное действие {step.action!r} в шаге {step.name}")
+        if step.action != "login" and not step.path:
+            raise ValueError(f"{path.name}: у шага {step.name} не указан path")
+        if step.action == "edit" and not step.source:
+            raise ValueError(f"{path.name}: у шага {step.name} не указан source")
+        unknown = step.pools() - POOLS
+        if unknown:
+            raise ValueError(f"{path.name}: неизвестные подстановки {sorted(unknown)} в шаге {step.name}")
+        steps[step.name] = step
+
+    missing = [name for name in data.get("on_start", []) if name not in steps]
+    if missing:
+        raise ValueError(f"{path.name}: on_start ссылается на неизвестные шаги {missing}")
+    return Scenario(
+        name=path.stem,
+        description=data.get("description", ""),
+        think_time_ms=data.get("think_time_ms", [0, 0]),
+        on_start=data.get("on_start", []),
+        steps=steps,
+    )
+
+
+def fill(value: Any, pools: Dict[str, List[int]], rng: random.Random, chosen: Dict[str, int]) -> Any:
+    """
+    Подставить значения из пулов в строку, словарь или список.
+
+    chosen - значения одиночных подстановок, уже выбранные для этого шага.
+    """
+    if isinstance(value, dict):
+        return {key: fill(item, pools, rng, chosen) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, pools, rng, chosen) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    def pick(name: str) -> int:
+        if name not in chosen:
+            chosen[name] = rng.choice(pools[name])
+        return chosen[name]
+
+    whole = PLACEHOLDER.fullmatch(value)
+    if whole and whole.group(2):
+        pool = pools[whole.group(1)]
+        return rng.sample(pool, min(int(whole.group(2)), len(pool)))
+    if whole:
+        return pick(whole.group(1))
+    return PLACEHOLDER.sub(lambda match: str(pick(match.group(1))), value)
+
+
+class StepStats:
+    """Задержки и ошибки одного шага за уровень нагрузки"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self.errors = 0
+        self.codes: Counter = Counter()
+
+
+class VirtualClient:
+    """Один клиент: свой токен и генератор случайных чисел"""
+
+    def __init__(self, http: httpx.AsyncClient, args, scenario: Scenario,
+                 pools: Dict[str, List[int]], stats: Dict[str, StepStats], seed: int):
+        self.http = http
+        self.args = args
+        self.scenario = scenario
+        self.pools = pools
+        self.stats = stats
+        self.rng = random.Random(seed)
+        self.headers: Dict[str, str] = {}
+        self.steps = [step for step in scenario.steps.values() if step.weight > 0]
+        self.weights = [step.weight for step in self.steps]
+
+    async def login(self) -> httpx.Response:
+        response = await self.http.post(
+            "/auth/login", json={"username": self.args.username, "password": self.args.password}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def edit(self, step: Step) -> httpx.Response:
+        chosen: Dict[str, int] = {}
+        response = await self.http.get(fill(step.source, self.pools, self.rng, chosen), headers=self.headers)
+        if response.status_code != 200:
+            return response
+        body = response.json()
+        body.update(step.changes)
+        return await self.http.put(fill(step.path, self.pools, self.rng, chosen), json=body, headers=self.headers)
+
+    async def run_step(self, step: Step):
+        started = time.perf_counter()
+        try:
+            if step.action == "login":
+                response = await self.login()
+            elif step.action == "edit":
+                response = await self.edit(step)
+            else:
+                chosen: Dict[str, int] = {}
+                response = await self.http.request(
+                    step.method,
+                    fill(step.path, self.pools, self.rng, chosen),
+                    json=fill(step.json, self.pools, self.rng, chosen),
+                    headers=self.headers,
+                )
+            code = str(response.status_code)
+            ok = response.status_code < 400
+        except httpx.HTTPError as e:
+            code, ok = type(e).__name__, False
+        elapsed = time.perf_counter() - started
+
+        stats = self.stats[step.name]
+        stats.codes[code] += 1
+        if ok:
+            stats.samples.append(elapsed)
+        else:
+            stats.errors += 1
+
+    async def think(self, deadline: float):
+        low, high = self.scenario.think_time_ms
+        pause = self.rng.uniform(low, high) / 1000 * self.args.think_scale
+        await asyncio.sleep(max(0.0, min(pause, deadline - time.perf_counter())))
+
+    async def run(self, deadline: float):
+        for name in self.scenario.on_start:
+            await self.run_step(self.scenario.steps[name])
+        while time.perf_counter() < deadline:
+            await self.think(deadline)
+            if time.perf_counter() >= deadline:
+                break
+            await self.run_step(self.rng.choices(self.steps, self.weights)[0])
+
+
+async def prepare_pools(http: httpx.AsyncClient, headers: dict, rng: random.Random) -> Dict[str, List[int]]:
+    """Собрать ID оборудования и файлов, к которым обращаются шаги сценария"""
+    response = await http.get("/main-table/", headers=headers)
+    response.raise_for_status()
+    rows = response.json()
+    pools = {
+        "equipment_id": [row["equipment_id"] for row in rows],
+        "bench_equipment_id": [
+            row["equipment_id"] for row in rows if row["factory_number"].startswith(BENCH_PREFIX)
+        ],
+        "file_id": [],
+    }
+
+    # Метаданные синтетических файлов есть, а содержимого на диске может не быть:
+    # оставляем только файлы, которые сервер действительно отдаёт
+    for equipment_id in rng.sample(pools["equipment_id"], min(FILE_PROBE_EQUIPMENT, len(rows))):
+        files = (await http.get(f"/files/equipment/{equipment_id}", headers=headers)).json()
+        for item in files:
+            probe = await http.get(f"/files/view/{item['id']}", headers={**headers, "Range": "bytes=0-0"})
+            if probe.status_code in (200, 206):
+                pools["file_id"].append(item["id"])
+    return pools
+
+
+def active_scenario(scenario: Scenario, pools: Dict[str, List[int]]) -> Scenario:
+    """Отключить шаги, для которых на сервере нет данных"""
+    steps = {}
+    for name, step in scenario.steps.items():
+        empty = sorted(pool for pool in step.pools() if not pools[pool])
+        if empty:
+            print(f"Шаг {name} отключён: нет данных для {', '.join(empty)}")
+            continue
+        steps[name] = step
+    on_start = [name for name in scenario.on_start if name in steps]
+    return Scenario(scenario.name, scenario.description, scenario.think_time_ms, on_start, steps)
+
+
+async def run_level(args, scenario: Scenario, pools: Dict[str, List[int]], clients: int) -> dict:
+    stats = {name: StepStats() for name in scenario.steps}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as http:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            VirtualClient(http, args, scenario, pools, stats, seed=args.seed * 100003 + i).run(deadline)
+            for i in range(clients)
+        ))
+        wall = time.perf_counter() - started
+
+    samples = [value for item in stats.values() for value in item.samples]
+    errors = sum(item.errors for item in stats.values())
+    return {
+        "clients": clients,
+        "duration_s": round(wall, 3),
+        "requests": len(samples) + errors,
+        "errors": errors,
+        "rps": round((len(samples) + errors) / wall, 1),
+        "latency": summarize(samples),
+        "steps": {
+            name: {
+                **summarize(item.samples),
+                "errors": item.errors,
+                "rps": round((len(item.samples) + item.errors) / wall, 1),
+                "codes": dict(item.codes),
+            }
+            for name, item in stats.items() if item.codes
+        },
+    }
+
+
+async def run(args) -> dict:
+    scenario = load_scenario(args.scenario)
+    print(f"Сценарий {scenario.name}: {scenario.description}")
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as http:
+        response = await http.post("/auth/login", json={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        pools = await prepare_pools(http, headers, random.Random(args.seed))
+    print(
+        f"Оборудование: {len(pools['equipment_id'])}, синтетическое: {len(pools['bench_equipment_id'])}, "
+        f"открываемых файлов: {len(pools['file_id'])}"
+    )
+    scenario = active_scenario(scenario, pools)
+
+    levels = []
+    for clients in args.clients:
+        levels.append(await run_level(args, scenario, pools, clients))
+        print_level(levels[-1])
+    return {
+        "url": args.url,
+        "label": args.label,
+        "scenario": scenario.name,
+        "duration_s": args.duration,
+        "think_scale": args.think_scale,
+        "seed": args.seed,
+        "levels": levels,
+    }
+
+
+def print_level(level: dict):
+    stats = level["latency"]
+    print(
+        f"clients={level['clients']:<4} rps={level['rps']:>8.1f}  "
+        f"p50={stats['p50_ms']:>8.1f} мс  p95={stats['p95_ms']:>8.1f} мс  "
+        f"p99={stats['p99_ms']:>8.1f} мс  errors={level['errors']}"
+    )
+    for name, step in level["steps"].items():
+        codes = ", ".join(f"{code}: {count}" for code, count in sorted(step["codes"].items()))
+        print(
+            f"    {name:<16} rps={step['rps']:>7.1f}  p50={step['p50_ms']:>8.1f} мс  "
+            f"p95={step['p95_ms']:>8.1f} мс  p99={step['p99_ms']:>8.1f} мс  [{codes}]"
+        )
+
+
+def compare(before_path: str, after_path: str) -> int:
+    """Сравнить два сохранённых прогона по уровням нагрузки и шагам"""
+    with open(before_path, encoding="utf-8") as f:
+        before = {level["clients"]: level for level in json.load(f)["levels"]}
+    with open(after_path, encoding="utf-8") as f:
+        after = {level["clients"]: level for level in json.load(f)["levels"]}
+
+    for clients in sorted(before.keys() & after.keys()):
+        old, new = before[clients], after[clients]
+        ratio = new["rps"] / old["rps"] if old["rps"] else float("inf")
+        print(
+            f"clients={clients:<4} rps {old['rps']:>8.1f} -> {new['rps']:>8.1f} (x{ratio:.2f})  "
+            f"p99 {old['latency']['p99_ms']:>8.1f} -> {new['latency']['p99_ms']:>8.1f} мс  "
+            f"errors {old['errors']} -> {new['errors']}"
+        )
+        for name in sorted(old["steps"].keys() & new["steps"].keys()):
+            a, b = old["steps"][name], new["steps"][name]
+            print(
+                f"    {name:<16} p50 {a['p50_ms']:>8.1f} -> {b['p50_ms']:>8.1f} мс  "
+                f"p99 {a['p99_ms']:>8.1f} -> {b['p99_ms']:>8.1f} мс"
+            )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Нагрузка смесью запросов клиентов по сценарию")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Адрес сервера")
+    parser.add_argument("--scenario", default="workday", help="Имя сценария из benchmarks/scenarios или путь к JSON")
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 100], help="Уровни одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=60.0, help="Длительность замера на уровень, с")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="Множитель пауз между шагами (0 - без пауз)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Таймаут запроса, с")
+    parser.add_argument("--username", help="Логин пользователя клиентов")
+    parser.add_argument("--password")
+    parser.add_argument("--seed", type=int, default=42, help="Seed выбора шагов и данных")
+    parser.add_argument("--label", default="", help="Метка прогона, например before/after")
+    parser.add_argument("--list", action="store_true", help="Показать доступные сценарии")
+    parser.add_argument("--json", help="Сохранить результат в JSON-файл")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Сравнить два JSON-результата")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare)
+
+    if args.list:
+        for path in sorted(SCENARIOS_DIR.glob("*.json")):
+            print(f"{path.stem:<16} {load_scenario(str(path)).description}")
+        return 0
+
+    if not args.username or args.password is None:
+        parser.error("нужны --username и --password")
+
+    result = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
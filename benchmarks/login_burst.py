@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# benchmarks/login_burst.py
+# Нагрузочный тест: задержка /main-table/ во время всплеска логинов
+
+"""
+Скрипт одновременно:
+- отправляет поток запросов GET /main-table/ (имитация работы пользователей)
+- запускает всплеск из --logins параллельных POST /auth/login
+
+и выводит p50/p95/p99 задержки /main-table/ до и во время всплеска.
+Если bcrypt выполняется в event loop, p99 во время всплеска вырастает
+на сотни миллисекунд; при выполнении в отдельном пуле потоков - почти нет.
+
+Использование (сервер должен быть запущен):
+    uv run python benchmarks/login_burst.py --username admin --password admin123
+    uv run python benchmarks/login_burst.py --logins 100 --readers 8 --json result.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List
+
+import httpx
+
+from common import summarize
+
+
+async def reader(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, samples: List[float]):
+    """Непрерывно запрашивает /main-table/ и записывает задержку"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/main-table/", headers=headers)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> float:
+    started = time.perf_counter()
+    response = await client.post("/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def run(args) -> dict:
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        token = (await client.post(
+            "/auth/login", json={"username": args.username, "password": args.password}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # Фаза 1: базовая задержка без логинов
+        baseline: List[float] = []
+        stop = asyncio.Event()
+        readers = [asyncio.create_task(reader(client, headers, stop, baseline)) for _ in range(args.readers)]
+        await asyncio.sleep(args.warmup)
+        stop.set()
+        await asyncio.gather(*readers)
+
+        # Фаза 2: та же нагрузка плюс всплеск логинов
+        during: List[float] = []
+        stop = asyncio.Event()
+        readers = [asyncio.create_task(reader(client, headers, stop, during)) for _ in range(args.readers)]
+        burst_started = time.perf_counter()
+        login_times = await asyncio.gather(
+            *(login(client, args.username, args.password) for _ in range(args.logins))
+        )
+        burst_seconds = time.perf_counter() - burst_started
+        stop.set()
+        await asyncio.gather(*readers)
+
+    return {
+        "url": args.url,
+        "readers": args.readers,
+        "logins": args.logins,
+        "burst_seconds": round(burst_seconds, 3),
+        "main_table_baseline": summarize(baseline),
+        "main_table_during_burst": summarize(during),
+        "login": summarize(list(login_times)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Задержка /main-table/ во время всплеска логинов")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Адрес сервера")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=50, help="Количество одновременных логинов")
+    parser.add_argument("--readers", type=int, default=4, help="Параллельных клиентов /main-table/")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Длительность базового замера, с")
+    parser.add_argument("--json", help="Сохранить результат в JSON-файл")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    for name in ("main_table_baseline", "main_table_during_burst", "login"):
+        stats = result[name]
+        print(
+            f"{name:<26} n={stats['count']:<6} p50={stats['p50_ms']:>8.1f} мс  "
+            f"p95={stats['p95_ms']:>8.1f} мс  p99={stats['p99_ms']:>8.1f} мс  max={stats['max_ms']:>8.1f} мс"
+        )
+    print(f"Всплеск из {result['logins']} логинов занял {result['burst_seconds']:.2f} с")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
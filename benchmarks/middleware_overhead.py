@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# benchmarks/middleware_overhead.py
+# Накладные расходы middleware логирования на запрос (без сервера и сети)
+
+"""
+Скрипт вызывает ASGI-приложение напрямую (без HTTP-сервера) и сравнивает
+время обработки запроса:
+- без middleware
+- с прежней реализацией на BaseHTTPMiddleware
+- с текущей LoggingMiddleware (чистый ASGI)
+
+Измеряются короткий JSON-ответ и потоковый ответ из --chunks фрагментов.
+Записи лога отправляются в NullHandler, чтобы замер не включал запись на диск.
+
+Использование:
+    uv run python benchmarks/middleware_overhead.py
+    uv run python benchmarks/middleware_overhead.py --requests 20000 --chunks 64 --json result.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from common import percentile
+
+# Добавляем корневую директорию проекта в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.db_metrics import finish_request_stats, start_request_stats
+from backend.middleware.logging_middleware import LoggingMiddleware
+
+bench_logger = logging.getLogger("benchmarks.middleware_overhead")
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """Прежняя реализация LoggingMiddleware - точка сравнения"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        client_ip = request.client.host if request.client else "unknown"
+        db_stats_token = start_request_stats()
+        try:
+            response = await call_next(request)
+        finally:
+            db_stats = finish_request_stats(db_stats_token)
+        duration_ms = round((time.time() - start_time) * 1000, 2)
+        user = getattr(request.state, "user", None)
+        bench_logger.info(
+            f"{request.method} {request.url.path} - {response.status_code}",
+            extra={
+                "event": "http_request",
+                "method": request.method,
+                "path": str(request.url.path),
+                "status_code": response.status_code,
+                "duration_ms": duration_ms,
+                "db_queries": db_stats.queries,
+                "db_time_ms": db_stats.time_ms,
+                "ip": client_ip,
+                "user": user.username if user else "anonymous",
+            }
+        )
+        return response
+
+
+def build_app(variant: str, chunks: int):
+    async def ping(request):
+        return JSONResponse({"ok": True})
+
+    async def stream(request):
+        async def body():
+            for _ in range(chunks):
+                yield b"x" * 4096
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    app = Starlette(routes=[Route("/ping", ping), Route("/stream", stream)])
+    if variant == "base_http":
+        app.add_middleware(BaseHTTPLoggingMiddleware)
+    elif variant == "asgi":
+        app.add_middleware(LoggingMiddleware)
+    return app
+
+
+async def call(app, path: str) -> int:
+    """Один запрос к ASGI-приложению; возвращает размер тела ответа"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 5000),
+        "server": ("bench", 80),
+    }
+    received = False
+    size = 0
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.sleep(3600)  # Клиент не отключается
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+def summarize_us(samples: List[float]) -> dict:
+    """Статистика в микросекундах (summarize из common округляет до 0.01 мс)"""
+    return {
+        "count": len(samples),
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(percentile(samples, 50), 1),
+        "p99_us": round(percentile(samples, 99), 1),
+    }
+
+
+async def measure(app, path: str, requests: int, warmup: int) -> List[float]:
+    """Время запросов в микросекундах"""
+    for _ in range(warmup):
+        await call(app, path)
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter_ns()
+        await call(app, path)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+    return samples
+
+
+async def run(args) -> dict:
+    results = {}
+    for path in ("/ping", "/stream"):
+        results[path] = {}
+        for variant in ("none", "base_http", "asgi"):
+            app = build_app(variant, args.chunks)
+            results[path][variant] = summarize_us(await measure(app, path, args.requests, args.warmup))
+    return results
+
+
+def print_results(results: dict):
+    for path, variants in results.items():
+        baseline = variants["none"]["mean_us"]
+        print(path)
+        for variant, stats in variants.items():
+            print(
+                f"    {variant:<10} mean={stats['mean_us']:>8.1f} мкс  "
+                f"p50={stats['p50_us']:>8.1f} мкс  p99={stats['p99_us']:>8.1f} мкс  "
+                f"накладные={stats['mean_us'] - baseline:>7.1f} мкс"
+            )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Накладные расходы middleware логирования")
+    parser.add_argument("--requests", type=int, default=5000, help="Запросов на вариант")
+    parser.add_argument("--warmup", type=int, default=500, help="Запросов прогрева")
+    parser.add_argument("--chunks", type=int, default=16, help="Фрагментов по 4 КБ в потоковом ответе")
+    parser.add_argument("--json", help="Сохранить результат в JSON-файл")
+    args = parser.parse_args(argv)
+
+    # Записи лога формируются, но не пишутся на диск
+    for name in (bench_logger.name, "backend.middleware.logging_middleware"):
+        target = logging.getLogger(name)
+        target.setLevel(logging.INFO)
+        target.addHandler(logging.NullHandler())
+        target.propagate = False
+
+    results = asyncio.run(run(args))
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# benchmarks/registry_generator.py
+# Генератор синтетического реестра оборудования для замеров производительности
+
+"""
+Создаёт в БД заданное число единиц оборудования со связанными записями
+(поверка, ответственность, финансы, файлы). Данные детерминированы: один и тот же
+--seed даёт одинаковый набор записей, поэтому замеры разных коммитов сравнимы.
+
+Распределения приближены к реальному реестру:
+- СИ и ИО примерно 3:1, год выпуска смещён к новым
+- поверка/калибровка/аттестация, интервалы 12/24/36/6 месяцев, часть просрочена
+- состояния: в работе ~82%, хранение, поверка, ремонт
+- подразделения неравномерно (крупные лаборатории чаще)
+- 0-6 файлов на единицу, размеры по логнормальному распределению
+- счёт и оплата есть примерно у 60% записей
+
+Синтетические записи помечены заводскими номерами BENCH-* и удаляются --clear.
+Файлы на диск не пишутся - в equipment_files только метаданные.
+
+Использование (лучше на отдельной БД, например DB_NAME=deltica_bench):
+    uv run python benchmarks/registry_generator.py --count 10000 --seed 42
+    uv run python benchmarks/registry_generator.py --clear
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+# Добавляем корневую директорию проекта в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.models import (
+    ArchivedEquipment, Equipment, EquipmentFile, Finance, Responsibility, Verification,
+)
+from backend.services.equipment_registry import EquipmentRegistryService
+from backend.services.main_table import calculate_status
+
+BENCH_PREFIX = "BENCH-"
+BATCH_SIZE = 5000
+
+# Наименования и модели (на одно наименование - несколько моделей)
+CATALOG = [
+    ("Манометр", ["МП-100", "МП-160", "ДМ-02", "ТМ-510"]),
+    ("Термометр", ["ТЛ-2", "ТЛ-4", "ТЦ-1200"]),
+    ("Весы лабораторные", ["ВЛ-210", "ВЛТЭ-500", "ЛВ-210А"]),
+    ("Штангенциркуль", ["ШЦ-I-150", "ШЦ-II-250", "ШЦЦ-I-150"]),
+    ("Микрометр", ["МК-25", "МК-50", "МКЦ-25"]),
+    ("Мультиметр", ["АРРА-107", "В7-78/1", "Fluke 87V"]),
+    ("Осциллограф", ["АКИП-4122", "С1-167", "TDS2024C"]),
+    ("Генератор сигналов", ["Г4-164", "АКИП-3409", "DG1022"]),
+    ("Источник питания", ["Б5-71", "АКИП-1105", "GPR-30H10D"]),
+    ("Секундомер", ["СОСпр-2б", "Интеграл С-01"]),
+    ("Гигрометр", ["ВИТ-2", "ИВА-6Н"]),
+    ("Барометр", ["БАММ-1", "МД-49"]),
+    ("Спектрофотометр", ["ПЭ-5400ВИ", "UV-1800"]),
+    ("pH-метр", ["pH-150МИ", "Эксперт-001"]),
+    ("Шкаф сушильный", ["ШС-80", "СНОЛ-58/350"]),
+    ("Печь муфельная", ["ПМ-8", "СНОЛ-8,2/1100"]),
+    ("Термостат", ["ТС-1/80", "LOIP LT-100"]),
+    ("Центрифуга", ["ОПн-8", "ЦЛМН-Р10"]),
+]
+# Испытательное оборудование (ИО), остальное - средства измерений (СИ)
+IO_NAMES = {"Шкаф сушильный", "Печь муфельная", "Термостат", "Центрифуга"}
+
+DEPARTMENTS = ["gtl", "lbr", "ltr", "lhaiei", "ogmk", "oii", "smtsik", "soii", "to", "ts", "es", "gruppa_sm", "ooops"]
+DEPARTMENT_WEIGHTS = [18, 15, 12, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+VERIFIER_ORGS = ["ФБУ ЦСМ", "ФБУ Тест-С.-Петербург", "ООО Метрология", "Собственная МС"]
+BUDGET_ITEMS = ["Поверка СИ", "Калибровка", "Аттестация ИО", "Ремонт", "Прочее"]
+
+VERIFICATION_TYPES = ["verification", "calibration", "certification"]
+VERIFICATION_TYPE_WEIGHTS = [60, 30, 10]
+INTERVALS = [12, 24, 36, 6]
+INTERVAL_WEIGHTS = [70, 20, 7, 3]
+STATES = ["state_work", "state_storage", "state_verification", "state_repair"]
+STATE_WEIGHTS = [82, 7, 6, 5]
+
+FILE_COUNTS = [0, 1, 2, 3, 4, 5, 6]
+FILE_COUNT_WEIGHTS = [15, 25, 25, 15, 10, 6, 4]
+FILE_TYPES = ["verification_docs", "general_docs", "active_certificate"]
+FILE_TYPE_WEIGHTS = [50, 40, 10]
+
+
+class RegistryGenerator:
+    """Детерминированный генератор записей реестра (один seed - один набор)"""
+
+    def __init__(self, seed: int = 42, today: Optional[date] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Даты строятся от текущего дня: доля просроченных и истекающих постоянна
+        self.today = today or date.today()
+
+    def equipment(self, index: int) -> dict:
+        rng = self.rng
+        name, models = rng.choice(CATALOG)
+        return {
+            "equipment_name": name,
+            "equipment_model": rng.choice(models),
+            "equipment_type": "IO" if name in IO_NAMES else "SI",
+            "equipment_specs": f"Диапазон 0-{rng.choice([10, 60, 100, 250, 1000])}, КТ {rng.choice([0.5, 1, 1.5, 2.5])}",
+            "factory_number": f"{BENCH_PREFIX}F-{self.seed}-{index}",
+            "inventory_number": f"{BENCH_PREFIX}INV-{self.seed}-{index}",
+            "equipment_year": min(2025, 2025 - int(rng.expovariate(1 / 8))),
+        }
+
+    def verification(self, equipment_id: int, equipment_type: str) -> dict:
+        rng = self.rng
+        interval = rng.choices(INTERVALS, INTERVAL_WEIGHTS)[0]
+        # Дата последней поверки внутри интервала; ~7% - просрочены
+        days_ago = rng.randint(0, interval * 30)
+        if rng.random() < 0.07:
+            days_ago += interval * 30
+        verification_date = self.today - timedelta(days=days_ago)
+        verification_due = verification_date + relativedelta(months=interval) - timedelta(days=1)
+        state = rng.choices(STATES, STATE_WEIGHTS)[0]
+        return {
+            "equipment_id": equipment_id,
+            "verification_type": rng.choices(VERIFICATION_TYPES, VERIFICATION_TYPE_WEIGHTS)[0],
+            "registry_number": f"{rng.randint(10000, 99999)}-{rng.randint(10, 25)}" if equipment_type == "SI" else None,
+            "verification_interval": interval,
+            "verification_date": verification_date,
+            "verification_plan": verification_due - timedelta(days=rng.randint(14, 45)),
+            "verification_state": state,
+            "status": calculate_status(verification_due, state),
+        }
+
+    def responsibility(self, equipment_id: int) -> dict:
+        rng = self.rng
+        return {
+            "equipment_id": equipment_id,
+            "department": rng.choices(DEPARTMENTS, DEPARTMENT_WEIGHTS)[0],
+            "responsible_person": f"Сотрудник {rng.randint(1, 300)}",
+            "verifier_org": rng.choice(VERIFIER_ORGS),
+        }
+
+    def finance(self, equipment_id: int) -> dict:
+        rng = self.rng
+        cost_rate = round(rng.lognormvariate(8, 0.8), 2)
+        quantity = 1 if rng.random() < 0.9 else rng.randint(2, 5)
+        coefficient = rng.choice([1.0, 1.0, 1.0, 1.2, 1.5])
+        total_cost = round(cost_rate * quantity * coefficient, 2)
+        paid = rng.random() < 0.6
+        return {
+            "equipment_model_id": equipment_id,
+            "budget_item": rng.choice(BUDGET_ITEMS),
+            "code_rate": f"Т-{rng.randint(100, 999)}",
+            "cost_rate": cost_rate,
+            "quantity": quantity,
+            "coefficient": coefficient,
+            "total_cost": total_cost,
+            "invoice_number": f"СЧ-{rng.randint(1, 9999)}" if paid else None,
+            "paid_amount": total_cost if paid else None,
+            "payment_date": self.today - timedelta(days=rng.randint(0, 365)) if paid else None,
+        }
+
+    def files(self, equipment_id: int, index: int) -> List[dict]:
+        rng = self.rng
+        count = rng.choices(FILE_COUNTS, FILE_COUNT_WEIGHTS)[0]
+        rows = []
+        for order in range(count):
+            digest = hashlib.sha256(f"{self.seed}-{index}-{order}".encode()).hexdigest()
+            file_type = rng.choices(FILE_TYPES, FILE_TYPE_WEIGHTS)[0]
+            rows.append({
+                "equipment_id": equipment_id,
+                "file_name": f"{'Свидетельство' if file_type != 'general_docs' else 'Паспорт'}_{order + 1}.pdf",
+                "file_path": f"blobs/{digest[:2]}/{digest}",
+                "file_type": file_type,
+                "file_size": int(min(rng.lognormvariate(12.5, 1.0), 50 * 1024 * 1024)),
+                "file_hash": digest,
+                "is_active_certificate": file_type == "active_certificate",
+                "sort_order": order,
+            })
+        return rows
+
+    def payload(self, index: int) -> dict:
+        """Тело POST/PUT /main-table/ (даты в ISO, срок поверки рассчитан)"""
+        row = self.equipment(index)
+        row.update(self.verification(0, row["equipment_type"]))
+        row.update(self.responsibility(0))
+        row.update(self.finance(0))
+        for key in ("equipment_id", "equipment_model_id"):
+            row.pop(key)
+        row["verification_due"] = (
+            row["verification_date"] + relativedelta(months=row["verification_interval"]) - timedelta(days=1)
+        )
+        return {key: value.isoformat() if isinstance(value, date) else value for key, value in row.items()}
+
+    def generate(self, db: Session, count: int, start_index: int = 0) -> List[int]:
+        """
+        Вставить count единиц оборудования со связанными записями.
+
+        Returns:
+            ID созданного оборудования (в порядке генерации)
+        """
+        equipment_ids: List[int] = []
+        for offset in range(start_index, start_index + count, BATCH_SIZE):
+            batch = [self.equipment(i) for i in range(offset, min(offset + BATCH_SIZE, start_index + count))]
+            ids = db.execute(
+                insert(Equipment).returning(Equipment.id, sort_by_parameter_order=True), batch
+            ).scalars().all()
+
+            verifications, responsibilities, finances, files = [], [], [], []
+            for index, (equipment_id, row) in enumerate(zip(ids, batch), start=offset):
+                verifications.append(self.verification(equipment_id, row["equipment_type"]))
+                responsibilities.append(self.responsibility(equipment_id))
+                finances.append(self.finance(equipment_id))
+                files.extend(self.files(equipment_id, index))
+
+            db.execute(insert(Verification), verifications)
+            db.execute(insert(Responsibility), responsibilities)
+            db.execute(insert(Finance), finances)
+            if files:
+                db.execute(insert(EquipmentFile), files)
+            equipment_ids.extend(ids)
+
+        EquipmentRegistryService(db).rebuild()
+        for table in ("equipment", "verification", "responsibility", "finance", "equipment_files", "equipment_registry"):
+            db.execute(text(f"ANALYZE {table}"))
+        return equipment_ids
+
+
+def clear(db: Session) -> int:
+    """Удалить синтетические записи (BENCH-*), включая архивные; возвращает число единиц"""
+    ids = select(Equipment.id).where(Equipment.factory_number.startswith(BENCH_PREFIX))
+    removed = db.execute(select(func.count()).select_from(ids.subquery())).scalar()
+    ids = ids.scalar_subquery()
+    db.execute(delete(Verification).where(Verification.equipment_id.in_(ids)))
+    db.execute(delete(Responsibility).where(Responsibility.equipment_id.in_(ids)))
+    db.execute(delete(Finance).where(Finance.equipment_model_id.in_(ids)))
+    db.execute(delete(Equipment).where(Equipment.factory_number.startswith(BENCH_PREFIX)))
+    # Архивные таблицы связаны каскадом
+    db.execute(delete(ArchivedEquipment).where(ArchivedEquipment.factory_number.startswith(BENCH_PREFIX)))
+    return removed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Синтетический реестр оборудования для замеров")
+    parser.add_argument("--count", type=int, default=10000, help="Количество единиц оборудования")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора")
+    parser.add_argument("--clear", action="store_true", help="Только удалить записи BENCH-*")
+    args = parser.parse_args(argv)
+
+    from backend.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        removed = clear(db)
+        if removed:
+            print(f"Удалено синтетических записей: {removed}")
+        if not args.clear:
+            started = time.perf_counter()
+            ids = RegistryGenerator(args.seed).generate(db, args.count)
+            print(f"Создано {len(ids)} единиц оборудования за {time.perf_counter() - started:.1f} с")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# benchmarks/registry_suite.py
+# Набор замеров основных сценариев на синтетическом реестре 1k/10k/100k
+
+"""
+Для каждого размера реестра скрипт пересоздаёт синтетические записи
+(registry_generator.py, один и тот же --seed) и замеряет сценарии:
+
+    full_table    GET /main-table/
+    search        поиск по заводскому и инвентарному номеру, фильтр истекающих поверок
+    detail        карточка оборудования и список её файлов
+    create        POST /main-table/
+    update        PUT /main-table/{id}
+    archive       POST /archive/equipment/{id}
+    restore       POST /archive/restore/{id}
+    labels_batch  этикетки на 20 единиц (кэш рендеринга очищается перед каждым вызовом)
+    bid           заявка на поверку на 20 единиц
+    excel_export  GET /backup/export-excel
+    backup        pg_dump через BackupService (пропускается, если pg_dump не найден)
+
+Запросы идут через TestClient в том же процессе: сеть и сервер не влияют
+на результат, а маршруты, сервисы и SQL - те же, что в работающем приложении.
+Отдельного поискового эндпоинта нет (поиск в таблице выполняется на клиенте),
+поэтому search замеряет запросы к проекции equipment_registry по индексам.
+
+Результаты сохраняются в JSON вместе с коммитом и параметрами прогона;
+--compare сравнивает p50 двух прогонов и завершается с кодом 1 при регрессии.
+
+Использование (лучше на отдельной БД, например DB_NAME=deltica_bench):
+    uv run python benchmarks/registry_suite.py --sizes 1000 10000 --json after.json
+    uv run python benchmarks/registry_suite.py --sizes 100000 --scenarios full_table search
+    uv run python benchmarks/registry_suite.py --compare before.json after.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from common import summarize
+from registry_generator import BENCH_PREFIX, RegistryGenerator, clear
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Логи, шаблоны документов и каталоги файлов заданы относительно корня проекта;
+# пути из аргументов разрешаются от исходного рабочего каталога
+LAUNCH_DIR = Path.cwd()
+os.chdir(PROJECT_ROOT)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import or_, select
+
+from backend.app.models import BackupHistory, EquipmentRegistry
+from backend.core.database import SessionLocal
+from backend.core.main import app
+from backend.services.backup import BackupService
+from backend.services.render_cache import render_cache
+from backend.services.user_cache import UserSnapshot
+from backend.utils.auth import get_current_active_admin, get_current_user
+
+SCENARIOS = [
+    "full_table", "search", "detail", "create", "update", "archive", "restore",
+    "labels_batch", "bid", "excel_export", "backup",
+]
+# Тяжёлые сценарии повторяются реже
+SLOW_SCENARIOS = {"excel_export", "backup"}
+BATCH_IDS = 20
+REGRESSION_THRESHOLD = 0.2
+
+BENCH_USER = UserSnapshot(
+    id=0, username="bench", full_name="Benchmark", department="bench", role="admin",
+    is_active=True, windows_username=None, created_at=datetime(2025, 1, 1),
+)
+
+
+class SuiteContext:
+    """Состояние прогона одного размера: клиент, ID реестра, созданные записи"""
+
+    def __init__(self, client: TestClient, generator: RegistryGenerator, ids: List[int], seed: int):
+        self.client = client
+        self.generator = generator
+        self.ids = ids
+        self.rng = random.Random(seed)
+        self.next_index = len(ids)
+        self.created: List[int] = []
+        self.archived: List[int] = []
+
+    def sample(self, count: int) -> List[int]:
+        return self.rng.sample(self.ids, min(count, len(self.ids)))
+
+    def payload(self) -> dict:
+        data = self.generator.payload(self.next_index)
+        self.next_index += 1
+        return data
+
+
+def check(response, scenario: str):
+    if response.status_code != 200:
+        raise RuntimeError(f"{scenario}: HTTP {response.status_code} {response.text[:200]}")
+    return response
+
+
+def run_full_table(ctx: SuiteContext):
+    check(ctx.client.get("/main-table/"), "full_table")
+
+
+def run_search(ctx: SuiteContext):
+    index = ctx.rng.randrange(len(ctx.ids))
+    seed = ctx.generator.seed
+    factory_number = f"{BENCH_PREFIX}F-{seed}-{index}"
+    inventory_number = f"{BENCH_PREFIX}INV-{seed}-{index}"
+    today = date.today()
+    with SessionLocal() as db:
+        found = db.execute(
+            select(EquipmentRegistry.equipment_id).where(or_(
+                EquipmentRegistry.factory_number == factory_number,
+                EquipmentRegistry.inventory_number == inventory_number,
+            ))
+        ).all()
+        if not found:
+            raise RuntimeError(f"search: {factory_number} не найден")
+        db.execute(
+            select(EquipmentRegistry).where(
+                EquipmentRegistry.verification_due.between(today, today + timedelta(days=30))
+            )
+        ).all()
+
+
+def run_detail(ctx: SuiteContext):
+    equipment_id = ctx.rng.choice(ctx.ids)
+    check(ctx.client.get(f"/main-table/{equipment_id}/full"), "detail")
+    check(ctx.client.get(f"/files/equipment/{equipment_id}"), "detail")
+
+
+def run_create(ctx: SuiteContext):
+    response = check(ctx.client.post("/main-table/", json=ctx.payload()), "create")
+    ctx.created.append(response.json()["equipment_id"])
+
+
+def run_update(ctx: SuiteContext):
+    equipment_id = ctx.rng.choice(ctx.created or ctx.ids)
+    check(ctx.client.put(f"/main-table/{equipment_id}", json=ctx.payload()), "update")
+
+
+def run_archive(ctx: SuiteContext):
+    if not ctx.created:
+        run_create(ctx)
+    equipment_id = ctx.created.pop()
+    response = check(
+        ctx.client.post(f"/archive/equipment/{equipment_id}", json={"archive_reason": "benchmark"}),
+        "archive",
+    )
+    ctx.archived.append(response.json()["id"])
+
+
+def run_restore(ctx: SuiteContext):
+    if not ctx.archived:
+        raise RuntimeError("restore: нет архивных записей (запустите вместе со сценарием archive)")
+    response = check(ctx.client.post(f"/archive/restore/{ctx.archived.pop()}"), "restore")
+    ctx.created.append(response.json()["equipment_id"])
+
+
+def run_labels_batch(ctx: SuiteContext):
+    check(ctx.client.post("/documents/labels", json={"equipment_ids": ctx.sample(BATCH_IDS)}), "labels_batch")
+
+
+def run_bid(ctx: SuiteContext):
+    check(ctx.client.post("/documents/bid-poverka", json={"equipment_ids": ctx.sample(BATCH_IDS)}), "bid")
+
+
+def run_excel_export(ctx: SuiteContext):
+    check(ctx.client.get("/backup/export-excel"), "excel_export")
+
+
+def run_backup(ctx: SuiteContext):
+    # Сервис напрямую: эндпоинт ограничивает число резервных копий в месяц
+    service = BackupService()
+    with SessionLocal() as db:
+        backup = service.create_backup(db, BENCH_USER.username)
+        try:
+            if backup.status != "success":
+                raise RuntimeError(f"backup: {backup.error_message}")
+        finally:
+            service.delete_backup(db, backup.id)
+
+
+RUNNERS: Dict[str, Callable[[SuiteContext], None]] = {
+    name: globals()[f"run_{name}"] for name in SCENARIOS
+}
+# Подготовка перед каждым вызовом, не входит в замер: документы рендерятся без кэша
+SETUP: Dict[str, Callable[[], None]] = {
+    "labels_batch": render_cache.clear,
+    "bid": render_cache.clear,
+}
+
+
+def measure(ctx: SuiteContext, scenario: str, repeat: int, warmup: int) -> dict:
+    runner = RUNNERS[scenario]
+    setup = SETUP.get(scenario, lambda: None)
+    for _ in range(warmup):
+        setup()
+        runner(ctx)
+    durations = []
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        runner(ctx)
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def run_size(client: TestClient, size: int, args) -> dict:
+    generator = RegistryGenerator(args.seed)
+    with SessionLocal() as db:
+        clear(db)
+        started = time.perf_counter()
+        ids = generator.generate(db, size)
+        db.commit()
+    print(f"\n=== {size} единиц (генерация {time.perf_counter() - started:.1f} с) ===")
+
+    ctx = SuiteContext(client, generator, ids, args.seed)
+    results = {}
+    for scenario in args.scenarios:
+        if scenario == "backup" and not BackupService()._find_pg_dump():
+            print(f"{scenario:<14} пропущен: pg_dump не найден")
+            continue
+        slow = scenario in SLOW_SCENARIOS
+        results[scenario] = measure(
+            ctx, scenario,
+            repeat=max(1, args.repeat // 5) if slow else args.repeat,
+            warmup=0 if slow else args.warmup,
+        )
+        stats = results[scenario]
+        print(f"{scenario:<14} n={stats['count']:<4} p50={stats['p50_ms']:>9.2f} ms "
+              f"p95={stats['p95_ms']:>9.2f} ms max={stats['max_ms']:>9.2f} ms")
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    app.dependency_overrides[get_current_user] = lambda: BENCH_USER
+    app.dependency_overrides[get_current_active_admin] = lambda: BENCH_USER
+    # Файлы выгрузок Excel, созданные прогоном, удаляются в конце
+    export_dir = BackupService.BACKUP_DIR
+    existing_exports = set(export_dir.glob("*.xlsx")) if export_dir.exists() else set()
+
+    report = {
+        "commit": git_commit(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "sizes": {},
+    }
+    try:
+        with TestClient(app) as client:
+            # Журнал запросов и предупреждения о медленных запросах не нужны в выводе замеров
+            logging.disable(logging.WARNING)
+            for size in args.sizes:
+                report["sizes"][str(size)] = run_size(client, size, args)
+    finally:
+        logging.disable(logging.NOTSET)
+        app.dependency_overrides.clear()
+        with SessionLocal() as db:
+            if not args.keep:
+                clear(db)
+            db.query(BackupHistory).filter(BackupHistory.created_by == BENCH_USER.username).delete()
+            db.commit()
+        if export_dir.exists():
+            for path in set(export_dir.glob("*.xlsx")) - existing_exports:
+                path.unlink()
+        render_cache.clear()
+    return report
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    regressions = 0
+    for size, scenarios in new["sizes"].items():
+        for scenario, stats in scenarios.items():
+            before = base["sizes"].get(size, {}).get(scenario)
+            if not before or not before["p50_ms"]:
+                continue
+            change = stats["p50_ms"] / before["p50_ms"] - 1
+            regressed = change > threshold
+            regressions += regressed
+            print(f"{size:>7} {scenario:<14} p50 {before['p50_ms']:>9.2f} -> {stats['p50_ms']:>9.2f} ms "
+                  f"({change:+.0%}){'  РЕГРЕССИЯ' if regressed else ''}")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Замеры сценариев на синтетическом реестре")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Размеры реестра")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора")
+    parser.add_argument("--repeat", type=int, default=20, help="Замеров на сценарий")
+    parser.add_argument("--warmup", type=int, default=2, help="Прогревочных вызовов на сценарий")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--keep", action="store_true", help="Не удалять синтетические записи после прогона")
+    parser.add_argument("--json", help="Сохранить результаты в JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Сравнить два JSON")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Допустимый рост p50 при сравнении (доля)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*(LAUNCH_DIR / path for path in args.compare), args.threshold)
+
+    # Порядок сценариев фиксирован: restore использует записи из archive
+    args.scenarios = [name for name in SCENARIOS if name in args.scenarios]
+    report = run(args)
+    if args.json:
+        with open(LAUNCH_DIR / args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# benchmarks/workers_scaling.py
+# Пропускная способность сервера при 1, 2 и 4 процессах-обработчиках
+
+"""
+Для каждого числа процессов скрипт запускает сервер
+(python -m backend.core.main --workers N) на отдельном порту, дожидается
+/health/, прогоняет load_harness.py с одними и теми же параметрами
+и останавливает сервер. В конце выводится сравнение: запросы в секунду,
+p50/p99 и ускорение относительно первого значения --workers.
+
+Параметры нагрузки (--scenario, --clients, --duration, --think-scale)
+передаются load_harness.py. Для оценки предела процессов используйте
+--think-scale 0: клиенты отправляют запросы без пауз.
+
+Использование (PostgreSQL запущен, настройки БД - в .env или окружении):
+    uv run python benchmarks/workers_scaling.py --username admin --password admin123
+    uv run python benchmarks/workers_scaling.py --workers 1 2 4 --clients 50 --think-scale 0 --json scaling.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCHMARKS_DIR.parent
+
+
+def wait_ready(url: str, server: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Сервер завершился с кодом {server.returncode}")
+        try:
+            if httpx.get(f"{url}/health/", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Сервер не ответил за {timeout:.0f} с")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def run_workers(args, workers: int, port: int) -> dict:
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "LOG_CONSOLE": "false"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.core.main", "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port)],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(url, server, args.startup_timeout)
+        with tempfile.TemporaryDirectory() as tmp:
+            result_path = Path(tmp) / "result.json"
+            subprocess.run(
+                [sys.executable, str(BENCHMARKS_DIR / "load_harness.py"),
+                 "--url", url,
+                 "--scenario", args.scenario,
+                 "--clients", *map(str, args.clients),
+                 "--duration", str(args.duration),
+                 "--think-scale", str(args.think_scale),
+                 "--username", args.username,
+                 "--password", args.password,
+                 "--label", f"workers={workers}",
+                 "--json", str(result_path)],
+                cwd=BENCHMARKS_DIR, check=True,
+            )
+            with open(result_path, encoding="utf-8") as f:
+                return json.load(f)
+    finally:
+        stop_server(server)
+
+
+def print_summary(runs: List[dict]):
+    base = {level["clients"]: level for level in runs[0]["result"]["levels"]}
+    print(f"\n{'workers':>7} {'clients':>7} {'rps':>9} {'p50, мс':>9} {'p99, мс':>9} {'errors':>7} {'ускорение':>9}")
+    for run in runs:
+        for level in run["result"]["levels"]:
+            first = base.get(level["clients"])
+            speedup = level["rps"] / first["rps"] if first and first["rps"] else float("nan")
+            print(
+                f"{run['workers']:>7} {level['clients']:>7} {level['rps']:>9.1f} "
+                f"{level['latency']['p50_ms']:>9.1f} {level['latency']['p99_ms']:>9.1f} "
+                f"{level['errors']:>7} {speedup:>8.2f}x"
+            )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Сравнение пропускной способности при разном числе процессов")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Числа процессов сервера")
+    parser.add_argument("--port", type=int, default=8100, help="Порт сервера (для каждого прогона +1)")
+    parser.add_argument("--scenario", default="workday")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50])
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--think-scale", type=float, default=1.0)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="Ожидание запуска сервера, с")
+    parser.add_argument("--json", help="Сохранить результаты в JSON-файл")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for offset, workers in enumerate(args.workers):
+        print(f"\n=== workers={workers} ===")
+        runs.append({"workers": workers, "result": run_workers(args, workers, args.port + offset)})
+    print_summary(runs)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(runs, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
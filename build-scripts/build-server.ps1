@@ -148,9 +148,17 @@ a = Analysis(
         'passlib.handlers.bcrypt',
         'sqlalchemy.sql.default_comparator',
         'psycopg',
+        'sqlalchemy.dialects.postgresql.psycopg',
+        'sqlalchemy.ext.asyncio',
+        'greenlet',
         'psycopg2',
         'alembic.operations',
         'docxtpl',
+        'PIL.Image',
+        'PIL.JpegImagePlugin',
+        'PIL.PngImagePlugin',
+        'pypdfium2',
+        'pypdfium2_raw',
     ],
     hookspath=[],
     hooksconfig={},
@@ -45,6 +45,9 @@ a = Analysis(
         'uvicorn.protocols.websockets.auto',
         'uvicorn.lifespan',
         'uvicorn.lifespan.on',
+        'uvicorn.supervisors',
+        'uvicorn.supervisors.multiprocess',
+        'backend.core.main',  # --workers N: процессы импортируют приложение по имени
         'passlib.handlers.bcrypt',
         'sqlalchemy.sql.default_comparator',
         'pydantic_settings',
@@ -57,9 +60,19 @@ a = Analysis(
         'jose.exceptions',
         'pandas',
         'psycopg',
+        'sqlalchemy.dialects.postgresql.psycopg',
+        'sqlalchemy.ext.asyncio',
+        'greenlet',
         'psycopg2',
         'alembic.operations',
         'docxtpl',
+        # Миниатюры файлов: плагины Pillow подключаются динамически, а библиотеку
+        # pdfium из pypdfium2_raw собирают хуки pyinstaller-hooks-contrib
+        'PIL.Image',
+        'PIL.JpegImagePlugin',
+        'PIL.PngImagePlugin',
+        'pypdfium2',
+        'pypdfium2_raw',
     ],
     hookspath=[],
     hooksconfig={},
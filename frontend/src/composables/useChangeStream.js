@@ -0,0 +1,108 @@
+// composables/useChangeStream.js
+// Подписка на поток изменений сервера (Server-Sent Events, /events/stream)
+
+import { ref, onUnmounted } from 'vue'
+import { API_ENDPOINTS } from '../config/api.js'
+
+// Одно соединение на всё приложение (shared state)
+let eventSource = null
+const handlers = new Map()  // event -> Set(handler)
+const isLive = ref(false)
+let wasLive = false
+let reportedUnavailable = false
+
+// Браузер без EventSource - данные загружаются как раньше
+const supported = typeof EventSource !== 'undefined'
+
+// События сервера (см. backend/routes/events.py)
+const EVENTS = ['ready', 'upsert', 'remove', 'files', 'resync']
+
+const emit = (event, data) => {
+  for (const handler of handlers.get(event) || []) {
+    try {
+      handler(data)
+    } catch (error) {
+      console.error(`[ChangeStream] Ошибка обработчика ${event}:`, error)
+    }
+  }
+}
+
+const connect = () => {
+  if (eventSource || !supported) return
+
+  eventSource = new EventSource(API_ENDPOINTS.eventsStream)
+
+  eventSource.onopen = () => {
+    isLive.value = true
+    wasLive = true
+  }
+
+  for (const event of EVENTS) {
+    eventSource.addEventListener(event, (message) => {
+      emit(event, JSON.parse(message.data))
+    })
+  }
+
+  // EventSource переподключается сам и передаёт Last-Event-ID:
+  // пропущенные события сервер дошлёт или пришлёт resync
+  eventSource.onerror = () => {
+    isLive.value = false
+    if (!wasLive && !reportedUnavailable) {
+      // Поток недоступен с самого начала (старый сервер, прокси) - работаем без него
+      reportedUnavailable = true
+      emit('unavailable', {})
+    }
+  }
+}
+
+const disconnect = () => {
+  if (!eventSource) return
+  eventSource.close()
+  eventSource = null
+  isLive.value = false
+  wasLive = false
+  reportedUnavailable = false
+}
+
+/**
+ * Composable для получения изменений данных без перечитывания таблицы
+ *
+ * События:
+ * - ready: соединение установлено, можно загружать данные
+ * - upsert: { rows, reason } - строки главной таблицы добавлены или изменены
+ * - remove: { ids, reason } - строки удалены или списаны в архив
+ * - files: { equipment_id, file_ids, action } - изменились файлы оборудования
+ * - resync: часть событий пропущена, данные нужно перечитать целиком
+ * - unavailable: поток не поддерживается, данные загружаются как раньше
+ *
+ * @returns {Object} - onChange(event, handler), признак активного потока isLive
+ *                     и поддержка потока браузером supported
+ */
+export function useChangeStream() {
+  const subscriptions = []
+
+  const onChange = (event, handler) => {
+    if (!handlers.has(event)) {
+      handlers.set(event, new Set())
+    }
+    handlers.get(event).add(handler)
+    subscriptions.push([event, handler])
+    connect()
+  }
+
+  // Отписка при размонтировании компонента; последний подписчик закрывает соединение
+  onUnmounted(() => {
+    for (const [event, handler] of subscriptions) {
+      handlers.get(event)?.delete(handler)
+    }
+    if ([...handlers.values()].every(set => set.size === 0)) {
+      disconnect()
+    }
+  })
+
+  return {
+    onChange,
+    isLive,
+    supported
+  }
+}
@@ -39,6 +39,7 @@ function createEndpoints(baseUrl) {
     fileUpload: (equipmentId) => `${baseUrl}/files/upload/${equipmentId}`,
     fileView: (fileId) => `${baseUrl}/files/view/${fileId}`,
     fileDownload: (fileId) => `${baseUrl}/files/download/${fileId}`,
+    fileThumb: (fileId) => `${baseUrl}/files/thumb/${fileId}`,
     fileDelete: (fileId) => `${baseUrl}/files/${fileId}`,
     fileSetActive: (fileId) => `${baseUrl}/files/${fileId}/set-active`,
     filesReorder: (equipmentId) => `${baseUrl}/files/equipment/${equipmentId}/reorder`,
@@ -69,6 +70,8 @@ function createEndpoints(baseUrl) {
     // Health & Monitoring
     healthSystem: `${baseUrl}/health/system`,
     healthLogs: (limit = 100) => `${baseUrl}/health/logs?limit=${limit}`,
+    healthLogsSearch: `${baseUrl}/health/logs/search`,
+    healthHistory: (minutes = 60) => `${baseUrl}/health/history?minutes=${minutes}`,
 
     // Auth
     auth: `${baseUrl}/auth`,
@@ -81,7 +84,10 @@ function createEndpoints(baseUrl) {
     documentBidPoverka: `${baseUrl}/documents/bid-poverka`,
     documentBidCalibrovka: `${baseUrl}/documents/bid-calibrovka`,
     documentRequest: `${baseUrl}/documents/request`,
-    documentCommissioningTemplate: `${baseUrl}/documents/commissioning-template`
+    documentCommissioningTemplate: `${baseUrl}/documents/commissioning-template`,
+
+    // Поток изменений (Server-Sent Events)
+    eventsStream: `${baseUrl}/events/stream`
   }
 }
 
@@ -0,0 +1,53 @@
+"""add_foreign_key_and_lookup_indexes
+
+Revision ID: 2f705865521e
+Revises: 8e0d55fc3b9f
+Create Date: 2026-10-19 15:52:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f705865521e'
+down_revision: Union[str, Sequence[str], None] = '8e0d55fc3b9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя индекса, таблица, колонки)
+INDEXES = [
+    # Внешние ключи: JOIN в get_all_data и выборки по оборудованию
+    ('ix_verification_equipment_id', 'verification', ['equipment_id']),
+    ('ix_responsibility_equipment_id', 'responsibility', ['equipment_id']),
+    ('ix_finance_equipment_model_id', 'finance', ['equipment_model_id']),
+    ('ix_equipment_files_equipment_id_sort_order', 'equipment_files', ['equipment_id', 'sort_order']),
+    ('ix_archived_verification_archived_equipment_id', 'archived_verification', ['archived_equipment_id']),
+    ('ix_archived_responsibility_archived_equipment_id', 'archived_responsibility', ['archived_equipment_id']),
+    ('ix_archived_finance_archived_equipment_id', 'archived_finance', ['archived_equipment_id']),
+    ('ix_archived_equipment_files_archived_equipment_id', 'archived_equipment_files', ['archived_equipment_id']),
+    # Фильтры и поиск
+    ('ix_verification_status', 'verification', ['status']),
+    ('ix_verification_verification_due', 'verification', ['verification_due']),
+    ('ix_equipment_factory_number', 'equipment', ['factory_number']),
+    ('ix_equipment_inventory_number', 'equipment', ['inventory_number']),
+    # Подсчёт ссылок на blob при удалении файлов (BlobStore.reference_count)
+    ('ix_equipment_files_file_path', 'equipment_files', ['file_path']),
+    ('ix_archived_equipment_files_file_path', 'archived_equipment_files', ['file_path']),
+    ('ix_pinned_documents_file_path', 'pinned_documents', ['file_path']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,110 @@
+"""add_equipment_registry_projection
+
+Revision ID: 5b3e9d1c7a42
+Revises: 2f705865521e
+Create Date: 2026-10-19 17:05:12.481930
+
+План перехода:
+1. Миграция создаёт таблицу equipment_registry и заполняет её из
+   equipment + verification + responsibility + finance (INSERT ... SELECT).
+2. Приложение поддерживает проекцию в тех же транзакциях, что и изменения
+   оборудования (MainTableService, ArchiveService); списки и выгрузка в Excel
+   читают её без JOIN.
+3. После прямых SQL-изменений (импорт, скрипты исправления) проекция
+   пересобирается; расхождения находит и исправляет
+   backend/scripts/check_equipment_registry.py (--repair / --rebuild).
+Откат: downgrade удаляет таблицу, исходные таблицы не затрагиваются.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b3e9d1c7a42'
+down_revision: Union[str, Sequence[str], None] = '2f705865521e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Связанная запись 1:1 - с наименьшим id (как EquipmentRegistryService.source_query)
+BACKFILL_SQL = """
+    INSERT INTO equipment_registry (
+        equipment_id, equipment_name, equipment_model, equipment_type, equipment_specs,
+        factory_number, inventory_number, equipment_year,
+        verification_type, registry_number, verification_interval, verification_date,
+        verification_due, verification_plan, verification_state, status,
+        department, responsible_person, verifier_org,
+        budget_item, code_rate, cost_rate, quantity, coefficient, total_cost,
+        invoice_number, paid_amount, payment_date
+    )
+    SELECT
+        e.id, e.equipment_name, e.equipment_model, e.equipment_type, e.equipment_specs,
+        e.factory_number, e.inventory_number, e.equipment_year,
+        v.verification_type, v.registry_number, v.verification_interval, v.verification_date,
+        v.verification_due, v.verification_plan, v.verification_state, v.status,
+        r.department, r.responsible_person, r.verifier_org,
+        f.budget_item, f.code_rate, f.cost_rate, f.quantity, f.coefficient, f.total_cost,
+        f.invoice_number, f.paid_amount, f.payment_date
+    FROM equipment e
+    LEFT JOIN (SELECT equipment_id, min(id) AS id FROM verification GROUP BY equipment_id) fv
+        ON fv.equipment_id = e.id
+    LEFT JOIN verification v ON v.id = fv.id
+    LEFT JOIN (SELECT equipment_id, min(id) AS id FROM responsibility GROUP BY equipment_id) fr
+        ON fr.equipment_id = e.id
+    LEFT JOIN responsibility r ON r.id = fr.id
+    LEFT JOIN (SELECT equipment_model_id, min(id) AS id FROM finance GROUP BY equipment_model_id) ff
+        ON ff.equipment_model_id = e.id
+    LEFT JOIN finance f ON f.id = ff.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'equipment_registry',
+        sa.Column('equipment_id', sa.Integer(), nullable=False),
+        sa.Column('equipment_name', sa.String(), nullable=False),
+        sa.Column('equipment_model', sa.String(), nullable=False),
+        sa.Column('equipment_type', postgresql.ENUM(name='equipment_type_enum', create_type=False), nullable=False),
+        sa.Column('equipment_specs', sa.String(), nullable=True),
+        sa.Column('factory_number', sa.String(), nullable=False),
+        sa.Column('inventory_number', sa.String(), nullable=False),
+        sa.Column('equipment_year', sa.Integer(), nullable=False),
+        sa.Column('verification_type', postgresql.ENUM(name='verification_type_enum', create_type=False), nullable=True),
+        sa.Column('registry_number', sa.String(), nullable=True),
+        sa.Column('verification_interval', sa.Integer(), nullable=True),
+        sa.Column('verification_date', sa.Date(), nullable=True),
+        sa.Column('verification_due', sa.Date(), nullable=True),
+        sa.Column('verification_plan', sa.Date(), nullable=True),
+        sa.Column('verification_state', postgresql.ENUM(name='verification_state_enum', create_type=False), nullable=True),
+        sa.Column('status', postgresql.ENUM(name='verification_status_enum', create_type=False), nullable=True),
+        sa.Column('department', sa.String(), nullable=True),
+        sa.Column('responsible_person', sa.String(), nullable=True),
+        sa.Column('verifier_org', sa.String(), nullable=True),
+        sa.Column('budget_item', sa.String(), nullable=True),
+        sa.Column('code_rate', sa.String(), nullable=True),
+        sa.Column('cost_rate', sa.Float(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=True),
+        sa.Column('coefficient', sa.Float(), nullable=True),
+        sa.Column('total_cost', sa.Float(), nullable=True),
+        sa.Column('invoice_number', sa.String(), nullable=True),
+        sa.Column('paid_amount', sa.Float(), nullable=True),
+        sa.Column('payment_date', sa.Date(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('equipment_id')
+    )
+    op.create_index('ix_equipment_registry_status', 'equipment_registry', ['status'], unique=False)
+    op.create_index('ix_equipment_registry_verification_due', 'equipment_registry', ['verification_due'], unique=False)
+
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_equipment_registry_verification_due', table_name='equipment_registry')
+    op.drop_index('ix_equipment_registry_status', table_name='equipment_registry')
+    op.drop_table('equipment_registry')
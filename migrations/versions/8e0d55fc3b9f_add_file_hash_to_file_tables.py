@@ -0,0 +1,33 @@
+"""add_file_hash_to_file_tables
+
+Revision ID: 8e0d55fc3b9f
+Revises: df2fe060be8f
+Create Date: 2026-10-19 15:20:11.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e0d55fc3b9f'
+down_revision: Union[str, Sequence[str], None] = 'df2fe060be8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SHA-256 содержимого, вычисляется при потоковой загрузке файла
+    op.add_column('equipment_files', sa.Column('file_hash', sa.String(length=64), nullable=True))
+    op.add_column('archived_equipment_files', sa.Column('file_hash', sa.String(length=64), nullable=True))
+    op.add_column('pinned_documents', sa.Column('file_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pinned_documents', 'file_hash')
+    op.drop_column('archived_equipment_files', 'file_hash')
+    op.drop_column('equipment_files', 'file_hash')